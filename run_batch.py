@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""MBD_CICDKits 无界面批量构建入口
+
+在独立的工作进程中并行构建多个项目（或同一项目的多个变体），
+按工具限制 MATLAB / IAR 的并发数，输出合并的进度和汇总。
+
+使用方法：
+    python run_batch.py ProjA ProjB                    # 构建两个已保存的项目
+    python run_batch.py --jobs-file nightly.json       # 从任务文件加载项目/变体
+    python run_batch.py ProjA ProjB -j 4 --limit matlab=2 --limit iar=1
+    python run_batch.py ProjA --workflow quick_compile --resume
+
+任务文件格式（JSON）：
+    [{"project": "E0Y", "label": "E0Y_debug", "workflow": "full_pipeline",
+      "overrides": {"target_path": "D:/out/debug"}}]
+
+全部任务成功时退出码为 0，否则为 1。
+"""
+
+import argparse
+import logging
+import multiprocessing
+import sys
+from pathlib import Path
+
+# 添加 src 到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from core.batch import (  # noqa: E402
+    EVENT_DONE,
+    EVENT_LOG,
+    EVENT_PROGRESS,
+    EVENT_STAGE,
+    BatchJob,
+    format_batch_summary,
+    load_batch_jobs,
+    parse_tool_limits,
+    run_batch
+)
+from utils.errors import ConfigError  # noqa: E402
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="MBD_CICDKits 无界面批量构建")
+    parser.add_argument("projects", nargs="*", help="项目配置名称")
+    parser.add_argument("--jobs-file", type=Path, help="批量任务文件（JSON）")
+    parser.add_argument("--workflow", default="", help="工作流模板 ID（默认使用项目保存的工作流）")
+    parser.add_argument("-j", "--max-workers", type=int, default=None, help="最大并行任务数")
+    parser.add_argument("--limit", action="append", default=[], metavar="TOOL=N",
+                        help="工具并发上限，例如 matlab=2、iar=1（<= 0 表示不限制）")
+    parser.add_argument("--resume", action="store_true", help="从上次失败的阶段继续")
+    parser.add_argument("-v", "--verbose", action="store_true", help="输出各任务的详细日志")
+    return parser.parse_args(argv)
+
+
+def print_event(event: dict, verbose: bool = False):
+    """输出批量构建事件"""
+    label = event["job"]
+    if event["type"] == EVENT_PROGRESS:
+        print(f"[{label}] {event['percent']:3d}% {event['message']}", flush=True)
+    elif event["type"] == EVENT_STAGE:
+        print(f"[{label}] 阶段 {event['stage']} {'完成' if event['success'] else '失败'}", flush=True)
+    elif event["type"] == EVENT_LOG and verbose:
+        print(f"[{label}] {event['message']}", flush=True)
+    elif event["type"] == EVENT_DONE:
+        result = event["result"]
+        status = "成功" if result.success else f"失败 {result.error}"
+        print(f"[{label}] 构建{status} ({result.duration:.1f} 秒)", flush=True)
+
+
+def main(argv=None) -> int:
+    """启动批量构建"""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    try:
+        jobs = [BatchJob(project=name, workflow_id=args.workflow) for name in args.projects]
+        if args.jobs_file:
+            jobs.extend(load_batch_jobs(args.jobs_file))
+        tool_limits = parse_tool_limits(args.limit)
+    except (ConfigError, ValueError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+
+    if not jobs:
+        print("错误: 未指定任何项目", file=sys.stderr)
+        return 2
+
+    try:
+        results = run_batch(
+            jobs,
+            max_workers=args.max_workers,
+            tool_limits=tool_limits,
+            resume=args.resume,
+            on_event=lambda event: print_event(event, args.verbose)
+        )
+    except ValueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+
+    print()
+    print(format_batch_summary(results))
+    return 0 if all(r.success for r in results) else 1
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""MBD_CICDKits 本地构建队列服务入口
+
+共享构建机上运行一个队列服务，GUI 和命令行将构建提交到队列，
+按优先级和资源占用（MATLAB / IAR 许可、项目工作目录）调度执行。
+
+使用方法：
+    python run_queue.py serve -j 2 --limit matlab=1 --limit iar=2   # 启动服务
+    python run_queue.py submit ProjA --priority 10                    # 提交构建
+    python run_queue.py status                                        # 查看队列
+    python run_queue.py watch <任务ID>                                # 跟踪进度
+    python run_queue.py cancel <任务ID>                               # 取消任务
+    python run_queue.py shutdown                                      # 停止服务
+"""
+
+import argparse
+import logging
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+# 添加 src 到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from core.batch import EVENT_DONE, EVENT_LOG, EVENT_PROGRESS, EVENT_STAGE, BatchJob, parse_tool_limits  # noqa: E402
+from core.build_queue import (  # noqa: E402
+    DEFAULT_QUEUE_WORKERS,
+    BuildQueue,
+    BuildQueueClient,
+    BuildQueueServer
+)
+from utils.errors import BuildQueueError  # noqa: E402
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="MBD_CICDKits 本地构建队列")
+    parser.add_argument("--service-file", type=Path, default=None, help="服务信息文件路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    serve = sub.add_parser("serve", help="启动构建队列服务")
+    serve.add_argument("-j", "--max-workers", type=int, default=DEFAULT_QUEUE_WORKERS, help="最大同时构建数")
+    serve.add_argument("--limit", action="append", default=[], metavar="TOOL=N",
+                       help="工具并发上限，例如 matlab=1、iar=2（<= 0 表示不限制）")
+    serve.add_argument("--port", type=int, default=0, help="监听端口（默认自动分配）")
+
+    submit = sub.add_parser("submit", help="提交构建")
+    submit.add_argument("project", help="项目配置名称")
+    submit.add_argument("--workflow", default="", help="工作流模板 ID")
+    submit.add_argument("--priority", type=int, default=0, help="优先级（越大越先执行）")
+    submit.add_argument("--watch", action="store_true", help="提交后跟踪进度")
+
+    sub.add_parser("status", help="查看队列")
+
+    watch = sub.add_parser("watch", help="跟踪任务进度")
+    watch.add_argument("job_id", help="任务 ID")
+
+    cancel = sub.add_parser("cancel", help="取消任务")
+    cancel.add_argument("job_id", help="任务 ID")
+
+    sub.add_parser("shutdown", help="停止服务（取消所有任务）")
+    return parser.parse_args(argv)
+
+
+def watch_job(client: BuildQueueClient, job_id: str) -> int:
+    """输出任务事件直到任务结束"""
+    since = 0
+    while True:
+        events, since = client.events(job_id, since)
+        for event in events:
+            if event["type"] == EVENT_PROGRESS:
+                print(f"{event['percent']:3d}% {event['message']}", flush=True)
+            elif event["type"] == EVENT_STAGE:
+                print(f"阶段 {event['stage']} {'完成' if event['success'] else '失败'}", flush=True)
+            elif event["type"] == EVENT_LOG:
+                print(f"  {event['message']}", flush=True)
+            elif event["type"] == EVENT_DONE:
+                result = event.get("result") or {}
+                print(f"任务 {job_id} 结束: {event['state']} {result.get('error', '')}".rstrip(), flush=True)
+                return 0 if event["state"] == "completed" else 1
+            else:
+                print(f"任务 {job_id}: {event['type']}", flush=True)
+        time.sleep(0.5)
+
+
+def main(argv=None) -> int:
+    """执行命令"""
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.command == "serve":
+        try:
+            tool_limits = parse_tool_limits(args.limit)
+        except ValueError as e:
+            print(f"错误: {e}", file=sys.stderr)
+            return 2
+        server = BuildQueueServer(
+            BuildQueue(max_workers=args.max_workers, tool_limits=tool_limits),
+            port=args.port,
+            service_file=args.service_file
+        )
+        print(f"构建队列服务已启动: {server.address[0]}:{server.address[1]} (Ctrl+C 停止)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
+        return 0
+
+    client = BuildQueueClient(args.service_file)
+    try:
+        if args.command == "submit":
+            job_id = client.submit(BatchJob(project=args.project, workflow_id=args.workflow), args.priority)
+            print(job_id)
+            return watch_job(client, job_id) if args.watch else 0
+        if args.command == "status":
+            for job in client.status():
+                print(f"{job['job_id']}  {job['state']:<9}  P{job['priority']:<3}  {job['percent']:3d}%  "
+                      f"{job['label']}  {job['message']}")
+            return 0
+        if args.command == "watch":
+            return watch_job(client, args.job_id)
+        if args.command == "cancel":
+            cancelled = client.cancel(args.job_id)
+            print("已取消" if cancelled else "任务不存在或已结束")
+            return 0 if cancelled else 1
+        if args.command == "shutdown":
+            client.shutdown()
+            return 0
+    except BuildQueueError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        return 130
+    return 2
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
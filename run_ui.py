@@ -11,6 +11,7 @@
     python run_ui.py --dark   # 深色主题
 """
 
+import multiprocessing
 import sys
 import traceback
 from pathlib import Path
@@ -123,4 +124,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # 打包后的 exe 中，进程池工作进程由 freeze_support 接管，不会重新启动 GUI
+    multiprocessing.freeze_support()
     main()
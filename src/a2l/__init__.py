@@ -11,15 +11,57 @@ Architecture Decision ADR-005:
 Modules:
     elf_parser: ELF file symbol extraction
     a2l_parser: A2L file structure parsing
+    mapped_parser: Memory-mapped, offset-indexed A2L parsing
+    parse_cache: Binary A2L parse snapshot cache keyed by content hash
     address_updater: A2L address update logic
+    leaf_index: Leaf-name symbol index with ambiguity detection
+    inplace_patcher: Fixed-width in-place address patching with undo journal
+    post_processor: Single-pass A2L post-processing engine
+    chunked_processor: Multi-core chunked A2L post-processing
+    document: In-memory A2L document shared by the A2L stage steps
+    dwarf_resolver: DWARF struct member address index
+    elf_cache: Persistent content-addressed ELF index cache
+    cal_extractor: Calibration initial-value snapshot from ELF data sections
+    daq_optimizer: XCP DAQ/ODT packing by MEASUREMENT address contiguity
+    address_validator: A2L address range validation against ELF sections and symbols
+    support_pruner: Removal of unreferenced COMPU_METHOD/COMPU_VTAB/RECORD_LAYOUT blocks
+    a2l_diff: Semantic A2L diff between two builds
 """
 
 from a2l.elf_parser import ELFParser
 from a2l.a2l_parser import A2LParser
+from a2l.mapped_parser import MappedA2LParser
+from a2l.parse_cache import A2LParseCache
 from a2l.address_updater import A2LAddressUpdater
+from a2l.leaf_index import SymbolLeafIndex
+from a2l.inplace_patcher import A2LInPlacePatcher
+from a2l.post_processor import A2LPostProcessor
+from a2l.chunked_processor import ChunkedA2LPostProcessor
+from a2l.document import A2LDocument
+from a2l.dwarf_resolver import DWARFMemberResolver
+from a2l.elf_cache import ELFIndexCache
+from a2l.cal_extractor import CalibrationExtractor
+from a2l.daq_optimizer import DAQOptimizer
+from a2l.address_validator import A2LAddressValidator
+from a2l.support_pruner import A2LSupportPruner
+from a2l.a2l_diff import A2LDiffer
 
 __all__ = [
     "ELFParser",
     "A2LParser",
+    "MappedA2LParser",
+    "A2LParseCache",
     "A2LAddressUpdater",
+    "SymbolLeafIndex",
+    "A2LInPlacePatcher",
+    "A2LPostProcessor",
+    "ChunkedA2LPostProcessor",
+    "A2LDocument",
+    "DWARFMemberResolver",
+    "ELFIndexCache",
+    "CalibrationExtractor",
+    "DAQOptimizer",
+    "A2LAddressValidator",
+    "A2LSupportPruner",
+    "A2LDiffer",
 ]
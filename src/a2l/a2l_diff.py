@@ -0,0 +1,392 @@
+"""Semantic A2L diff between two builds.
+
+Text diffs of two 100 MB A2L files are slow and dominated by address
+noise. This module indexes CHARACTERISTIC, MEASUREMENT and AXIS_PTS
+objects (block detection as in A2LParser, standard and Simulink
+formats) by name in a single streaming pass over each file and compares
+them field by field:
+
+- positional header fields are named after the ASAP2 parameter order
+  (datatype, conversion, lower_limit, ...)
+- optional keyword lines become fields named after the keyword
+  (ECU_ADDRESS, MATRIX_DIM, BIT_MASK, ...)
+- nested blocks (IF_DATA, ANNOTATION, ...) become one field per block
+  type with whitespace-normalized content
+- comments are ignored, so reformatting a Simulink header is no change
+
+Address fields (header address, ECU_ADDRESS, address lines) can be
+ignored so that a relink does not mark every object as changed.
+
+Usage:
+    differ = A2LDiffer(ignore_addresses=True)
+    result = differ.diff("App_old.a2l", "App_new.a2l")
+    for change in result.changed:
+        print(change.name, [c.field for c in change.changes])
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from a2l.a2l_parser import A2LParser, A2LParseError
+from a2l.post_processor import A2L_ENCODINGS
+
+logger = logging.getLogger(__name__)
+
+# 各类对象头部的位置参数名称（ASAP2 参数顺序，不含名称）
+HEADER_FIELDS = {
+    "CHARACTERISTIC": (
+        "long_identifier", "type", "address", "deposit", "max_diff",
+        "conversion", "lower_limit", "upper_limit",
+    ),
+    "MEASUREMENT": (
+        "long_identifier", "datatype", "conversion", "resolution", "accuracy",
+        "lower_limit", "upper_limit",
+    ),
+    "AXIS_PTS": (
+        "long_identifier", "address", "input_quantity", "deposit", "max_diff",
+        "conversion", "max_axis_points", "lower_limit", "upper_limit",
+    ),
+}
+
+# 视为地址的字段
+ADDRESS_FIELDS = frozenset({"address", "ECU_ADDRESS"})
+
+TOKEN_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\S+')
+NESTED_BEGIN_PATTERN = re.compile(r'/begin\s+(\w+)', re.IGNORECASE)
+NESTED_END_PATTERN = re.compile(r'/end\s+(\w+)', re.IGNORECASE)
+
+# 对象索引: (类型, 名称) -> {字段: 值}
+A2LIndex = Dict[Tuple[str, str], Dict[str, str]]
+
+
+@dataclass
+class FieldChange:
+    """字段变化
+
+    Attributes:
+        field: 字段名称
+        old: 旧值（新增字段为 None）
+        new: 新值（删除字段为 None）
+    """
+    field: str
+    old: Optional[str] = None
+    new: Optional[str] = None
+
+
+@dataclass
+class ObjectChange:
+    """对象变化
+
+    Attributes:
+        kind: 对象类型
+        name: 对象名称
+        changes: 字段变化列表
+    """
+    kind: str
+    name: str
+    changes: List[FieldChange] = field(default_factory=list)
+
+
+@dataclass
+class A2LDiffResult:
+    """A2L 差异结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        old_path: 旧 A2L 文件路径
+        new_path: 新 A2L 文件路径
+        old_count: 旧文件对象数量
+        new_count: 新文件对象数量
+        added: 新增对象 [(类型, 名称)]
+        removed: 删除对象 [(类型, 名称)]
+        changed: 变化对象
+        address_changed: 只有地址变化的对象数量（忽略地址时统计）
+        execution_time: 耗时（秒）
+    """
+    success: bool = False
+    message: str = ""
+    old_path: str = ""
+    new_path: str = ""
+    old_count: int = 0
+    new_count: int = 0
+    added: List[Tuple[str, str]] = field(default_factory=list)
+    removed: List[Tuple[str, str]] = field(default_factory=list)
+    changed: List[ObjectChange] = field(default_factory=list)
+    address_changed: int = 0
+    execution_time: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {
+            "old_path": self.old_path,
+            "new_path": self.new_path,
+            "summary": {
+                "old_objects": self.old_count,
+                "new_objects": self.new_count,
+                "added": len(self.added),
+                "removed": len(self.removed),
+                "changed": len(self.changed),
+                "address_changed": self.address_changed,
+            },
+            "added": [{"kind": kind, "name": name} for kind, name in self.added],
+            "removed": [{"kind": kind, "name": name} for kind, name in self.removed],
+            "changed": [
+                {
+                    "kind": change.kind,
+                    "name": change.name,
+                    "fields": [
+                        {"field": c.field, "old": c.old, "new": c.new}
+                        for c in change.changes
+                    ],
+                }
+                for change in self.changed
+            ],
+        }
+
+
+class _ObjectBuilder:
+    """当前正在索引的顶层对象（内部使用）"""
+
+    __slots__ = ('kind', 'name', 'fields', 'header', 'header_pos', 'nested', 'nested_kind', 'nested_depth')
+
+    def __init__(self, kind: str, name: str):
+        self.kind = kind
+        self.name = name
+        self.fields: Dict[str, str] = {}
+        self.header = HEADER_FIELDS[kind]
+        self.header_pos = -1 if not name else 0
+        self.nested: List[str] = []
+        self.nested_kind = ""
+        self.nested_depth = 0
+
+    def add_tokens(self, tokens: List[str]):
+        """依次填充名称和头部位置参数，其余按“关键字 值”记录"""
+        header = self.header
+        pos = self.header_pos
+        i = 0
+        count = len(tokens)
+        while i < count and pos < len(header):
+            if pos < 0:
+                self.name = tokens[i]
+            else:
+                self.fields[header[pos]] = tokens[i]
+            pos += 1
+            i += 1
+        self.header_pos = pos
+        if i < count:
+            key = tokens[i]
+            value = " ".join(tokens[i + 1:])
+            # 同一关键字出现多次时合并
+            self.fields[key] = f"{self.fields[key]}; {value}" if key in self.fields else value
+
+    def add_nested(self, kind: str, text: str):
+        """记录嵌套块内容（同类嵌套块合并为一个字段）"""
+        key = f"/begin {kind}"
+        self.fields[key] = f"{self.fields[key]} | {text}" if key in self.fields else text
+
+
+def _strip_comments(line: str) -> str:
+    """删除行内的 /* ... */ 注释"""
+    while '/*' in line:
+        before, _, rest = line.partition('/*')
+        line = before + ' ' + rest.partition('*/')[2]
+    return line
+
+
+def _index_lines(lines: Iterable[str]) -> A2LIndex:
+    """单遍索引核心
+
+    Args:
+        lines: 行迭代器
+
+    Returns:
+        A2LIndex: 对象索引
+    """
+    index: A2LIndex = {}
+    current: Optional[_ObjectBuilder] = None
+
+    for line in lines:
+        if current is None:
+            if '/begin' not in line:
+                continue
+            start = A2LParser.BLOCK_START_PATTERN.search(line)
+            if start is None:
+                start = A2LParser.BLOCK_START_PATTERN_SIMULINK.search(line)
+            if start is None:
+                continue
+            kind = start.group(1).upper()
+            current = _ObjectBuilder(kind, "")
+            rest = line[start.start() + len("/begin"):]
+            tokens = TOKEN_PATTERN.findall(_strip_comments(rest))[1:]
+            if tokens:
+                current.add_tokens(tokens)
+            continue
+
+        # 嵌套块：整体作为一个字段
+        if current.nested_depth:
+            current.nested_depth += len(NESTED_BEGIN_PATTERN.findall(line))
+            current.nested_depth -= len(NESTED_END_PATTERN.findall(line))
+            if current.nested_depth > 0:
+                current.nested.append(line.strip())
+            else:
+                current.add_nested(current.nested_kind, " ".join(" ".join(current.nested).split()))
+                current.nested = []
+            continue
+
+        if '/' in line:
+            if '/end' in line and A2LParser.BLOCK_END_PATTERN.search(line):
+                if current.name:
+                    index[(current.kind, current.name)] = current.fields
+                current = None
+                continue
+            nested = NESTED_BEGIN_PATTERN.search(line) if '/begin' in line else None
+            if nested:
+                current.nested_kind = nested.group(1).upper()
+                current.nested_depth = 1 - len(NESTED_END_PATTERN.findall(line, nested.end()))
+                if current.nested_depth <= 0:
+                    current.add_nested(current.nested_kind, " ".join(line[nested.end():].split()))
+                    current.nested_depth = 0
+                else:
+                    current.nested = [line[nested.end():].strip()]
+                continue
+            line = _strip_comments(line)
+
+        tokens = TOKEN_PATTERN.findall(line) if '"' in line else line.split()
+        if tokens:
+            current.add_tokens(tokens)
+
+    return index
+
+
+def index_a2l(a2l_path: Path) -> A2LIndex:
+    """流式读取 A2L 文件并按对象名称建立字段索引
+
+    Args:
+        a2l_path: A2L 文件路径
+
+    Returns:
+        A2LIndex: (类型, 名称) 到字段的映射
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        A2LParseError: 文件无法解码
+    """
+    a2l_path = Path(a2l_path)
+    if not a2l_path.exists():
+        raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+
+    for encoding in A2L_ENCODINGS:
+        try:
+            with open(a2l_path, 'r', encoding=encoding) as f:
+                return _index_lines(f)
+        except UnicodeDecodeError:
+            logger.debug(f"A2L 文件不是 {encoding} 编码，尝试下一种编码: {a2l_path}")
+            continue
+
+    raise A2LParseError(f"无法解码 A2L 文件（尝试 {', '.join(A2L_ENCODINGS)}）: {a2l_path}")
+
+
+def diff_indexes(
+    old: A2LIndex,
+    new: A2LIndex,
+    ignore_addresses: bool = True
+) -> A2LDiffResult:
+    """比较两个对象索引
+
+    Args:
+        old: 旧文件索引
+        new: 新文件索引
+        ignore_addresses: 是否忽略地址字段
+
+    Returns:
+        A2LDiffResult: 差异结果（不含路径、消息和耗时）
+    """
+    result = A2LDiffResult(success=True, old_count=len(old), new_count=len(new))
+    result.added = sorted(key for key in new if key not in old)
+    result.removed = sorted(key for key in old if key not in new)
+
+    for key in sorted(old.keys() & new.keys()):
+        old_fields, new_fields = old[key], new[key]
+        if old_fields == new_fields:
+            continue
+        changes = [
+            FieldChange(name, old_fields.get(name), new_fields.get(name))
+            for name in sorted(old_fields.keys() | new_fields.keys())
+            if old_fields.get(name) != new_fields.get(name)
+        ]
+        if ignore_addresses:
+            significant = [c for c in changes if c.field not in ADDRESS_FIELDS]
+            if len(significant) != len(changes):
+                result.address_changed += not significant
+            changes = significant
+        if changes:
+            result.changed.append(ObjectChange(key[0], key[1], changes))
+
+    return result
+
+
+class A2LDiffer:
+    """A2L 语义差异比较器
+
+    Attributes:
+        ignore_addresses: 是否忽略地址字段
+    """
+
+    def __init__(self, ignore_addresses: bool = True):
+        """初始化比较器
+
+        Args:
+            ignore_addresses: 是否忽略地址字段
+        """
+        self.ignore_addresses = ignore_addresses
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def diff(self, old_path: Path, new_path: Path) -> A2LDiffResult:
+        """比较两个 A2L 文件
+
+        Args:
+            old_path: 旧 A2L 文件路径
+            new_path: 新 A2L 文件路径
+
+        Returns:
+            A2LDiffResult: 差异结果
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            A2LParseError: 文件无法解码
+        """
+        start_time = time.monotonic()
+        result = diff_indexes(index_a2l(old_path), index_a2l(new_path), self.ignore_addresses)
+        result.old_path = str(old_path)
+        result.new_path = str(new_path)
+        result.execution_time = time.monotonic() - start_time
+        result.message = (
+            f"A2L 差异比较完成: 新增 {len(result.added)}, 删除 {len(result.removed)}, "
+            f"变化 {len(result.changed)}"
+            + (f", 仅地址变化 {result.address_changed}（已忽略）" if self.ignore_addresses else "")
+        )
+        self._log(result.message)
+        return result
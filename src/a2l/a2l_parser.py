@@ -35,8 +35,14 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Generator
 
+from a2l.parse_cache import A2LParseCache, A2LParseIndex, KIND_LINES
+
 logger = logging.getLogger(__name__)
 
+# 变量类型编码（紧凑数组和解析缓存中保存为单字节）
+VAR_TYPES = ("CHARACTERISTIC", "MEASUREMENT", "AXIS_PTS")
+VAR_TYPE_CODES = {name: code for code, name in enumerate(VAR_TYPES)}
+
 
 class A2LParseError(Exception):
     """A2L 解析错误
@@ -46,6 +52,23 @@ class A2LParseError(Exception):
     pass
 
 
+def decode_token(raw: bytes) -> str:
+    """解码从字节内容中读取的名称/地址等标记
+
+    UTF-8 优先，失败时按 latin-1，与 A2LParser 读取文件时的编码回退一致。
+
+    Args:
+        raw: 标记原始字节
+
+    Returns:
+        str: 解码后的标记
+    """
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return raw.decode('latin-1')
+
+
 @dataclass
 class A2LVariable:
     """A2L 变量信息
@@ -129,15 +152,20 @@ class A2LParser:
         re.IGNORECASE
     )
 
-    def __init__(self, a2l_path: Optional[Path] = None):
+    # 解析缓存条目类型（行号按 splitlines 计数）
+    CACHE_KIND = KIND_LINES
+
+    def __init__(self, a2l_path: Optional[Path] = None, cache: Optional[A2LParseCache] = None):
         """初始化 A2L 解析器
 
         Args:
             a2l_path: 可选的 A2L 文件路径
+            cache: 可选的 A2L 解析缓存（A2L 内容未变化时跳过块扫描）
         """
         self.a2l_path = a2l_path
+        self._cache = cache
         self._variables: Dict[str, A2LVariable] = {}
-        self._lines: List[str] = []
+        self._lines: Optional[List[str]] = []
 
     @property
     def variables(self) -> Dict[str, A2LVariable]:
@@ -181,12 +209,18 @@ class A2LParser:
         logger.info(f"开始解析 A2L 文件: {self.a2l_path} ({file_size} bytes)")
 
         try:
-            # 读取文件内容（尝试多种编码）
-            content = self._read_file_with_encoding(self.a2l_path)
-            self._lines = content.splitlines()
-
-            # 解析变量块
-            self._parse_blocks()
+            # 解析变量块（A2L 内容未变化时直接使用缓存的块索引，文件行在 get_lines() 时才读取）
+            index = self._cache.load(self.a2l_path, self.CACHE_KIND) if self._cache else None
+            if index is not None:
+                self._load_index(index)
+                self._lines = None
+            else:
+                # 读取文件内容（尝试多种编码）
+                content = self._read_file_with_encoding(self.a2l_path)
+                self._lines = content.splitlines()
+                self._parse_blocks()
+                if self._cache:
+                    self._cache.store(self.a2l_path, self.CACHE_KIND, self._build_index())
 
             logger.info(f"A2L 解析完成: 提取 {len(self._variables)} 个变量")
 
@@ -325,6 +359,41 @@ class A2LParser:
                     else:
                         current_block.address = int(addr_str)
 
+    def _build_index(self) -> A2LParseIndex:
+        """将解析结果转换为可缓存的块索引"""
+        index = A2LParseIndex()
+        for var in self._variables.values():
+            index.names.append(var.name)
+            index.type_codes.append(VAR_TYPE_CODES[var.var_type])
+            index.line_starts.append(var.line_start)
+            index.line_ends.append(var.line_end)
+            index.address_lines.append(var.address_line)
+            index.address_starts.append(0)
+            index.address_ends.append(0)
+            index.address_strs.append(var.address_str)
+        return index
+
+    def _load_index(self, index: A2LParseIndex):
+        """从缓存的块索引恢复解析结果"""
+        for i, name in enumerate(index.names):
+            addr_str = index.address_strs[i]
+            self._variables[name] = A2LVariable(
+                name=name,
+                var_type=VAR_TYPES[index.type_codes[i]],
+                address=self._parse_address(addr_str) if addr_str else 0,
+                address_str=addr_str,
+                line_start=index.line_starts[i],
+                line_end=index.line_ends[i],
+                address_line=index.address_lines[i]
+            )
+
+    @staticmethod
+    def _parse_address(addr_str: str) -> int:
+        """解析地址字符串（0x 前缀为十六进制，否则为十进制）"""
+        if addr_str.lower().startswith('0x'):
+            return int(addr_str, 16)
+        return int(addr_str)
+
     def get_variable(self, name: str) -> Optional[A2LVariable]:
         """获取指定变量信息
 
@@ -357,13 +426,22 @@ class A2LParser:
         return len(self._variables)
 
     def get_lines(self) -> List[str]:
-        """获取文件所有行
+        """获取文件所有行（命中解析缓存时首次调用才读取文件）
 
         Returns:
             List[str]: 文件行列表
         """
+        if self._lines is None:
+            self._lines = self._read_file_with_encoding(self.a2l_path).splitlines()
         return self._lines
 
+    def close(self):
+        """释放解析器持有的资源
+
+        内存中解析的 A2LParser 无需释放，MappedA2LParser 会关闭内存映射。
+        """
+        pass
+
     def get_characteristic_count(self) -> int:
         """获取 CHARACTERISTIC 数量
 
@@ -10,13 +10,23 @@ Equivalent to MATLAB: rtw.asap2SetAddress('TmsApp.a2l', 'CYT4BF_M7_Master.elf')
 """
 
 import logging
+import os
 import shutil
+import tempfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Callable
+from typing import Dict, List, Optional, Sequence, Tuple, Callable
 
 from a2l.elf_parser import ELFParser, ELFParseError
-from a2l.a2l_parser import A2LParser, A2LParseError, A2LVariable
+from a2l.a2l_parser import A2LParser, A2LParseError
+from a2l.mapped_parser import MappedA2LParser
+from a2l.parse_cache import A2LParseCache
+from a2l.inplace_patcher import A2LInPlacePatcher
+from a2l.dwarf_resolver import DWARFMemberResolver
+from a2l.elf_cache import ELFIndexCache, read_shared_index, share_index
+from a2l.leaf_index import SymbolLeafIndex
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +39,135 @@ class AddressUpdateError(Exception):
     pass
 
 
+def match_symbol_address(
+    var_name: str,
+    symbol_map: Dict[str, int],
+    member_index: Optional[Dict[str, int]] = None,
+    leaf_index: Optional[SymbolLeafIndex] = None
+) -> Tuple[Optional[int], str, List[str]]:
+    """按 A2L 变量名在符号表中查找地址
+
+    匹配顺序：
+    1. 精确匹配
+    2. 结构体成员匹配（DWARF 点号路径索引，如 Model_B.Out）
+    3. 叶子节点匹配（处理点号分隔的层级变量名）
+
+    提供 leaf_index 时，叶子节点对应多个地址不同的候选符号视为歧义，
+    不做猜测，返回 (None, "ambiguous", 候选符号列表)。
+
+    Args:
+        var_name: A2L 变量名称
+        symbol_map: 符号名称到地址的映射
+        member_index: 可选的 DWARF 成员路径到地址的映射
+        leaf_index: 可选的叶子节点索引（基于同一符号表建立）
+
+    Returns:
+        Tuple[Optional[int], str, List[str]]: (地址, 匹配类型, 歧义候选符号)，
+        未匹配时返回 (None, "", [])；候选符号只在匹配类型为 "ambiguous" 时非空
+    """
+    # 1. 精确匹配
+    addr = symbol_map.get(var_name)
+    if addr is not None:
+        return addr, "exact", []
+
+    # 2. 结构体成员匹配（DWARF 成员偏移）
+    if member_index and "." in var_name:
+        addr = member_index.get(var_name)
+        if addr is not None:
+            return addr, "member", []
+
+    # 3. 叶子节点匹配（处理点号分隔的层级变量名）
+    if "." in var_name and leaf_index is not None:
+        addr, candidates = leaf_index.resolve(var_name)
+        if addr is not None:
+            return addr, "leaf", []
+        return None, "ambiguous" if candidates else "", candidates
+
+    if "." in var_name:
+        leaf_name = var_name.split(".")[-1]
+        addr = symbol_map.get(leaf_name)
+        if addr is not None:
+            return addr, "leaf", []
+
+    return None, "", []
+
+
+@dataclass
+class AddressDelta:
+    """地址增量报告
+
+    比较 ELF 中的新地址与 A2L 中已有地址的差异。A2L 中地址为 0
+    （或没有地址字段）视为尚未分配地址。
+
+    Attributes:
+        moved: 地址变化的变量 (名称, 旧地址, 新地址)
+        new: 新获得地址的变量 (名称, 新地址)
+        vanished: 原有地址但 ELF 中已不存在的变量 (名称, 旧地址)
+        unchanged_count: 地址未变化的变量数量
+    """
+    moved: List[Tuple[str, int, int]] = field(default_factory=list)
+    new: List[Tuple[str, int]] = field(default_factory=list)
+    vanished: List[Tuple[str, int]] = field(default_factory=list)
+    unchanged_count: int = 0
+
+    @property
+    def has_changes(self) -> bool:
+        """是否有需要写入 A2L 的地址变化（消失的变量不修改文件）"""
+        return bool(self.moved or self.new)
+
+    def record(self, name: str, old_addr: int, new_addr: Optional[int]):
+        """记录单个变量的比较结果
+
+        Args:
+            name: 变量名称
+            old_addr: A2L 中的原地址（0 表示未分配）
+            new_addr: ELF 中匹配的新地址，未匹配时为 None
+        """
+        if new_addr is None:
+            if old_addr:
+                self.vanished.append((name, old_addr))
+        elif new_addr == old_addr:
+            self.unchanged_count += 1
+        elif old_addr:
+            self.moved.append((name, old_addr, new_addr))
+        else:
+            self.new.append((name, new_addr))
+
+    def extend(self, other: "AddressDelta"):
+        """追加另一份增量报告（分块处理时按块顺序合并）
+
+        Args:
+            other: 要追加的增量报告
+        """
+        self.moved.extend(other.moved)
+        self.new.extend(other.new)
+        self.vanished.extend(other.vanished)
+        self.unchanged_count += other.unchanged_count
+
+    def to_dict(self) -> Dict[str, object]:
+        """转换为可序列化为 JSON 的字典
+
+        Returns:
+            Dict[str, object]: 增量报告字典，地址格式为 0x%08X
+        """
+        return {
+            "moved": [
+                {"name": name, "old": f"0x{old:08X}", "new": f"0x{new:08X}"}
+                for name, old, new in self.moved
+            ],
+            "new": [{"name": name, "new": f"0x{new:08X}"} for name, new in self.new],
+            "vanished": [{"name": name, "old": f"0x{old:08X}"} for name, old in self.vanished],
+            "unchanged_count": self.unchanged_count,
+        }
+
+    def summary(self) -> str:
+        """生成单行摘要"""
+        return (
+            f"移动 {len(self.moved)}, 新增 {len(self.new)}, "
+            f"消失 {len(self.vanished)}, 未变化 {self.unchanged_count}"
+        )
+
+
 @dataclass
 class AddressUpdateResult:
     """地址更新结果
@@ -45,6 +184,11 @@ class AddressUpdateResult:
         updated_variables: 更新的变量列表
         unmatched_variables: 未匹配的变量列表
         output_path: 更新后的 A2L 文件路径
+        patched_count: 原地修改的地址数量（原地修改模式和增量模式）
+        journal_path: 撤销日志路径（仅原地修改模式）
+        delta: 地址增量报告（增量模式和原地修改模式）
+        write_skipped: 地址均未变化而跳过写文件（仅增量模式）
+        ambiguous_variables: 叶子节点歧义的变量及其候选符号（同时计入未匹配）
     """
     success: bool = False
     message: str = ""
@@ -55,6 +199,78 @@ class AddressUpdateResult:
     updated_variables: List[str] = field(default_factory=list)
     unmatched_variables: List[str] = field(default_factory=list)
     output_path: str = ""
+    patched_count: int = 0
+    journal_path: str = ""
+    delta: Optional[AddressDelta] = None
+    write_skipped: bool = False
+    ambiguous_variables: Dict[str, List[str]] = field(default_factory=dict)
+
+
+def batch_output_names(a2l_paths: Sequence[Path]) -> List[str]:
+    """确定批量更新时各 A2L 文件在输出目录中的文件名
+
+    文件名不重复时保留原文件名；不同目录下的同名文件加上所在目录名前缀
+    （<目录名>_<文件名>），仍然重复时再加上序号前缀，保证输出互不覆盖。
+
+    Args:
+        a2l_paths: A2L 文件路径列表
+
+    Returns:
+        List[str]: 与 a2l_paths 顺序一致的输出文件名
+    """
+    paths = [Path(p) for p in a2l_paths]
+    counts = Counter(os.path.normcase(p.name) for p in paths)
+    names = [
+        f"{p.parent.name}_{p.name}" if counts[os.path.normcase(p.name)] > 1 and p.parent.name else p.name
+        for p in paths
+    ]
+
+    counts = Counter(os.path.normcase(name) for name in names)
+    return [
+        f"{index}_{name}" if counts[os.path.normcase(name)] > 1 else name
+        for index, name in enumerate(names)
+    ]
+
+
+# 批量更新工作进程中共享的符号映射（由 _init_batch_worker 初始化）
+_batch_symbol_map: Dict[str, int] = {}
+_batch_member_index: Optional[Dict[str, int]] = None
+
+
+def _init_batch_worker(symbols_shm: str, members_shm: Optional[str]):
+    """批量更新工作进程初始化：每个进程只解码一次共享的符号映射
+
+    Args:
+        symbols_shm: 符号映射所在共享内存块名称
+        members_shm: DWARF 成员索引所在共享内存块名称（可选）
+    """
+    global _batch_symbol_map, _batch_member_index
+    _batch_symbol_map = read_shared_index(symbols_shm)
+    _batch_member_index = read_shared_index(members_shm) if members_shm else None
+
+
+def _run_batch_update(
+    a2l_path: str,
+    output_path: Optional[str],
+    backup: bool,
+    patch_in_place: bool,
+    memory_mapped: bool,
+    parse_cache: Optional[A2LParseCache] = None
+) -> AddressUpdateResult:
+    """在工作进程中更新单个 A2L 文件"""
+    updater = A2LAddressUpdater(
+        resolve_struct_members=False,
+        memory_mapped=memory_mapped,
+        parse_cache=parse_cache
+    )
+    return updater.update_with_symbol_map(
+        _batch_symbol_map,
+        Path(a2l_path),
+        Path(output_path) if output_path else None,
+        backup=backup,
+        member_index=_batch_member_index,
+        patch_in_place=patch_in_place
+    )
 
 
 class A2LAddressUpdater:
@@ -78,10 +294,30 @@ class A2LAddressUpdater:
             print(f"Updated {result.matched_count} variables")
     """
 
-    def __init__(self):
-        """初始化地址更新器"""
-        self._elf_parser = ELFParser()
-        self._a2l_parser = A2LParser()
+    def __init__(
+        self,
+        resolve_struct_members: bool = True,
+        cache: Optional[ELFIndexCache] = None,
+        memory_mapped: bool = False,
+        parse_cache: Optional[A2LParseCache] = None
+    ):
+        """初始化地址更新器
+
+        Args:
+            resolve_struct_members: 是否使用 DWARF 信息解析结构体成员地址
+            cache: 可选的 ELF 索引磁盘缓存（符号表与 DWARF 成员索引共用）
+            memory_mapped: 是否使用内存映射解析器（适用于超大 A2L 文件）
+            parse_cache: 可选的 A2L 解析缓存（A2L 内容未变化时跳过块扫描）
+        """
+        self._elf_parser = ELFParser(cache=cache)
+        self._parse_cache = parse_cache
+        self._a2l_parser = (
+            MappedA2LParser(cache=parse_cache) if memory_mapped else A2LParser(cache=parse_cache)
+        )
+        self._dwarf_resolver = DWARFMemberResolver(cache=cache)
+        self._resolve_struct_members = resolve_struct_members
+        self._patcher = A2LInPlacePatcher()
+        self._leaf_index: Optional[SymbolLeafIndex] = None
         self._log_callback: Optional[Callable[[str], None]] = None
 
     def set_log_callback(self, callback: Callable[[str], None]):
@@ -107,7 +343,9 @@ class A2LAddressUpdater:
         elf_path: Path,
         a2l_path: Path,
         output_path: Optional[Path] = None,
-        backup: bool = True
+        backup: bool = True,
+        patch_in_place: bool = False,
+        incremental: bool = False
     ) -> AddressUpdateResult:
         """更新 A2L 文件中的变量地址
 
@@ -124,6 +362,8 @@ class A2LAddressUpdater:
             a2l_path: A2L 文件路径
             output_path: 输出文件路径（可选，默认覆盖原文件）
             backup: 是否备份原文件
+            patch_in_place: 覆盖原文件时是否使用原地等宽修改（地址宽度不一致时回退到整文件重写）
+            incremental: 是否只修改地址变化的行并生成增量报告（无变化时不写文件）
 
         Returns:
             AddressUpdateResult: 更新结果
@@ -142,6 +382,25 @@ class A2LAddressUpdater:
             elf_symbols = self._elf_parser.extract_symbols(elf_path)
             result.total_symbols = len(elf_symbols)
             self._log(f"ELF 符号数量: {result.total_symbols}")
+            member_index = self._build_member_index(elf_path)
+
+            # 原地等宽修改：只写入变化的字节，撤销日志代替 .a2l.bak
+            if patch_in_place and output_path == a2l_path:
+                patch_result = self._patch_in_place(elf_symbols, member_index, a2l_path)
+                if patch_result is not None:
+                    patch_result.total_symbols = result.total_symbols
+                    self._log(patch_result.message)
+                    return patch_result
+                self._log("地址宽度与原文件不一致，回退到整文件重写")
+
+            # 增量更新：只修改地址变化的行，无变化时跳过写文件
+            if incremental:
+                delta_result = self._update_incremental(
+                    elf_symbols, member_index, a2l_path, output_path, backup
+                )
+                delta_result.total_symbols = result.total_symbols
+                self._log(delta_result.message)
+                return delta_result
 
             # 步骤 2: 解析 A2L 文件 (任务 4.3)
             self._log(f"解析 A2L 文件: {a2l_path}")
@@ -156,23 +415,12 @@ class A2LAddressUpdater:
                 self._log(f"已备份原文件: {backup_path}")
 
             # 步骤 4: 匹配和更新地址 (任务 4.4)
-            lines = self._a2l_parser.get_lines()
-            updated_lines = lines.copy()
+            updates: List[Tuple[str, int]] = []
 
             for var_name, var_info in a2l_variables.items():
-                matched_addr = None
-                match_type = ""
-
-                # 1. 精确匹配
-                if var_name in elf_symbols:
-                    matched_addr = elf_symbols[var_name]
-                    match_type = "exact"
-                # 2. 叶子节点匹配（处理点号分隔的层级变量名）
-                elif "." in var_name:
-                    leaf_name = var_name.split(".")[-1]
-                    if leaf_name in elf_symbols:
-                        matched_addr = elf_symbols[leaf_name]
-                        match_type = "leaf"
+                matched_addr, match_type = self._match(
+                    var_name, elf_symbols, member_index, result
+                )
 
                 if matched_addr is not None:
                     new_addr = matched_addr
@@ -180,12 +428,7 @@ class A2LAddressUpdater:
 
                     # 更新地址行
                     if var_info.address_line > 0:
-                        old_line = lines[var_info.address_line - 1]
-                        new_line = old_line.replace(
-                            var_info.address_str,
-                            f"0x{new_addr:08X}"
-                        )
-                        updated_lines[var_info.address_line - 1] = new_line
+                        updates.append((var_name, new_addr))
 
                         result.matched_count += 1
                         result.updated_variables.append(var_name)
@@ -195,13 +438,11 @@ class A2LAddressUpdater:
                             f"0x{old_addr:08X} -> 0x{new_addr:08X}"
                         )
                 else:
-                    result.unmatched_count += 1
-                    result.unmatched_variables.append(var_name)
-                    logger.debug(f"未匹配变量: {var_name}")
+                    logger.debug(f"未匹配变量: {var_name} {match_type}")
 
             # 步骤 5: 保存更新后的文件 (任务 4.6)
             self._log(f"保存更新后的 A2L 文件: {output_path}")
-            self._write_file(output_path, updated_lines)
+            self._write_updates(output_path, updates)
             result.output_path = str(output_path)
 
             # 设置结果
@@ -214,6 +455,7 @@ class A2LAddressUpdater:
             if result.unmatched_variables:
                 self._log(f"未匹配变量 ({result.unmatched_count}): {', '.join(result.unmatched_variables[:10])}"
                          + ("..." if result.unmatched_count > 10 else ""))
+            self._log_ambiguous(result.ambiguous_variables)
 
         except (ELFParseError, A2LParseError, FileNotFoundError) as e:
             result.success = False
@@ -226,8 +468,437 @@ class A2LAddressUpdater:
             logger.error(result.message, exc_info=True)
             self._log(f"错误: {result.message}")
 
+        finally:
+            self._a2l_parser.close()
+
+        return result
+
+    def update_batch(
+        self,
+        elf_path: Path,
+        a2l_paths: Sequence[Path],
+        output_dir: Optional[Path] = None,
+        backup: bool = True,
+        max_workers: Optional[int] = None,
+        patch_in_place: bool = False
+    ) -> List[AddressUpdateResult]:
+        """使用同一个 ELF 批量更新多个 A2L 文件
+
+        ELF 只解析一次（符号表与 DWARF 成员索引），多个 A2L 文件
+        在进程池中并发更新。适用于多核 ECU 和多变体 A2L 共用一个 ELF 的场景。
+
+        Args:
+            elf_path: ELF 文件路径
+            a2l_paths: A2L 文件路径列表
+            output_dir: 输出目录（可选，默认覆盖原文件）
+            backup: 是否备份原文件
+            max_workers: 最大工作进程数（可选，默认 CPU 核数）
+            patch_in_place: 覆盖原文件时是否使用原地等宽修改
+
+        Returns:
+            List[AddressUpdateResult]: 与 a2l_paths 顺序一致的更新结果
+
+        Raises:
+            ELFParseError: 如果 ELF 文件无法解析
+            FileNotFoundError: 如果 ELF 文件不存在
+        """
+        elf_path = Path(elf_path)
+        self._log(f"批量 A2L 地址更新: ELF={elf_path.name}, A2L 文件数={len(a2l_paths)}")
+
+        symbol_map = self._elf_parser.extract_symbols(elf_path)
+        self._log(f"ELF 符号数量: {len(symbol_map)}")
+        member_index = self._build_member_index(elf_path)
+
+        return self.update_batch_with_symbol_map(
+            symbol_map,
+            a2l_paths,
+            output_dir=output_dir,
+            backup=backup,
+            max_workers=max_workers,
+            member_index=member_index,
+            patch_in_place=patch_in_place
+        )
+
+    def update_batch_with_symbol_map(
+        self,
+        symbol_map: Dict[str, int],
+        a2l_paths: Sequence[Path],
+        output_dir: Optional[Path] = None,
+        backup: bool = True,
+        max_workers: Optional[int] = None,
+        member_index: Optional[Dict[str, int]] = None,
+        patch_in_place: bool = False
+    ) -> List[AddressUpdateResult]:
+        """使用预解析的符号映射批量更新多个 A2L 文件
+
+        符号映射序列化后放入共享内存，每个工作进程启动时解码一次，
+        各文件的更新任务只传递路径。只有一个文件或 max_workers 为 1 时
+        在当前进程中顺序执行。
+
+        指定输出目录时，不同目录下的同名 A2L 文件按 batch_output_names
+        加前缀，避免并发写入同一个输出文件。
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+            a2l_paths: A2L 文件路径列表
+            output_dir: 输出目录（可选，默认覆盖原文件）
+            backup: 是否备份原文件
+            max_workers: 最大工作进程数（可选，默认 CPU 核数）
+            member_index: 可选的 DWARF 成员路径到地址的映射
+            patch_in_place: 覆盖原文件时是否使用原地等宽修改
+
+        Returns:
+            List[AddressUpdateResult]: 与 a2l_paths 顺序一致的更新结果
+
+        Raises:
+            ValueError: 如果同一个 A2L 文件出现多次
+        """
+        a2l_paths = [Path(p) for p in a2l_paths]
+        resolved = Counter(os.path.normcase(os.path.abspath(p)) for p in a2l_paths)
+        repeated = sorted(path for path, count in resolved.items() if count > 1)
+        if repeated:
+            raise ValueError(f"批量更新的 A2L 文件重复: {', '.join(repeated)}")
+
+        jobs = []
+        output_names = batch_output_names(a2l_paths) if output_dir else [None] * len(a2l_paths)
+        for a2l_path, output_name in zip(a2l_paths, output_names):
+            output_path = Path(output_dir) / output_name if output_name else None
+            jobs.append((str(a2l_path), str(output_path) if output_path else None))
+
+        if not jobs:
+            return []
+
+        memory_mapped = isinstance(self._a2l_parser, MappedA2LParser)
+        workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+
+        if workers <= 1:
+            results = [
+                self.update_with_symbol_map(
+                    symbol_map,
+                    Path(a2l_path),
+                    Path(output_path) if output_path else None,
+                    backup=backup,
+                    member_index=member_index,
+                    patch_in_place=patch_in_place
+                )
+                for a2l_path, output_path in jobs
+            ]
+        else:
+            results = self._run_batch_pool(
+                symbol_map, member_index, jobs, workers,
+                backup, patch_in_place, memory_mapped
+            )
+
+        succeeded = sum(1 for r in results if r.success)
+        self._log(f"批量 A2L 地址更新完成: 成功 {succeeded}/{len(results)} 个文件")
+        for (a2l_path, _), result in zip(jobs, results):
+            if not result.success:
+                self._log(f"错误: {Path(a2l_path).name}: {result.message}")
+
+        return results
+
+    def _run_batch_pool(
+        self,
+        symbol_map: Dict[str, int],
+        member_index: Optional[Dict[str, int]],
+        jobs: List[Tuple[str, Optional[str]]],
+        workers: int,
+        backup: bool,
+        patch_in_place: bool,
+        memory_mapped: bool
+    ) -> List[AddressUpdateResult]:
+        """在进程池中执行批量更新，符号映射通过共享内存传递"""
+        blocks = []
+
+        try:
+            blocks.append(share_index(symbol_map))
+            symbols_shm = blocks[-1].name
+            members_shm = None
+            if member_index:
+                blocks.append(share_index(member_index))
+                members_shm = blocks[-1].name
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_batch_worker,
+                initargs=(symbols_shm, members_shm)
+            ) as executor:
+                futures = [
+                    executor.submit(
+                        _run_batch_update, a2l_path, output_path,
+                        backup, patch_in_place, memory_mapped, self._parse_cache
+                    )
+                    for a2l_path, output_path in jobs
+                ]
+
+                results = []
+                for future in futures:
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        results.append(AddressUpdateResult(
+                            success=False,
+                            message=f"地址更新异常: {e}"
+                        ))
+                return results
+
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    def _get_leaf_index(self, symbol_map: Dict[str, int]) -> SymbolLeafIndex:
+        """获取符号表的叶子节点索引（同一符号表只建立一次）
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+
+        Returns:
+            SymbolLeafIndex: 叶子节点索引
+        """
+        if self._leaf_index is None or self._leaf_index.symbol_map is not symbol_map:
+            self._leaf_index = SymbolLeafIndex(symbol_map)
+        return self._leaf_index
+
+    def _match(
+        self,
+        var_name: str,
+        symbol_map: Dict[str, int],
+        member_index: Optional[Dict[str, int]],
+        result: AddressUpdateResult
+    ) -> Tuple[Optional[int], str]:
+        """匹配单个变量地址，未匹配和歧义的变量记录到结果中
+
+        Args:
+            var_name: A2L 变量名称
+            symbol_map: 符号名称到地址的映射
+            member_index: 可选的 DWARF 成员路径到地址的映射
+            result: 更新结果
+
+        Returns:
+            Tuple[Optional[int], str]: (地址, 匹配类型)
+        """
+        addr, match_type, candidates = match_symbol_address(
+            var_name, symbol_map, member_index, self._get_leaf_index(symbol_map)
+        )
+
+        if addr is None:
+            result.unmatched_count += 1
+            result.unmatched_variables.append(var_name)
+            if match_type == "ambiguous":
+                result.ambiguous_variables[var_name] = candidates
+
+        return addr, match_type
+
+    def _log_ambiguous(self, ambiguous: Dict[str, List[str]]):
+        """记录叶子节点歧义的变量（只显示前 10 个）"""
+        if not ambiguous:
+            return
+        self._log(f"警告: {len(ambiguous)} 个变量的叶子节点对应多个地址不同的符号，未更新地址")
+        for var_name, candidates in list(ambiguous.items())[:10]:
+            self._log(f"  {var_name}: {', '.join(candidates)}")
+
+    def _patch_in_place(
+        self,
+        symbol_map: Dict[str, int],
+        member_index: Optional[Dict[str, int]],
+        a2l_path: Path
+    ) -> Optional[AddressUpdateResult]:
+        """以原地等宽修改的方式更新地址
+
+        使用内存映射解析器获取每个地址标记的字节偏移，只有当所有
+        新地址（0x%08X）与原地址标记等宽时才修改，否则返回 None
+        由调用方回退到整文件重写。地址未变化的变量不写入。
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+            member_index: 可选的 DWARF 成员路径到地址的映射
+            a2l_path: A2L 文件路径
+
+        Returns:
+            Optional[AddressUpdateResult]: 更新结果，宽度不一致时返回 None
+
+        Raises:
+            A2LPatchError: 文件内容在解析后被修改
+        """
+        result = AddressUpdateResult(delta=AddressDelta())
+        patches: List[Tuple[int, str, str]] = []
+
+        parser = MappedA2LParser(cache=self._parse_cache)
+        try:
+            a2l_variables = parser.parse(a2l_path)
+            result.total_variables = len(a2l_variables)
+
+            for var_name, var_info in a2l_variables.items():
+                matched_addr, match_type = self._match(
+                    var_name, symbol_map, member_index, result
+                )
+                if match_type != "ambiguous":
+                    result.delta.record(var_name, var_info.address, matched_addr)
+
+                if matched_addr is None:
+                    continue
+
+                span = parser.get_address_span(var_name)
+                if span is None:
+                    continue
+
+                old_addr_str = var_info.address_str
+                new_addr_str = f"0x{matched_addr:08X}"
+                if len(new_addr_str) != len(old_addr_str):
+                    return None
+
+                if new_addr_str != old_addr_str:
+                    patches.append((span[0], old_addr_str, new_addr_str))
+                result.matched_count += 1
+                result.updated_variables.append(var_name)
+        finally:
+            parser.close()
+
+        if patches:
+            journal_path = self._patcher.apply(a2l_path, patches)
+            result.journal_path = str(journal_path)
+
+        result.patched_count = len(patches)
+        result.output_path = str(a2l_path)
+        result.success = True
+        result.message = (
+            f"A2L 地址原地更新完成: 匹配 {result.matched_count}/{result.total_variables} 个变量, "
+            f"修改 {result.patched_count} 处"
+        )
+        return result
+
+    def _update_incremental(
+        self,
+        symbol_map: Dict[str, int],
+        member_index: Optional[Dict[str, int]],
+        a2l_path: Path,
+        output_path: Path,
+        backup: bool
+    ) -> AddressUpdateResult:
+        """增量更新地址
+
+        比较 ELF 新地址与 A2L 已有地址，只替换地址变化的行，
+        未变化的地址保持原格式。所有地址都未变化时不写文件（也不备份）；
+        输出路径与原文件不同时直接复制原文件。
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+            member_index: 可选的 DWARF 成员路径到地址的映射
+            a2l_path: A2L 文件路径
+            output_path: 输出文件路径
+            backup: 是否备份原文件
+
+        Returns:
+            AddressUpdateResult: 更新结果（包含增量报告）
+
+        Raises:
+            A2LParseError: 如果 A2L 文件无法解析
+            FileNotFoundError: 如果 A2L 文件不存在
+        """
+        result = AddressUpdateResult(delta=AddressDelta())
+        delta = result.delta
+        changed: List[Tuple[str, int]] = []
+
+        a2l_variables = self._a2l_parser.parse(a2l_path)
+        result.total_variables = len(a2l_variables)
+
+        for var_name, var_info in a2l_variables.items():
+            matched_addr, match_type = self._match(var_name, symbol_map, member_index, result)
+            if match_type != "ambiguous":
+                delta.record(var_name, var_info.address, matched_addr)
+
+            if matched_addr is None:
+                continue
+
+            if var_info.address_line > 0:
+                result.matched_count += 1
+                if matched_addr != var_info.address:
+                    changed.append((var_name, matched_addr))
+                    result.updated_variables.append(var_name)
+
+        result.output_path = str(output_path)
+        result.success = True
+
+        if not changed:
+            self._a2l_parser.close()
+            if output_path != a2l_path:
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(a2l_path, output_path)
+            else:
+                result.write_skipped = True
+            result.message = f"A2L 地址无变化，跳过写入: {delta.summary()}"
+            return result
+
+        if backup and output_path == a2l_path:
+            shutil.copy2(a2l_path, a2l_path.with_suffix('.a2l.bak'))
+
+        self._write_updates(output_path, changed)
+        result.patched_count = len(changed)
+        result.message = (
+            f"A2L 地址增量更新完成: 修改 {result.patched_count} 处 ({delta.summary()})"
+        )
         return result
 
+    def _build_member_index(self, elf_path: Path) -> Optional[Dict[str, int]]:
+        """构建 DWARF 结构体成员索引
+
+        DWARF 信息缺失或解析失败时仅记录警告，退回到符号表匹配。
+
+        Args:
+            elf_path: ELF 文件路径
+
+        Returns:
+            Optional[Dict[str, int]]: 成员路径到地址的映射，未启用或失败时返回 None
+        """
+        if not self._resolve_struct_members:
+            return None
+
+        try:
+            member_index = self._dwarf_resolver.build_index(elf_path)
+        except ELFParseError as e:
+            self._log(f"警告: DWARF 成员索引构建失败，仅使用符号表匹配: {e}")
+            return None
+
+        self._log(f"DWARF 成员路径数量: {len(member_index)}")
+        return member_index
+
+    def _write_updates(self, output_path: Path, updates: List[Tuple[str, int]]):
+        """写出地址更新后的 A2L 文件并关闭解析器
+
+        内存映射解析器按地址标记的字节偏移分块写出临时文件，释放映射后
+        再替换输出文件，不整体解码原文件；普通解析器修改行列表后写出。
+
+        Args:
+            output_path: 输出文件路径
+            updates: (变量名, 新地址) 列表，变量必须有地址行
+        """
+        parser = self._a2l_parser
+        if not isinstance(parser, MappedA2LParser):
+            lines = parser.get_lines()
+            for var_name, new_addr in updates:
+                var_info = parser.get_variable(var_name)
+                index = var_info.address_line - 1
+                lines[index] = lines[index].replace(var_info.address_str, f"0x{new_addr:08X}")
+            parser.close()
+            self._write_file(output_path, lines)
+            return
+
+        patches = [
+            (*parser.get_address_span(var_name), f"0x{new_addr:08X}")
+            for var_name, new_addr in updates
+        ]
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=output_path.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            parser.write_patched(Path(temp_name), patches)
+            parser.close()
+            os.replace(temp_name, output_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
     def _write_file(self, path: Path, lines: List[str]):
         """写入文件
 
@@ -246,7 +917,10 @@ class A2LAddressUpdater:
         symbol_map: Dict[str, int],
         a2l_path: Path,
         output_path: Optional[Path] = None,
-        backup: bool = True
+        backup: bool = True,
+        member_index: Optional[Dict[str, int]] = None,
+        patch_in_place: bool = False,
+        incremental: bool = False
     ) -> AddressUpdateResult:
         """使用预解析的符号映射更新 A2L 文件
 
@@ -257,6 +931,9 @@ class A2LAddressUpdater:
             a2l_path: A2L 文件路径
             output_path: 输出文件路径（可选）
             backup: 是否备份原文件
+            member_index: 可选的 DWARF 成员路径到地址的映射
+            patch_in_place: 覆盖原文件时是否使用原地等宽修改（地址宽度不一致时回退到整文件重写）
+            incremental: 是否只修改地址变化的行并生成增量报告（无变化时不写文件）
 
         Returns:
             AddressUpdateResult: 更新结果
@@ -268,6 +945,20 @@ class A2LAddressUpdater:
         result.total_symbols = len(symbol_map)
 
         try:
+            # 原地等宽修改：只写入变化的字节，撤销日志代替 .a2l.bak
+            if patch_in_place and output_path == a2l_path:
+                patch_result = self._patch_in_place(symbol_map, member_index, a2l_path)
+                if patch_result is not None:
+                    patch_result.total_symbols = result.total_symbols
+                    return patch_result
+
+            if incremental:
+                delta_result = self._update_incremental(
+                    symbol_map, member_index, a2l_path, output_path, backup
+                )
+                delta_result.total_symbols = result.total_symbols
+                return delta_result
+
             # 解析 A2L 文件
             a2l_variables = self._a2l_parser.parse(a2l_path)
             result.total_variables = len(a2l_variables)
@@ -278,38 +969,20 @@ class A2LAddressUpdater:
                 shutil.copy2(a2l_path, backup_path)
 
             # 更新地址
-            lines = self._a2l_parser.get_lines()
-            updated_lines = lines.copy()
+            updates: List[Tuple[str, int]] = []
 
             for var_name, var_info in a2l_variables.items():
-                matched_addr = None
-
-                # 1. 精确匹配
-                if var_name in symbol_map:
-                    matched_addr = symbol_map[var_name]
-                # 2. 叶子节点匹配（处理点号分隔的层级变量名）
-                elif "." in var_name:
-                    leaf_name = var_name.split(".")[-1]
-                    if leaf_name in symbol_map:
-                        matched_addr = symbol_map[leaf_name]
+                matched_addr, _ = self._match(var_name, symbol_map, member_index, result)
 
                 if matched_addr is not None:
                     if var_info.address_line > 0:
-                        old_line = lines[var_info.address_line - 1]
-                        new_line = old_line.replace(
-                            var_info.address_str,
-                            f"0x{matched_addr:08X}"
-                        )
-                        updated_lines[var_info.address_line - 1] = new_line
+                        updates.append((var_name, matched_addr))
 
                         result.matched_count += 1
                         result.updated_variables.append(var_name)
-                else:
-                    result.unmatched_count += 1
-                    result.unmatched_variables.append(var_name)
 
             # 保存文件
-            self._write_file(output_path, updated_lines)
+            self._write_updates(output_path, updates)
             result.output_path = str(output_path)
 
             result.success = True
@@ -319,6 +992,9 @@ class A2LAddressUpdater:
             result.success = False
             result.message = f"地址更新失败: {e}"
 
+        finally:
+            self._a2l_parser.close()
+
         return result
 
     def get_match_statistics(
@@ -328,7 +1004,8 @@ class A2LAddressUpdater:
     ) -> Tuple[int, int, int, List[str]]:
         """获取匹配统计信息（不执行更新）
 
-        用于预览匹配情况。
+        用于预览匹配情况。匹配规则与 update 相同（精确匹配、启用时的
+        DWARF 结构体成员匹配、叶子节点匹配），叶子节点歧义的变量计入未匹配。
 
         Args:
             elf_path: ELF 文件路径
@@ -338,15 +1015,28 @@ class A2LAddressUpdater:
             Tuple[int, int, int, List[str]]: (匹配数, 未匹配数, 总变量数, 未匹配列表)
         """
         elf_symbols = self._elf_parser.extract_symbols(elf_path)
-        a2l_variables = self._a2l_parser.parse(a2l_path)
+        member_index = self._build_member_index(elf_path)
+        leaf_index = self._get_leaf_index(elf_symbols)
 
         matched = 0
         unmatched_list = []
+        ambiguous: Dict[str, List[str]] = {}
 
-        for var_name in a2l_variables:
-            if var_name in elf_symbols:
-                matched += 1
-            else:
-                unmatched_list.append(var_name)
-
-        return matched, len(unmatched_list), len(a2l_variables), unmatched_list
+        try:
+            a2l_variables = self._a2l_parser.parse(a2l_path)
+            total = len(a2l_variables)
+            for var_name in a2l_variables:
+                addr, match_type, candidates = match_symbol_address(
+                    var_name, elf_symbols, member_index, leaf_index
+                )
+                if addr is not None:
+                    matched += 1
+                else:
+                    unmatched_list.append(var_name)
+                    if match_type == "ambiguous":
+                        ambiguous[var_name] = candidates
+        finally:
+            self._a2l_parser.close()
+
+        self._log_ambiguous(ambiguous)
+        return matched, len(unmatched_list), total, unmatched_list
@@ -0,0 +1,383 @@
+"""A2L address range validation against ELF sections and symbols.
+
+Backs the ``check_address_ranges.py`` command-line wrapper in the
+repository root. Every CHARACTERISTIC and MEASUREMENT of the updated A2L is
+checked against the ELF once the data sections and data-object symbols
+have been sorted a single time:
+
+- the object's [address, address + size) must lie inside one allocated
+  data section (bisect over section start addresses)
+- objects must not partially overlap each other; nested ranges (a struct
+  and its members, an array and an element) are allowed. Checked with a
+  sweep line over the objects sorted by (address, -size)
+- the A2L datatype size must not exceed the ELF symbol the object lives
+  in (bisect over symbol start addresses)
+
+Sizes come from the A2L: datatype x MATRIX_DIM/ARRAY_SIZE for
+MEASUREMENTs, the record layout for VALUE/VAL_BLK/ASCII CHARACTERISTICs
+and the ELF symbol size for CURVE/MAP.
+
+Usage:
+    validator = A2LAddressValidator()
+    result = validator.validate_file("App.a2l", "App.elf")
+    for issue in result.issues:
+        print(issue.kind, issue.name, issue.detail)
+"""
+
+import logging
+import mmap
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from a2l.cal_extractor import (
+    CalExtractError,
+    ELFDataImage,
+    read_characteristic_layouts,
+    read_record_layouts,
+    resolve_characteristic_size
+)
+from a2l.daq_optimizer import read_measurements
+
+logger = logging.getLogger(__name__)
+
+# 问题类型
+ISSUE_OUTSIDE_SECTION = "outside_section"
+ISSUE_OVERLAP = "overlap"
+ISSUE_SIZE_EXCEEDS_SYMBOL = "size_exceeds_symbol"
+
+# 对象类型
+KIND_CHARACTERISTIC = "CHARACTERISTIC"
+KIND_MEASUREMENT = "MEASUREMENT"
+
+
+class AddressValidationError(Exception):
+    """地址验证错误
+
+    当 ELF 或 A2L 文件无法读取时抛出。
+    """
+    pass
+
+
+@dataclass
+class A2LObject:
+    """A2L 对象的地址范围
+
+    Attributes:
+        name: 对象名称
+        kind: CHARACTERISTIC 或 MEASUREMENT
+        address: 起始地址
+        size: 字节数
+    """
+    name: str
+    kind: str
+    address: int
+    size: int
+
+    @property
+    def end(self) -> int:
+        """结束地址（不含）"""
+        return self.address + self.size
+
+
+@dataclass
+class AddressIssue:
+    """地址问题
+
+    Attributes:
+        kind: 问题类型（outside_section、overlap、size_exceeds_symbol）
+        name: 对象名称
+        address: 对象地址
+        size: 对象字节数
+        detail: 问题说明
+    """
+    kind: str
+    name: str
+    address: int
+    size: int
+    detail: str = ""
+
+    def to_dict(self) -> Dict[str, object]:
+        """转换为字典"""
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "address": f"0x{self.address:08X}",
+            "size": self.size,
+            "detail": self.detail,
+        }
+
+
+@dataclass
+class AddressValidationResult:
+    """地址验证结果
+
+    Attributes:
+        success: 是否未发现问题
+        message: 结果消息
+        object_count: 验证的对象数量
+        issues: 发现的问题
+        skipped: 无法确定地址或大小的对象名称到原因的映射
+        execution_time: 验证耗时（秒，不含文件读取）
+    """
+    success: bool = False
+    message: str = ""
+    object_count: int = 0
+    issues: List[AddressIssue] = field(default_factory=list)
+    skipped: Dict[str, str] = field(default_factory=dict)
+    execution_time: float = 0.0
+
+    def count(self, kind: str) -> int:
+        """统计某类问题的数量
+
+        Args:
+            kind: 问题类型
+
+        Returns:
+            int: 问题数量
+        """
+        return sum(1 for issue in self.issues if issue.kind == kind)
+
+
+def read_a2l_objects(
+    content: bytes,
+    symbol_sizes: Dict[int, int]
+) -> Tuple[List[A2LObject], Dict[str, str]]:
+    """读取 A2L 中全部 CHARACTERISTIC 和 MEASUREMENT 的地址范围
+
+    地址为 0 的对象（已从 ELF 中移除的变量）不参与验证。
+
+    Args:
+        content: A2L 文件内容
+        symbol_sizes: 数据对象符号地址到大小的映射（CURVE/MAP 的大小来源）
+
+    Returns:
+        Tuple[List[A2LObject], Dict[str, str]]: (对象列表, 跳过的对象及原因)
+    """
+    objects: List[A2LObject] = []
+    record_layouts = read_record_layouts(content)
+
+    measurements, skipped = read_measurements(content)
+    objects.extend(
+        A2LObject(m.name, KIND_MEASUREMENT, m.address, m.size) for m in measurements
+    )
+
+    for layout in read_characteristic_layouts(content).values():
+        try:
+            address = int(layout.address_str, 0)
+        except ValueError:
+            skipped[layout.name] = f"地址格式无效: {layout.address_str}"
+            continue
+        if address == 0:
+            skipped[layout.name] = "无地址"
+            continue
+        size, _ = resolve_characteristic_size(layout, record_layouts, symbol_sizes, address)
+        if size == 0:
+            skipped[layout.name] = f"无法确定大小（{layout.char_type}）"
+            continue
+        objects.append(A2LObject(layout.name, KIND_CHARACTERISTIC, address, size))
+
+    return objects, skipped
+
+
+def check_sections(
+    objects: List[A2LObject],
+    sections: List[Tuple[int, int]]
+) -> List[AddressIssue]:
+    """检查对象是否完整落在一个数据节内
+
+    Args:
+        objects: 对象列表
+        sections: 按起始地址排序的数据节 [(起始地址, 结束地址)]
+
+    Returns:
+        List[AddressIssue]: 问题列表
+    """
+    starts = [start for start, _ in sections]
+    issues: List[AddressIssue] = []
+    for obj in objects:
+        index = bisect_right(starts, obj.address) - 1
+        if index < 0 or obj.address >= sections[index][1]:
+            issues.append(AddressIssue(
+                ISSUE_OUTSIDE_SECTION, obj.name, obj.address, obj.size, "地址不在任何数据节内"
+            ))
+        elif obj.end > sections[index][1]:
+            issues.append(AddressIssue(
+                ISSUE_OUTSIDE_SECTION, obj.name, obj.address, obj.size,
+                f"超出数据节末尾 0x{sections[index][1]:08X}"
+            ))
+    return issues
+
+
+def check_overlaps(objects: List[A2LObject]) -> List[AddressIssue]:
+    """扫描线检查对象之间的部分重叠
+
+    按 (地址, -大小) 排序后维护包含当前地址的嵌套范围栈；完全包含
+    （结构体与成员、数组与元素、同一变量的多个对象）不是问题。
+
+    Args:
+        objects: 对象列表
+
+    Returns:
+        List[AddressIssue]: 问题列表（每对重叠对象报告一次）
+    """
+    issues: List[AddressIssue] = []
+    stack: List[A2LObject] = []
+    for obj in sorted(objects, key=lambda o: (o.address, -o.size)):
+        while stack and stack[-1].end <= obj.address:
+            stack.pop()
+        for outer in reversed(stack):
+            if outer.end >= obj.end:
+                break
+            if outer.end > obj.address:
+                issues.append(AddressIssue(
+                    ISSUE_OVERLAP, obj.name, obj.address, obj.size,
+                    f"与 {outer.name} (0x{outer.address:08X}, {outer.size} 字节) 部分重叠"
+                ))
+        stack.append(obj)
+    return issues
+
+
+def check_symbol_sizes(
+    objects: List[A2LObject],
+    symbol_sizes: Dict[int, int]
+) -> List[AddressIssue]:
+    """检查对象大小是否超出其所在的 ELF 符号
+
+    不在任何数据对象符号内的对象（如绝对地址变量）不检查。
+
+    Args:
+        objects: 对象列表
+        symbol_sizes: 数据对象符号地址到大小的映射
+
+    Returns:
+        List[AddressIssue]: 问题列表
+    """
+    starts = sorted(symbol_sizes)
+    issues: List[AddressIssue] = []
+    for obj in objects:
+        index = bisect_right(starts, obj.address) - 1
+        if index < 0:
+            continue
+        start = starts[index]
+        end = start + symbol_sizes[start]
+        if obj.address < end < obj.end:
+            issues.append(AddressIssue(
+                ISSUE_SIZE_EXCEEDS_SYMBOL, obj.name, obj.address, obj.size,
+                f"A2L 大小 {obj.size} 字节超出 ELF 符号 "
+                f"(0x{start:08X}, {symbol_sizes[start]} 字节)"
+            ))
+    return issues
+
+
+class A2LAddressValidator:
+    """A2L 地址范围验证器
+
+    Attributes:
+        max_logged_issues: 日志中逐条列出的最大问题数
+    """
+
+    def __init__(self, max_logged_issues: int = 20):
+        """初始化验证器
+
+        Args:
+            max_logged_issues: 日志中逐条列出的最大问题数
+        """
+        self.max_logged_issues = max_logged_issues
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def validate(
+        self,
+        objects: List[A2LObject],
+        sections: List[Tuple[int, int]],
+        symbol_sizes: Dict[int, int]
+    ) -> AddressValidationResult:
+        """验证对象地址范围
+
+        Args:
+            objects: 对象列表
+            sections: 按起始地址排序的数据节 [(起始地址, 结束地址)]
+            symbol_sizes: 数据对象符号地址到大小的映射
+
+        Returns:
+            AddressValidationResult: 验证结果
+        """
+        start_time = time.monotonic()
+        issues = (
+            check_sections(objects, sections)
+            + check_overlaps(objects)
+            + check_symbol_sizes(objects, symbol_sizes)
+        )
+        result = AddressValidationResult(
+            success=not issues,
+            object_count=len(objects),
+            issues=issues,
+            execution_time=time.monotonic() - start_time
+        )
+        result.message = (
+            f"地址验证完成: {result.object_count} 个对象, "
+            f"不在数据节内 {result.count(ISSUE_OUTSIDE_SECTION)}, "
+            f"部分重叠 {result.count(ISSUE_OVERLAP)}, "
+            f"超出符号大小 {result.count(ISSUE_SIZE_EXCEEDS_SYMBOL)}"
+        )
+        return result
+
+    def validate_file(self, a2l_path: Path, elf_path: Path) -> AddressValidationResult:
+        """验证 A2L 文件中全部对象的地址范围
+
+        Args:
+            a2l_path: A2L 文件路径（地址已更新）
+            elf_path: ELF 文件路径
+
+        Returns:
+            AddressValidationResult: 验证结果
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            AddressValidationError: ELF 或 A2L 文件无法解析
+        """
+        a2l_path = Path(a2l_path)
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+        if a2l_path.stat().st_size == 0:
+            raise AddressValidationError(f"A2L 文件大小为 0: {a2l_path}")
+
+        try:
+            with ELFDataImage(elf_path) as elf:
+                sections = elf.sections
+                symbol_sizes = elf.symbol_sizes
+        except CalExtractError as e:
+            raise AddressValidationError(str(e)) from e
+
+        with open(a2l_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                objects, skipped = read_a2l_objects(mm, symbol_sizes)
+
+        result = self.validate(objects, sections, symbol_sizes)
+        result.skipped = skipped
+        self._log(result.message)
+        for issue in result.issues[:self.max_logged_issues]:
+            self._log(f"  [{issue.kind}] {issue.name} @ 0x{issue.address:08X}: {issue.detail}")
+        if len(result.issues) > self.max_logged_issues:
+            self._log(f"  ... 另有 {len(result.issues) - self.max_logged_issues} 个问题")
+        return result
@@ -0,0 +1,706 @@
+"""Calibration initial-value extraction from ELF into a snapshot file.
+
+Cal.c places every calibration parameter in an initialized-data section
+(``ASW_ATECH_*_SEC_CALIB``), so the default values are already stored in
+the ELF file. This module reads the initial bytes of every A2L
+CHARACTERISTIC straight from the ELF instead of opening INCA:
+
+- name, type, address, record layout and MATRIX_DIM/NUMBER of every
+  CHARACTERISTIC come from one regex pass over the memory-mapped A2L
+  (standard and Simulink comment-annotated headers share the ASAP2
+  positional field order)
+- the ELF is memory-mapped and the bytes of each parameter are returned
+  as memoryviews into the mapping (no copy) from its SHT_PROGBITS
+  section; SHT_NOBITS (.bss) parameters are zero
+- the size is taken from the record layout for VALUE/VAL_BLK/ASCII and
+  from the ELF symbol size for CURVE/MAP and other layouts
+
+The snapshot is written as compact JSON (raw bytes as hex) or as CDF 2.0
+(CDFX) with values decoded from the record layout data type. CDFX values
+are physical values: IDENTICAL, LINEAR and linear RAT_FUNC COMPU_METHODs
+(and NO_COMPU_METHOD) are applied; parameters using other conversions
+(tables, formulas, non-linear RAT_FUNC) are left out of the CDFX file.
+
+Usage:
+    extractor = CalibrationExtractor()
+    result = extractor.extract("App.a2l", "App.elf", "App_cal.json")
+    print(result.message)
+"""
+
+import json
+import logging
+import mmap
+import re
+import struct
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from a2l.elf_parser import ELFCLASS32, ELFCLASS64, read_section_table, unpack_symbols
+from a2l.a2l_parser import A2LParseError, decode_token
+
+logger = logging.getLogger(__name__)
+
+# 节类型与标志
+SHT_PROGBITS = 1
+SHT_NOBITS = 8
+SHF_ALLOC = 0x2
+
+# 符号类型：数据对象
+STT_OBJECT = 1
+
+# 符号表条目布局 (st_value, st_size, st_info)，按 ELF 类别区分
+SYMBOL_LAYOUTS = {
+    ELFCLASS32: ('4xIIB3x', (0, 1, 2)),
+    ELFCLASS64: ('4xB3xQQ', (1, 2, 0)),
+}
+
+# A2L 数据类型到 struct 格式字符
+DATATYPE_FORMATS = {
+    "UBYTE": "B",
+    "SBYTE": "b",
+    "UWORD": "H",
+    "SWORD": "h",
+    "ULONG": "I",
+    "SLONG": "i",
+    "A_UINT64": "Q",
+    "A_INT64": "q",
+    "FLOAT16_IEEE": "e",
+    "FLOAT32_IEEE": "f",
+    "FLOAT64_IEEE": "d",
+}
+
+# 按记录布局计算大小的 CHARACTERISTIC 类型
+SIMPLE_TYPES = ("VALUE", "VAL_BLK", "ASCII")
+
+# 快照格式
+FORMAT_JSON = "json"
+FORMAT_CDFX = "cdfx"
+
+# 不做转换的 COMPU_METHOD 名称与线性转换 (factor, offset)：物理值 = factor * 原始值 + offset
+NO_COMPU_METHOD = "NO_COMPU_METHOD"
+IDENTITY_CONVERSION = (1.0, 0.0)
+
+# A2L 块与字段（ASAP2 关键字区分大小写）
+CHARACTERISTIC_BEGIN_PATTERN = re.compile(rb'/begin\s+CHARACTERISTIC\b')
+CHARACTERISTIC_END_PATTERN = re.compile(rb'/end\s+CHARACTERISTIC\b')
+RECORD_LAYOUT_BLOCK_PATTERN = re.compile(
+    rb'/begin\s+RECORD_LAYOUT\s+(\S+)(.*?)/end\s+RECORD_LAYOUT\b',
+    re.DOTALL
+)
+COMMENT_PATTERN = re.compile(rb'/\*.*?\*/', re.DOTALL)
+NESTED_BLOCK_PATTERN = re.compile(rb'/begin\s+(\w+).*?/end\s+\1\b', re.DOTALL)
+
+# CHARACTERISTIC 头部：Name LongIdentifier Type Address Deposit（字段间可夹注释）
+_SEPARATOR = rb'(?:\s+|/\*.*?\*/)+'
+# 之后的 MaxDiff Conversion 可选（不以 / 开头，避免把注释或嵌套块当作字段）
+CHARACTERISTIC_HEADER_PATTERN = re.compile(
+    rb'(?:\s+|/\*.*?\*/)*(\S+)' + _SEPARATOR + rb'("(?:[^"\\]|\\.)*"|\S+)' + _SEPARATOR
+    + rb'(\S+)' + _SEPARATOR + rb'(\S+)' + _SEPARATOR + rb'(\S+)'
+    + rb'(?:' + _SEPARATOR + rb'[^\s/]\S*' + _SEPARATOR + rb'([^\s/]\S*))?',
+    re.DOTALL
+)
+# COMPU_METHOD 头部：Name LongIdentifier ConversionType
+COMPU_METHOD_BLOCK_PATTERN = re.compile(
+    rb'/begin\s+COMPU_METHOD\b(.*?)/end\s+COMPU_METHOD\b',
+    re.DOTALL
+)
+COMPU_METHOD_HEADER_PATTERN = re.compile(
+    rb'(?:\s+|/\*.*?\*/)*(\S+)' + _SEPARATOR + rb'("(?:[^"\\]|\\.)*"|\S+)' + _SEPARATOR + rb'(\w+)',
+    re.DOTALL
+)
+_NUMBER = rb'\s+([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)'
+COEFFS_LINEAR_PATTERN = re.compile(rb'\bCOEFFS_LINEAR' + _NUMBER * 2)
+COEFFS_PATTERN = re.compile(rb'\bCOEFFS' + _NUMBER * 6)
+MATRIX_DIM_PATTERN = re.compile(rb'\bMATRIX_DIM((?:\s+\d+){1,3})')
+NUMBER_PATTERN = re.compile(rb'\bNUMBER\s+(\d+)')
+FNC_VALUES_PATTERN = re.compile(rb'\bFNC_VALUES\s+\d+\s+(\w+)')
+AXIS_LAYOUT_PATTERN = re.compile(rb'\b(?:NO_)?AXIS_PTS_[XYZ45]\b|\bAXIS_RESCALE_[XYZ45]\b')
+
+
+class CalExtractError(Exception):
+    """标定值提取错误
+
+    当 ELF 或 A2L 文件无法解析时抛出。
+    """
+    pass
+
+
+@dataclass
+class CharacteristicLayout:
+    """CHARACTERISTIC 的存储描述
+
+    Attributes:
+        name: 参数名称
+        char_type: 类型（VALUE、VAL_BLK、CURVE、MAP 等）
+        address_str: A2L 头部中的地址字符串
+        deposit: 记录布局名称
+        element_count: 元素个数（MATRIX_DIM 各维乘积或 NUMBER，默认 1）
+        conversion: COMPU_METHOD 名称（头部缺少该字段时为空字符串）
+    """
+    name: str
+    char_type: str
+    address_str: str = ""
+    deposit: str = ""
+    element_count: int = 1
+    conversion: str = ""
+
+
+@dataclass
+class CalibrationValue:
+    """标定参数初始值
+
+    Attributes:
+        name: 参数名称
+        char_type: 类型
+        address: 地址
+        datatype: 记录布局的数据类型（未知时为空字符串）
+        data: 初始值字节（指向 ELF 内存映射的 memoryview）
+        conversion: COMPU_METHOD 名称
+        coefficients: 线性转换 (factor, offset)；转换未定义或不是线性时为 None
+    """
+    name: str
+    char_type: str
+    address: int
+    datatype: str
+    data: memoryview
+    conversion: str = ""
+    coefficients: Optional[Tuple[float, float]] = IDENTITY_CONVERSION
+
+
+@dataclass
+class CalExtractResult:
+    """标定值提取结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        snapshot_path: 快照文件路径
+        snapshot_format: 快照格式（json 或 cdfx）
+        characteristic_count: A2L 中的 CHARACTERISTIC 数量
+        extracted_count: 提取成功的参数数量
+        total_bytes: 提取的字节总数
+        skipped: 未提取的参数名称到原因的映射
+        execution_time: 执行时长（秒）
+    """
+    success: bool = False
+    message: str = ""
+    snapshot_path: str = ""
+    snapshot_format: str = FORMAT_JSON
+    characteristic_count: int = 0
+    extracted_count: int = 0
+    total_bytes: int = 0
+    skipped: Dict[str, str] = field(default_factory=dict)
+    execution_time: float = 0.0
+
+
+def iter_characteristic_blocks(content: bytes) -> Iterator[bytes]:
+    """按顺序遍历 CHARACTERISTIC 块的内容（不含 /begin、/end 标记）
+
+    Args:
+        content: A2L 文件内容
+
+    Yields:
+        bytes: 块内容
+    """
+    pos = 0
+    while True:
+        begin = CHARACTERISTIC_BEGIN_PATTERN.search(content, pos)
+        if begin is None:
+            return
+        end = CHARACTERISTIC_END_PATTERN.search(content, begin.end())
+        if end is None:
+            return
+        yield content[begin.end():end.start()]
+        pos = end.end()
+
+
+def read_characteristic_layouts(content: bytes) -> Dict[str, CharacteristicLayout]:
+    """扫描 A2L 中全部 CHARACTERISTIC 的类型、地址、记录布局和元素个数
+
+    标准格式与 Simulink 注释格式（/* Name */ ...）的头部字段顺序相同，
+    跳过注释后按位置读取；MATRIX_DIM/NUMBER 只在嵌套块之外查找。
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Dict[str, CharacteristicLayout]: 参数名称到存储描述的映射
+    """
+    layouts: Dict[str, CharacteristicLayout] = {}
+    for body in iter_characteristic_blocks(content):
+        header = CHARACTERISTIC_HEADER_PATTERN.match(body)
+        if header is None:
+            continue
+
+        name, _, char_type, address, deposit, conversion = header.groups()
+        layout = CharacteristicLayout(
+            name=decode_token(name),
+            char_type=char_type.decode('ascii', 'replace'),
+            address_str=address.decode('ascii', 'replace'),
+            deposit=decode_token(deposit),
+            conversion=decode_token(conversion) if conversion else ""
+        )
+
+        if b'MATRIX_DIM' in body or b'NUMBER' in body:
+            body = NESTED_BLOCK_PATTERN.sub(b' ', COMMENT_PATTERN.sub(b' ', body))
+            dims = MATRIX_DIM_PATTERN.search(body)
+            number = NUMBER_PATTERN.search(body)
+            if dims:
+                count = 1
+                for dim in dims.group(1).split():
+                    count *= int(dim) or 1
+                layout.element_count = count
+            elif number:
+                layout.element_count = int(number.group(1)) or 1
+
+        layouts[layout.name] = layout
+    return layouts
+
+
+def read_record_layouts(content: bytes) -> Dict[str, Optional[str]]:
+    """扫描 A2L 中的 RECORD_LAYOUT
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Dict[str, Optional[str]]: 记录布局名称到 FNC_VALUES 数据类型的映射；
+        包含轴点（CURVE/MAP 内嵌轴）或没有 FNC_VALUES 的布局为 None
+    """
+    layouts: Dict[str, Optional[str]] = {}
+    for match in RECORD_LAYOUT_BLOCK_PATTERN.finditer(content):
+        body = COMMENT_PATTERN.sub(b' ', match.group(2))
+        fnc = FNC_VALUES_PATTERN.search(body)
+        datatype = None
+        if fnc and not AXIS_LAYOUT_PATTERN.search(body):
+            datatype = fnc.group(1).decode('ascii').upper()
+            if datatype not in DATATYPE_FORMATS:
+                datatype = None
+        layouts[decode_token(match.group(1))] = datatype
+    return layouts
+
+
+def read_compu_methods(content: bytes) -> Dict[str, Optional[Tuple[float, float]]]:
+    """扫描 A2L 中的 COMPU_METHOD 并转换为线性系数
+
+    - IDENTICAL: (1, 0)
+    - LINEAR: COEFFS_LINEAR a b，物理值 = a * 原始值 + b
+    - RAT_FUNC: COEFFS a b c d e f 定义 原始值 = (a*x² + b*x + c) / (d*x² + e*x + f)，
+      只支持 a = d = e = 0 的线性形式，物理值 = (f * 原始值 - c) / b
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Dict[str, Optional[Tuple[float, float]]]: 转换方法名称到 (factor, offset) 的映射；
+        查表、公式等无法线性表示的转换为 None
+    """
+    methods: Dict[str, Optional[Tuple[float, float]]] = {}
+    for match in COMPU_METHOD_BLOCK_PATTERN.finditer(content):
+        header = COMPU_METHOD_HEADER_PATTERN.match(match.group(1))
+        if header is None:
+            continue
+
+        name, _, conversion_type = header.groups()
+        body = COMMENT_PATTERN.sub(b' ', match.group(1)[header.end():])
+        coefficients = None
+        if conversion_type == b'IDENTICAL':
+            coefficients = IDENTITY_CONVERSION
+        elif conversion_type == b'LINEAR':
+            coeffs = COEFFS_LINEAR_PATTERN.search(body)
+            if coeffs:
+                coefficients = (float(coeffs.group(1)), float(coeffs.group(2)))
+        elif conversion_type == b'RAT_FUNC':
+            coeffs = COEFFS_PATTERN.search(body)
+            if coeffs:
+                a, b, c, d, e, f = (float(value) for value in coeffs.groups())
+                if a == d == e == 0 and b != 0 and f != 0:
+                    coefficients = (f / b, -c / b)
+        methods[decode_token(name)] = coefficients
+    return methods
+
+
+class ELFDataImage:
+    """ELF 初始化数据的内存映射视图
+
+    按地址查找 SHF_ALLOC 的 SHT_PROGBITS/SHT_NOBITS 节，返回指向文件
+    内存映射的 memoryview。关闭前必须释放所有返回的 memoryview。
+
+    Attributes:
+        elf_path: ELF 文件路径
+        byte_order: struct 字节序前缀（'<' 或 '>'）
+        symbol_sizes: 数据对象符号地址到大小的映射（同一地址取最大值）
+    """
+
+    def __init__(self, elf_path: Path):
+        """打开并索引 ELF 文件
+
+        Args:
+            elf_path: ELF 文件路径
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            CalExtractError: 不是有效的 ELF 文件
+        """
+        self.elf_path = Path(elf_path)
+        if not self.elf_path.exists():
+            raise FileNotFoundError(f"ELF 文件不存在: {self.elf_path}")
+
+        self.byte_order = '<'
+        self.symbol_sizes: Dict[int, int] = {}
+        # 节: (起始地址, 结束地址, 文件偏移, 是否 NOBITS)
+        self._sections: List[Tuple[int, int, int, bool]] = []
+        self._starts: List[int] = []
+
+        with open(self.elf_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._index()
+        except (ValueError, struct.error, IndexError) as e:
+            self.close()
+            raise CalExtractError(f"ELF 文件解析失败: {self.elf_path}: {e}") from e
+
+    def __enter__(self) -> "ELFDataImage":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """释放内存映射"""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def _index(self):
+        """解析节头表和符号表（节头表读取与 ELFParser 共用）"""
+        table = read_section_table(self._mm)
+        if table is None:
+            raise CalExtractError(f"不是有效的 ELF 文件或格式不支持: {self.elf_path}")
+        self.byte_order = table.byte_order
+
+        # 节头: (name, type, flags, addr, offset, size, link, info, addralign, entsize)
+        data_sections = sorted(
+            (s[3], s[3] + s[5], s[4], s[1] == SHT_NOBITS)
+            for s in table.sections
+            if s[1] in (SHT_PROGBITS, SHT_NOBITS) and s[2] & SHF_ALLOC and s[5] > 0
+        )
+        self._sections = data_sections
+        self._starts = [s[0] for s in data_sections]
+
+        if table.symtab is None:
+            return
+        sym_fmt, (value_pos, size_pos, info_pos) = SYMBOL_LAYOUTS[table.elf_class]
+        objects = unpack_symbols(
+            self._mm, table, sym_fmt,
+            lambda entry: entry[size_pos] and entry[info_pos] & 0xF == STT_OBJECT
+        )
+        sizes = self.symbol_sizes
+        for entry in objects:
+            addr, size = entry[value_pos], entry[size_pos]
+            if size > sizes.get(addr, 0):
+                sizes[addr] = size
+
+    @property
+    def sections(self) -> List[Tuple[int, int]]:
+        """按起始地址排序的数据节地址范围 [(起始地址, 结束地址)]"""
+        return [(start, end) for start, end, _, _ in self._sections]
+
+    def view(self, address: int, size: int) -> Optional[memoryview]:
+        """获取一段地址的初始化数据
+
+        Args:
+            address: 起始地址
+            size: 字节数
+
+        Returns:
+            Optional[memoryview]: 数据视图（NOBITS 节为全 0）；
+            地址范围不完全落在同一个数据节内时返回 None
+        """
+        index = bisect_right(self._starts, address) - 1
+        if index < 0 or size <= 0:
+            return None
+        start, end, offset, nobits = self._sections[index]
+        if address + size > end:
+            return None
+        if nobits:
+            return memoryview(bytes(size))
+        begin = offset + address - start
+        return memoryview(self._mm)[begin:begin + size]
+
+
+def resolve_characteristic_size(
+    layout: CharacteristicLayout,
+    record_layouts: Dict[str, Optional[str]],
+    symbol_sizes: Dict[int, int],
+    address: int
+) -> Tuple[int, str]:
+    """确定 CHARACTERISTIC 的字节数与数据类型
+
+    VALUE/VAL_BLK/ASCII 按记录布局数据类型和元素个数计算，
+    CURVE/MAP 等其他类型使用 ELF 中该地址数据对象符号的大小。
+
+    Args:
+        layout: CHARACTERISTIC 存储描述
+        record_layouts: 记录布局名称到数据类型的映射（read_record_layouts 的结果）
+        symbol_sizes: 数据对象符号地址到大小的映射
+        address: 参数地址
+
+    Returns:
+        Tuple[int, str]: (字节数, 数据类型)，无法确定时字节数为 0
+    """
+    datatype = record_layouts.get(layout.deposit) or ""
+    if datatype and layout.char_type in SIMPLE_TYPES:
+        count = 1 if layout.char_type == "VALUE" else layout.element_count
+        return struct.calcsize(DATATYPE_FORMATS[datatype]) * count, datatype
+    return symbol_sizes.get(address, 0), datatype
+
+
+def _format_number(value, fmt: str) -> str:
+    """格式化 CDFX 数值（单精度浮点保留 9 位有效数字）"""
+    if fmt in ('e', 'f'):
+        return f"{value:.9g}"
+    return repr(value) if fmt == 'd' else str(value)
+
+
+def _format_physical(value: float) -> str:
+    """格式化经过线性转换的 CDFX 物理值（双精度保留 15 位有效数字）"""
+    return f"{value:.15g}"
+
+
+class CalibrationExtractor:
+    """标定参数初始值提取器
+
+    从 ELF 初始化数据节读取 A2L 中每个 CHARACTERISTIC 的初始值，
+    写入 JSON 或 CDFX 快照文件。
+    """
+
+    def __init__(self):
+        """初始化提取器"""
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def iter_values(
+        self,
+        a2l_path: Path,
+        elf: ELFDataImage,
+        skipped: Dict[str, str]
+    ) -> Iterator[CalibrationValue]:
+        """按 A2L 顺序遍历可提取的标定参数
+
+        Args:
+            a2l_path: A2L 文件路径
+            elf: 已打开的 ELF 数据视图
+            skipped: 用于收集未提取参数及原因的字典
+
+        Yields:
+            CalibrationValue: 标定参数初始值（data 在 elf 关闭前有效）
+
+        Raises:
+            FileNotFoundError: A2L 文件不存在
+            A2LParseError: A2L 文件无法解析
+        """
+        a2l_path = Path(a2l_path)
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+        if a2l_path.stat().st_size == 0:
+            raise A2LParseError(f"A2L 文件大小为 0: {a2l_path}")
+
+        with open(a2l_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                layouts = read_characteristic_layouts(mm)
+                record_layouts = read_record_layouts(mm)
+                compu_methods = read_compu_methods(mm)
+
+        for name, layout in layouts.items():
+            try:
+                address = int(layout.address_str, 0)
+            except ValueError:
+                address = 0
+            if not address:
+                skipped[name] = "无地址"
+                continue
+
+            size, datatype = resolve_characteristic_size(layout, record_layouts, elf.symbol_sizes, address)
+            if not size:
+                skipped[name] = f"无法确定大小 ({layout.char_type} {layout.deposit})"
+                continue
+
+            data = elf.view(address, size)
+            if data is None:
+                skipped[name] = f"0x{address:08X} 不在 ELF 初始化数据节中"
+                continue
+
+            if layout.conversion == NO_COMPU_METHOD:
+                coefficients = IDENTITY_CONVERSION
+            else:
+                coefficients = compu_methods.get(layout.conversion)
+            yield CalibrationValue(name, layout.char_type, address, datatype, data,
+                                   layout.conversion, coefficients)
+
+    def extract(
+        self,
+        a2l_path: Path,
+        elf_path: Path,
+        output_path: Path,
+        snapshot_format: Optional[str] = None
+    ) -> CalExtractResult:
+        """提取标定参数初始值并写入快照文件
+
+        Args:
+            a2l_path: A2L 文件路径（地址已更新）
+            elf_path: ELF 文件路径
+            output_path: 快照文件路径
+            snapshot_format: json 或 cdfx（None 时按扩展名判断，.cdfx 为 CDFX）
+
+        Returns:
+            CalExtractResult: 提取结果
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            A2LParseError: A2L 文件无法解析
+            CalExtractError: ELF 文件无法解析
+        """
+        start_time = time.monotonic()
+        a2l_path, elf_path, output_path = Path(a2l_path), Path(elf_path), Path(output_path)
+        if snapshot_format is None:
+            snapshot_format = FORMAT_CDFX if output_path.suffix.lower() == ".cdfx" else FORMAT_JSON
+
+        result = CalExtractResult(snapshot_path=str(output_path), snapshot_format=snapshot_format)
+        values: List[CalibrationValue] = []
+
+        with ELFDataImage(elf_path) as elf:
+            try:
+                values.extend(self.iter_values(a2l_path, elf, result.skipped))
+                result.characteristic_count = len(values) + len(result.skipped)
+                output_path.parent.mkdir(parents=True, exist_ok=True)
+                if snapshot_format == FORMAT_CDFX:
+                    self._write_cdfx(values, elf.byte_order, output_path, result.skipped)
+                else:
+                    self._write_json(values, elf.byte_order, a2l_path, elf_path, output_path, result.skipped)
+                result.total_bytes = sum(
+                    len(value.data) for value in values if value.name not in result.skipped
+                )
+            finally:
+                for value in values:
+                    value.data.release()
+
+        result.extracted_count = result.characteristic_count - len(result.skipped)
+        result.success = True
+        result.execution_time = time.monotonic() - start_time
+        result.message = (
+            f"标定值提取完成: {result.extracted_count}/{result.characteristic_count} 个参数, "
+            f"{result.total_bytes:,} 字节, 耗时 {result.execution_time:.2f} 秒"
+        )
+        self._log(result.message)
+        for name, reason in list(result.skipped.items())[:10]:
+            self._log(f"  未提取 {name}: {reason}")
+        return result
+
+    def _write_json(
+        self,
+        values: List[CalibrationValue],
+        byte_order: str,
+        a2l_path: Path,
+        elf_path: Path,
+        output_path: Path,
+        skipped: Dict[str, str]
+    ):
+        """写入紧凑 JSON 快照（初始值为十六进制字节串）"""
+        snapshot = {
+            "a2l": str(a2l_path),
+            "elf": str(elf_path),
+            "created_at": datetime.now().isoformat(),
+            "byte_order": "little" if byte_order == '<' else "big",
+            "characteristics": {
+                value.name: {
+                    "address": f"0x{value.address:08X}",
+                    "type": value.char_type,
+                    "datatype": value.datatype,
+                    "size": len(value.data),
+                    "data": value.data.hex(),
+                }
+                for value in values
+            },
+            "skipped": skipped,
+        }
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(snapshot, ensure_ascii=False, separators=(',', ':')))
+
+    def _write_cdfx(
+        self,
+        values: List[CalibrationValue],
+        byte_order: str,
+        output_path: Path,
+        skipped: Dict[str, str]
+    ):
+        """写入 CDF 2.0 快照
+
+        只写入能按记录布局数据类型解码的参数（VALUE、VAL_BLK、ASCII），
+        数值按 COMPU_METHOD 转换为物理值；类型不支持或转换不是线性的参数记入 skipped。
+        """
+        parts = [
+            '<?xml version="1.0" encoding="UTF-8"?>\n',
+            '<!DOCTYPE MSRSW PUBLIC "-//ASAM//DTD CALIBRATION DATA FORMAT:V2.0.0:LAI:IAI:XML:CDF200.XSD//EN" '
+            '"cdf_v2.0.0.sl.dtd">\n',
+            '<MSRSW>\n<SHORT-NAME>', escape(output_path.stem), '</SHORT-NAME>\n<CATEGORY>CDF20</CATEGORY>\n',
+            '<SW-SYSTEMS>\n<SW-SYSTEM>\n<SHORT-NAME>', escape(output_path.stem), '</SHORT-NAME>\n',
+            '<SW-INSTANCE-SPEC>\n<SW-INSTANCE-TREE>\n<SHORT-NAME>', escape(output_path.stem),
+            '</SHORT-NAME>\n<CATEGORY>NO_VCD</CATEGORY>\n',
+        ]
+
+        for value in values:
+            if value.char_type not in SIMPLE_TYPES or not value.datatype:
+                skipped[value.name] = f"CDFX 不支持的类型 ({value.char_type})"
+                continue
+            if value.char_type != "ASCII" and value.coefficients is None:
+                skipped[value.name] = f"CDFX 不支持的转换方法 ({value.conversion or '未指定'})"
+                continue
+
+            parts.append(f'<SW-INSTANCE>\n<SHORT-NAME>{escape(value.name)}</SHORT-NAME>\n')
+            parts.append(f'<CATEGORY>{value.char_type}</CATEGORY>\n<SW-VALUE-CONT>\n')
+            if value.char_type == "ASCII":
+                text = value.data.tobytes().split(b'\0', 1)[0].decode('latin-1')
+                parts.append(f'<SW-VALUES-PHYS><VT>{escape(text)}</VT></SW-VALUES-PHYS>\n')
+            else:
+                fmt = DATATYPE_FORMATS[value.datatype]
+                count = len(value.data) // struct.calcsize(fmt)
+                numbers = struct.unpack_from(f"{byte_order}{count}{fmt}", value.data)
+                if value.char_type == "VAL_BLK":
+                    parts.append(f'<SW-ARRAYSIZE><V>{count}</V></SW-ARRAYSIZE>\n')
+                parts.append('<SW-VALUES-PHYS>')
+                if value.coefficients == IDENTITY_CONVERSION:
+                    parts.extend(f'<V>{_format_number(n, fmt)}</V>' for n in numbers)
+                else:
+                    factor, offset = value.coefficients
+                    parts.extend(f'<V>{_format_physical(factor * n + offset)}</V>' for n in numbers)
+                parts.append('</SW-VALUES-PHYS>\n')
+            parts.append('</SW-VALUE-CONT>\n</SW-INSTANCE>\n')
+
+        parts.append(
+            '</SW-INSTANCE-TREE>\n</SW-INSTANCE-SPEC>\n</SW-SYSTEM>\n</SW-SYSTEMS>\n</MSRSW>\n'
+        )
+        with open(output_path, 'w', encoding='utf-8') as f:
+            f.write(''.join(parts))
@@ -0,0 +1,292 @@
+"""Multi-core chunked A2L post-processing.
+
+Large merged A2L files are split into chunks at top-level variable block
+boundaries (a line starting with /begin CHARACTERISTIC, MEASUREMENT or
+AXIS_PTS). Variable blocks never nest, so each chunk starts at block
+depth 0 and outside any IF_DATA block and can be processed independently
+by A2LPostProcessor. Chunks are processed in a ProcessPoolExecutor and
+the outputs are concatenated in their original order.
+
+The header (file start .. first /end MOD_PAR) is always kept in the first
+chunk so the XCP header replacement happens exactly once. The ELF symbol
+map and DWARF member index are passed to the worker processes through
+shared memory and decoded once per worker.
+
+Usage:
+    processor = ChunkedA2LPostProcessor(
+        symbol_map=symbols,
+        remove_if_data_xcp=True,
+        xcp_template=template,
+        max_workers=8,
+    )
+    result = processor.process(Path("merged.a2l"), Path("output/merged.a2l"))
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, TextIO, Tuple
+
+from a2l.address_updater import AddressDelta
+from a2l.elf_cache import read_shared_index, share_index
+from a2l.post_processor import A2LPostProcessor, PostProcessResult, find_header_end
+
+logger = logging.getLogger(__name__)
+
+# 分块边界：行首的变量块起始标记（变量块之间不嵌套，此处块深度必为 0）
+CHUNK_BOUNDARY_PATTERN = re.compile(
+    r'^[ \t]*/begin[ \t]+(?:CHARACTERISTIC|MEASUREMENT|AXIS_PTS)\b',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# 每块最小字符数，小于 2 倍该值的文件直接在当前进程处理
+DEFAULT_MIN_CHUNK_SIZE = 1024 * 1024
+
+# 每个工作进程分配的块数（块数多于进程数以平衡负载）
+CHUNKS_PER_WORKER = 4
+
+
+def split_a2l_chunks(content: str, chunk_count: int, start: int = 0) -> List[str]:
+    """在顶层变量块边界把 A2L 文本切分为若干块
+
+    Args:
+        content: A2L 文件内容
+        chunk_count: 期望的块数
+        start: 第一个切分点不早于此位置（用于保证头部完整落在第一块）
+
+    Returns:
+        List[str]: 按原顺序排列的块，拼接后与 content 相同
+    """
+    if chunk_count <= 1 or not content:
+        return [content]
+
+    target = max(len(content) // chunk_count, 1)
+    cuts = [0]
+    pos = max(start, target)
+
+    while pos < len(content):
+        match = CHUNK_BOUNDARY_PATTERN.search(content, pos)
+        if match is None:
+            break
+        if match.start() > cuts[-1]:
+            cuts.append(match.start())
+        pos = max(match.start() + target, match.end())
+
+    cuts.append(len(content))
+    return [content[begin:end] for begin, end in zip(cuts, cuts[1:]) if end > begin]
+
+
+def merge_results(results: List[PostProcessResult]) -> PostProcessResult:
+    """按块顺序合并各块的处理统计
+
+    Args:
+        results: 各块的处理结果（第一块包含头部替换信息）
+
+    Returns:
+        PostProcessResult: 合并后的统计（不含 success/message）
+    """
+    merged = PostProcessResult()
+    if results:
+        merged.header_found = results[0].header_found
+        merged.header_original_length = results[0].header_original_length
+        merged.header_new_length = results[0].header_new_length
+
+    for result in results:
+        merged.matched_count += result.matched_count
+        merged.unmatched_count += result.unmatched_count
+        merged.total_variables += result.total_variables
+        merged.updated_variables.extend(result.updated_variables)
+        merged.unmatched_variables.extend(result.unmatched_variables)
+        merged.if_data_removed += result.if_data_removed
+        merged.characteristic_count += result.characteristic_count
+        merged.zero_address_removed += result.zero_address_removed
+        merged.removed_variables.extend(result.removed_variables)
+        merged.ambiguous_variables.update(result.ambiguous_variables)
+        if result.delta is not None:
+            if merged.delta is None:
+                merged.delta = AddressDelta()
+            merged.delta.extend(result.delta)
+
+    return merged
+
+
+# 工作进程中的处理选项与符号映射（由 _init_chunk_worker 初始化）
+_worker_options: Dict[str, object] = {}
+_worker_symbol_map: Optional[Dict[str, int]] = None
+_worker_member_index: Optional[Dict[str, int]] = None
+
+
+def _init_chunk_worker(
+    options: Dict[str, object],
+    symbols_shm: Optional[str],
+    members_shm: Optional[str]
+):
+    """分块处理工作进程初始化：每个进程只解码一次共享的符号映射
+
+    Args:
+        options: remove_if_data_xcp / filter_zero_address / xcp_template
+        symbols_shm: 符号映射所在共享内存块名称（None 表示不更新地址）
+        members_shm: DWARF 成员索引所在共享内存块名称（可选）
+    """
+    global _worker_options, _worker_symbol_map, _worker_member_index
+    _worker_options = options
+    _worker_symbol_map = read_shared_index(symbols_shm) if symbols_shm else None
+    _worker_member_index = read_shared_index(members_shm) if members_shm else None
+
+
+def _process_chunk(chunk: str, with_header: bool) -> Tuple[str, PostProcessResult]:
+    """在工作进程中处理单个块
+
+    Args:
+        chunk: 块内容
+        with_header: 是否为包含头部的第一块
+
+    Returns:
+        Tuple[str, PostProcessResult]: (处理后的内容, 处理统计)
+    """
+    processor = A2LPostProcessor(
+        symbol_map=_worker_symbol_map,
+        remove_if_data_xcp=_worker_options["remove_if_data_xcp"],
+        filter_zero_address=_worker_options["filter_zero_address"],
+        xcp_template=_worker_options["xcp_template"] if with_header else None,
+        member_index=_worker_member_index
+    )
+    return processor.process_text(chunk)
+
+
+class ChunkedA2LPostProcessor(A2LPostProcessor):
+    """多进程分块 A2L 后处理器
+
+    处理规则与 A2LPostProcessor 完全一致，输出逐字节相同。
+    文件较小或只有一个工作进程时退回单进程处理。
+
+    Attributes:
+        max_workers: 最大工作进程数（None 表示 CPU 核数）
+        min_chunk_size: 每块最小字符数
+    """
+
+    def __init__(
+        self,
+        symbol_map: Optional[Dict[str, int]] = None,
+        remove_if_data_xcp: bool = False,
+        filter_zero_address: bool = False,
+        xcp_template: Optional[str] = None,
+        member_index: Optional[Dict[str, int]] = None,
+        max_workers: Optional[int] = None,
+        min_chunk_size: int = DEFAULT_MIN_CHUNK_SIZE
+    ):
+        """初始化分块后处理器
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+            remove_if_data_xcp: 是否删除 IF_DATA XCP 块
+            filter_zero_address: 是否删除地址为 0 的 CHARACTERISTIC 块
+            xcp_template: XCP 头文件模板内容
+            member_index: DWARF 成员路径到地址的映射
+            max_workers: 最大工作进程数（None 表示 CPU 核数）
+            min_chunk_size: 每块最小字符数
+        """
+        super().__init__(
+            symbol_map=symbol_map,
+            remove_if_data_xcp=remove_if_data_xcp,
+            filter_zero_address=filter_zero_address,
+            xcp_template=xcp_template,
+            member_index=member_index
+        )
+        self.max_workers = max_workers
+        self.min_chunk_size = max(min_chunk_size, 1)
+
+    def process_text(self, content: str) -> Tuple[str, PostProcessResult]:
+        """分块处理内存中的 A2L 文本
+
+        Args:
+            content: A2L 文件内容
+
+        Returns:
+            Tuple[str, PostProcessResult]: (处理后的内容, 处理结果)
+        """
+        output, result = self._run_chunked(content)
+        result.success = self.xcp_template is None or result.header_found
+        result.message = self._summarize(result)
+        return output, result
+
+    def _run_file(
+        self,
+        src: TextIO,
+        write: Callable[[str], object]
+    ) -> PostProcessResult:
+        """读取整个源文件后分块处理"""
+        output, result = self._run_chunked(src.read())
+        write(output)
+        return result
+
+    def _split(self, content: str) -> List[str]:
+        """根据工作进程数和最小块大小切分内容"""
+        workers = self.max_workers or os.cpu_count() or 1
+        chunk_count = min(workers * CHUNKS_PER_WORKER, len(content) // self.min_chunk_size)
+        if workers <= 1 or chunk_count <= 1:
+            return [content]
+
+        start = 0
+        if self.xcp_template is not None:
+            header_end = find_header_end(content)
+            if header_end is None:
+                # 没有 /end MOD_PAR 时整体处理，由调用方报告未找到头部
+                return [content]
+            start = header_end
+
+        return split_a2l_chunks(content, chunk_count, start)
+
+    def _run_chunked(self, content: str) -> Tuple[str, PostProcessResult]:
+        """分块处理核心
+
+        Args:
+            content: A2L 文件内容
+
+        Returns:
+            Tuple[str, PostProcessResult]: (处理后的内容, 处理统计)
+        """
+        chunks = self._split(content)
+        if len(chunks) <= 1:
+            parts: List[str] = []
+            result = self._run(content.splitlines(keepends=True), parts.append)
+            return ''.join(parts), result
+
+        workers = min(len(chunks), self.max_workers or os.cpu_count() or 1)
+        self._log(f"分块处理 A2L: {len(chunks)} 块, {workers} 个进程")
+
+        options = {
+            "remove_if_data_xcp": self.remove_if_data_xcp,
+            "filter_zero_address": self.filter_zero_address,
+            "xcp_template": self.xcp_template,
+        }
+        blocks = []
+
+        try:
+            symbols_shm = None
+            members_shm = None
+            if self.symbol_map is not None:
+                blocks.append(share_index(self.symbol_map))
+                symbols_shm = blocks[-1].name
+            if self.member_index:
+                blocks.append(share_index(self.member_index))
+                members_shm = blocks[-1].name
+
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_chunk_worker,
+                initargs=(options, symbols_shm, members_shm)
+            ) as executor:
+                outputs = list(executor.map(
+                    _process_chunk,
+                    chunks,
+                    [index == 0 for index in range(len(chunks))]
+                ))
+
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+        return ''.join(text for text, _ in outputs), merge_results([r for _, r in outputs])
@@ -0,0 +1,609 @@
+"""XCP DAQ/ODT packing optimizer for A2L MEASUREMENTs.
+
+MEASUREMENTs are listed in generation order in the A2L, and XCP masters
+usually build one ODT entry per measurement in that order. Neighbouring
+signals in memory then end up in different ODTs, which wastes DTO
+payload and caps the achievable sampling rate.
+
+The optimizer sorts measurements by address and size, merges
+overlapping/contiguous address ranges into single ODT entries (split at
+measurement boundaries so a signal is never torn across ODTs unless it
+is larger than an ODT), and packs the entries into ODTs. Three layouts
+are evaluated and the one with the fewest ODTs (then entries) wins:
+best-fit decreasing bin packing of whole ranges, best-fit decreasing of
+single measurements with adjacent entries coalesced afterwards, and an
+address-ordered fill that splits a range at a measurement boundary when
+an ODT is full. The result is a
+recommended DAQ/ODT layout plus a report of the bytes per ODT compared
+with the naive one-entry-per-measurement layout.
+
+Usage:
+    optimizer = DAQOptimizer(max_odt_bytes=7)
+    result = optimizer.optimize_file("App.a2l", "App_daq.json")
+    print(result.message)
+"""
+
+import json
+import logging
+import mmap
+import re
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from a2l.a2l_parser import A2LParseError, decode_token
+from a2l.cal_extractor import (
+    COMMENT_PATTERN,
+    DATATYPE_FORMATS,
+    MATRIX_DIM_PATTERN,
+    NESTED_BLOCK_PATTERN
+)
+
+logger = logging.getLogger(__name__)
+
+# CAN 上的 XCP：8 字节 DTO 减去 1 字节 PID
+DEFAULT_MAX_ODT_BYTES = 7
+
+# ODT_ENTRY_SIZE_DAQ 的最大值
+DEFAULT_MAX_ENTRY_SIZE = 255
+
+# A2L 块与字段
+MEASUREMENT_BEGIN_PATTERN = re.compile(rb'/begin\s+MEASUREMENT\b')
+MEASUREMENT_END_PATTERN = re.compile(rb'/end\s+MEASUREMENT\b')
+
+# MEASUREMENT 头部：Name LongIdentifier Datatype（字段间可夹注释）
+_SEPARATOR = rb'(?:\s+|/\*.*?\*/)+'
+MEASUREMENT_HEADER_PATTERN = re.compile(
+    rb'(?:\s+|/\*.*?\*/)*(\S+)' + _SEPARATOR + rb'("(?:[^"\\]|\\.)*"|\S+)' + _SEPARATOR + rb'(\S+)',
+    re.DOTALL
+)
+
+# 地址：ECU_ADDRESS 关键字、Simulink 注释格式、独立的 address 行（与 A2LParser 一致）
+ECU_ADDRESS_PATTERN = re.compile(rb'\bECU_ADDRESS\s+(0x[0-9A-Fa-f]+|\d+)', re.IGNORECASE)
+SIMULINK_ADDRESS_PATTERN = re.compile(
+    rb'/\*\s*ECU\s+Address\s*\*/\s*(0x[0-9A-Fa-f]+|\d+)',
+    re.IGNORECASE
+)
+ADDRESS_LINE_PATTERN = re.compile(
+    rb'^\s*address\s+(0x[0-9A-Fa-f]+|\d+)\s*$',
+    re.IGNORECASE | re.MULTILINE
+)
+ARRAY_SIZE_PATTERN = re.compile(rb'\bARRAY_SIZE\s+(\d+)')
+
+
+class DAQOptimizeError(Exception):
+    """DAQ 优化错误
+
+    当 ODT 参数无效时抛出。
+    """
+    pass
+
+
+@dataclass
+class MeasurementInfo:
+    """MEASUREMENT 的地址与大小
+
+    Attributes:
+        name: 变量名称
+        address: 地址
+        size: 字节数（数据类型大小 × 元素个数）
+        datatype: 数据类型
+    """
+    name: str
+    address: int
+    size: int
+    datatype: str = ""
+
+    @property
+    def end(self) -> int:
+        """结束地址（不含）"""
+        return self.address + self.size
+
+
+@dataclass
+class OdtEntry:
+    """ODT 条目（一段连续地址）
+
+    Attributes:
+        address: 起始地址
+        size: 字节数
+        measurements: 覆盖的变量名称
+    """
+    address: int
+    size: int
+    measurements: List[str] = field(default_factory=list)
+
+
+@dataclass
+class Odt:
+    """对象描述表
+
+    Attributes:
+        number: ODT 序号（从 0 开始）
+        entries: 按地址排序的条目
+    """
+    number: int
+    entries: List[OdtEntry] = field(default_factory=list)
+
+    @property
+    def size(self) -> int:
+        """ODT 数据字节数"""
+        return sum(entry.size for entry in self.entries)
+
+
+@dataclass
+class DAQPackingResult:
+    """DAQ 打包结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        max_odt_bytes: 每个 ODT 的最大数据字节数
+        measurement_count: 参与打包的变量数量
+        range_count: 合并后的连续地址范围数量
+        odts: 推荐的 ODT 布局
+        naive_odt_count: 按生成顺序每变量一个条目时的 ODT 数量
+        naive_entry_count: 按生成顺序每变量一个条目时的条目数量
+        split_measurements: 大于单个 ODT 而被拆分的变量
+        skipped: 未参与打包的变量名称到原因的映射
+    """
+    success: bool = False
+    message: str = ""
+    max_odt_bytes: int = DEFAULT_MAX_ODT_BYTES
+    measurement_count: int = 0
+    range_count: int = 0
+    odts: List[Odt] = field(default_factory=list)
+    naive_odt_count: int = 0
+    naive_entry_count: int = 0
+    split_measurements: List[str] = field(default_factory=list)
+    skipped: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def entry_count(self) -> int:
+        """推荐布局的条目总数"""
+        return sum(len(odt.entries) for odt in self.odts)
+
+    @property
+    def total_bytes(self) -> int:
+        """推荐布局每个采样周期传输的数据字节数"""
+        return sum(odt.size for odt in self.odts)
+
+    @property
+    def average_odt_bytes(self) -> float:
+        """推荐布局每个 ODT 的平均数据字节数"""
+        return self.total_bytes / len(self.odts) if self.odts else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为报告字典"""
+        return {
+            "max_odt_bytes": self.max_odt_bytes,
+            "summary": {
+                "measurements": self.measurement_count,
+                "ranges": self.range_count,
+                "odts": len(self.odts),
+                "entries": self.entry_count,
+                "bytes": self.total_bytes,
+                "average_odt_bytes": round(self.average_odt_bytes, 2),
+                "naive_odts": self.naive_odt_count,
+                "naive_entries": self.naive_entry_count,
+            },
+            "odts": [
+                {
+                    "odt": odt.number,
+                    "bytes": odt.size,
+                    "entries": [
+                        {
+                            "address": f"0x{entry.address:08X}",
+                            "size": entry.size,
+                            "measurements": entry.measurements,
+                        }
+                        for entry in odt.entries
+                    ],
+                }
+                for odt in self.odts
+            ],
+            "split_measurements": self.split_measurements,
+            "skipped": self.skipped,
+        }
+
+
+def read_measurements(content: bytes) -> Tuple[List[MeasurementInfo], Dict[str, str]]:
+    """扫描 A2L 中全部 MEASUREMENT 的地址与大小
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Tuple[List[MeasurementInfo], Dict[str, str]]:
+        (按生成顺序排列的变量, 无法确定地址或大小的变量及原因)
+    """
+    measurements: List[MeasurementInfo] = []
+    skipped: Dict[str, str] = {}
+    pos = 0
+
+    while True:
+        begin = MEASUREMENT_BEGIN_PATTERN.search(content, pos)
+        if begin is None:
+            break
+        end = MEASUREMENT_END_PATTERN.search(content, begin.end())
+        if end is None:
+            break
+        body = content[begin.end():end.start()]
+        pos = end.end()
+
+        header = MEASUREMENT_HEADER_PATTERN.match(body)
+        if header is None:
+            continue
+        name = decode_token(header.group(1))
+        datatype = header.group(3).decode('ascii', 'replace')
+
+        address_match = SIMULINK_ADDRESS_PATTERN.search(body)
+        body = NESTED_BLOCK_PATTERN.sub(b' ', COMMENT_PATTERN.sub(b' ', body))
+        address_match = (
+            address_match
+            or ECU_ADDRESS_PATTERN.search(body)
+            or ADDRESS_LINE_PATTERN.search(body)
+        )
+        address = int(address_match.group(1), 0) if address_match else 0
+        if not address:
+            skipped[name] = "无地址"
+            continue
+        if datatype not in DATATYPE_FORMATS:
+            skipped[name] = f"未知数据类型 {datatype}"
+            continue
+
+        count = 1
+        dims = MATRIX_DIM_PATTERN.search(body)
+        array_size = ARRAY_SIZE_PATTERN.search(body)
+        if dims:
+            for dim in dims.group(1).split():
+                count *= int(dim) or 1
+        elif array_size:
+            count = int(array_size.group(1)) or 1
+
+        size = struct.calcsize(DATATYPE_FORMATS[datatype]) * count
+        measurements.append(MeasurementInfo(name, address, size, datatype))
+
+    return measurements, skipped
+
+
+def merge_ranges(
+    measurements: List[MeasurementInfo],
+    max_gap: int = 0
+) -> List[List[MeasurementInfo]]:
+    """按地址和大小排序并合并重叠/连续的变量
+
+    Args:
+        measurements: 变量列表
+        max_gap: 允许合并的最大间隙字节数（间隙字节也会被传输；-1 表示只合并重叠的变量）
+
+    Returns:
+        List[List[MeasurementInfo]]: 每个连续地址范围内按地址排序的变量
+    """
+    ranges: List[List[MeasurementInfo]] = []
+    range_end = -1
+    for m in sorted(measurements, key=lambda m: (m.address, -m.size)):
+        if ranges and m.address <= range_end + max_gap:
+            ranges[-1].append(m)
+            range_end = max(range_end, m.end)
+        else:
+            ranges.append([m])
+            range_end = m.end
+    return ranges
+
+
+def split_range(members: List[MeasurementInfo], capacity: int) -> List[OdtEntry]:
+    """把一个连续地址范围在变量边界处切分为不超过 capacity 的条目
+
+    单个变量大于 capacity 时按 capacity 拆分。
+
+    Args:
+        members: 按地址排序的变量
+        capacity: 单个条目的最大字节数
+
+    Returns:
+        List[OdtEntry]: 条目列表
+    """
+    entries: List[OdtEntry] = []
+    current: Optional[OdtEntry] = None
+    current_end = 0
+
+    for m in members:
+        if current is not None:
+            new_end = max(current_end, m.end)
+            if new_end - current.address <= capacity:
+                current.measurements.append(m.name)
+                current_end = new_end
+                current.size = current_end - current.address
+                continue
+            entries.append(current)
+
+        if m.size > capacity:
+            for offset in range(0, m.size, capacity):
+                entries.append(OdtEntry(m.address + offset, min(capacity, m.size - offset), [m.name]))
+            current = None
+            continue
+
+        current = OdtEntry(m.address, m.size, [m.name])
+        current_end = m.end
+
+    if current is not None:
+        entries.append(current)
+    return entries
+
+
+def pack_entries(entries: List[OdtEntry], capacity: int) -> List[Odt]:
+    """按最佳适配递减把条目装入 ODT
+
+    Args:
+        entries: 条目（均不超过 capacity）
+        capacity: 每个 ODT 的最大数据字节数
+
+    Returns:
+        List[Odt]: 按最低地址排序的 ODT，条目按地址排序
+    """
+    # free_bins[n]: 剩余容量为 n 的 ODT 下标
+    free_bins: List[List[int]] = [[] for _ in range(capacity + 1)]
+    odts: List[List[OdtEntry]] = []
+    free: List[int] = []
+
+    for entry in sorted(entries, key=lambda e: (-e.size, e.address)):
+        index = None
+        for remaining in range(entry.size, capacity + 1):
+            if free_bins[remaining]:
+                index = free_bins[remaining].pop()
+                break
+        if index is None:
+            index = len(odts)
+            odts.append([])
+            free.append(capacity)
+        odts[index].append(entry)
+        free[index] -= entry.size
+        free_bins[free[index]].append(index)
+
+    for odt_entries in odts:
+        odt_entries.sort(key=lambda e: e.address)
+    odts.sort(key=lambda odt_entries: odt_entries[0].address)
+    return [Odt(number, odt_entries) for number, odt_entries in enumerate(odts)]
+
+
+def coalesce_entries(odts: List[Odt], max_entry_size: int) -> List[Odt]:
+    """合并同一 ODT 内地址相邻的条目
+
+    Args:
+        odts: 条目已按地址排序的 ODT
+        max_entry_size: 单个条目的最大字节数
+
+    Returns:
+        List[Odt]: 原 ODT 列表（就地合并）
+    """
+    for odt in odts:
+        merged: List[OdtEntry] = []
+        for entry in odt.entries:
+            last = merged[-1] if merged else None
+            if (last is not None and last.address + last.size == entry.address
+                    and last.size + entry.size <= max_entry_size):
+                last.size += entry.size
+                last.measurements.extend(entry.measurements)
+            else:
+                merged.append(entry)
+        odt.entries = merged
+    return odts
+
+
+def fill_odts(
+    ranges: List[List[MeasurementInfo]],
+    capacity: int,
+    max_entry_size: int
+) -> List[Odt]:
+    """按地址顺序依次填满 ODT，范围在变量边界处跨 ODT 切分
+
+    Args:
+        ranges: merge_ranges 返回的连续地址范围
+        capacity: 每个 ODT 的最大数据字节数
+        max_entry_size: 单个条目的最大字节数
+
+    Returns:
+        List[Odt]: 按地址排序的 ODT
+    """
+    chunk = min(capacity, max_entry_size)
+    odts: List[Odt] = []
+    free = 0
+
+    for members in ranges:
+        entry: Optional[OdtEntry] = None
+        entry_end = 0
+        for m in members:
+            if entry is not None:
+                new_end = max(entry_end, m.end)
+                grow = new_end - entry_end
+                if grow <= free and new_end - entry.address <= max_entry_size:
+                    entry.measurements.append(m.name)
+                    entry_end = new_end
+                    entry.size = entry_end - entry.address
+                    free -= grow
+                    continue
+
+            if m.size > chunk:
+                for offset in range(0, m.size, chunk):
+                    size = min(chunk, m.size - offset)
+                    odts.append(Odt(len(odts), [OdtEntry(m.address + offset, size, [m.name])]))
+                    free = capacity - size
+                entry = None
+                continue
+
+            if m.size > free:
+                odts.append(Odt(len(odts)))
+                free = capacity
+            entry = OdtEntry(m.address, m.size, [m.name])
+            odts[-1].entries.append(entry)
+            entry_end = m.end
+            free -= m.size
+
+    return odts
+
+
+def naive_packing(measurements: List[MeasurementInfo], capacity: int) -> Tuple[int, int]:
+    """按生成顺序每个变量一个条目顺序装入 ODT（XCP 主站的默认做法）
+
+    Args:
+        measurements: 按生成顺序排列的变量
+        capacity: 每个 ODT 的最大数据字节数
+
+    Returns:
+        Tuple[int, int]: (ODT 数量, 条目数量)
+    """
+    odt_count = 0
+    entry_count = 0
+    free = 0
+    for m in measurements:
+        for offset in range(0, m.size, capacity):
+            size = min(capacity, m.size - offset)
+            entry_count += 1
+            if size > free:
+                odt_count += 1
+                free = capacity
+            free -= size
+    return odt_count, entry_count
+
+
+class DAQOptimizer:
+    """XCP DAQ/ODT 打包优化器
+
+    Attributes:
+        max_odt_bytes: 每个 ODT 的最大数据字节数（MAX_DTO 减去 PID/时间戳等开销）
+        max_entry_size: 单个 ODT 条目的最大字节数
+        max_gap: 允许合并的最大地址间隙（字节）
+    """
+
+    def __init__(
+        self,
+        max_odt_bytes: int = DEFAULT_MAX_ODT_BYTES,
+        max_entry_size: int = DEFAULT_MAX_ENTRY_SIZE,
+        max_gap: int = 0
+    ):
+        """初始化优化器
+
+        Args:
+            max_odt_bytes: 每个 ODT 的最大数据字节数
+            max_entry_size: 单个 ODT 条目的最大字节数
+            max_gap: 允许合并的最大地址间隙（字节）
+
+        Raises:
+            DAQOptimizeError: 参数无效
+        """
+        if max_odt_bytes <= 0 or max_entry_size <= 0 or max_gap < 0:
+            raise DAQOptimizeError(
+                f"ODT 参数无效: max_odt_bytes={max_odt_bytes}, "
+                f"max_entry_size={max_entry_size}, max_gap={max_gap}"
+            )
+        self.max_odt_bytes = max_odt_bytes
+        self.max_entry_size = max_entry_size
+        self.max_gap = max_gap
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def optimize(self, measurements: List[MeasurementInfo]) -> DAQPackingResult:
+        """计算推荐的 ODT 布局
+
+        Args:
+            measurements: 按生成顺序排列的变量
+
+        Returns:
+            DAQPackingResult: 打包结果
+        """
+        capacity = min(self.max_odt_bytes, self.max_entry_size)
+        ranges = merge_ranges(measurements, self.max_gap)
+
+        entries: List[OdtEntry] = []
+        split = []
+        for members in ranges:
+            entries.extend(split_range(members, capacity))
+            split.extend(m.name for m in members if m.size > capacity)
+
+        # 仅合并互相重叠的变量（结构体与其成员），装箱后再合并相邻条目
+        atoms: List[OdtEntry] = []
+        for members in merge_ranges(measurements, -1):
+            atoms.extend(split_range(members, capacity))
+
+        # 候选布局取 ODT 更少者，其次取条目更少者
+        candidates = [
+            pack_entries(entries, self.max_odt_bytes),
+            coalesce_entries(pack_entries(atoms, self.max_odt_bytes), self.max_entry_size),
+            fill_odts(ranges, self.max_odt_bytes, self.max_entry_size),
+        ]
+        odts = min(candidates, key=lambda c: (len(c), sum(len(odt.entries) for odt in c)))
+
+        result = DAQPackingResult(
+            success=True,
+            max_odt_bytes=self.max_odt_bytes,
+            measurement_count=len(measurements),
+            range_count=len(ranges),
+            odts=odts,
+            split_measurements=split
+        )
+        result.naive_odt_count, result.naive_entry_count = naive_packing(measurements, capacity)
+        result.message = (
+            f"DAQ 打包完成: {result.measurement_count} 个变量 -> {result.range_count} 个连续范围, "
+            f"{len(result.odts)} 个 ODT / {result.entry_count} 个条目 "
+            f"(按生成顺序: {result.naive_odt_count} 个 ODT / {result.naive_entry_count} 个条目), "
+            f"平均每个 ODT {result.average_odt_bytes:.1f}/{self.max_odt_bytes} 字节"
+        )
+        return result
+
+    def optimize_file(self, a2l_path: Path, report_path: Optional[Path] = None) -> DAQPackingResult:
+        """读取 A2L 的 MEASUREMENT 并计算推荐的 ODT 布局
+
+        Args:
+            a2l_path: A2L 文件路径（地址已更新）
+            report_path: JSON 报告路径（None 表示不写入）
+
+        Returns:
+            DAQPackingResult: 打包结果
+
+        Raises:
+            FileNotFoundError: A2L 文件不存在
+            A2LParseError: A2L 文件为空
+        """
+        a2l_path = Path(a2l_path)
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+        if a2l_path.stat().st_size == 0:
+            raise A2LParseError(f"A2L 文件大小为 0: {a2l_path}")
+
+        with open(a2l_path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                measurements, skipped = read_measurements(mm)
+
+        result = self.optimize(measurements)
+        result.skipped = skipped
+        self._log(result.message)
+        if skipped:
+            self._log(f"  未参与打包的变量: {len(skipped)}")
+        if result.split_measurements:
+            self._log(f"  大于单个 ODT 而被拆分的变量: {len(result.split_measurements)}")
+
+        if report_path is not None:
+            report = result.to_dict()
+            report["a2l"] = str(a2l_path)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+        return result
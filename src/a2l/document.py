@@ -0,0 +1,151 @@
+"""In-memory A2L document shared by the A2L stage steps.
+
+The A2L process stage used to let every helper (header lookup, header
+replacement, zero-address filtering, verification) open the file again,
+retry utf-8/gbk and re-split the content. An A2LDocument is decoded
+once; helpers read and modify it in memory, and only ``save`` writes to
+disk.
+
+Usage:
+    document = A2LDocument.load(Path("tmsAPP.a2l"))
+    content, result = processor.process_text(document.content)
+    document.content = content
+    document.save(Path("output/tmsAPP_upAdress.a2l"))
+"""
+
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from a2l.post_processor import A2LPostProcessError, find_header_end, read_a2l_text
+
+logger = logging.getLogger(__name__)
+
+
+class A2LDocument:
+    """解码一次、在内存中修改的 A2L 文档
+
+    Attributes:
+        path: 来源文件路径（内存中创建时为 None）
+        encoding: 检测到的源文件编码
+        modified: 加载后内容是否被修改
+    """
+
+    def __init__(self, content: str, encoding: str = 'utf-8', path: Optional[Path] = None):
+        """初始化文档
+
+        Args:
+            content: A2L 文件内容（换行符为 \\n）
+            encoding: 源文件编码
+            path: 来源文件路径
+        """
+        self.path = Path(path) if path else None
+        self.encoding = encoding
+        self.modified = False
+        self._content = content
+        self._lines: Optional[List[str]] = None
+        self._header_end: Optional[int] = None
+        self._header_searched = False
+
+    @classmethod
+    def load(cls, path: Path) -> "A2LDocument":
+        """读取并解码 A2L 文件（utf-8 优先，失败时回退 gbk）
+
+        Args:
+            path: A2L 文件路径
+
+        Returns:
+            A2LDocument: 文档
+
+        Raises:
+            FileNotFoundError: 文件不存在
+            A2LPostProcessError: 文件无法解码
+        """
+        path = Path(path)
+        if not path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {path}")
+        content, encoding = read_a2l_text(path)
+        logger.debug(f"加载 A2L 文档: {path} ({encoding}, {len(content):,} 字符)")
+        return cls(content, encoding, path)
+
+    @property
+    def content(self) -> str:
+        """文档内容"""
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        """替换文档内容（清除行与头部位置缓存）"""
+        if value is self._content:
+            return
+        self._content = value
+        self._lines = None
+        self._header_searched = False
+        self.modified = True
+
+    @property
+    def lines(self) -> List[str]:
+        """按 \\n 切分的行（缓存到内容被修改为止）"""
+        if self._lines is None:
+            self._lines = self._content.split('\n')
+        return self._lines
+
+    def header_end(self) -> Optional[int]:
+        """XCP 头文件替换范围的结束位置（第一个 /end MOD_PAR 所在行的行尾）
+
+        Returns:
+            Optional[int]: 结束位置，未找到时返回 None
+        """
+        if not self._header_searched:
+            self._header_end = find_header_end(self._content)
+            self._header_searched = True
+        return self._header_end
+
+    def replace_range(self, start: int, end: int, text: str):
+        """用 text 替换 [start, end) 范围的内容
+
+        Args:
+            start: 起始位置
+            end: 结束位置
+            text: 新内容
+        """
+        self.content = self._content[:start] + text + self._content[end:]
+
+    def save(self, output_path: Path, encoding: str = 'utf-8', newline: Optional[str] = None) -> Path:
+        """原子性写入文件（先写临时文件再重命名）
+
+        Args:
+            output_path: 输出文件路径
+            encoding: 输出文件编码
+            newline: 输出换行符（传给 open()，None 表示平台默认）
+
+        Returns:
+            Path: 输出文件路径
+
+        Raises:
+            A2LPostProcessError: 写入失败
+        """
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        temp_fd, temp_name = tempfile.mkstemp(
+            dir=str(output_path.parent),
+            prefix=f".{output_path.stem}_",
+            suffix=".tmp"
+        )
+        temp_path = Path(temp_name)
+        try:
+            with os.fdopen(temp_fd, 'w', encoding=encoding, newline=newline) as f:
+                f.write(self._content)
+            os.replace(temp_path, output_path)
+        except (OSError, UnicodeEncodeError) as e:
+            raise A2LPostProcessError(f"写入 A2L 文件失败: {output_path} - {e}") from e
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        self.path = output_path
+        self.modified = False
+        return output_path
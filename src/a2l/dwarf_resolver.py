@@ -0,0 +1,340 @@
+"""DWARF-backed struct member address resolver.
+
+This module builds an index from DWARF debug information that maps
+dotted variable paths (e.g. ``CbnBlw_B.Out``, ``CbnBlw_DW.Delay2_DSTATE``)
+to absolute addresses, so Simulink block I/O and DWork members that only
+exist as struct fields can be resolved without a leaf-name guess.
+
+The index is built with a single walk over the top-level DIEs of every
+compilation unit; struct layouts are flattened once per type and reused.
+
+Usage:
+    resolver = DWARFMemberResolver()
+    index = resolver.build_index("firmware.elf")
+    addr = resolver.resolve("CbnBlw_B.Out")
+    # Returns: 0x28001234 or None
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from a2l.elf_cache import ELFIndexCache, KIND_DWARF_MEMBERS
+from a2l.elf_parser import ELFParseError
+
+logger = logging.getLogger(__name__)
+
+# DWARF 表达式操作码：DW_OP_addr / DW_OP_plus_uconst
+DW_OP_ADDR = 0x03
+DW_OP_PLUS_UCONST = 0x23
+
+# 解析类型时需要透传的修饰类型
+TRANSPARENT_TYPE_TAGS = (
+    'DW_TAG_typedef',
+    'DW_TAG_const_type',
+    'DW_TAG_volatile_type',
+    'DW_TAG_restrict_type',
+)
+
+# 可展开成员的聚合类型
+AGGREGATE_TYPE_TAGS = (
+    'DW_TAG_structure_type',
+    'DW_TAG_union_type',
+    'DW_TAG_class_type',
+)
+
+
+def _decode_uleb128(data: List[int], start: int) -> int:
+    """解码 ULEB128 编码的无符号整数
+
+    Args:
+        data: 字节列表
+        start: 起始位置
+
+    Returns:
+        int: 解码后的整数
+    """
+    value = 0
+    shift = 0
+    for byte in data[start:]:
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            break
+        shift += 7
+    return value
+
+
+class DWARFMemberResolver:
+    """DWARF 结构体成员地址解析器
+
+    遍历 ELF 的 DWARF 调试信息，为全局变量及其结构体成员建立
+    点号路径到绝对地址的索引。索引按 ELF 文件缓存，同一 ELF
+    （路径、大小、修改时间不变）只构建一次，查询为 O(1) 字典查找。
+
+    Attributes:
+        elf_path: 当前索引对应的 ELF 文件路径
+        index: 点号路径到地址的映射
+        cache: 可选的 ELF 索引磁盘缓存（按文件内容哈希命中）
+    """
+
+    # 结构体嵌套展开的最大深度（防止异常类型图导致无限递归）
+    MAX_MEMBER_DEPTH = 16
+
+    def __init__(self, cache: Optional[ELFIndexCache] = None):
+        """初始化解析器
+
+        Args:
+            cache: 可选的 ELF 索引磁盘缓存
+        """
+        self.elf_path: Optional[Path] = None
+        self.cache = cache
+        self._index: Dict[str, int] = {}
+        self._variable_count = 0
+        self._elf_key: Optional[Tuple[str, int, int]] = None
+        self._type_members: Dict[int, List[Tuple[str, int]]] = {}
+
+    @property
+    def index(self) -> Dict[str, int]:
+        """获取已构建的成员索引
+
+        Returns:
+            Dict[str, int]: 点号路径到地址的映射
+        """
+        return self._index
+
+    def build_index(self, elf_path: Path) -> Dict[str, int]:
+        """从 ELF 文件的 DWARF 信息构建成员地址索引
+
+        同一 ELF 文件未发生变化时直接返回已构建的索引。
+        ELF 不包含 DWARF 信息时返回空索引。
+
+        Args:
+            elf_path: ELF 文件路径
+
+        Returns:
+            Dict[str, int]: 点号路径到地址的映射
+
+        Raises:
+            ELFParseError: 如果 ELF 文件无法解析
+            FileNotFoundError: 如果文件不存在
+        """
+        elf_path = Path(elf_path)
+        if not elf_path.exists():
+            raise FileNotFoundError(f"ELF 文件不存在: {elf_path}")
+
+        stat = elf_path.stat()
+        elf_key = (str(elf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+        if elf_key == self._elf_key:
+            return self._index
+
+        self.elf_path = elf_path
+        self._index = {}
+        self._variable_count = 0
+        self._type_members = {}
+
+        if self.cache is not None:
+            cached = self.cache.load(elf_path, KIND_DWARF_MEMBERS)
+            if cached is not None:
+                self._index, self._variable_count = cached
+                self._elf_key = elf_key
+                return self._index
+
+        try:
+            from elftools.elf.elffile import ELFFile
+        except ImportError:
+            raise ELFParseError(
+                "pyelftools 未安装。请运行: pip install pyelftools"
+            )
+
+        logger.info(f"开始构建 DWARF 成员索引: {elf_path}")
+
+        try:
+            with open(elf_path, 'rb') as f:
+                if f.read(4) != b'\x7fELF':
+                    raise ELFParseError(f"不是有效的 ELF 文件: {elf_path}")
+                f.seek(0)
+
+                elf = ELFFile(f)
+                if not elf.has_dwarf_info():
+                    logger.warning("ELF 文件中没有 DWARF 调试信息")
+                    self._elf_key = elf_key
+                    return self._index
+
+                byteorder = 'little' if elf.little_endian else 'big'
+                dwarf_info = elf.get_dwarf_info()
+
+                for cu in dwarf_info.iter_CUs():
+                    address_size = cu['address_size']
+                    for die in cu.get_top_DIE().iter_children():
+                        if die.tag == 'DW_TAG_variable':
+                            self._index_variable(die, address_size, byteorder)
+
+        except Exception as e:
+            if isinstance(e, (ELFParseError, FileNotFoundError)):
+                raise
+            raise ELFParseError(f"解析 DWARF 信息失败: {e}") from e
+
+        # 类型展开缓存仅在构建期间使用
+        self._type_members = {}
+        self._elf_key = elf_key
+
+        if self.cache is not None:
+            self.cache.store(elf_path, KIND_DWARF_MEMBERS, self._index, self._variable_count)
+
+        logger.info(
+            f"DWARF 成员索引构建完成: {self._variable_count} 个变量, "
+            f"{len(self._index)} 个路径"
+        )
+        return self._index
+
+    def resolve(self, name: str) -> Optional[int]:
+        """解析点号路径对应的地址
+
+        Args:
+            name: 变量名或点号分隔的成员路径
+
+        Returns:
+            Optional[int]: 地址，如果不存在返回 None
+        """
+        return self._index.get(name)
+
+    def get_variable_count(self) -> int:
+        """获取已索引的全局变量数量
+
+        Returns:
+            int: 带静态地址的全局变量数量
+        """
+        return self._variable_count
+
+    def _index_variable(self, die, address_size: int, byteorder: str):
+        """将一个全局变量及其全部成员加入索引
+
+        Args:
+            die: DW_TAG_variable DIE
+            address_size: 目标地址宽度（字节）
+            byteorder: 字节序
+        """
+        address = self._get_static_address(die, address_size, byteorder)
+        if address is None:
+            return
+
+        # 定义 DIE 可能只通过 DW_AT_specification 引用声明 DIE
+        decl = die
+        if 'DW_AT_specification' in die.attributes:
+            decl = die.get_DIE_from_attribute('DW_AT_specification')
+
+        name = self._get_name(die) or self._get_name(decl)
+        if not name:
+            return
+
+        type_die = None
+        if 'DW_AT_type' in die.attributes:
+            type_die = die.get_DIE_from_attribute('DW_AT_type')
+        elif 'DW_AT_type' in decl.attributes:
+            type_die = decl.get_DIE_from_attribute('DW_AT_type')
+
+        self._index[name] = address
+        self._variable_count += 1
+
+        if type_die is None:
+            return
+
+        prefix = name + "."
+        for member_path, offset in self._get_type_members(type_die, 0):
+            self._index[prefix + member_path] = address + offset
+
+    def _get_type_members(self, type_die, depth: int) -> List[Tuple[str, int]]:
+        """获取类型展开后的成员路径及相对偏移（按类型缓存）
+
+        Args:
+            type_die: 类型 DIE
+            depth: 当前嵌套深度
+
+        Returns:
+            List[Tuple[str, int]]: (成员路径, 相对偏移) 列表，非聚合类型返回空列表
+        """
+        type_die = self._strip_type(type_die)
+        if type_die is None or type_die.tag not in AGGREGATE_TYPE_TAGS:
+            return []
+
+        cached = self._type_members.get(type_die.offset)
+        if cached is not None:
+            return cached
+
+        members: List[Tuple[str, int]] = []
+        if depth < self.MAX_MEMBER_DEPTH:
+            # 先占位，防止自引用类型重复展开
+            self._type_members[type_die.offset] = members
+
+            for child in type_die.iter_children():
+                if child.tag != 'DW_TAG_member' or 'DW_AT_type' not in child.attributes:
+                    continue
+
+                offset = self._get_member_offset(child)
+                member_type = child.get_DIE_from_attribute('DW_AT_type')
+                sub_members = self._get_type_members(member_type, depth + 1)
+                member_name = self._get_name(child)
+
+                if member_name:
+                    members.append((member_name, offset))
+                    for sub_path, sub_offset in sub_members:
+                        members.append((f"{member_name}.{sub_path}", offset + sub_offset))
+                else:
+                    # 匿名结构体/联合体成员直接并入父级路径
+                    for sub_path, sub_offset in sub_members:
+                        members.append((sub_path, offset + sub_offset))
+
+        return members
+
+    @staticmethod
+    def _strip_type(type_die):
+        """去除 typedef/const/volatile 等修饰，返回底层类型 DIE"""
+        seen = 0
+        while type_die is not None and type_die.tag in TRANSPARENT_TYPE_TAGS:
+            if 'DW_AT_type' not in type_die.attributes or seen > 32:
+                return None
+            type_die = type_die.get_DIE_from_attribute('DW_AT_type')
+            seen += 1
+        return type_die
+
+    @staticmethod
+    def _get_name(die) -> str:
+        """读取 DIE 的 DW_AT_name 属性"""
+        attr = die.attributes.get('DW_AT_name')
+        if attr is None:
+            return ""
+        name = attr.value
+        if isinstance(name, bytes):
+            name = name.decode('utf-8', errors='ignore')
+        return name
+
+    @staticmethod
+    def _get_member_offset(die) -> int:
+        """读取成员的 DW_AT_data_member_location 偏移
+
+        支持常量形式和 DWARF 2 的 DW_OP_plus_uconst 表达式形式，
+        联合体成员没有该属性时偏移为 0。
+        """
+        attr = die.attributes.get('DW_AT_data_member_location')
+        if attr is None:
+            return 0
+        value = attr.value
+        if isinstance(value, int):
+            return value
+        if value and value[0] == DW_OP_PLUS_UCONST:
+            return _decode_uleb128(value, 1)
+        return 0
+
+    @staticmethod
+    def _get_static_address(die, address_size: int, byteorder: str) -> Optional[int]:
+        """读取变量 DW_AT_location 中的静态地址（DW_OP_addr）
+
+        局部变量、寄存器变量和位置列表均返回 None。
+        """
+        attr = die.attributes.get('DW_AT_location')
+        if attr is None or not isinstance(attr.value, list):
+            return None
+        expr = attr.value
+        if len(expr) != 1 + address_size or expr[0] != DW_OP_ADDR:
+            return None
+        return int.from_bytes(bytes(expr[1:]), byteorder)
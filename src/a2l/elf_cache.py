@@ -0,0 +1,321 @@
+"""Persistent content-addressed cache for parsed ELF indexes.
+
+This module stores the symbol table extracted by ELFParser and the DWARF
+member index built by DWARFMemberResolver on disk, keyed by the SHA-256
+of the ELF file contents. Repeated A2L updates, dry runs and inspections
+against an unchanged ELF load the cached index instead of re-parsing.
+
+Cache file layout (little-endian):
+    header   : magic(4s) version(H) count(I) extra(I) names_size(I)
+    addresses: count x uint64
+    names    : zlib-compressed, NUL-separated UTF-8 names
+
+The cache directory is capped at max_bytes; store() evicts the least
+recently used files (by mtime, refreshed on every hit) beyond the cap.
+
+Usage:
+    cache = ELFIndexCache()
+    parser = ELFParser(cache=cache)
+    symbols = parser.extract_symbols("firmware.elf")  # 第二次调用直接命中缓存
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件格式
+CACHE_MAGIC = b'ELFX'
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<4sHIII')
+
+# 缓存条目类型（文件扩展名）
+KIND_SYMBOLS = "sym"
+KIND_DWARF_MEMBERS = "dwarf"
+
+# 计算内容哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# 缓存目录默认大小上限（字节）
+DEFAULT_MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def pack_index(mapping: Dict[str, int], extra: int = 0) -> bytes:
+    """将名称到地址映射序列化为紧凑二进制格式
+
+    Args:
+        mapping: 名称到地址的映射
+        extra: 附加计数
+
+    Returns:
+        bytes: 序列化结果
+    """
+    addresses = array('Q', mapping.values())
+    if sys.byteorder != 'little':
+        addresses.byteswap()
+    names_blob = zlib.compress('\0'.join(mapping).encode('utf-8'), 1)
+    header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(mapping), extra, len(names_blob))
+    return header + addresses.tobytes() + names_blob
+
+
+def unpack_index(data: bytes) -> Tuple[Dict[str, int], int]:
+    """反序列化 pack_index 生成的数据
+
+    Args:
+        data: 序列化数据（bytes 或 memoryview）
+
+    Returns:
+        Tuple[Dict[str, int], int]: (映射, 附加计数)
+
+    Raises:
+        ValueError: 数据格式无效
+    """
+    magic, version, count, extra, names_size = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        raise ValueError(f"缓存格式不匹配: {magic!r} v{version}")
+
+    addr_start = CACHE_HEADER.size
+    names_start = addr_start + count * 8
+    addresses = array('Q')
+    addresses.frombytes(data[addr_start:names_start])
+    if sys.byteorder != 'little':
+        addresses.byteswap()
+
+    names_blob = zlib.decompress(data[names_start:names_start + names_size])
+    names = names_blob.decode('utf-8').split('\0') if count else []
+    if len(names) != count:
+        raise ValueError(f"缓存条目数量不一致: {len(names)} != {count}")
+
+    return dict(zip(names, addresses)), extra
+
+
+def share_index(mapping: Dict[str, int]) -> shared_memory.SharedMemory:
+    """将名称到地址映射序列化后放入共享内存，供工作进程读取
+
+    调用方负责在使用完毕后调用 close() 和 unlink()。
+
+    Args:
+        mapping: 名称到地址的映射
+
+    Returns:
+        SharedMemory: 共享内存块（通过 .name 传递给工作进程）
+    """
+    data = pack_index(mapping)
+    shm = shared_memory.SharedMemory(create=True, size=len(data))
+    shm.buf[:len(data)] = data
+    return shm
+
+
+def read_shared_index(name: str) -> Dict[str, int]:
+    """从 share_index 创建的共享内存块读取名称到地址映射
+
+    Args:
+        name: 共享内存块名称
+
+    Returns:
+        Dict[str, int]: 名称到地址的映射
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        mapping, _ = unpack_index(bytes(shm.buf))
+    finally:
+        shm.close()
+    return mapping
+
+
+def get_default_cache_dir() -> Path:
+    """获取默认缓存目录
+
+    Returns:
+        Path: %APPDATA%/MBD_CICDKits/elf_cache（非 Windows 为 ~/.local/MBD_CICDKits/elf_cache）
+    """
+    appdata_dir = Path(os.getenv('APPDATA', Path.home() / '.local'))
+    return appdata_dir / 'MBD_CICDKits' / 'elf_cache'
+
+
+class ELFIndexCache:
+    """ELF 索引磁盘缓存
+
+    以 ELF 文件内容的 SHA-256 作为键，分别缓存符号表和 DWARF 成员索引。
+    同一进程内对同一文件（路径、大小、修改时间不变）只计算一次哈希。
+    缓存文件损坏或版本不匹配时视为未命中，不影响正常解析。
+    缓存目录总大小超过 max_bytes 时，写入后删除最久未使用的缓存文件。
+
+    Attributes:
+        cache_dir: 缓存目录
+        max_bytes: 缓存目录大小上限（字节，<= 0 表示不限制）
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: int = DEFAULT_MAX_CACHE_BYTES):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（可选，默认使用应用数据目录）
+            max_bytes: 缓存目录大小上限（字节，<= 0 表示不限制）
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else get_default_cache_dir()
+        self.max_bytes = max_bytes
+        self._hash_memo: Dict[Tuple[str, int, int], str] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_content_hash(self, elf_path: Path) -> str:
+        """计算 ELF 文件内容的 SHA-256
+
+        Args:
+            elf_path: ELF 文件路径
+
+        Returns:
+            str: 十六进制哈希值
+        """
+        elf_path = Path(elf_path)
+        stat = elf_path.stat()
+        memo_key = (str(elf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+        content_hash = self._hash_memo.get(memo_key)
+        if content_hash is None:
+            digest = hashlib.sha256()
+            with open(elf_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                    digest.update(chunk)
+            content_hash = digest.hexdigest()
+            self._hash_memo[memo_key] = content_hash
+
+        return content_hash
+
+    def get_cache_path(self, elf_path: Path, kind: str) -> Path:
+        """获取缓存文件路径
+
+        Args:
+            elf_path: ELF 文件路径
+            kind: 缓存条目类型（KIND_SYMBOLS / KIND_DWARF_MEMBERS）
+
+        Returns:
+            Path: 缓存文件路径
+        """
+        return self.cache_dir / f"{self.get_content_hash(elf_path)}.{kind}"
+
+    def load(self, elf_path: Path, kind: str) -> Optional[Tuple[Dict[str, int], int]]:
+        """加载缓存的名称到地址映射
+
+        Args:
+            elf_path: ELF 文件路径
+            kind: 缓存条目类型
+
+        Returns:
+            Optional[Tuple[Dict[str, int], int]]: (映射, 附加计数)，未命中返回 None
+        """
+        cache_path = self.get_cache_path(elf_path, kind)
+        if not cache_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            mapping, extra = unpack_index(cache_path.read_bytes())
+        except Exception as e:
+            logger.warning(f"ELF 索引缓存损坏，忽略: {cache_path}: {e}")
+            self.misses += 1
+            return None
+
+        try:
+            # 更新修改时间，作为 LRU 淘汰依据
+            os.utime(cache_path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        logger.info(f"命中 ELF 索引缓存: {cache_path.name} ({len(mapping)} 项)")
+        return mapping, extra
+
+    def store(self, elf_path: Path, kind: str, mapping: Dict[str, int], extra: int = 0) -> Optional[Path]:
+        """保存名称到地址映射
+
+        写入失败只记录警告，不影响调用方。
+
+        Args:
+            elf_path: ELF 文件路径
+            kind: 缓存条目类型
+            mapping: 名称到地址的映射
+            extra: 附加计数（如被过滤的符号数量）
+
+        Returns:
+            Optional[Path]: 缓存文件路径，写入失败返回 None
+        """
+        try:
+            cache_path = self.get_cache_path(elf_path, kind)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+            data = pack_index(mapping, extra)
+
+            fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_name, cache_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+
+        except Exception as e:
+            logger.warning(f"写入 ELF 索引缓存失败: {e}")
+            return None
+
+        logger.debug(f"已写入 ELF 索引缓存: {cache_path}")
+        self._prune(keep=cache_path)
+        return cache_path
+
+    def _prune(self, keep: Path):
+        """缓存目录超过大小上限时，按修改时间删除最久未使用的缓存文件
+
+        Args:
+            keep: 不删除的文件（刚写入的缓存）
+        """
+        if self.max_bytes <= 0:
+            return
+
+        entries = []
+        for kind in (KIND_SYMBOLS, KIND_DWARF_MEMBERS):
+            for cache_file in self.cache_dir.glob(f"*.{kind}"):
+                try:
+                    stat = cache_file.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, cache_file))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, cache_file in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if cache_file == keep:
+                continue
+            try:
+                cache_file.unlink()
+            except OSError as e:
+                logger.debug(f"删除 ELF 索引缓存失败: {cache_file}: {e}")
+                continue
+            total -= size
+            logger.debug(f"已淘汰 ELF 索引缓存: {cache_file.name}")
+
+    def clear(self) -> int:
+        """删除全部缓存文件
+
+        Returns:
+            int: 删除的文件数量
+        """
+        removed = 0
+        if not self.cache_dir.exists():
+            return removed
+        for kind in (KIND_SYMBOLS, KIND_DWARF_MEMBERS):
+            for cache_file in self.cache_dir.glob(f"*.{kind}"):
+                cache_file.unlink(missing_ok=True)
+                removed += 1
+        return removed
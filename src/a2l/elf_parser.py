@@ -1,7 +1,13 @@
 """ELF file parser for extracting symbol addresses.
 
 This module provides functionality to parse ELF files and extract
-symbol names and their addresses using pyelftools.
+symbol names and their addresses. The symbol table is decoded in bulk
+straight from a memory-mapped file: the st_name/st_value columns are
+strided memoryview.cast() slices of .symtab (an array copy when the file
+byte order differs from the host), entries are filtered with
+itertools.compress, and only the surviving names are sliced out of
+.strtab. pyelftools is used as the fallback for layouts the fast path
+does not handle.
 
 Story 2.9 - Task 2: Implement ELF file parsing
 Architecture Decision ADR-005: Pure Python implementation
@@ -13,11 +19,45 @@ Usage:
 """
 
 import logging
+import mmap
+import re
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from itertools import compress, repeat
+from operator import not_
 from pathlib import Path
-from typing import Dict, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from a2l.elf_cache import ELFIndexCache, KIND_SYMBOLS
 
 logger = logging.getLogger(__name__)
 
+# ELF 常量
+ELFCLASS32 = 1
+ELFCLASS64 = 2
+ELFDATA2LSB = 1
+ELFDATA2MSB = 2
+SHT_SYMTAB = 2
+
+# 节头表与符号表条目布局（不含字节序前缀）: 类别 -> (节头格式, 符号格式)
+# 符号格式只解出 (st_name, st_value)，其余字段用填充字节跳过
+ELF_LAYOUTS = {
+    ELFCLASS32: ('IIIIIIIIII', 'II8x'),
+    ELFCLASS64: ('IIQQQQIIQQ', 'I4xQ8x'),
+}
+
+# 符号表按列读取: 类别 -> (条目大小, st_name 列, st_value 列)
+# 每列为 (数组类型码, 条目内的元素下标, 每个条目的元素数)
+SYMBOL_COLUMNS = {
+    ELFCLASS32: (16, ('I', 0, 4), ('I', 1, 4)),
+    ELFCLASS64: (24, ('I', 0, 6), ('Q', 1, 3)),
+}
+
+# 主机字节序对应的 struct 前缀
+HOST_BYTE_ORDER = '<' if sys.byteorder == 'little' else '>'
+
 
 class ELFParseError(Exception):
     """ELF 解析错误
@@ -27,6 +67,143 @@ class ELFParseError(Exception):
     pass
 
 
+@dataclass
+class ELFSectionTable:
+    """ELF 节头表
+
+    Attributes:
+        byte_order: struct 字节序前缀（'<' 或 '>'）
+        elf_class: ELFCLASS32 或 ELFCLASS64
+        sections: 节头列表，每项为
+            (name, type, flags, addr, offset, size, link, info, addralign, entsize)
+        symtab: .symtab 节头（没有符号表时为 None）
+    """
+    byte_order: str
+    elf_class: int
+    sections: List[Tuple[int, ...]] = field(default_factory=list)
+    symtab: Optional[Tuple[int, ...]] = None
+
+
+def _read_cstring(mm: mmap.mmap, offset: int) -> bytes:
+    """读取以 NUL 结尾的字符串"""
+    end = mm.find(b'\0', offset)
+    return mm[offset:end] if end >= 0 else b''
+
+
+def read_section_table(mm: mmap.mmap) -> Optional[ELFSectionTable]:
+    """从内存映射的 ELF 中读取节头表并定位 .symtab
+
+    Args:
+        mm: ELF 文件的只读内存映射
+
+    Returns:
+        Optional[ELFSectionTable]: 节头表；不是 ELF 文件、格式不支持或使用
+        扩展节数量（SHN_XINDEX 等）时返回 None
+
+    Raises:
+        struct.error: 节头表超出文件范围
+        IndexError: 节索引无效
+    """
+    if len(mm) < 64 or mm[:4] != b'\x7fELF':
+        return None
+
+    elf_class, elf_data = mm[4], mm[5]
+    if elf_class not in ELF_LAYOUTS or elf_data not in (ELFDATA2LSB, ELFDATA2MSB):
+        return None
+
+    order = '<' if elf_data == ELFDATA2LSB else '>'
+    shdr = struct.Struct(order + ELF_LAYOUTS[elf_class][0])
+
+    # e_shoff / e_shentsize / e_shnum / e_shstrndx
+    if elf_class == ELFCLASS32:
+        e_shoff, = struct.unpack_from(order + 'I', mm, 32)
+        e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(order + 'HHH', mm, 46)
+    else:
+        e_shoff, = struct.unpack_from(order + 'Q', mm, 40)
+        e_shentsize, e_shnum, e_shstrndx = struct.unpack_from(order + 'HHH', mm, 58)
+
+    if e_shoff == 0 or e_shnum == 0 or e_shentsize != shdr.size or e_shstrndx >= e_shnum:
+        return None
+
+    table = ELFSectionTable(byte_order=order, elf_class=elf_class)
+    table.sections = [
+        shdr.unpack_from(mm, e_shoff + i * e_shentsize)
+        for i in range(e_shnum)
+    ]
+    shstr_offset = table.sections[e_shstrndx][4]
+    for section in table.sections:
+        if section[1] == SHT_SYMTAB and _read_cstring(mm, shstr_offset + section[0]) == b'.symtab':
+            table.symtab = section
+            break
+    return table
+
+
+def unpack_symbols(
+    mm: mmap.mmap,
+    table: ELFSectionTable,
+    sym_fmt: str,
+    keep: Callable[[Tuple], bool]
+) -> List[Tuple]:
+    """批量解码 .symtab 条目并按条件过滤
+
+    Args:
+        mm: ELF 文件的只读内存映射
+        table: 节头表（必须包含 symtab）
+        sym_fmt: 不含字节序前缀的符号条目格式（长度必须等于条目大小）
+        keep: 条目过滤条件
+
+    Returns:
+        List[Tuple]: 保留的条目，保持符号表顺序
+    """
+    sym = struct.Struct(table.byte_order + sym_fmt)
+    offset, size = table.symtab[4], table.symtab[5]
+    size -= size % sym.size
+    view = memoryview(mm)[offset:offset + size]
+    try:
+        return [entry for entry in sym.iter_unpack(view) if keep(entry)]
+    finally:
+        view.release()
+
+
+def symbol_columns(mm: mmap.mmap, table: ELFSectionTable) -> Tuple[List[int], List[int]]:
+    """按列读取 .symtab 的 st_name 与 st_value
+
+    文件为主机字节序且符号表偏移对齐时，直接对内存映射做
+    memoryview.cast() 并按条目步长切片；否则复制为 array 并交换字节序。
+
+    Args:
+        mm: ELF 文件的只读内存映射
+        table: 节头表（必须包含 symtab）
+
+    Returns:
+        Tuple[List[int], List[int]]: (st_name 列, st_value 列)，保持符号表顺序
+    """
+    entry_size, *layout = SYMBOL_COLUMNS[table.elf_class]
+    offset, size = table.symtab[4], table.symtab[5]
+    size -= size % entry_size
+    native = table.byte_order == HOST_BYTE_ORDER
+
+    columns = []
+    view = memoryview(mm)[offset:offset + size]
+    try:
+        for typecode, index, stride in layout:
+            words = array(typecode)
+            if native and offset % words.itemsize == 0:
+                cast = view.cast(typecode)
+                try:
+                    columns.append(cast[index::stride].tolist())
+                finally:
+                    cast.release()
+            else:
+                words.frombytes(view)
+                if not native:
+                    words.byteswap()
+                columns.append(words[index::stride].tolist())
+    finally:
+        view.release()
+    return columns[0], columns[1]
+
+
 class ELFParser:
     """ELF 文件解析器
 
@@ -38,9 +215,14 @@ class ELFParser:
     - 提取符号名称和地址映射
     - 过滤出 A2L 需要的变量符号
 
+    默认先用内存映射按列批量读取 .symtab，只为通过地址过滤的符号读取
+    名称；格式不支持时回退到 pyelftools 逐符号解析。
+
     Attributes:
         elf_path: ELF 文件路径
         symbols: 符号名称到地址的映射
+        cache: 可选的 ELF 索引磁盘缓存（按文件内容哈希命中）
+        use_raw_reader: 是否启用原始符号表快速解析
     """
 
     # 需要过滤的符号前缀（通常不是用户变量）
@@ -57,13 +239,22 @@ class ELFParser:
         '_fini',
     )
 
-    def __init__(self, elf_path: Optional[Path] = None):
+    def __init__(
+        self,
+        elf_path: Optional[Path] = None,
+        cache: Optional[ELFIndexCache] = None,
+        use_raw_reader: bool = True
+    ):
         """初始化 ELF 解析器
 
         Args:
             elf_path: 可选的 ELF 文件路径
+            cache: 可选的 ELF 索引磁盘缓存
+            use_raw_reader: 是否启用原始符号表快速解析（失败时回退到 pyelftools）
         """
         self.elf_path = elf_path
+        self.cache = cache
+        self.use_raw_reader = use_raw_reader
         self._symbols: Dict[str, int] = {}
         self._filtered_count = 0
 
@@ -106,8 +297,29 @@ class ELFParser:
         if self.elf_path.stat().st_size == 0:
             raise ELFParseError(f"ELF 文件大小为 0: {self.elf_path}")
 
+        # 内容未变化的 ELF 直接从磁盘缓存加载
+        if self.cache is not None:
+            cached = self.cache.load(self.elf_path, KIND_SYMBOLS)
+            if cached is not None:
+                self._symbols, self._filtered_count = cached
+                return self._symbols
+
         logger.info(f"开始解析 ELF 文件: {self.elf_path}")
 
+        if not (self.use_raw_reader and self._extract_symbols_raw()):
+            self._extract_symbols_pyelftools()
+
+        if self.cache is not None:
+            self.cache.store(self.elf_path, KIND_SYMBOLS, self._symbols, self._filtered_count)
+
+        return self._symbols
+
+    def _extract_symbols_pyelftools(self):
+        """使用 pyelftools 逐符号解析符号表
+
+        Raises:
+            ELFParseError: 如果 ELF 文件无法解析
+        """
         try:
             from elftools.elf.elffile import ELFFile
         except ImportError:
@@ -129,7 +341,7 @@ class ELFParser:
                 symtab = elf.get_section_by_name('.symtab')
                 if symtab is None:
                     logger.warning("ELF 文件中没有 .symtab section")
-                    return self._symbols
+                    return
 
                 # 提取符号
                 symbol_count = 0
@@ -159,7 +371,97 @@ class ELFParser:
                 raise
             raise ELFParseError(f"解析 ELF 文件失败: {e}") from e
 
-        return self._symbols
+    def _extract_symbols_raw(self) -> bool:
+        """通过内存映射批量解码 .symtab/.strtab
+
+        按列读取 st_name/st_value 并用 itertools.compress 先丢弃未命名或
+        地址为 0 的符号，再从字符串表切出名称并按前后缀过滤，只解码保留的符号名。
+        结果与 pyelftools 路径一致（同名符号后出现者覆盖）。
+
+        Returns:
+            bool: 成功解析返回 True；格式不支持或文件异常返回 False（回退到 pyelftools）
+        """
+        try:
+            with open(self.elf_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return self._read_symtab(mm)
+        except (OSError, ValueError, struct.error, IndexError) as e:
+            logger.debug(f"原始符号表解析失败，回退到 pyelftools: {e}")
+            self._symbols = {}
+            self._filtered_count = 0
+            return False
+
+    def _read_symtab(self, mm: mmap.mmap) -> bool:
+        """从内存映射的 ELF 中解码符号表
+
+        Args:
+            mm: ELF 文件的只读内存映射
+
+        Returns:
+            bool: 成功解析返回 True，格式不支持返回 False
+        """
+        # 格式不支持或扩展节数量（SHN_XINDEX 等）交给 pyelftools 处理
+        table = read_section_table(mm)
+        if table is None:
+            return False
+
+        if table.symtab is None:
+            logger.warning("ELF 文件中没有 .symtab section")
+            return True
+
+        strtab = table.sections[table.symtab[6]]
+        str_offset, str_size = strtab[4], strtab[5]
+
+        # 按列读取 (st_name, st_value)，地址为 0 的符号直接丢弃
+        name_offsets, values = symbol_columns(mm, table)
+        name_offsets = list(compress(name_offsets, values))
+        addresses = list(compress(values, values))
+        del values
+
+        # ASCII 字符串表按 latin-1 解码后字符偏移即字节偏移，名称无需再解码；
+        # 否则按字节处理，只解码保留的名称。末尾补 NUL 使越界或未结尾的名称有界
+        strings = mm[str_offset:str_offset + str_size]
+        ascii_names = strings.isascii()
+        prefixes, suffixes = self.FILTERED_PREFIXES, self.FILTERED_SUFFIXES
+        if ascii_names:
+            strings = strings.decode('latin-1') + '\0'
+            nul = '\0'
+            suffix_pattern = '(?:%s)\0' % '|'.join(map(re.escape, suffixes))
+        else:
+            strings += b'\0'
+            nul = b'\0'
+            prefixes = tuple(prefix.encode('ascii') for prefix in prefixes)
+            suffixes = tuple(suffix.encode('ascii') for suffix in suffixes)
+            suffix_pattern = b'(?:%s)\0' % b'|'.join(map(re.escape, suffixes))
+
+        # 名称为 [偏移, 结尾 NUL)，偏移可能指向尾部合并字符串的中间。
+        # 前缀按偏移逐个判断；后缀先在整个字符串表中定位（通常很少），只复核命中项
+        ends = list(map(strings.find, repeat(nul), name_offsets))
+        filtered_flags = list(map(strings.startswith, repeat(prefixes), name_offsets))
+        if suffixes:
+            suffix_ends = {match.end() - 1 for match in re.finditer(suffix_pattern, strings)}
+            if suffix_ends:
+                hits = compress(range(len(ends)), map(suffix_ends.__contains__, ends))
+                for i in hits:
+                    if strings.endswith(suffixes, name_offsets[i], ends[i]):
+                        filtered_flags[i] = True
+
+        keep = list(map(not_, filtered_flags))
+        names = map(strings.__getitem__, map(slice, compress(name_offsets, keep), compress(ends, keep)))
+        if not ascii_names:
+            names = map(bytes.decode, names, repeat('utf-8'), repeat('replace'))
+
+        # 同名符号后出现者覆盖，与 pyelftools 路径一致；名称为空的符号最后移除
+        self._symbols.update(zip(names, compress(addresses, keep)))
+        self._symbols.pop('', None)
+
+        filtered = filtered_flags.count(True)
+        self._filtered_count = filtered
+        logger.info(
+            f"ELF 解析完成: 提取 {len(self._symbols)} 个符号, "
+            f"过滤 {filtered} 个符号"
+        )
+        return True
 
     def _should_filter_symbol(self, name: str) -> bool:
         """判断符号是否应该被过滤
@@ -0,0 +1,248 @@
+"""In-place fixed-width patching of A2L address tokens.
+
+When a new address token has the same byte width as the token it
+replaces, the A2L file length does not change and only the changed byte
+ranges need to be written. This module applies such patches directly at
+their recorded offsets and keeps a small JSON undo journal of the
+original bytes instead of a full ``.a2l.bak`` copy. Repeated applies stack
+onto the same journal (up to MAX_JOURNAL_ENTRIES, oldest dropped first),
+and each undo reverts the most recent one.
+
+This is an API-level mode (A2LAddressUpdater(..., patch_in_place=True)
+overwriting the source file); the build stages always write the updated
+A2L to their output directory and never patch in place.
+
+Usage:
+    patcher = A2LInPlacePatcher()
+    journal = patcher.apply("config.a2l", [(1234, "0x00000000", "0x28001000")])
+    patcher.undo("config.a2l")  # 恢复最近一次修改前的内容
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 撤销日志格式版本
+JOURNAL_VERSION = 2
+
+# 撤销日志最多保留的修改次数，超出时丢弃最早的修改记录
+MAX_JOURNAL_ENTRIES = 16
+
+
+class A2LPatchError(Exception):
+    """A2L 原地修改错误
+
+    当待修改的字节与记录不一致或撤销日志无效时抛出。
+    """
+    pass
+
+
+def get_journal_path(a2l_path: Path) -> Path:
+    """获取 A2L 文件对应的撤销日志路径
+
+    Args:
+        a2l_path: A2L 文件路径
+
+    Returns:
+        Path: 撤销日志路径（<name>.a2l.journal）
+    """
+    return Path(a2l_path).with_suffix('.a2l.journal')
+
+
+class A2LInPlacePatcher:
+    """A2L 原地修改器
+
+    在记录的字节偏移处写入等宽的新内容。写入前先校验原内容，
+    并将原内容写入撤销日志（先落盘再修改），修改中断时也能恢复。
+    已有未撤销的日志时，本次修改追加到日志末尾，撤销时按相反顺序逐次恢复；
+    日志最多保留 max_journal_entries 次修改，更早的修改不再可撤销。
+    """
+
+    def __init__(self, max_journal_entries: int = MAX_JOURNAL_ENTRIES):
+        """初始化原地修改器
+
+        Args:
+            max_journal_entries: 撤销日志最多保留的修改次数（至少为 1）
+        """
+        self.max_journal_entries = max(1, max_journal_entries)
+
+    def apply(
+        self,
+        a2l_path: Path,
+        patches: List[Tuple[int, str, str]],
+        journal_path: Optional[Path] = None
+    ) -> Path:
+        """应用等宽修改
+
+        Args:
+            a2l_path: A2L 文件路径
+            patches: (字节偏移, 原内容, 新内容) 列表，原内容与新内容必须等宽
+            journal_path: 撤销日志路径（可选，默认 <name>.a2l.journal）
+
+        Returns:
+            Path: 撤销日志路径
+
+        Raises:
+            A2LPatchError: 修改不等宽、文件内容与记录不一致，或已有的撤销日志与文件不匹配
+            FileNotFoundError: 如果文件不存在
+        """
+        a2l_path = Path(a2l_path)
+        journal_path = Path(journal_path) if journal_path else get_journal_path(a2l_path)
+
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+
+        file_size = a2l_path.stat().st_size
+        entries = []
+        if journal_path.exists():
+            journal = self._read_journal(journal_path)
+            if journal["file_size"] != file_size:
+                raise A2LPatchError(
+                    f"存在与文件不匹配的撤销日志，请先撤销或删除: {journal_path}"
+                )
+            entries = journal["entries"]
+
+        encoded = []
+        for offset, old, new in patches:
+            old_bytes = old.encode('ascii')
+            new_bytes = new.encode('ascii')
+            if len(old_bytes) != len(new_bytes):
+                raise A2LPatchError(
+                    f"偏移 {offset} 处修改不等宽: {old!r} -> {new!r}"
+                )
+            encoded.append((offset, old_bytes, new_bytes))
+
+        with open(a2l_path, 'r+b') as f:
+            # 校验原内容，防止文件在解析后被修改
+            for offset, old_bytes, _ in encoded:
+                f.seek(offset)
+                if f.read(len(old_bytes)) != old_bytes:
+                    raise A2LPatchError(
+                        f"偏移 {offset} 处内容与记录不一致，文件可能已被修改: {a2l_path}"
+                    )
+
+            entries.append({
+                "ranges": [
+                    {"offset": offset, "old": old, "new": new}
+                    for offset, old, new in patches
+                ]
+            })
+            dropped = len(entries) - self.max_journal_entries
+            if dropped > 0:
+                del entries[:dropped]
+                logger.info(f"撤销日志超过 {self.max_journal_entries} 次修改，丢弃最早的 {dropped} 次")
+            self._write_journal(journal_path, a2l_path, file_size, entries)
+
+            for offset, _, new_bytes in encoded:
+                f.seek(offset)
+                f.write(new_bytes)
+            f.flush()
+            os.fsync(f.fileno())
+
+        logger.info(
+            f"原地修改完成: {len(encoded)} 处, "
+            f"{sum(len(p[2]) for p in encoded)} 字节, 撤销日志: {journal_path}"
+        )
+        return journal_path
+
+    def undo(self, a2l_path: Path, journal_path: Optional[Path] = None) -> int:
+        """根据撤销日志恢复最近一次修改前的内容
+
+        恢复后从日志中移除该次修改，日志为空时删除日志文件。
+
+        Args:
+            a2l_path: A2L 文件路径
+            journal_path: 撤销日志路径（可选，默认 <name>.a2l.journal）
+
+        Returns:
+            int: 恢复的修改数量
+
+        Raises:
+            A2LPatchError: 撤销日志无效或与文件不匹配
+            FileNotFoundError: 如果文件或撤销日志不存在
+        """
+        a2l_path = Path(a2l_path)
+        journal_path = Path(journal_path) if journal_path else get_journal_path(a2l_path)
+
+        if not journal_path.exists():
+            raise FileNotFoundError(f"撤销日志不存在: {journal_path}")
+
+        journal = self._read_journal(journal_path)
+        file_size = journal["file_size"]
+        entries = journal["entries"]
+        if a2l_path.stat().st_size != file_size:
+            raise A2LPatchError(f"文件大小与撤销日志不一致，无法恢复: {a2l_path}")
+
+        ranges = entries.pop()["ranges"] if entries else []
+        with open(a2l_path, 'r+b') as f:
+            # 校验当前内容仍是该次修改写入的内容，防止恢复到已被改写的文件
+            for entry in ranges:
+                new_bytes = entry["new"].encode('ascii')
+                f.seek(entry["offset"])
+                if f.read(len(new_bytes)) != new_bytes:
+                    raise A2LPatchError(
+                        f"偏移 {entry['offset']} 处内容与撤销日志不一致，无法恢复: {a2l_path}"
+                    )
+
+            for entry in ranges:
+                f.seek(entry["offset"])
+                f.write(entry["old"].encode('ascii'))
+            f.flush()
+            os.fsync(f.fileno())
+
+        if entries:
+            self._write_journal(journal_path, a2l_path, file_size, entries)
+        else:
+            journal_path.unlink()
+        logger.info(f"已根据撤销日志恢复 {len(ranges)} 处修改: {a2l_path}")
+        return len(ranges)
+
+    @staticmethod
+    def _read_journal(journal_path: Path) -> Dict[str, Any]:
+        """读取撤销日志
+
+        Args:
+            journal_path: 撤销日志路径
+
+        Returns:
+            Dict[str, Any]: 包含 file_size 和 entries 的日志内容
+
+        Raises:
+            A2LPatchError: 撤销日志无效或版本不支持
+        """
+        try:
+            journal = json.loads(journal_path.read_text(encoding='utf-8'))
+            version = journal.get("version")
+            if version != JOURNAL_VERSION:
+                raise A2LPatchError(f"撤销日志版本不支持: {version}")
+            entries = journal["entries"]
+            for entry in entries:
+                entry["ranges"] = list(entry["ranges"])
+            return {"file_size": journal["file_size"], "entries": entries}
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise A2LPatchError(f"撤销日志无效: {journal_path}: {e}") from e
+
+    def _write_journal(
+        self,
+        journal_path: Path,
+        a2l_path: Path,
+        file_size: int,
+        entries: List[Dict[str, Any]]
+    ):
+        """写入撤销日志并落盘"""
+        journal = {
+            "version": JOURNAL_VERSION,
+            "file": a2l_path.name,
+            "file_size": file_size,
+            "entries": entries,
+        }
+        temp_path = journal_path.with_name(journal_path.name + '.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(journal, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, journal_path)
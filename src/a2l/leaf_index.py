@@ -0,0 +1,114 @@
+"""Leaf-name index for hierarchical A2L variable name matching.
+
+A2L variables exported from Simulink often use dotted hierarchical names
+(e.g. ``TmsApp_ARID_DEF.IDP_o3.gCAN_BMS_SOCLight_uint8``) while the ELF
+symbol table holds the flat or partially qualified name. The leaf-name
+fallback maps such a variable to a symbol by its last path component.
+
+This module precomputes a leaf -> candidate symbols multimap once per
+symbol table. A leaf resolves in O(1) when all candidates share one
+address; otherwise candidates whose name is a dotted suffix of the A2L
+variable name are preferred, and if they still disagree the variable is
+reported as ambiguous instead of silently taking one of them.
+
+Usage:
+    index = SymbolLeafIndex(symbols)
+    addr, candidates = index.resolve("Model_B.Out")
+    if addr is None and candidates:
+        print(f"叶子节点歧义: {candidates}")
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolLeafIndex:
+    """符号叶子节点索引
+
+    对符号表中带点号的符号按最后一级名称建立多值索引；
+    不带点号的符号本身即为叶子节点，直接在符号表中查找。
+
+    Attributes:
+        symbol_map: 建立索引时使用的符号表
+    """
+
+    def __init__(self, symbol_map: Dict[str, int]):
+        """建立索引
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+        """
+        self.symbol_map = symbol_map
+        self._dotted: Dict[str, List[str]] = {}
+
+        for name in [n for n in symbol_map if '.' in n]:
+            self._dotted.setdefault(name.rsplit('.', 1)[1], []).append(name)
+
+        logger.debug(f"叶子节点索引: {len(self._dotted)} 个带点号符号的叶子节点")
+
+    def get_candidates(self, leaf: str) -> List[str]:
+        """获取叶子节点对应的全部候选符号
+
+        Args:
+            leaf: 叶子节点名称
+
+        Returns:
+            List[str]: 候选符号名称列表（可能为空）
+        """
+        candidates = list(self._dotted.get(leaf, ()))
+        if leaf in self.symbol_map:
+            candidates.append(leaf)
+        return candidates
+
+    def resolve(self, var_name: str) -> Tuple[Optional[int], List[str]]:
+        """按叶子节点解析变量地址
+
+        Args:
+            var_name: 点号分隔的 A2L 变量名称
+
+        Returns:
+            Tuple[Optional[int], List[str]]: (地址, 候选符号)。
+            唯一解析时返回 (地址, 候选)；存在歧义时返回 (None, 候选)；
+            没有候选时返回 (None, [])
+        """
+        leaf = var_name.rsplit('.', 1)[-1]
+        candidates = self.get_candidates(leaf)
+        if not candidates:
+            return None, []
+
+        addr = self._unique_address(candidates)
+        if addr is not None:
+            return addr, candidates
+
+        # 候选地址不一致时，只保留名称是变量名点号后缀的候选
+        suffix_matches = [c for c in candidates if var_name.endswith('.' + c)]
+        addr = self._unique_address(suffix_matches)
+        if addr is not None:
+            return addr, suffix_matches
+
+        return None, candidates
+
+    def get_ambiguous_leaves(self) -> Dict[str, List[str]]:
+        """获取所有候选地址不一致的叶子节点
+
+        Returns:
+            Dict[str, List[str]]: 叶子节点到候选符号列表的映射
+        """
+        ambiguous = {}
+        for leaf in self._dotted:
+            candidates = self.get_candidates(leaf)
+            if self._unique_address(candidates) is None:
+                ambiguous[leaf] = candidates
+        return ambiguous
+
+    def _unique_address(self, names: List[str]) -> Optional[int]:
+        """所有名称地址相同时返回该地址，否则返回 None"""
+        if not names:
+            return None
+        addr = self.symbol_map[names[0]]
+        for name in names[1:]:
+            if self.symbol_map[name] != addr:
+                return None
+        return addr
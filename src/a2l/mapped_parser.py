@@ -0,0 +1,498 @@
+"""Memory-mapped, offset-indexed A2L parser.
+
+This module provides a parser mode for very large A2L files. Instead of
+decoding the whole file into a list of line strings and creating one
+A2LVariable dataclass per block, it memory-maps the file, scans only the
+lines that can affect the result, and records each block's line numbers
+and the byte offsets of its address token in compact arrays.
+
+Variable records (``__slots__`` objects) and their field values are only
+materialized when accessed, so ``variables``, ``get_variable`` and
+``get_lines`` keep working with the same semantics as A2LParser.
+``write_patched`` writes an address-patched copy of the file by byte
+offset in fixed-size chunks, so updating a large A2L never decodes the
+whole file into memory.
+
+Usage:
+    with MappedA2LParser() as parser:
+        variables = parser.parse("large.a2l")
+        var = parser.get_variable("CalVar")
+        print(var.address, var.address_line)
+"""
+
+import codecs
+import logging
+import mmap
+import re
+from array import array
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from a2l.a2l_parser import A2LParser, A2LParseError, VAR_TYPES, VAR_TYPE_CODES, decode_token
+from a2l.parse_cache import A2LParseCache, A2LParseIndex, KIND_OFFSETS
+
+logger = logging.getLogger(__name__)
+
+# 只有包含这些关键字的行才可能影响解析结果，其余行在 C 层直接跳过
+RELEVANT_LINE_PATTERN = re.compile(
+    rb'^[^\n]*?(?:/begin|/end|address|name)[^\n]*',
+    re.IGNORECASE | re.MULTILINE
+)
+
+
+# write_patched 每次读取和写入的字节数
+WRITE_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def _to_bytes_pattern(pattern: re.Pattern) -> re.Pattern:
+    """将 A2LParser 的文本正则转换为等价的字节正则"""
+    return re.compile(pattern.pattern.encode('ascii'), pattern.flags & ~re.UNICODE)
+
+
+class MappedA2LVariable:
+    """惰性 A2L 变量记录
+
+    只保存所属解析器和块索引，其余字段在访问时从紧凑数组和
+    内存映射中解码。字段名称与 A2LVariable 一致。
+    """
+
+    __slots__ = ('_parser', '_index', 'name')
+
+    def __init__(self, parser: "MappedA2LParser", index: int, name: str):
+        self._parser = parser
+        self._index = index
+        self.name = name
+
+    @property
+    def var_type(self) -> str:
+        """变量类型（CHARACTERISTIC、MEASUREMENT 或 AXIS_PTS）"""
+        return VAR_TYPES[self._parser._type_codes[self._index]]
+
+    @property
+    def address_str(self) -> str:
+        """地址字符串（原始格式），无地址行时为空字符串"""
+        return self._parser._read_address_str(self._index)
+
+    @property
+    def address(self) -> int:
+        """当前地址值，无地址行时为 0"""
+        addr_str = self.address_str
+        if not addr_str:
+            return 0
+        if addr_str.lower().startswith('0x'):
+            return int(addr_str, 16)
+        return int(addr_str)
+
+    @property
+    def line_start(self) -> int:
+        """块开始行号"""
+        return self._parser._line_starts[self._index]
+
+    @property
+    def line_end(self) -> int:
+        """块结束行号"""
+        return self._parser._line_ends[self._index]
+
+    @property
+    def address_line(self) -> int:
+        """地址所在行号，无地址行时为 0"""
+        return self._parser._address_lines[self._index]
+
+    def __repr__(self) -> str:
+        return (
+            f"MappedA2LVariable(name={self.name!r}, var_type={self.var_type!r}, "
+            f"address_str={self.address_str!r}, address_line={self.address_line})"
+        )
+
+
+class _MappedVariables(Mapping):
+    """变量名称到惰性记录的只读映射"""
+
+    def __init__(self, parser: "MappedA2LParser"):
+        self._parser = parser
+
+    def __getitem__(self, name: str) -> MappedA2LVariable:
+        return MappedA2LVariable(self._parser, self._parser._name_index[name], name)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._parser._name_index)
+
+    def __len__(self) -> int:
+        return len(self._parser._name_index)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._parser._name_index
+
+
+class MappedA2LParser(A2LParser):
+    """内存映射 A2L 解析器
+
+    与 A2LParser 的块识别规则完全一致，但：
+    - 使用 mmap 读取文件，不整体解码为字符串
+    - 每个块只在紧凑数组中保存类型、行号和地址标记的字节偏移
+    - 变量记录在访问时才创建（__slots__ 对象）
+    - get_lines() 按需解码，不常驻内存
+
+    行号按 '\\n' 计数（'\\r\\n' 视为一个换行）。
+    解析器持有内存映射，使用完毕后应调用 close()（或使用 with 语句）。
+
+    Attributes:
+        a2l_path: A2L 文件路径
+        variables: 变量名称到 MappedA2LVariable 的只读映射
+    """
+
+    # 解析缓存条目类型（行号按 '\n' 计数，保存地址标记字节偏移）
+    CACHE_KIND = KIND_OFFSETS
+
+    def __init__(self, a2l_path: Optional[Path] = None, cache: Optional[A2LParseCache] = None):
+        """初始化内存映射解析器
+
+        Args:
+            a2l_path: 可选的 A2L 文件路径
+            cache: 可选的 A2L 解析缓存（A2L 内容未变化时只需映射文件并校验缓存头部）
+        """
+        super().__init__(a2l_path, cache)
+        self._mm: Optional[mmap.mmap] = None
+        self._reset_index()
+
+        self._block_start = _to_bytes_pattern(self.BLOCK_START_PATTERN)
+        self._block_start_simulink = _to_bytes_pattern(self.BLOCK_START_PATTERN_SIMULINK)
+        self._block_end = _to_bytes_pattern(self.BLOCK_END_PATTERN)
+        self._address = _to_bytes_pattern(self.ADDRESS_PATTERN)
+        self._address_ecu = _to_bytes_pattern(self.ADDRESS_PATTERN_ECU)
+        self._name_simulink = _to_bytes_pattern(self.NAME_PATTERN_SIMULINK)
+        self._address_simulink = _to_bytes_pattern(self.ADDRESS_PATTERN_SIMULINK)
+
+    def _reset_index(self):
+        """清空偏移索引"""
+        self._name_index: Dict[str, int] = {}
+        self._type_codes = array('B')
+        self._line_starts = array('I')
+        self._line_ends = array('I')
+        self._address_lines = array('I')
+        self._address_starts = array('Q')
+        self._address_ends = array('Q')
+        self._variables = _MappedVariables(self)
+
+    def __enter__(self) -> "MappedA2LParser":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        """释放内存映射
+
+        关闭后已创建的记录不能再读取地址字段。
+        """
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+
+    def parse(self, a2l_path: Path) -> Mapping:
+        """解析 A2L 文件并建立偏移索引
+
+        Args:
+            a2l_path: A2L 文件路径
+
+        Returns:
+            Mapping[str, MappedA2LVariable]: 变量名称到惰性记录的映射
+
+        Raises:
+            A2LParseError: 如果 A2L 文件无法解析
+            FileNotFoundError: 如果文件不存在
+        """
+        self.close()
+        self.a2l_path = Path(a2l_path)
+        self._reset_index()
+
+        if not self.a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {self.a2l_path}")
+
+        file_size = self.a2l_path.stat().st_size
+        if file_size == 0:
+            raise A2LParseError(f"A2L 文件大小为 0: {self.a2l_path}")
+
+        logger.info(f"开始解析 A2L 文件（内存映射）: {self.a2l_path} ({file_size} bytes)")
+
+        try:
+            with open(self.a2l_path, 'rb') as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+            index = self._cache.load(self.a2l_path, self.CACHE_KIND) if self._cache else None
+            if index is not None:
+                self._load_index(index)
+            else:
+                self._scan_blocks()
+                if self._cache:
+                    self._cache.store(self.a2l_path, self.CACHE_KIND, self._build_index())
+
+            logger.info(f"A2L 解析完成: 提取 {len(self._name_index)} 个变量")
+
+        except Exception as e:
+            self.close()
+            if isinstance(e, (A2LParseError, FileNotFoundError)):
+                raise
+            raise A2LParseError(f"解析 A2L 文件失败: {e}") from e
+
+        return self._variables
+
+    def _scan_blocks(self):
+        """扫描相关行并记录块的行号与地址偏移
+
+        块识别、嵌套深度和地址覆盖规则与 A2LParser._parse_blocks 相同。
+        """
+        mm = self._mm
+        line_num = 1
+        prev_pos = 0
+
+        # 当前顶层块: [类型编码, 起始行, 名称, 地址行, 地址起始偏移, 地址结束偏移]
+        current: Optional[list] = None
+        block_depth = 0
+
+        for line_match in RELEVANT_LINE_PATTERN.finditer(mm):
+            line_pos = line_match.start()
+            line_num += mm[prev_pos:line_pos].count(b'\n')
+            prev_pos = line_pos
+            line = line_match.group()
+
+            start_match = self._block_start.search(line)
+            if start_match:
+                if block_depth == 0:
+                    current = [
+                        VAR_TYPE_CODES[start_match.group(1).upper().decode('ascii')],
+                        line_num,
+                        decode_token(start_match.group(2)),
+                        0, 0, 0
+                    ]
+                block_depth += 1
+                continue
+
+            start_match_simulink = self._block_start_simulink.search(line)
+            if start_match_simulink:
+                if block_depth == 0:
+                    current = [
+                        VAR_TYPE_CODES[start_match_simulink.group(1).upper().decode('ascii')],
+                        line_num, "", 0, 0, 0
+                    ]
+                block_depth += 1
+                continue
+
+            if self._block_end.search(line):
+                block_depth -= 1
+                if block_depth == 0 and current:
+                    if current[2]:
+                        self._add_block(current, line_num)
+                    current = None
+                continue
+
+            if current and block_depth == 1:
+                if not current[2]:
+                    name_match = self._name_simulink.search(line)
+                    if name_match:
+                        current[2] = decode_token(name_match.group(1))
+
+                addr_match = (
+                    self._address.match(line)
+                    or self._address_ecu.search(line)
+                    or self._address_simulink.search(line)
+                )
+                if addr_match:
+                    current[3] = line_num
+                    current[4] = line_pos + addr_match.start(1)
+                    current[5] = line_pos + addr_match.end(1)
+
+    def _add_block(self, block: list, line_end: int):
+        """将完成的顶层块写入紧凑数组（同名变量后出现者覆盖）"""
+        type_code, line_start, name, address_line, addr_start, addr_end = block
+
+        index = self._name_index.get(name)
+        if index is None:
+            self._name_index[name] = len(self._type_codes)
+            self._type_codes.append(type_code)
+            self._line_starts.append(line_start)
+            self._line_ends.append(line_end)
+            self._address_lines.append(address_line)
+            self._address_starts.append(addr_start)
+            self._address_ends.append(addr_end)
+        else:
+            self._type_codes[index] = type_code
+            self._line_starts[index] = line_start
+            self._line_ends[index] = line_end
+            self._address_lines[index] = address_line
+            self._address_starts[index] = addr_start
+            self._address_ends[index] = addr_end
+
+    def _build_index(self) -> A2LParseIndex:
+        """将偏移索引转换为可缓存的块索引"""
+        return A2LParseIndex(
+            names=list(self._name_index),
+            type_codes=self._type_codes,
+            line_starts=self._line_starts,
+            line_ends=self._line_ends,
+            address_lines=self._address_lines,
+            address_starts=self._address_starts,
+            address_ends=self._address_ends
+        )
+
+    def _load_index(self, index: A2LParseIndex):
+        """从缓存的块索引恢复偏移索引"""
+        self._name_index = {name: i for i, name in enumerate(index.names)}
+        self._type_codes = index.type_codes
+        self._line_starts = index.line_starts
+        self._line_ends = index.line_ends
+        self._address_lines = index.address_lines
+        self._address_starts = index.address_starts
+        self._address_ends = index.address_ends
+
+    def _read_address_str(self, index: int) -> str:
+        """读取块的原始地址字符串"""
+        start = self._address_starts[index]
+        end = self._address_ends[index]
+        if end <= start:
+            return ""
+        if self._mm is None:
+            raise A2LParseError("A2L 内存映射已关闭，无法读取地址")
+        return self._mm[start:end].decode('ascii')
+
+    def get_address_span(self, name: str) -> Optional[Tuple[int, int]]:
+        """获取变量地址标记在文件中的字节范围
+
+        Args:
+            name: 变量名称
+
+        Returns:
+            Optional[Tuple[int, int]]: (起始偏移, 结束偏移)，变量不存在或无地址时返回 None
+        """
+        index = self._name_index.get(name)
+        if index is None or self._address_ends[index] <= self._address_starts[index]:
+            return None
+        return self._address_starts[index], self._address_ends[index]
+
+    def get_variable(self, name: str) -> Optional[MappedA2LVariable]:
+        """获取指定变量信息（按需创建记录）
+
+        Args:
+            name: 变量名称
+
+        Returns:
+            Optional[MappedA2LVariable]: 变量信息，如果不存在返回 None
+        """
+        index = self._name_index.get(name)
+        if index is None:
+            return None
+        return MappedA2LVariable(self, index, name)
+
+    def get_lines(self) -> List[str]:
+        """按需解码文件所有行
+
+        每次调用都重新解码，结果不常驻内存。行的划分与行号计数一致。
+
+        Returns:
+            List[str]: 文件行列表
+        """
+        if self._mm is None:
+            return []
+
+        raw = self._mm[:]
+        try:
+            content = raw.decode('utf-8')
+        except UnicodeDecodeError:
+            content = raw.decode('latin-1')
+
+        lines = content.split('\n')
+        if lines and lines[-1] == '':
+            lines.pop()
+        return [line[:-1] if line.endswith('\r') else line for line in lines]
+
+    def write_patched(self, output_path: Path, patches: Sequence[Tuple[int, int, str]]):
+        """按字节偏移替换地址标记，分块写出更新后的文件
+
+        输出与 A2LParser.get_lines() 修改后再用 '\n' 连接写出的结果一致：
+        '\r\n' 转换为 '\n'、去掉文件末尾的换行、按 UTF-8 编码写出
+        （原文件不是有效 UTF-8 时按 latin-1 解码后转码）。内存占用与文件大小无关。
+
+        output_path 不能是当前映射的文件（先写临时文件，关闭后再替换）。
+
+        Args:
+            output_path: 输出文件路径
+            patches: (起始偏移, 结束偏移, 新文本) 列表，新文本只能包含 ASCII 字符
+
+        Raises:
+            A2LParseError: 如果没有已映射的文件
+        """
+        if self._mm is None:
+            raise A2LParseError("A2L 内存映射已关闭，无法写出文件")
+
+        transcode = self._content_encoding() != 'utf-8'
+        ends_with_newline = self._mm[-1:] == b'\n'
+
+        with open(output_path, 'wb') as out:
+            carry = b''
+            for piece in self._iter_patched(patches):
+                data = carry + piece
+                # 保留末尾的 '\r'（可能与下一块开头的 '\n' 组成换行）和最后两个字节（文件末尾特殊处理）
+                cut = len(data) - 2
+                while cut > 0 and data[cut - 1:cut] == b'\r':
+                    cut -= 1
+                if cut <= 0:
+                    carry = data
+                    continue
+                carry = data[cut:]
+                out.write(self._normalize(data[:cut], transcode))
+
+            tail = carry.replace(b'\r\n', b'\n')
+            if ends_with_newline:
+                tail = tail[:-1]
+            elif tail.endswith(b'\r'):
+                tail = tail[:-1]
+            out.write(self._normalize(tail, transcode))
+
+    def _iter_patched(self, patches: Sequence[Tuple[int, int, str]]) -> Iterator[bytes]:
+        """按顺序产生替换后的文件内容块"""
+        mm = self._mm
+        pos = 0
+        for start, end, text in sorted(patches) + [(len(mm), len(mm), "")]:
+            for offset in range(pos, start, WRITE_CHUNK_SIZE):
+                yield mm[offset:min(offset + WRITE_CHUNK_SIZE, start)]
+            if text:
+                yield text.encode('ascii')
+            pos = end
+
+    @staticmethod
+    def _normalize(data: bytes, transcode: bool) -> bytes:
+        """转换换行符并按需从 latin-1 转码为 UTF-8"""
+        data = data.replace(b'\r\n', b'\n')
+        return data.decode('latin-1').encode('utf-8') if transcode else data
+
+    def _content_encoding(self) -> str:
+        """分块校验文件是否为有效 UTF-8（与 get_lines 的编码回退一致）
+
+        Returns:
+            str: 'utf-8' 或 'latin-1'
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for offset in range(0, len(self._mm), WRITE_CHUNK_SIZE):
+                decoder.decode(self._mm[offset:offset + WRITE_CHUNK_SIZE])
+            decoder.decode(b'', final=True)
+        except UnicodeDecodeError:
+            return 'latin-1'
+        return 'utf-8'
+
+    def get_characteristic_count(self) -> int:
+        """获取 CHARACTERISTIC 数量
+
+        Returns:
+            int: CHARACTERISTIC 数量
+        """
+        return self._type_codes.count(VAR_TYPE_CODES["CHARACTERISTIC"])
+
+    def get_measurement_count(self) -> int:
+        """获取 MEASUREMENT 数量
+
+        Returns:
+            int: MEASUREMENT 数量
+        """
+        return self._type_codes.count(VAR_TYPE_CODES["MEASUREMENT"])
@@ -0,0 +1,368 @@
+"""Binary snapshot cache for parsed A2L block indexes.
+
+The A2L template fed from ``a2l_path`` rarely changes between builds, but
+A2LParser and MappedA2LParser re-run their block regexes over every line
+on each parse. This module stores the resulting block index (names,
+types, line spans, address lines, address byte offsets or address
+strings) in a compact binary file next to the A2L file and reuses it
+while the A2L content is unchanged.
+
+Entries are keyed by the SHA-256 of the A2L contents, which is stored in
+the cache header together with the file size and modification time. A
+matching size and mtime is trusted without rehashing, so loading an
+unchanged A2L is a header check plus a few array copies. When only the
+mtime differs (e.g. the file was copied) the content is rehashed and the
+header refreshed. Any other mismatch is a miss and the entry is
+overwritten on the next store.
+
+The two parsers count lines differently (splitlines vs '\\n'), so each
+keeps its own entry kind:
+    App.a2l.lines.idx    A2LParser (address strings)
+    App.a2l.offsets.idx  MappedA2LParser (address byte offsets)
+    App.a2l.blocksHX.idx A2LPostProcessor (every top-level block, including
+                         unnamed and duplicate ones; H/X are 0/1 flags for
+                         header replacement and IF_DATA XCP removal, which
+                         change which lines the block scan sees)
+
+Cache file layout (little-endian):
+    header        : magic(4s) version(H) size(Q) mtime_ns(Q) sha256(32s)
+                    count(I) names_size(I) strings_size(I)
+    type codes    : count x uint8
+    line starts   : count x uint32
+    line ends     : count x uint32
+    address lines : count x uint32
+    address starts: count x uint64
+    address ends  : count x uint64
+    names         : zlib-compressed, NUL-separated UTF-8 names
+    strings       : zlib-compressed, NUL-separated address strings (may be empty)
+
+Usage:
+    cache = A2LParseCache()
+    parser = MappedA2LParser(cache=cache)
+    variables = parser.parse("App.a2l")  # 第二次解析直接加载索引
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import sys
+import tempfile
+import zlib
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 缓存文件格式
+CACHE_MAGIC = b'A2LX'
+CACHE_VERSION = 1
+CACHE_HEADER = struct.Struct('<4sHQQ32sIII')
+CACHE_SUFFIX = ".idx"
+
+# 缓存条目类型（文件名中的类型部分）
+KIND_LINES = "lines"
+KIND_OFFSETS = "offsets"
+KIND_BLOCKS = "blocks"
+
+# 计算内容哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# (数组类型码, A2LParseIndex 字段名)，按文件中的顺序
+_ARRAY_FIELDS = (
+    ('B', 'type_codes'),
+    ('I', 'line_starts'),
+    ('I', 'line_ends'),
+    ('I', 'address_lines'),
+    ('Q', 'address_starts'),
+    ('Q', 'address_ends'),
+)
+
+
+@dataclass
+class A2LParseIndex:
+    """A2L 块索引（每个顶层块一项，按首次出现顺序）
+
+    Attributes:
+        names: 变量名称
+        type_codes: 变量类型编码（见 mapped_parser.VAR_TYPES）
+        line_starts: 块开始行号
+        line_ends: 块结束行号
+        address_lines: 地址所在行号（无地址为 0）
+        address_starts: 地址标记起始字节偏移（KIND_OFFSETS）
+        address_ends: 地址标记结束字节偏移（KIND_OFFSETS）
+        address_strs: 地址字符串（KIND_LINES，其他类型为空列表）
+    """
+    names: List[str] = field(default_factory=list)
+    type_codes: array = field(default_factory=lambda: array('B'))
+    line_starts: array = field(default_factory=lambda: array('I'))
+    line_ends: array = field(default_factory=lambda: array('I'))
+    address_lines: array = field(default_factory=lambda: array('I'))
+    address_starts: array = field(default_factory=lambda: array('Q'))
+    address_ends: array = field(default_factory=lambda: array('Q'))
+    address_strs: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+
+def block_kind(replace_header: bool, remove_if_data: bool) -> str:
+    """获取 A2LPostProcessor 块索引的条目类型
+
+    Args:
+        replace_header: 是否替换 XCP 头文件
+        remove_if_data: 是否删除 IF_DATA XCP 块
+
+    Returns:
+        str: 条目类型（如 blocks11）
+    """
+    return f"{KIND_BLOCKS}{int(replace_header)}{int(remove_if_data)}"
+
+
+def _pack_strings(strings: List[str]) -> bytes:
+    """压缩 NUL 分隔的字符串列表（空列表返回空字节串）"""
+    return zlib.compress('\0'.join(strings).encode('utf-8'), 1) if strings else b''
+
+
+def _unpack_strings(blob: bytes, count: int) -> List[str]:
+    """解压 _pack_strings 生成的数据"""
+    if not blob:
+        return []
+    strings = zlib.decompress(blob).decode('utf-8').split('\0')
+    if len(strings) != count:
+        raise ValueError(f"缓存条目数量不一致: {len(strings)} != {count}")
+    return strings
+
+
+def pack_parse_index(index: A2LParseIndex, size: int, mtime_ns: int, digest: bytes) -> bytes:
+    """将块索引序列化为紧凑二进制格式
+
+    Args:
+        index: 块索引
+        size: A2L 文件大小
+        mtime_ns: A2L 文件修改时间（纳秒）
+        digest: A2L 文件内容的 SHA-256 摘要（32 字节）
+
+    Returns:
+        bytes: 序列化结果
+    """
+    count = len(index)
+    names_blob = _pack_strings(index.names)
+    strings_blob = _pack_strings(index.address_strs)
+
+    parts = [CACHE_HEADER.pack(
+        CACHE_MAGIC, CACHE_VERSION, size, mtime_ns, digest,
+        count, len(names_blob), len(strings_blob)
+    )]
+    for typecode, name in _ARRAY_FIELDS:
+        values = array(typecode, getattr(index, name))
+        if len(values) != count:
+            raise ValueError(f"索引字段长度不一致: {name} {len(values)} != {count}")
+        if sys.byteorder != 'little':
+            values.byteswap()
+        parts.append(values.tobytes())
+    parts.append(names_blob)
+    parts.append(strings_blob)
+    return b''.join(parts)
+
+
+def unpack_parse_index(data: bytes) -> A2LParseIndex:
+    """反序列化 pack_parse_index 生成的数据
+
+    Args:
+        data: 序列化数据
+
+    Returns:
+        A2LParseIndex: 块索引
+
+    Raises:
+        ValueError: 数据格式无效
+    """
+    magic, version, _, _, _, count, names_size, strings_size = CACHE_HEADER.unpack_from(data)
+    if magic != CACHE_MAGIC or version != CACHE_VERSION:
+        raise ValueError(f"缓存格式不匹配: {magic!r} v{version}")
+
+    index = A2LParseIndex()
+    pos = CACHE_HEADER.size
+    for typecode, name in _ARRAY_FIELDS:
+        values = array(typecode)
+        end = pos + count * values.itemsize
+        values.frombytes(data[pos:end])
+        if len(values) != count:
+            raise ValueError(f"缓存数据被截断: {name}")
+        if sys.byteorder != 'little':
+            values.byteswap()
+        setattr(index, name, values)
+        pos = end
+
+    index.names = _unpack_strings(data[pos:pos + names_size], count)
+    pos += names_size
+    index.address_strs = _unpack_strings(data[pos:pos + strings_size], count)
+    if len(index.names) != count:
+        raise ValueError(f"缓存条目数量不一致: {len(index.names)} != {count}")
+    return index
+
+
+def hash_file(path: Path) -> bytes:
+    """计算文件内容的 SHA-256 摘要
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        bytes: 32 字节摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+class A2LParseCache:
+    """A2L 解析结果磁盘缓存
+
+    缓存文件默认与 A2L 文件放在同一目录（<A2L 文件名>.<类型>.idx）。
+    缓存文件损坏、版本不匹配或 A2L 内容变化时视为未命中，不影响正常解析；
+    写入失败只记录警告。
+
+    Attributes:
+        cache_dir: 缓存目录（None 表示与 A2L 文件同目录）
+        trust_mtime: 文件大小和修改时间一致时是否跳过内容哈希校验
+        hits: 命中次数
+        misses: 未命中次数
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, trust_mtime: bool = True):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（可选，默认与 A2L 文件同目录）
+            trust_mtime: 文件大小和修改时间一致时是否跳过内容哈希校验
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.trust_mtime = trust_mtime
+        self.hits = 0
+        self.misses = 0
+
+    def get_cache_path(self, a2l_path: Path, kind: str) -> Path:
+        """获取缓存文件路径
+
+        Args:
+            a2l_path: A2L 文件路径
+            kind: 缓存条目类型（KIND_LINES / KIND_OFFSETS）
+
+        Returns:
+            Path: 缓存文件路径
+        """
+        a2l_path = Path(a2l_path)
+        directory = self.cache_dir or a2l_path.parent
+        return directory / f"{a2l_path.name}.{kind}{CACHE_SUFFIX}"
+
+    def load(self, a2l_path: Path, kind: str) -> Optional[A2LParseIndex]:
+        """加载与 A2L 文件内容一致的块索引
+
+        Args:
+            a2l_path: A2L 文件路径
+            kind: 缓存条目类型
+
+        Returns:
+            Optional[A2LParseIndex]: 块索引，未命中返回 None
+        """
+        a2l_path = Path(a2l_path)
+        cache_path = self.get_cache_path(a2l_path, kind)
+        if not cache_path.exists():
+            self.misses += 1
+            return None
+
+        try:
+            data = cache_path.read_bytes()
+            _, _, size, mtime_ns, digest = CACHE_HEADER.unpack_from(data)[:5]
+            stat = a2l_path.stat()
+            if size != stat.st_size:
+                self.misses += 1
+                return None
+
+            if not (self.trust_mtime and mtime_ns == stat.st_mtime_ns):
+                if hash_file(a2l_path) != digest:
+                    self.misses += 1
+                    return None
+                self._refresh_mtime(cache_path, stat.st_mtime_ns)
+
+            index = unpack_parse_index(data)
+        except Exception as e:
+            logger.warning(f"A2L 解析缓存损坏，忽略: {cache_path}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(f"命中 A2L 解析缓存: {cache_path.name} ({len(index)} 个块)")
+        return index
+
+    def store(self, a2l_path: Path, kind: str, index: A2LParseIndex) -> Optional[Path]:
+        """保存块索引
+
+        写入失败只记录警告，不影响调用方。
+
+        Args:
+            a2l_path: A2L 文件路径
+            kind: 缓存条目类型
+            index: 块索引
+
+        Returns:
+            Optional[Path]: 缓存文件路径，写入失败返回 None
+        """
+        try:
+            a2l_path = Path(a2l_path)
+            cache_path = self.get_cache_path(a2l_path, kind)
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+
+            stat = a2l_path.stat()
+            data = pack_parse_index(index, stat.st_size, stat.st_mtime_ns, hash_file(a2l_path))
+
+            fd, temp_name = tempfile.mkstemp(dir=cache_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_name, cache_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+
+        except Exception as e:
+            logger.warning(f"写入 A2L 解析缓存失败: {e}")
+            return None
+
+        logger.debug(f"已写入 A2L 解析缓存: {cache_path}")
+        return cache_path
+
+    def invalidate(self, a2l_path: Path) -> int:
+        """删除 A2L 文件的全部缓存条目
+
+        Args:
+            a2l_path: A2L 文件路径
+
+        Returns:
+            int: 删除的文件数量
+        """
+        removed = 0
+        block_kinds = [block_kind(header, if_data) for header in (False, True) for if_data in (False, True)]
+        for kind in [KIND_LINES, KIND_OFFSETS] + block_kinds:
+            cache_path = self.get_cache_path(a2l_path, kind)
+            if cache_path.exists():
+                cache_path.unlink()
+                removed += 1
+        return removed
+
+    @staticmethod
+    def _refresh_mtime(cache_path: Path, mtime_ns: int):
+        """内容哈希一致但修改时间不同（如文件被复制）时更新缓存头部的修改时间"""
+        offset = struct.calcsize('<4sHQ')
+        try:
+            with open(cache_path, 'r+b') as f:
+                f.seek(offset)
+                f.write(struct.pack('<Q', mtime_ns))
+        except OSError as e:
+            logger.debug(f"更新 A2L 解析缓存头部失败: {cache_path}: {e}")
@@ -0,0 +1,689 @@
+"""Single-pass A2L post-processing engine.
+
+This module fuses the A2L post-processing steps of the a2l_process stage
+into one streaming pass over the file:
+
+1. Address patching (ELF symbol map -> CHARACTERISTIC/MEASUREMENT/AXIS_PTS)
+2. Removal of /begin IF_DATA XCP ... /end IF_DATA blocks
+3. Filtering of CHARACTERISTIC blocks whose address is 0
+4. Replacement of the header (file start .. first /end MOD_PAR) with the
+   XCP header template
+
+The file is decoded once (utf-8, then gbk) and written once via a
+temporary file that is atomically renamed to the output path.
+
+When a parse cache is given, the line spans of the top-level blocks found
+while processing a document loaded from disk are stored next to the A2L
+file. While the A2L content is unchanged, later runs take block starts,
+ends and address lines from that index instead of running the block
+regexes over every line.
+
+Usage:
+    processor = A2LPostProcessor(
+        symbol_map=symbols,
+        remove_if_data_xcp=True,
+        xcp_template=template,
+    )
+    result = processor.process(Path("tmsAPP.a2l"), Path("output/tmsAPP_upAdress.a2l"))
+"""
+
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from a2l.a2l_parser import VAR_TYPE_CODES, VAR_TYPES, A2LParser
+from a2l.address_updater import AddressDelta, match_symbol_address
+from a2l.leaf_index import SymbolLeafIndex
+from a2l.parse_cache import A2LParseCache, A2LParseIndex, block_kind
+
+logger = logging.getLogger(__name__)
+
+# 读取 A2L 文件时依次尝试的编码（与 a2l_process 阶段保持一致）
+A2L_ENCODINGS = ('utf-8-sig', 'gbk')
+
+# IF_DATA XCP 块起止标记（对应 MATLAB 脚本 A2LTool.m）
+IF_DATA_XCP_START_PATTERN = re.compile(r'/begin\s+IF_DATA\s+XCP', re.IGNORECASE)
+IF_DATA_END_PATTERN = re.compile(r'/end\s+IF_DATA', re.IGNORECASE)
+
+# XCP 头文件替换范围结束标记：第一个 /end MOD_PAR
+MOD_PAR_END_PATTERN = re.compile(r'/end\s+MOD_PAR', re.IGNORECASE)
+
+
+class A2LPostProcessError(Exception):
+    """A2L 后处理错误
+
+    当 A2L 文件无法读取、解码或写入时抛出。
+    """
+    pass
+
+
+@dataclass
+class PostProcessResult:
+    """A2L 后处理结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        encoding: 检测到的源文件编码
+        output_path: 输出文件路径
+        matched_count: 匹配并更新地址的变量数量
+        unmatched_count: 未匹配的变量数量
+        total_variables: 带名称的变量块总数
+        updated_variables: 更新的变量列表
+        unmatched_variables: 未匹配的变量列表
+        if_data_removed: 删除的 IF_DATA XCP 块数量
+        characteristic_count: CHARACTERISTIC 总数（启用零地址过滤时统计）
+        zero_address_removed: 因地址为 0 被删除的 CHARACTERISTIC 数量
+        removed_variables: 因地址为 0 被删除的变量列表
+        header_found: 是否找到 /end MOD_PAR（启用头文件替换时有效）
+        header_original_length: 被替换的原始头部长度（字符）
+        header_new_length: 模板长度（字符）
+        ambiguous_variables: 叶子节点歧义的变量及其候选符号（同时计入未匹配）
+        delta: 地址增量报告（更新地址时生成，歧义变量不计入）
+    """
+    success: bool = False
+    message: str = ""
+    encoding: str = ""
+    output_path: str = ""
+    matched_count: int = 0
+    unmatched_count: int = 0
+    total_variables: int = 0
+    updated_variables: List[str] = field(default_factory=list)
+    unmatched_variables: List[str] = field(default_factory=list)
+    if_data_removed: int = 0
+    characteristic_count: int = 0
+    zero_address_removed: int = 0
+    removed_variables: List[str] = field(default_factory=list)
+    header_found: bool = False
+    header_original_length: int = 0
+    header_new_length: int = 0
+    ambiguous_variables: Dict[str, List[str]] = field(default_factory=dict)
+    delta: Optional[AddressDelta] = None
+
+
+class _Block:
+    """当前正在缓冲的顶层变量块（内部使用）"""
+
+    __slots__ = ('var_type', 'name', 'lines', 'address', 'address_str', 'address_index',
+                 'line_start', 'address_line')
+
+    def __init__(self, var_type: str, name: str, line_start: int = 0):
+        self.var_type = var_type
+        self.name = name
+        self.lines: List[str] = []
+        self.address = 0
+        self.address_str = ""
+        self.address_index = -1
+        self.line_start = line_start
+        self.address_line = 0
+
+
+def read_a2l_text(path: Path) -> Tuple[str, str]:
+    """读取 A2L 文件全部内容（utf-8 优先，失败时回退 gbk）
+
+    Args:
+        path: A2L 文件路径
+
+    Returns:
+        Tuple[str, str]: (文件内容, 使用的编码)
+
+    Raises:
+        A2LPostProcessError: 所有编码均无法解码
+    """
+    for encoding in A2L_ENCODINGS:
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                return f.read(), encoding
+        except UnicodeDecodeError:
+            continue
+
+    raise A2LPostProcessError(f"无法解码 A2L 文件（尝试 {', '.join(A2L_ENCODINGS)}）: {path}")
+
+
+def find_header_end(content: str) -> Optional[int]:
+    """查找 XCP 头文件替换范围的结束位置
+
+    替换范围从文件开头到第一个 /end MOD_PAR 所在行的行尾（不含换行符）。
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Optional[int]: 结束位置，未找到 /end MOD_PAR 时返回 None
+    """
+    match = MOD_PAR_END_PATTERN.search(content)
+    if not match:
+        return None
+
+    line_end = match.end()
+    while line_end < len(content) and content[line_end] not in ('\n', '\r'):
+        line_end += 1
+    return line_end
+
+
+class A2LPostProcessor:
+    """A2L 单遍后处理器
+
+    以流式方式逐行处理 A2L 文件，一次读取、一次写入完成
+    地址更新、IF_DATA XCP 删除、零地址过滤和 XCP 头文件替换。
+
+    变量块的识别规则与 A2LParser 一致（标准格式与 Simulink 格式），
+    地址匹配规则与 A2LAddressUpdater 一致（精确匹配 + 结构体成员匹配 + 叶子节点匹配）。
+
+    Attributes:
+        symbol_map: 符号名称到地址的映射（None 表示不更新地址）
+        member_index: DWARF 成员路径到地址的映射（可选）
+        remove_if_data_xcp: 是否删除 IF_DATA XCP 块
+        filter_zero_address: 是否删除地址为 0 的 CHARACTERISTIC 块
+        xcp_template: XCP 头文件模板（None 表示不替换头部）
+        parse_cache: A2L 解析缓存（None 表示不缓存块索引，仅 process_document 使用）
+    """
+
+    def __init__(
+        self,
+        symbol_map: Optional[Dict[str, int]] = None,
+        remove_if_data_xcp: bool = False,
+        filter_zero_address: bool = False,
+        xcp_template: Optional[str] = None,
+        member_index: Optional[Dict[str, int]] = None,
+        parse_cache: Optional[A2LParseCache] = None
+    ):
+        """初始化后处理器
+
+        Args:
+            symbol_map: 符号名称到地址的映射
+            remove_if_data_xcp: 是否删除 IF_DATA XCP 块
+            filter_zero_address: 是否删除地址为 0 的 CHARACTERISTIC 块
+            xcp_template: XCP 头文件模板内容
+            member_index: DWARF 成员路径到地址的映射
+            parse_cache: 可选的 A2L 解析缓存（A2L 内容未变化时跳过块识别）
+        """
+        self.symbol_map = symbol_map
+        self.member_index = member_index
+        self.remove_if_data_xcp = remove_if_data_xcp
+        self.filter_zero_address = filter_zero_address
+        self.xcp_template = xcp_template
+        self.parse_cache = parse_cache
+        self._leaf_index: Optional[SymbolLeafIndex] = None
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def process(
+        self,
+        a2l_path: Path,
+        output_path: Optional[Path] = None,
+        backup: bool = False,
+        encoding: str = 'utf-8',
+        newline: Optional[str] = None
+    ) -> PostProcessResult:
+        """处理 A2L 文件并写入输出文件
+
+        输出先写入输出目录下的临时文件，处理成功后原子性重命名。
+        原地处理（output_path 为空或与 a2l_path 相同）且 backup=True 时，
+        原文件被重命名为 .a2l.bak，无需额外复制。
+
+        Args:
+            a2l_path: A2L 源文件路径
+            output_path: 输出文件路径（可选，默认覆盖原文件）
+            backup: 原地处理时是否保留 .a2l.bak 备份
+            encoding: 输出文件编码
+            newline: 输出换行符（传给 open()，None 表示平台默认）
+
+        Returns:
+            PostProcessResult: 处理结果（启用头文件替换但未找到
+            /end MOD_PAR 时 success 为 False，且不写入输出文件）
+
+        Raises:
+            FileNotFoundError: A2L 文件不存在
+            A2LPostProcessError: 文件无法解码或写入
+        """
+        a2l_path = Path(a2l_path)
+        output_path = Path(output_path) if output_path else a2l_path
+        in_place = output_path.resolve() == a2l_path.resolve()
+
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        temp_fd, temp_name = tempfile.mkstemp(
+            dir=str(output_path.parent),
+            prefix=f".{output_path.stem}_",
+            suffix=".tmp"
+        )
+        os.close(temp_fd)
+        temp_path = Path(temp_name)
+
+        try:
+            result = None
+            for source_encoding in A2L_ENCODINGS:
+                try:
+                    with open(a2l_path, 'r', encoding=source_encoding) as src, \
+                            open(temp_path, 'w', encoding=encoding, newline=newline) as dst:
+                        result = self._run_file(src, dst.write)
+                    result.encoding = source_encoding
+                    break
+                except UnicodeDecodeError:
+                    logger.debug(f"A2L 文件不是 {source_encoding} 编码，尝试下一种编码: {a2l_path}")
+                    continue
+
+            if result is None:
+                raise A2LPostProcessError(
+                    f"无法解码 A2L 文件（尝试 {', '.join(A2L_ENCODINGS)}）: {a2l_path}"
+                )
+
+            if self.xcp_template is not None and not result.header_found:
+                result.success = False
+                result.message = f"未找到 A2L 文件中的 /end MOD_PAR 标记: {a2l_path}"
+                temp_path.unlink()
+                return result
+
+            if in_place and backup:
+                os.replace(a2l_path, a2l_path.with_suffix('.a2l.bak'))
+            os.replace(temp_path, output_path)
+
+        except A2LPostProcessError:
+            raise
+        except OSError as e:
+            raise A2LPostProcessError(f"写入 A2L 文件失败: {output_path} - {e}") from e
+        finally:
+            if temp_path.exists():
+                temp_path.unlink()
+
+        result.success = True
+        result.output_path = str(output_path)
+        result.message = self._summarize(result)
+        return result
+
+    def process_text(self, content: str) -> Tuple[str, PostProcessResult]:
+        """处理内存中的 A2L 文本
+
+        Args:
+            content: A2L 文件内容
+
+        Returns:
+            Tuple[str, PostProcessResult]: (处理后的内容, 处理结果)
+        """
+        parts: List[str] = []
+        result = self._run(content.splitlines(keepends=True), parts.append)
+        result.success = self.xcp_template is None or result.header_found
+        result.message = self._summarize(result)
+        return ''.join(parts), result
+
+    def process_document(self, document) -> PostProcessResult:
+        """处理内存中的 A2L 文档（a2l.document.A2LDocument），不写入 A2L 文件
+
+        处理成功时更新文档内容；启用头文件替换但未找到 /end MOD_PAR 时
+        success 为 False，文档保持不变。设置了解析缓存且文档从磁盘加载后
+        未修改时，块索引按源文件缓存（见 a2l.parse_cache）。
+
+        Args:
+            document: A2L 文档
+
+        Returns:
+            PostProcessResult: 处理结果
+        """
+        if self.parse_cache is not None and document.path is not None and not document.modified:
+            content, result = self._process_cached(document.content, document.path)
+        else:
+            content, result = self.process_text(document.content)
+        result.encoding = document.encoding
+        if result.success:
+            document.content = content
+        return result
+
+    def _process_cached(self, content: str, source_path: Path) -> Tuple[str, PostProcessResult]:
+        """使用源文件的块索引缓存处理文本（未命中时处理后保存块索引）
+
+        Args:
+            content: A2L 文件内容（与 source_path 的内容一致）
+            source_path: A2L 源文件路径（缓存键）
+
+        Returns:
+            Tuple[str, PostProcessResult]: (处理后的内容, 处理结果)
+        """
+        kind = block_kind(self.xcp_template is not None, self.remove_if_data_xcp)
+        lines = content.splitlines(keepends=True)
+        parts: List[str] = []
+
+        index = self.parse_cache.load(source_path, kind)
+        if index is not None:
+            result = self._run_indexed(lines, parts.append, index)
+        else:
+            index = A2LParseIndex()
+            result = self._run(lines, parts.append, index)
+            self.parse_cache.store(source_path, kind, index)
+
+        result.success = self.xcp_template is None or result.header_found
+        result.message = self._summarize(result)
+        return ''.join(parts), result
+
+    def _summarize(self, result: PostProcessResult) -> str:
+        """生成结果摘要消息"""
+        parts = []
+        if self.symbol_map is not None:
+            parts.append(f"匹配 {result.matched_count}/{result.total_variables} 个变量")
+        if self.remove_if_data_xcp:
+            parts.append(f"删除 {result.if_data_removed} 个 IF_DATA XCP 块")
+        if self.filter_zero_address:
+            parts.append(f"过滤 {result.zero_address_removed} 个零地址 CHARACTERISTIC")
+        if self.xcp_template is not None:
+            parts.append("已替换 XCP 头文件" if result.header_found else "未找到 XCP 头文件")
+        return "A2L 后处理完成: " + ", ".join(parts) if parts else "A2L 后处理完成"
+
+    def _run_file(
+        self,
+        src: TextIO,
+        write: Callable[[str], object]
+    ) -> PostProcessResult:
+        """处理已打开的源文件（子类可覆盖以改变处理方式）
+
+        Args:
+            src: 以文本模式打开的 A2L 源文件
+            write: 输出写入函数
+
+        Returns:
+            PostProcessResult: 处理统计（不含 success/message）
+        """
+        return self._run(src, write)
+
+    def _new_result(self) -> PostProcessResult:
+        """创建处理结果，并按符号表建立一次叶子节点索引"""
+        result = PostProcessResult()
+        if self.symbol_map is not None:
+            if self._leaf_index is None or self._leaf_index.symbol_map is not self.symbol_map:
+                self._leaf_index = SymbolLeafIndex(self.symbol_map)
+            result.delta = AddressDelta()
+        return result
+
+    def _replace_header_line(
+        self,
+        line: str,
+        write: Callable[[str], object],
+        result: PostProcessResult
+    ) -> bool:
+        """处理头部替换范围内的一行
+
+        Returns:
+            bool: 该行是否为头部最后一行（第一个 /end MOD_PAR 所在行）
+        """
+        match = MOD_PAR_END_PATTERN.search(line)
+        if not match:
+            result.header_original_length += len(line)
+            return False
+        content = line.rstrip('\r\n')
+        line_break = line[len(content):]
+        result.header_original_length += len(content)
+        result.header_new_length = len(self.xcp_template)
+        result.header_found = True
+        write(self.xcp_template)
+        if line_break:
+            write(line_break)
+        return True
+
+    def _run(
+        self,
+        lines: Iterable[str],
+        write: Callable[[str], object],
+        index: Optional[A2LParseIndex] = None
+    ) -> PostProcessResult:
+        """单遍处理核心
+
+        Args:
+            lines: 保留行尾的行迭代器
+            write: 输出写入函数
+            index: 可选的块索引，按行号（从 1 开始）记录识别到的全部顶层块
+
+        Returns:
+            PostProcessResult: 处理统计（不含 success/message）
+        """
+        result = self._new_result()
+
+        remove_if_data = self.remove_if_data_xcp
+        in_header = self.xcp_template is not None
+        in_if_data = False
+        block: Optional[_Block] = None
+        block_depth = 0
+
+        for line_num, line in enumerate(lines, start=1):
+            # 1. 删除 IF_DATA XCP 块（可能跨行，也可能只占行的一部分）
+            if remove_if_data and (in_if_data or '/' in line):
+                line, in_if_data, removed = self._strip_if_data(line, in_if_data)
+                result.if_data_removed += removed
+                if not line:
+                    continue
+
+            # 2. 头部替换：丢弃第一个 /end MOD_PAR 之前（含该行）的内容
+            if in_header:
+                in_header = not self._replace_header_line(line, write, result)
+                continue
+
+            # 3. 变量块识别（规则与 A2LParser._parse_blocks 一致）
+            if '/' in line:
+                start_match = A2LParser.BLOCK_START_PATTERN.search(line)
+                if start_match is None:
+                    start_match = A2LParser.BLOCK_START_PATTERN_SIMULINK.search(line)
+                if start_match is not None:
+                    if block_depth == 0:
+                        name = start_match.group(2) if start_match.re is A2LParser.BLOCK_START_PATTERN else ""
+                        block = _Block(start_match.group(1).upper(), name, line_num)
+                    block_depth += 1
+                    block.lines.append(line)
+                    continue
+
+                if block is not None and A2LParser.BLOCK_END_PATTERN.search(line):
+                    block_depth -= 1
+                    block.lines.append(line)
+                    if block_depth == 0:
+                        if index is not None:
+                            self._record_block(index, block, line_num)
+                        self._flush_block(block, write, result)
+                        block = None
+                    continue
+
+            if block is None:
+                write(line)
+                continue
+
+            block.lines.append(line)
+            if block_depth == 1:
+                self._scan_block_line(block, line, line_num)
+
+        # 文件结束时仍未闭合的块原样输出
+        if block is not None:
+            for block_line in block.lines:
+                write(block_line)
+
+        return result
+
+    def _run_indexed(
+        self,
+        lines: List[str],
+        write: Callable[[str], object],
+        index: A2LParseIndex
+    ) -> PostProcessResult:
+        """按缓存的块索引处理（输出与 _run 一致，跳过块识别和块内扫描）
+
+        Args:
+            lines: 保留行尾的行列表（与建立索引时的内容一致）
+            write: 输出写入函数
+            index: _run 记录的块索引
+
+        Returns:
+            PostProcessResult: 处理统计（不含 success/message）
+        """
+        result = self._new_result()
+
+        remove_if_data = self.remove_if_data_xcp
+        in_header = self.xcp_template is not None
+        in_if_data = False
+        block: Optional[_Block] = None
+        block_end = 0
+        address_line = 0
+        count = len(index)
+        next_block = 0
+        next_start = index.line_starts[0] if count else 0
+
+        for line_num, line in enumerate(lines, start=1):
+            if remove_if_data and (in_if_data or '/' in line):
+                line, in_if_data, removed = self._strip_if_data(line, in_if_data)
+                result.if_data_removed += removed
+                if not line:
+                    continue
+
+            if in_header:
+                in_header = not self._replace_header_line(line, write, result)
+                continue
+
+            if block is None:
+                if line_num != next_start:
+                    write(line)
+                    continue
+                i = next_block
+                block = _Block(VAR_TYPES[index.type_codes[i]], index.names[i], line_num)
+                block.address_str = index.address_strs[i]
+                block_end = index.line_ends[i]
+                address_line = index.address_lines[i]
+                next_block += 1
+                next_start = index.line_starts[next_block] if next_block < count else 0
+
+            block.lines.append(line)
+            if line_num == address_line:
+                block.address_index = len(block.lines) - 1
+                addr_str = block.address_str
+                block.address = int(addr_str, 16) if addr_str.lower().startswith('0x') else int(addr_str)
+            if line_num == block_end:
+                self._flush_block(block, write, result)
+                block = None
+
+        if block is not None:
+            for block_line in block.lines:
+                write(block_line)
+
+        return result
+
+    @staticmethod
+    def _record_block(index: A2LParseIndex, block: _Block, line_end: int):
+        """将已闭合的顶层块追加到块索引"""
+        index.names.append(block.name)
+        index.type_codes.append(VAR_TYPE_CODES[block.var_type])
+        index.line_starts.append(block.line_start)
+        index.line_ends.append(line_end)
+        index.address_lines.append(block.address_line)
+        index.address_starts.append(0)
+        index.address_ends.append(0)
+        index.address_strs.append(block.address_str)
+
+    @staticmethod
+    def _strip_if_data(line: str, in_if_data: bool) -> Tuple[str, bool, int]:
+        """从一行中删除 IF_DATA XCP 块内容
+
+        Args:
+            line: 当前行
+            in_if_data: 进入此行时是否处于 IF_DATA XCP 块内
+
+        Returns:
+            Tuple[str, bool, int]: (剩余内容, 行末是否仍在块内, 本行开始的块数量)
+        """
+        kept: List[str] = []
+        removed = 0
+        pos = 0
+        while True:
+            if in_if_data:
+                end_match = IF_DATA_END_PATTERN.search(line, pos)
+                if end_match is None:
+                    return ''.join(kept), True, removed
+                pos = end_match.end()
+                in_if_data = False
+            else:
+                start_match = IF_DATA_XCP_START_PATTERN.search(line, pos)
+                if start_match is None:
+                    kept.append(line[pos:] if pos else line)
+                    return ''.join(kept), False, removed
+                kept.append(line[pos:start_match.start()])
+                pos = start_match.end()
+                in_if_data = True
+                removed += 1
+
+    @staticmethod
+    def _scan_block_line(block: _Block, line: str, line_num: int = 0):
+        """在顶层块内查找名称和地址（与 A2LParser 相同的优先级）"""
+        if not block.name:
+            name_match = A2LParser.NAME_PATTERN_SIMULINK.search(line)
+            if name_match:
+                block.name = name_match.group(1)
+
+        addr_match = (
+            A2LParser.ADDRESS_PATTERN.match(line)
+            or A2LParser.ADDRESS_PATTERN_ECU.search(line)
+            or A2LParser.ADDRESS_PATTERN_SIMULINK.search(line)
+        )
+        if addr_match:
+            addr_str = addr_match.group(1)
+            block.address_str = addr_str
+            block.address_index = len(block.lines) - 1
+            block.address_line = line_num
+            block.address = int(addr_str, 16) if addr_str.lower().startswith('0x') else int(addr_str)
+
+    def _flush_block(
+        self,
+        block: _Block,
+        write: Callable[[str], object],
+        result: PostProcessResult
+    ):
+        """块结束时更新地址、应用零地址过滤并输出"""
+        if block.name:
+            result.total_variables += 1
+
+            if self.symbol_map is not None:
+                new_addr, match_type, candidates = match_symbol_address(
+                    block.name, self.symbol_map, self.member_index, self._leaf_index
+                )
+                if match_type != "ambiguous" and block.address_index >= 0:
+                    result.delta.record(block.name, block.address, new_addr)
+
+                if new_addr is None:
+                    result.unmatched_count += 1
+                    result.unmatched_variables.append(block.name)
+                    if match_type == "ambiguous":
+                        result.ambiguous_variables[block.name] = candidates
+                elif block.address_index >= 0:
+                    old_line = block.lines[block.address_index]
+                    block.lines[block.address_index] = old_line.replace(
+                        block.address_str,
+                        f"0x{new_addr:08X}"
+                    )
+                    block.address = new_addr
+                    result.matched_count += 1
+                    result.updated_variables.append(block.name)
+
+        if self.filter_zero_address and block.var_type == "CHARACTERISTIC":
+            result.characteristic_count += 1
+            if block.address_index >= 0 and block.address == 0:
+                result.zero_address_removed += 1
+                result.removed_variables.append(block.name)
+                return
+
+        for block_line in block.lines:
+            write(block_line)
@@ -0,0 +1,368 @@
+"""Removal of unreferenced COMPU_METHOD/COMPU_VTAB/RECORD_LAYOUT blocks.
+
+Filtering zero-address CHARACTERISTICs leaves the conversion methods,
+value tables and record layouts they referenced in the A2L, which makes
+the shipped file much larger than necessary and slows down INCA/CANape.
+
+The pruner builds a reference graph over the memory-mapped A2L in one
+pass:
+
+- a single /begin|/end scan tracks block nesting and records the span
+  and name of every support block directly inside MODULE
+- identifiers are tokenized once; tokens outside support blocks are the
+  roots (CHARACTERISTIC, MEASUREMENT, AXIS_PTS, TYPEDEF_*, MOD_COMMON
+  S_REC_LAYOUT, ...) and tokens inside a support block are its edges
+  (COMPU_TAB_REF, STATUS_STRING_REF, ...). Edges are resolved with
+  dict lookups on the block names, never with per-name regex scans
+- support blocks not reachable from a root are dropped in one streaming
+  rewrite of the kept byte ranges
+
+Matching is conservative: a name that appears anywhere outside its own
+block (including long identifiers and comments) keeps the block.
+
+Usage:
+    pruner = A2LSupportPruner()
+    result = pruner.prune("App.a2l")
+    print(result.message)
+
+    # 已在内存中的内容（A2L 处理阶段的 A2LDocument）
+    content, result = pruner.prune_text(content)
+"""
+
+import logging
+import mmap
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from a2l.a2l_parser import decode_token
+
+logger = logging.getLogger(__name__)
+
+# 可删除的支撑块类型
+SUPPORT_KINDS = frozenset({
+    b"COMPU_METHOD",
+    b"COMPU_TAB",
+    b"COMPU_VTAB",
+    b"COMPU_VTAB_RANGE",
+    b"RECORD_LAYOUT",
+})
+
+BLOCK_MARKER_PATTERN = re.compile(rb'/(begin|end)\s+(\w+)')
+BLOCK_NAME_PATTERN = re.compile(rb'(?:\s+|/\*.*?\*/)*([^\s"/]+)', re.DOTALL)
+IDENTIFIER_PATTERN = re.compile(rb'[A-Za-z_][\w.\[\]]*')
+
+
+class A2LPruneError(Exception):
+    """A2L 精简错误
+
+    当 A2L 文件无法读取或写入时抛出。
+    """
+    pass
+
+
+@dataclass
+class SupportBlock:
+    """支撑块（COMPU_METHOD、COMPU_VTAB、RECORD_LAYOUT 等）
+
+    Attributes:
+        kind: 块类型
+        name: 块名称
+        start: 块所在首行的起始偏移
+        end: 块结束行的结束偏移（含换行符）
+        references: 块内出现的其他支撑块名称
+    """
+    kind: str
+    name: str
+    start: int
+    end: int
+    references: Set[str] = field(default_factory=set)
+
+    @property
+    def size(self) -> int:
+        """块占用的字节数"""
+        return self.end - self.start
+
+
+@dataclass
+class PruneResult:
+    """A2L 精简结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        output_path: 输出文件路径
+        support_count: 支撑块总数
+        removed: 被删除的块类型到名称列表的映射
+        original_size: 原始文件字节数
+        new_size: 输出文件字节数
+        execution_time: 耗时（秒）
+    """
+    success: bool = False
+    message: str = ""
+    output_path: str = ""
+    support_count: int = 0
+    removed: Dict[str, List[str]] = field(default_factory=dict)
+    original_size: int = 0
+    new_size: int = 0
+    execution_time: float = 0.0
+
+    @property
+    def removed_count(self) -> int:
+        """删除的块数量"""
+        return sum(len(names) for names in self.removed.values())
+
+    @property
+    def bytes_saved(self) -> int:
+        """节省的字节数"""
+        return self.original_size - self.new_size
+
+
+def _line_start(content: bytes, pos: int) -> int:
+    """块起始行的起始偏移（/begin 前只有空白时扩展到行首）"""
+    line_start = content.rfind(b'\n', 0, pos) + 1
+    return line_start if not content[line_start:pos].strip() else pos
+
+
+def _line_end(content: bytes, pos: int) -> int:
+    """块结束行的结束偏移（/end 后只有空白时扩展到换行符之后）"""
+    newline = content.find(b'\n', pos)
+    if newline < 0:
+        return len(content) if not content[pos:].strip() else pos
+    return newline + 1 if not content[pos:newline].strip() else pos
+
+
+def build_reference_graph(content: bytes) -> Tuple[Dict[bytes, List[SupportBlock]], Set[bytes]]:
+    """建立支撑块引用图
+
+    Args:
+        content: A2L 文件内容
+
+    Returns:
+        Tuple[Dict[bytes, List[SupportBlock]], Set[bytes]]:
+        (支撑块名称到块的映射（同名不同类型的块共用一个名称）,
+        支撑块之外引用的支撑块名称)
+    """
+    spans: List[Tuple[int, int, bytes, bytes]] = []
+    stack: List[bytes] = []
+    current: Optional[Tuple[int, bytes, bytes]] = None
+
+    for marker in BLOCK_MARKER_PATTERN.finditer(content):
+        kind = marker.group(2)
+        if marker.group(1) == b'begin':
+            if current is None and kind in SUPPORT_KINDS and stack and stack[-1] == b'MODULE':
+                name_match = BLOCK_NAME_PATTERN.match(content, marker.end())
+                if name_match:
+                    current = (_line_start(content, marker.start()), kind, name_match.group(1))
+            stack.append(kind)
+        elif stack:
+            stack.pop()
+            if current is not None and len(stack) > 0 and stack[-1] == b'MODULE' and kind == current[1]:
+                spans.append((current[0], _line_end(content, marker.end()), current[1], current[2]))
+                current = None
+
+    blocks: Dict[bytes, List[SupportBlock]] = {}
+    for start, end, kind, name in spans:
+        blocks.setdefault(name, []).append(SupportBlock(decode_token(kind), decode_token(name), start, end))
+
+    roots: Set[bytes] = set()
+    pos = 0
+    for start, end, _, name in spans:
+        roots.update(t for t in IDENTIFIER_PATTERN.findall(content, pos, start) if t in blocks)
+        block_refs = {t for t in IDENTIFIER_PATTERN.findall(content, start, end) if t in blocks}
+        block_refs.discard(name)
+        for block in blocks[name]:
+            if block.start == start:
+                block.references = {decode_token(t) for t in block_refs}
+        pos = end
+    roots.update(t for t in IDENTIFIER_PATTERN.findall(content, pos) if t in blocks)
+
+    return blocks, roots
+
+
+def find_unreferenced(
+    blocks: Dict[bytes, List[SupportBlock]],
+    roots: Iterable[bytes]
+) -> List[SupportBlock]:
+    """按引用图查找不可达的支撑块
+
+    Args:
+        blocks: 支撑块名称到块的映射
+        roots: 支撑块之外引用的支撑块名称
+
+    Returns:
+        List[SupportBlock]: 按文件位置排序的不可达块
+    """
+    names = {decode_token(name): name for name in blocks}
+    reached: Set[bytes] = set()
+    queue = deque(roots)
+    while queue:
+        name = queue.popleft()
+        if name in reached or name not in blocks:
+            continue
+        reached.add(name)
+        for block in blocks[name]:
+            queue.extend(names[ref] for ref in block.references if ref in names)
+
+    unreferenced = [
+        block
+        for name, group in blocks.items() if name not in reached
+        for block in group
+    ]
+    return sorted(unreferenced, key=lambda block: block.start)
+
+
+class A2LSupportPruner:
+    """未引用支撑块精简器"""
+
+    def __init__(self):
+        """初始化精简器"""
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def prune(self, a2l_path: Path, output_path: Optional[Path] = None) -> PruneResult:
+        """删除未引用的支撑块并写入输出文件
+
+        输出先写入输出目录下的临时文件，成功后原子性重命名；
+        没有可删除的块且原地处理时不重写文件。
+
+        Args:
+            a2l_path: A2L 文件路径
+            output_path: 输出文件路径（可选，默认覆盖原文件）
+
+        Returns:
+            PruneResult: 精简结果
+
+        Raises:
+            FileNotFoundError: A2L 文件不存在
+            A2LPruneError: 文件无法读取或写入
+        """
+        start_time = time.monotonic()
+        a2l_path = Path(a2l_path)
+        output_path = Path(output_path) if output_path else a2l_path
+        in_place = output_path.resolve() == a2l_path.resolve()
+
+        if not a2l_path.exists():
+            raise FileNotFoundError(f"A2L 文件不存在: {a2l_path}")
+        if a2l_path.stat().st_size == 0:
+            raise A2LPruneError(f"A2L 文件大小为 0: {a2l_path}")
+
+        result = PruneResult(output_path=str(output_path))
+        temp_path: Optional[Path] = None
+        try:
+            with open(a2l_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    unreferenced = self._collect(mm, result)
+
+                    if unreferenced or not in_place:
+                        output_path.parent.mkdir(parents=True, exist_ok=True)
+                        temp_fd, temp_name = tempfile.mkstemp(
+                            dir=str(output_path.parent),
+                            prefix=f".{output_path.stem}_",
+                            suffix=".tmp"
+                        )
+                        temp_path = Path(temp_name)
+                        with os.fdopen(temp_fd, 'wb') as dst:
+                            pos = 0
+                            for block in unreferenced:
+                                dst.write(mm[pos:block.start])
+                                pos = block.end
+                            dst.write(mm[pos:])
+                            result.new_size = dst.tell()
+                    else:
+                        result.new_size = result.original_size
+
+            if temp_path is not None:
+                os.replace(temp_path, output_path)
+                temp_path = None
+        except OSError as e:
+            raise A2LPruneError(f"精简 A2L 文件失败: {a2l_path} - {e}") from e
+        finally:
+            if temp_path is not None and temp_path.exists():
+                temp_path.unlink()
+
+        self._finish(result, start_time)
+        return result
+
+    def prune_text(self, content: str) -> Tuple[str, PruneResult]:
+        """删除内存中 A2L 文本的未引用支撑块（不读写磁盘）
+
+        字节数按 UTF-8 编码统计。
+
+        Args:
+            content: A2L 文件内容
+
+        Returns:
+            Tuple[str, PruneResult]: (精简后的内容, 精简结果)
+        """
+        start_time = time.monotonic()
+        data = content.encode('utf-8')
+        result = PruneResult()
+        unreferenced = self._collect(data, result)
+
+        if unreferenced:
+            parts: List[bytes] = []
+            pos = 0
+            for block in unreferenced:
+                parts.append(data[pos:block.start])
+                pos = block.end
+            parts.append(data[pos:])
+            data = b''.join(parts)
+            content = data.decode('utf-8')
+        result.new_size = len(data)
+
+        self._finish(result, start_time)
+        return content, result
+
+    def _collect(self, buffer, result: PruneResult) -> List[SupportBlock]:
+        """建立引用图并把统计写入 result
+
+        Args:
+            buffer: A2L 内容（bytes 或 mmap）
+            result: 精简结果
+
+        Returns:
+            List[SupportBlock]: 按文件位置排序的不可达块
+        """
+        blocks, roots = build_reference_graph(buffer)
+        unreferenced = find_unreferenced(blocks, roots)
+
+        result.original_size = len(buffer)
+        result.support_count = sum(len(group) for group in blocks.values())
+        for block in unreferenced:
+            result.removed.setdefault(block.kind, []).append(block.name)
+        return unreferenced
+
+    def _finish(self, result: PruneResult, start_time: float):
+        """填写成功状态、耗时和结果消息并记录日志"""
+        result.success = True
+        result.execution_time = time.monotonic() - start_time
+        summary = ", ".join(f"{kind} {len(names)}" for kind, names in sorted(result.removed.items()))
+        result.message = (
+            f"A2L 精简完成: 删除 {result.removed_count}/{result.support_count} 个未引用的支撑块"
+            + (f" ({summary})" if summary else "")
+            + f", 节省 {result.bytes_saved:,} 字节"
+        )
+        self._log(result.message)
@@ -0,0 +1,558 @@
+"""Headless multi-project batch build runner for MBD_CICDKits.
+
+Runs several project builds (or variants of one project) without the GUI,
+each in its own worker process, on top of core.workflow.execute_workflow.
+
+Worker processes share one semaphore per external tool (MATLAB licenses,
+IAR seats); stages listed in core.workflow.STAGE_TOOLS hold a slot while
+they run, so the number of concurrent tool invocations never exceeds the
+configured cap regardless of how many builds run in parallel.
+
+Jobs whose working directories overlap (WORKSPACE_CONFIG_KEYS, e.g. two
+variants sharing a2l_tool_path) are never started at the same time; the
+A2L tool directory cleanup and matlab_code_path clearing would otherwise
+clobber the other build.
+
+Progress, stage completion and log messages are sent back to the parent
+process through a multiprocessing queue and delivered to the on_event
+callback in the calling thread.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from core.config import load_config, load_workflow_templates
+from core.models import BuildContext, ProjectConfig, WorkflowConfig
+from core.stage_cache import CACHE_HIT, CACHE_STATE_KEY
+from core.workflow import execute_workflow
+from utils.errors import ConfigLoadError
+from utils.resume import get_resume_dir
+
+logger = logging.getLogger(__name__)
+
+# 默认工具并发上限（工具名 -> 同时运行数，<= 0 表示不限制）
+DEFAULT_TOOL_LIMITS = {"matlab": 1, "iar": 1}
+
+# 等待任务完成时转发事件的间隔（秒）
+EVENT_POLL_INTERVAL = 0.2
+
+# 事件类型
+EVENT_PROGRESS = "progress"
+EVENT_STAGE = "stage"
+EVENT_LOG = "log"
+EVENT_DONE = "done"
+
+# 构建写入的工作目录（同一目录或父子目录的任务不能同时运行）
+WORKSPACE_CONFIG_KEYS = (
+    "simulink_path",
+    "matlab_code_path",
+    "iar_project_path",
+    "a2l_tool_path",
+    "target_path",
+)
+
+
+@dataclass
+class BatchJob:
+    """批量构建任务
+
+    Attributes:
+        project: 项目配置名称（load_config 的参数）
+        label: 任务标识（默认与项目名相同，同一项目的多个变体需各自指定）
+        workflow_id: 工作流模板 ID（为空时使用项目中保存的工作流）
+        overrides: 覆盖项目配置的字段（用于构建变体）
+        workflow_config: 完整的工作流配置字典（非空时优先于 workflow_id）
+        project_config: 完整的项目配置字典（非空时不从配置目录加载项目）
+    """
+    project: str
+    label: str = ""
+    workflow_id: str = ""
+    overrides: Dict[str, Any] = field(default_factory=dict)
+    workflow_config: Dict[str, Any] = field(default_factory=dict)
+    project_config: Dict[str, Any] = field(default_factory=dict)
+
+    def __post_init__(self):
+        if not self.label:
+            self.label = self.project
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BatchJob":
+        """从字典创建任务
+
+        Args:
+            data: 任务字典（project 必填，workflow 为 workflow_id 的别名）
+
+        Returns:
+            BatchJob 实例
+        """
+        return cls(
+            project=data["project"],
+            label=data.get("label", ""),
+            workflow_id=data.get("workflow_id", data.get("workflow", "")),
+            overrides=dict(data.get("overrides", {})),
+            workflow_config=dict(data.get("workflow_config", {})),
+            project_config=dict(data.get("project_config", {}))
+        )
+
+
+@dataclass
+class BatchJobResult:
+    """批量构建任务结果
+
+    Attributes:
+        label: 任务标识
+        project: 项目配置名称
+        success: 是否构建成功
+        duration: 耗时（秒）
+        failed_stage: 失败的阶段名称
+        error: 错误信息
+        cached_stages: 命中阶段缓存的阶段
+        resumed_stages: 从恢复快照跳过的阶段
+        output_files: 各阶段的输出文件
+        stage_durations: 阶段名 -> 耗时（秒）
+    """
+    label: str
+    project: str
+    success: bool = False
+    duration: float = 0.0
+    failed_stage: str = ""
+    error: str = ""
+    cached_stages: List[str] = field(default_factory=list)
+    resumed_stages: List[str] = field(default_factory=list)
+    output_files: List[str] = field(default_factory=list)
+    stage_durations: Dict[str, float] = field(default_factory=dict)
+
+
+def load_batch_jobs(file_path: Path) -> List[BatchJob]:
+    """从 JSON 文件加载批量构建任务
+
+    文件内容为任务列表，或包含 "jobs" 列表的对象，例如:
+        [{"project": "E0Y", "label": "E0Y_debug", "overrides": {"target_path": "D:/out/debug"}}]
+
+    Args:
+        file_path: 任务文件路径
+
+    Returns:
+        List[BatchJob]: 任务列表
+
+    Raises:
+        ConfigLoadError: 文件不存在或格式错误时抛出
+    """
+    try:
+        data = json.loads(Path(file_path).read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise ConfigLoadError(f"批量任务文件无法读取: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("jobs", [])
+    if not isinstance(data, list):
+        raise ConfigLoadError("批量任务文件应为任务列表")
+
+    try:
+        return [BatchJob.from_dict(item) for item in data]
+    except (KeyError, TypeError, AttributeError) as e:
+        raise ConfigLoadError(f"批量任务格式错误: {e}",
+                              suggestions=["每个任务必须包含 project 字段"])
+
+
+def load_job_config(job: BatchJob) -> ProjectConfig:
+    """加载任务的项目配置
+
+    任务携带完整的项目配置时直接使用（例如 GUI 提交到构建队列的未保存配置），
+    否则按项目名从配置目录加载。
+
+    Args:
+        job: 批量构建任务
+
+    Returns:
+        ProjectConfig: 项目配置（未应用覆盖项）
+
+    Raises:
+        ConfigLoadError: 项目配置无法加载时抛出
+    """
+    if job.project_config:
+        return ProjectConfig.from_dict(job.project_config)
+    return load_config(job.project)
+
+
+def parse_tool_limits(specs: List[str]) -> Dict[str, int]:
+    """解析命令行中的工具并发上限
+
+    Args:
+        specs: "工具=数量" 形式的字符串列表，例如 ["matlab=2", "iar=1"]
+
+    Returns:
+        Dict[str, int]: 工具名 -> 并发上限
+
+    Raises:
+        ValueError: 格式错误时抛出
+    """
+    limits = {}
+    for spec in specs:
+        tool, sep, count = spec.partition("=")
+        if not sep or not tool.strip():
+            raise ValueError(f"工具并发上限格式应为 工具=数量: {spec}")
+        try:
+            limits[tool.strip().lower()] = int(count)
+        except ValueError:
+            raise ValueError(f"工具并发上限必须是整数: {spec}")
+    return limits
+
+
+def resolve_workflow(project_config: ProjectConfig, workflow_id: str = "") -> WorkflowConfig:
+    """确定项目构建使用的工作流
+
+    未指定 workflow_id 时优先使用项目中保存的完整工作流配置
+    （custom_params["workflow_config"]），其次按项目的 workflow_id 查找模板，
+    都没有时使用第一个模板。
+
+    Args:
+        project_config: 项目配置
+        workflow_id: 指定的工作流模板 ID（可选）
+
+    Returns:
+        WorkflowConfig: 工作流配置
+
+    Raises:
+        ConfigLoadError: 指定的工作流模板不存在时抛出
+    """
+    saved = project_config.custom_params.get("workflow_config")
+    if not workflow_id and saved:
+        return WorkflowConfig.from_dict(saved)
+
+    templates = load_workflow_templates()
+    target_id = workflow_id or project_config.workflow_id
+    for template in templates:
+        if template.id == target_id:
+            return template
+
+    if workflow_id:
+        raise ConfigLoadError(
+            f"工作流模板不存在: {workflow_id}",
+            suggestions=[f"可用模板: {', '.join(t.id for t in templates)}"]
+        )
+    return templates[0]
+
+
+def workspace_tokens(label: str, config: Dict[str, Any]) -> List[str]:
+    """计算任务占用的工作区令牌
+
+    Args:
+        label: 任务标识
+        config: 项目配置字典（已应用覆盖项）
+
+    Returns:
+        List[str]: "project:<label>" 和 "path:<规范化路径>" 形式的令牌
+    """
+    tokens = [f"project:{label}"]
+    for key in WORKSPACE_CONFIG_KEYS:
+        value = config.get(key)
+        if value:
+            path = os.path.normcase(os.path.abspath(str(value)))
+            tokens.append(f"path:{path}")
+    return tokens
+
+
+def tokens_conflict(tokens_a: List[str], tokens_b: List[str]) -> bool:
+    """检查两组工作区令牌是否冲突
+
+    项目令牌相同，或一个路径与另一个路径相同或为其父目录时冲突。
+
+    Args:
+        tokens_a: 令牌列表
+        tokens_b: 令牌列表
+
+    Returns:
+        bool: 是否冲突
+    """
+    for a in tokens_a:
+        for b in tokens_b:
+            if a == b:
+                return True
+            if a.startswith("path:") and b.startswith("path:"):
+                path_a, path_b = a[5:], b[5:]
+                if path_b.startswith(path_a.rstrip(os.sep) + os.sep) or \
+                        path_a.startswith(path_b.rstrip(os.sep) + os.sep):
+                    return True
+    return False
+
+
+def create_tool_slots(tool_limits: Optional[Dict[str, int]] = None) -> Dict[str, Any]:
+    """创建跨进程共享的工具许可
+
+    Args:
+        tool_limits: 工具并发上限，覆盖 DEFAULT_TOOL_LIMITS
+
+    Returns:
+        Dict[str, Any]: 工具名 -> 信号量（上限 <= 0 的工具不限制）
+    """
+    limits = dict(DEFAULT_TOOL_LIMITS)
+    limits.update(tool_limits or {})
+    logger.info(f"工具并发上限: {limits}")
+    return {tool: multiprocessing.Semaphore(count) for tool, count in limits.items() if count > 0}
+
+
+# 工作进程中的工具许可与事件队列（由 init_batch_worker 初始化）
+_worker_tool_slots: Dict[str, Any] = {}
+_worker_events = None
+
+
+def init_batch_worker(tool_slots: Dict[str, Any], events) -> None:
+    """初始化批量构建工作进程
+
+    Args:
+        tool_slots: 工具名 -> 跨进程信号量
+        events: 事件队列
+    """
+    global _worker_tool_slots, _worker_events
+    _worker_tool_slots = tool_slots
+    _worker_events = events
+
+
+def _emit(label: str, event_type: str, **data) -> None:
+    """从工作进程发送事件
+
+    Args:
+        label: 任务标识
+        event_type: 事件类型
+        **data: 事件数据
+    """
+    if _worker_events is not None:
+        _worker_events.put({"job": label, "type": event_type, **data})
+
+
+def run_batch_job(
+    job: BatchJob,
+    resume: bool = False,
+    cancel_path: str = "",
+    job_key: str = ""
+) -> BatchJobResult:
+    """在当前进程中执行一个批量构建任务
+
+    Args:
+        job: 批量构建任务
+        resume: 是否从恢复快照继续
+        cancel_path: 取消标记文件路径（文件出现时取消构建，可选）
+        job_key: 事件中的任务标识（默认 job.label）
+
+    Returns:
+        BatchJobResult: 任务结果
+    """
+    start_time = time.monotonic()
+    result = BatchJobResult(label=job.label, project=job.project)
+    key = job_key or job.label
+
+    try:
+        project_config = load_job_config(job)
+        if job.workflow_config:
+            workflow_config = WorkflowConfig.from_dict(job.workflow_config)
+        else:
+            workflow_config = resolve_workflow(project_config, job.workflow_id)
+    except Exception as e:
+        result.error = str(e).splitlines()[0]
+        return result
+
+    config = project_config.to_dict()
+    config.update(job.overrides)
+    if job.label != project_config.name and "resume_dir" not in config:
+        # 同一项目的变体各自保存恢复快照，避免互相覆盖
+        config["resume_dir"] = str(get_resume_dir() / "variants" / job.label)
+
+    context = BuildContext(
+        config=config,
+        log_callback=lambda msg: _emit(key, EVENT_LOG, message=msg),
+        tool_slots=dict(_worker_tool_slots)
+    )
+
+    def cancel_check() -> bool:
+        if not os.path.exists(cancel_path):
+            return False
+        context.is_cancelled = True
+        return True
+
+    try:
+        result.success = execute_workflow(
+            workflow_config,
+            context,
+            progress_callback=lambda percent, msg: _emit(key, EVENT_PROGRESS,
+                                                         percent=percent, message=msg),
+            stage_callback=lambda stage, ok: _emit(key, EVENT_STAGE,
+                                                   stage=stage, success=ok),
+            cancel_check=cancel_check if cancel_path else None,
+            resume=resume
+        )
+    except Exception as e:
+        logger.exception(f"批量任务 {job.label} 执行异常")
+        result.error = str(e)
+
+    result.failed_stage = context.state.get("failed_stage", "")
+    if not result.success and not result.error:
+        result.error = context.state.get("failure_reason", "") or context.state.get("cancel_reason", "")
+    result.cached_stages = [name for name, status in context.state.get(CACHE_STATE_KEY, {}).items()
+                            if status == CACHE_HIT]
+    result.resumed_stages = list(context.state.get("resumed_stages", []))
+    for stage in workflow_config.stages:
+        for output in context.state.get(f"{stage.name}_output", []):
+            if str(output) not in result.output_files:
+                result.output_files.append(str(output))
+    result.stage_durations = dict(context.state.get("stage_durations", {}))
+    result.duration = time.monotonic() - start_time
+    return result
+
+
+def _job_workspace_tokens(job: BatchJob) -> List[str]:
+    """计算批量任务的工作区令牌
+
+    项目配置无法加载时只使用任务标识（任务本身会在工作进程中报告错误）。
+
+    Args:
+        job: 批量构建任务
+
+    Returns:
+        List[str]: 工作区令牌
+    """
+    try:
+        config = load_job_config(job).to_dict()
+    except Exception:
+        config = {}
+    config.update(job.overrides)
+    return workspace_tokens(job.label, config)
+
+
+def _drain_events(events, on_event: Optional[Callable[[dict], None]]) -> None:
+    """转发队列中的所有事件
+
+    Args:
+        events: 事件队列
+        on_event: 事件回调
+    """
+    while True:
+        try:
+            event = events.get_nowait()
+        except queue.Empty:
+            return
+        if on_event:
+            on_event(event)
+
+
+def run_batch(
+    jobs: List[BatchJob],
+    max_workers: Optional[int] = None,
+    tool_limits: Optional[Dict[str, int]] = None,
+    resume: bool = False,
+    on_event: Optional[Callable[[dict], None]] = None
+) -> List[BatchJobResult]:
+    """并行执行批量构建任务，每个任务在独立的工作进程中运行
+
+    工作目录（WORKSPACE_CONFIG_KEYS）相同或嵌套的任务（例如共用 A2L 工具目录的
+    变体）按任务顺序依次执行，避免互相清理或覆盖文件。
+
+    事件为字典，包含 "job"（任务标识）和 "type":
+        progress: percent, message
+        stage: stage, success
+        log: message
+        done: result (BatchJobResult)
+
+    Args:
+        jobs: 批量构建任务列表（label 不能重复）
+        max_workers: 最大并行任务数（默认 min(任务数, CPU 核数)）
+        tool_limits: 工具并发上限，覆盖 DEFAULT_TOOL_LIMITS
+        resume: 是否从恢复快照继续
+        on_event: 事件回调（在调用线程中执行）
+
+    Returns:
+        List[BatchJobResult]: 任务结果（与 jobs 顺序一致）
+
+    Raises:
+        ValueError: 任务标识重复时抛出
+    """
+    labels = [job.label for job in jobs]
+    duplicates = sorted({label for label in labels if labels.count(label) > 1})
+    if duplicates:
+        raise ValueError(f"批量任务标识重复: {', '.join(duplicates)}")
+    if not jobs:
+        return []
+
+    tool_slots = create_tool_slots(tool_limits)
+    events = multiprocessing.Queue()
+    workers = max(1, min(max_workers or os.cpu_count() or 1, len(jobs)))
+    tokens = {job.label: _job_workspace_tokens(job) for job in jobs}
+
+    logger.info(f"批量构建: {len(jobs)} 个任务，{workers} 个工作进程")
+
+    results: Dict[str, BatchJobResult] = {}
+    waiting = list(jobs)
+    running: Dict[Any, BatchJob] = {}
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_batch_worker,
+        initargs=(tool_slots, events)
+    ) as executor:
+        while waiting or running:
+            # 按任务顺序启动与运行中任务工作目录不冲突的任务；
+            # 等待中的任务保留其工作目录，后面的冲突任务不能越过它
+            reserved: List[str] = []
+            for job in list(waiting):
+                if len(running) >= workers:
+                    break
+                job_tokens = tokens[job.label]
+                if any(tokens_conflict(job_tokens, tokens[r.label]) for r in running.values()) or \
+                        tokens_conflict(job_tokens, reserved):
+                    reserved.extend(job_tokens)
+                    continue
+                waiting.remove(job)
+                running[executor.submit(run_batch_job, job, resume)] = job
+
+            done, _ = wait(running, timeout=EVENT_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            _drain_events(events, on_event)
+
+            for future in done:
+                job = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"批量任务 {job.label} 工作进程异常: {e}")
+                    result = BatchJobResult(label=job.label, project=job.project,
+                                            error=f"工作进程异常: {e}")
+                results[job.label] = result
+                if on_event:
+                    on_event({"job": job.label, "type": EVENT_DONE, "result": result})
+
+    _drain_events(events, on_event)
+    return [results[job.label] for job in jobs]
+
+
+def format_batch_summary(results: List[BatchJobResult]) -> str:
+    """格式化批量构建汇总
+
+    Args:
+        results: 任务结果列表
+
+    Returns:
+        str: 汇总文本
+    """
+    width = max([len(r.label) for r in results] + [4])
+    lines = [f"{'任务':<{width}}  结果  耗时(秒)  说明"]
+    for r in results:
+        if r.success:
+            notes = []
+            if r.cached_stages:
+                notes.append(f"缓存: {', '.join(r.cached_stages)}")
+            if r.resumed_stages:
+                notes.append(f"恢复: {', '.join(r.resumed_stages)}")
+            note = "; ".join(notes)
+        else:
+            note = f"[{r.failed_stage}] {r.error}" if r.failed_stage else r.error
+        lines.append(f"{r.label:<{width}}  {'成功' if r.success else '失败'}  {r.duration:>8.1f}  {note}")
+
+    succeeded = sum(1 for r in results if r.success)
+    lines.append(f"共 {len(results)} 个任务: {succeeded} 成功, {len(results) - succeeded} 失败")
+    return "\n".join(lines)
@@ -11,9 +11,11 @@ import json
 import logging
 import uuid
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Callable, List, Optional, Dict, Any
 from datetime import datetime
 
+from a2l.a2l_diff import A2LDiffer
+from a2l.a2l_parser import A2LParseError
 from core.build_history_models import (
     BuildRecord,
     BuildFilters,
@@ -320,6 +322,37 @@ class BuildHistoryManager:
         logger.info(f"查询构建记录: {len(results)} 条结果")
         return results
 
+    def find_latest_output_file(
+        self,
+        project_name: str,
+        suffix: str,
+        exclude: Optional[Callable[[Path], bool]] = None
+    ) -> Optional[Path]:
+        """查找项目最近一次成功构建的输出文件
+
+        按时间从新到旧遍历已完成的构建记录，返回第一个仍然存在的、
+        扩展名匹配的输出文件。
+
+        Args:
+            project_name: 项目名称
+            suffix: 文件扩展名（如 ".hex"，不区分大小写）
+            exclude: 排除条件（返回 True 的文件被跳过）
+
+        Returns:
+            Path: 输出文件路径，如果未找到则返回 None
+        """
+        suffix = suffix.lower()
+        for record in self._records:
+            if record.project_name != project_name or record.state != BuildState.COMPLETED:
+                continue
+            for file_path in record.output_files:
+                path = Path(file_path)
+                if path.suffix.lower() != suffix or (exclude and exclude(path)):
+                    continue
+                if path.is_file():
+                    return path
+        return None
+
     def get_recent_records(self, limit: int = 10) -> List[BuildRecord]:
         """获取最近的构建记录 (Story 3.4 Task 8)
 
@@ -414,12 +447,20 @@ class BuildHistoryManager:
         logger.info(f"清空所有构建历史记录: {count} 条记录")
         return count
 
-    def compare_records(self, build_id_1: str, build_id_2: str) -> Dict[str, Any]:
+    def compare_records(
+        self,
+        build_id_1: str,
+        build_id_2: str,
+        a2l_diff: bool = False,
+        ignore_addresses: bool = True
+    ) -> Dict[str, Any]:
         """对比两个构建记录 (Story 3.4 Task 12)
 
         Args:
             build_id_1: 第一个构建 ID
             build_id_2: 第二个构建 ID
+            a2l_diff: 是否对比两次构建输出的 A2L 文件（结果在 'a2l_diff' 键中）
+            ignore_addresses: A2L 对比时是否忽略地址字段
 
         Returns:
             Dict[str, Any]: 对比结果
@@ -501,9 +542,50 @@ class BuildHistoryManager:
 
         comparison['config_diff'] = config_diff
 
+        if a2l_diff:
+            comparison['a2l_diff'] = self._compare_a2l_outputs(record_1, record_2, ignore_addresses)
+
         logger.info(f"对比构建记录: {build_id_1} vs {build_id_2}")
         return comparison
 
+    @staticmethod
+    def _first_a2l_output(record: BuildRecord) -> Optional[Path]:
+        """构建记录中第一个仍然存在的 A2L 输出文件"""
+        for file_path in record.output_files:
+            path = Path(file_path)
+            if path.suffix.lower() == '.a2l' and path.is_file():
+                return path
+        return None
+
+    def _compare_a2l_outputs(
+        self,
+        record_1: BuildRecord,
+        record_2: BuildRecord,
+        ignore_addresses: bool
+    ) -> Dict[str, Any]:
+        """对比两个构建记录的 A2L 输出文件
+
+        Args:
+            record_1: 第一个构建记录（旧）
+            record_2: 第二个构建记录（新）
+            ignore_addresses: 是否忽略地址字段
+
+        Returns:
+            Dict[str, Any]: A2LDiffResult.to_dict() 的结果；
+            任一构建没有 A2L 输出或对比失败时只包含 'error'
+        """
+        old_path = self._first_a2l_output(record_1)
+        new_path = self._first_a2l_output(record_2)
+        if old_path is None or new_path is None:
+            missing = record_1.build_id if old_path is None else record_2.build_id
+            return {'error': f"构建 {missing} 没有可用的 A2L 输出文件"}
+
+        try:
+            return A2LDiffer(ignore_addresses=ignore_addresses).diff(old_path, new_path).to_dict()
+        except (OSError, A2LParseError) as e:
+            logger.warning(f"A2L 文件对比失败: {e}")
+            return {'error': f"A2L 文件对比失败: {e}"}
+
     def get_all_records(self) -> List[BuildRecord]:
         """获取所有构建记录
 
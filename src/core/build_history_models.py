@@ -80,6 +80,7 @@ class StageExecutionRecord:
         error_message: Error message if failed
         output_files: List of output file IDs
         logs: Stage logs (optional)
+        cache_status: Stage cache result ("hit" or "miss", None if not cached)
     """
     stage_id: str
     build_id: str
@@ -91,6 +92,7 @@ class StageExecutionRecord:
     error_message: Optional[str] = None
     output_files: List[str] = field(default_factory=list)
     logs: Optional[str] = None
+    cache_status: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -109,6 +111,9 @@ class StageExecutionRecord:
         if self.end_time:
             data['end_time'] = self.end_time.isoformat()
 
+        if self.cache_status:
+            data['cache_status'] = self.cache_status
+
         return data
 
     @classmethod
@@ -0,0 +1,772 @@
+"""Local build queue service for MBD_CICDKits.
+
+A shared build PC runs one queue service; the GUI and the command line
+submit workflow jobs to it over a local socket instead of building
+directly, so concurrent builds no longer clobber each other's working
+directories (A2L tool directory cleanup, matlab_code_path clearing, ...).
+
+Jobs are ordered by priority (higher first, FIFO within a priority) and
+started on a process pool when their resource tokens are free:
+- workspace tokens: the job label and every working directory the build
+  writes to (core.batch.WORKSPACE_CONFIG_KEYS); overlapping paths conflict, and a job
+  holds its tokens for the whole build
+- tool tokens: cross-process semaphores for MATLAB / IAR, held only while
+  the corresponding stage runs (see core.workflow.STAGE_TOOLS)
+
+A waiting job also reserves its workspace tokens against lower-priority
+jobs, so a busy project cannot starve a high-priority job.
+
+The service listens on 127.0.0.1 with multiprocessing.connection and
+writes its address and auth key to a machine-wide service file, so every
+user account on the build PC finds the same service:
+    %PROGRAMDATA%/MBD_CICDKits/queue/service.json
+(<temp dir>/MBD_CICDKits/queue/ where PROGRAMDATA is not set, or the
+directory named by the MBD_CICDKITS_QUEUE_DIR environment variable).
+Clients read the service file, send one request dict per connection and
+receive one response dict.
+"""
+
+import dataclasses
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import secrets
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from datetime import datetime
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from core.batch import (
+    BatchJob,
+    BatchJobResult,
+    EVENT_DONE,
+    create_tool_slots,
+    init_batch_worker,
+    load_job_config,
+    run_batch_job,
+    tokens_conflict,
+    workspace_tokens
+)
+from utils.errors import BuildQueueError
+
+logger = logging.getLogger(__name__)
+
+# 默认同时运行的构建数
+DEFAULT_QUEUE_WORKERS = 2
+
+# 调度循环间隔（秒）
+QUEUE_POLL_INTERVAL = 0.2
+
+# 客户端等待响应的超时（秒）
+CLIENT_TIMEOUT = 10.0
+
+# 保留的已结束任务数
+MAX_FINISHED_JOBS = 50
+
+# 每个任务保留的事件数（超出时丢弃最早的事件）
+MAX_JOB_EVENTS = 5000
+
+# 任务状态
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+# 指定构建队列服务目录的环境变量
+QUEUE_DIR_ENV = "MBD_CICDKITS_QUEUE_DIR"
+
+
+def get_queue_dir() -> Path:
+    """获取构建队列服务目录
+
+    队列服务由整台构建机共用，服务信息和取消标记保存到机器级目录
+    %PROGRAMDATA%/MBD_CICDKits/queue/（未设置 PROGRAMDATA 时为系统临时目录下的
+    MBD_CICDKits/queue/）；设置环境变量 MBD_CICDKITS_QUEUE_DIR 时使用该目录。
+
+    Returns:
+        Path: 服务目录路径
+    """
+    queue_dir = os.environ.get(QUEUE_DIR_ENV)
+    if queue_dir:
+        return Path(queue_dir)
+    program_data = os.environ.get("PROGRAMDATA") or tempfile.gettempdir()
+    return Path(program_data) / "MBD_CICDKits" / "queue"
+
+
+def get_service_file() -> Path:
+    """获取默认的服务信息文件路径
+
+    Returns:
+        Path: 服务信息文件路径
+    """
+    return get_queue_dir() / "service.json"
+
+
+@dataclass
+class QueueJob:
+    """构建队列中的任务
+
+    Attributes:
+        job_id: 任务 ID
+        job: 构建任务
+        priority: 优先级（越大越先执行）
+        seq: 提交序号（同优先级按提交顺序执行）
+        tokens: 工作区令牌
+        state: 任务状态
+        submitted_at: 提交时间
+        started_at: 开始时间
+        finished_at: 结束时间
+        percent: 进度百分比
+        message: 最近的进度消息
+        cancel_requested: 是否已请求取消
+        result: 构建结果
+        events: 任务事件
+        dropped_events: 因超出 MAX_JOB_EVENTS 丢弃的事件数
+    """
+    job_id: str
+    job: BatchJob
+    priority: int = 0
+    seq: int = 0
+    tokens: List[str] = field(default_factory=list)
+    state: str = JOB_QUEUED
+    submitted_at: str = ""
+    started_at: str = ""
+    finished_at: str = ""
+    percent: int = 0
+    message: str = ""
+    cancel_requested: bool = False
+    result: Optional[BatchJobResult] = None
+    events: List[dict] = field(default_factory=list)
+    dropped_events: int = 0
+
+    def to_dict(self) -> dict:
+        """转换为字典（不含事件）
+
+        Returns:
+            任务字典
+        """
+        return {
+            "job_id": self.job_id,
+            "project": self.job.project,
+            "label": self.job.label,
+            "priority": self.priority,
+            "state": self.state,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "percent": self.percent,
+            "message": self.message,
+            "result": dataclasses.asdict(self.result) if self.result else None,
+        }
+
+
+class BuildQueue:
+    """构建队列：按优先级和资源令牌调度构建任务
+
+    线程安全；submit / cancel / 查询可以在任意线程中调用，poll() 在调度线程中
+    周期调用。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_QUEUE_WORKERS,
+        tool_limits: Optional[Dict[str, int]] = None,
+        work_dir: Optional[Path] = None
+    ):
+        """初始化构建队列
+
+        Args:
+            max_workers: 最大同时运行的构建数
+            tool_limits: 工具并发上限，覆盖 core.batch.DEFAULT_TOOL_LIMITS
+            work_dir: 取消标记目录（默认 get_queue_dir()）
+        """
+        self.max_workers = max(1, max_workers)
+        self._tool_slots = create_tool_slots(tool_limits)
+        self._events = multiprocessing.Queue()
+        self._cancel_dir = Path(work_dir or get_queue_dir()) / "cancel"
+
+        self._lock = threading.RLock()
+        self._jobs: Dict[str, QueueJob] = {}
+        self._futures: Dict[Future, str] = {}
+        self._seq = itertools.count(1)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def submit(self, job: BatchJob, priority: int = 0) -> QueueJob:
+        """提交构建任务
+
+        Args:
+            job: 构建任务
+            priority: 优先级（越大越先执行）
+
+        Returns:
+            QueueJob: 队列任务
+
+        Raises:
+            ConfigLoadError: 项目配置无法加载时抛出
+        """
+        config = load_job_config(job).to_dict()
+        config.update(job.overrides)
+
+        with self._lock:
+            queue_job = QueueJob(
+                job_id=uuid.uuid4().hex[:12],
+                job=job,
+                priority=priority,
+                seq=next(self._seq),
+                tokens=workspace_tokens(job.label, config),
+                submitted_at=datetime.now().isoformat()
+            )
+            self._jobs[queue_job.job_id] = queue_job
+            self._add_event(queue_job, {"type": JOB_QUEUED, "priority": priority})
+            logger.info(f"构建任务已排队: {queue_job.job_id} ({job.label}, 优先级 {priority})")
+            self._dispatch()
+            return queue_job
+
+    def cancel(self, job_id: str) -> bool:
+        """取消构建任务
+
+        排队中的任务直接取消；运行中的任务写入取消标记，由工作进程在
+        阶段间检查后停止。
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            bool: 是否已取消或已请求取消
+        """
+        with self._lock:
+            queue_job = self._jobs.get(job_id)
+            if not queue_job or queue_job.state in FINISHED_STATES:
+                return False
+
+            queue_job.cancel_requested = True
+            if queue_job.state == JOB_QUEUED:
+                self._finish(queue_job, JOB_CANCELLED, None)
+                self._dispatch()
+            else:
+                self._cancel_path(job_id).parent.mkdir(parents=True, exist_ok=True)
+                self._cancel_path(job_id).touch()
+                self._add_event(queue_job, {"type": "log", "message": "已请求取消构建"})
+            logger.info(f"已取消构建任务: {job_id}")
+            return True
+
+    def get_job(self, job_id: str) -> Optional[QueueJob]:
+        """获取任务
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            Optional[QueueJob]: 任务，不存在返回 None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[dict]:
+        """列出所有任务（按提交顺序）
+
+        Returns:
+            List[dict]: 任务字典列表
+        """
+        with self._lock:
+            return [queue_job.to_dict() for queue_job in self._jobs.values()]
+
+    def get_events(self, job_id: str, since: int = 0) -> Tuple[List[dict], int]:
+        """获取任务事件
+
+        Args:
+            job_id: 任务 ID
+            since: 上次返回的事件序号
+
+        Returns:
+            Tuple[List[dict], int]: (新事件列表, 下次查询的序号)
+
+        Raises:
+            KeyError: 任务不存在时抛出
+        """
+        with self._lock:
+            queue_job = self._jobs[job_id]
+            start = max(since - queue_job.dropped_events, 0)
+            events = queue_job.events[start:]
+            return list(events), queue_job.dropped_events + len(queue_job.events)
+
+    def poll(self) -> None:
+        """转发工作进程事件、收集完成的任务并启动可运行的任务"""
+        self._drain_events()
+        with self._lock:
+            pool_broken = False
+            for future in [f for f in self._futures if f.done()]:
+                queue_job = self._jobs[self._futures.pop(future)]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # 工作进程崩溃后进程池不能再使用，下次启动任务前重新创建
+                    pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+                    logger.error(f"构建任务 {queue_job.job_id} 工作进程异常: {e}")
+                    result = BatchJobResult(label=queue_job.job.label, project=queue_job.job.project,
+                                            error=f"工作进程异常: {e}")
+                self._cancel_path(queue_job.job_id).unlink(missing_ok=True)
+
+                if result.success:
+                    state = JOB_COMPLETED
+                elif queue_job.cancel_requested:
+                    state = JOB_CANCELLED
+                else:
+                    state = JOB_FAILED
+                self._finish(queue_job, state, result)
+            if pool_broken:
+                self._reset_executor()
+            self._dispatch()
+
+    def run_forever(self, stop_event: threading.Event) -> None:
+        """周期调度，直到 stop_event 被设置
+
+        Args:
+            stop_event: 停止事件
+        """
+        while not stop_event.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("构建队列调度异常")
+            stop_event.wait(QUEUE_POLL_INTERVAL)
+
+    def shutdown(self) -> None:
+        """取消所有任务并关闭工作进程池（等待运行中的构建停止）"""
+        with self._lock:
+            for job_id in list(self._jobs):
+                self.cancel(job_id)
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=True)
+        self.poll()
+
+    def _dispatch(self) -> None:
+        """按优先级启动资源空闲的排队任务（调用方持有锁）"""
+        running = [j for j in self._jobs.values() if j.state == JOB_RUNNING]
+        waiting = sorted((j for j in self._jobs.values() if j.state == JOB_QUEUED),
+                         key=lambda j: (-j.priority, j.seq))
+        reserved: List[str] = []
+
+        for queue_job in waiting:
+            if len(running) >= self.max_workers:
+                break
+            blocked = any(tokens_conflict(queue_job.tokens, r.tokens) for r in running)
+            if blocked or tokens_conflict(queue_job.tokens, reserved):
+                # 为等待中的高优先级任务保留资源，避免被低优先级任务抢占
+                reserved.extend(queue_job.tokens)
+                continue
+            if self._start(queue_job):
+                running.append(queue_job)
+
+    def _start(self, queue_job: QueueJob) -> bool:
+        """在工作进程中启动任务（调用方持有锁）
+
+        进程池已损坏（工作进程崩溃）时重新创建一次，仍然失败则任务失败，
+        避免任务一直停留在队列中。
+
+        Args:
+            queue_job: 队列任务
+
+        Returns:
+            bool: 是否已启动
+        """
+        cancel_path = self._cancel_path(queue_job.job_id)
+        cancel_path.unlink(missing_ok=True)
+        args = (run_batch_job, queue_job.job, False, str(cancel_path), queue_job.job_id)
+
+        try:
+            future = self._get_executor().submit(*args)
+        except BrokenProcessPool:
+            logger.warning("构建工作进程池已损坏，重新创建")
+            self._reset_executor()
+            try:
+                future = self._get_executor().submit(*args)
+            except Exception as e:
+                logger.error(f"构建任务 {queue_job.job_id} 无法启动: {e}")
+                self._finish(queue_job, JOB_FAILED, BatchJobResult(
+                    label=queue_job.job.label, project=queue_job.job.project,
+                    error=f"工作进程池异常: {e}"))
+                return False
+        self._futures[future] = queue_job.job_id
+
+        queue_job.state = JOB_RUNNING
+        queue_job.started_at = datetime.now().isoformat()
+        self._add_event(queue_job, {"type": JOB_RUNNING})
+        logger.info(f"构建任务开始: {queue_job.job_id} ({queue_job.job.label})")
+        return True
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """获取工作进程池，首次使用时创建（调用方持有锁）
+
+        Returns:
+            ProcessPoolExecutor: 工作进程池
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=init_batch_worker,
+                initargs=(self._tool_slots, self._events)
+            )
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        """丢弃已损坏的工作进程池，下次启动任务时重新创建（调用方持有锁）"""
+        executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _finish(self, queue_job: QueueJob, state: str, result: Optional[BatchJobResult]) -> None:
+        """结束任务并清理过旧的已结束任务（调用方持有锁）
+
+        Args:
+            queue_job: 队列任务
+            state: 结束状态
+            result: 构建结果
+        """
+        queue_job.state = state
+        queue_job.result = result
+        queue_job.finished_at = datetime.now().isoformat()
+        if state == JOB_COMPLETED:
+            queue_job.percent = 100
+        self._add_event(queue_job, {"type": EVENT_DONE, "state": state,
+                                    "result": dataclasses.asdict(result) if result else None})
+        logger.info(f"构建任务结束: {queue_job.job_id} ({state})")
+
+        finished = [j for j in self._jobs.values() if j.state in FINISHED_STATES]
+        for old in finished[:-MAX_FINISHED_JOBS]:
+            del self._jobs[old.job_id]
+
+    def _drain_events(self) -> None:
+        """将工作进程事件转发到对应的运行中任务"""
+        while True:
+            try:
+                event = self._events.get_nowait()
+            except queue.Empty:
+                return
+            with self._lock:
+                queue_job = self._jobs.get(event.get("job"))
+                if queue_job and queue_job.state == JOB_RUNNING:
+                    if event["type"] == "progress":
+                        queue_job.percent = event["percent"]
+                        queue_job.message = event["message"]
+                    self._add_event(queue_job, event)
+
+    def _add_event(self, queue_job: QueueJob, event: dict) -> None:
+        """记录任务事件（调用方持有锁）
+
+        Args:
+            queue_job: 队列任务
+            event: 事件字典
+        """
+        queue_job.events.append(dict(event, job=queue_job.job_id, time=time.time()))
+        if len(queue_job.events) > MAX_JOB_EVENTS:
+            del queue_job.events[0]
+            queue_job.dropped_events += 1
+
+    def _cancel_path(self, job_id: str) -> Path:
+        """获取任务的取消标记文件路径
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            Path: 取消标记文件路径
+        """
+        return self._cancel_dir / job_id
+
+
+class BuildQueueServer:
+    """构建队列服务：在本地套接字上接收请求
+
+    请求为字典 {"cmd": ..., ...}，响应为 {"ok": True, ...} 或
+    {"ok": False, "error": ...}。支持的命令:
+        ping, submit(job, priority), cancel(job_id), status(job_id 可选),
+        events(job_id, since), shutdown
+    """
+
+    def __init__(
+        self,
+        build_queue: BuildQueue,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        service_file: Optional[Path] = None
+    ):
+        """初始化构建队列服务
+
+        Args:
+            build_queue: 构建队列
+            host: 监听地址（仅本机）
+            port: 监听端口（0 表示自动分配）
+            service_file: 服务信息文件路径（默认 get_service_file()）
+        """
+        self.build_queue = build_queue
+        self.service_file = Path(service_file or get_service_file())
+        self._authkey = secrets.token_bytes(16)
+        self._listener = Listener((host, port), authkey=self._authkey)
+        self._stop = threading.Event()
+        self._stopped = False
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """服务监听地址"""
+        return self._listener.address
+
+    def start(self) -> None:
+        """写入服务信息文件并启动接收线程和调度线程"""
+        self.service_file.parent.mkdir(parents=True, exist_ok=True)
+        info = {
+            "address": list(self.address),
+            "authkey": self._authkey.hex(),
+            "pid": os.getpid(),
+            "started_at": datetime.now().isoformat()
+        }
+        self.service_file.write_text(json.dumps(info, indent=2), encoding="utf-8")
+
+        self._threads = [
+            threading.Thread(target=self._accept_loop, name="build-queue-accept", daemon=True),
+            threading.Thread(target=self.build_queue.run_forever, args=(self._stop,),
+                             name="build-queue-scheduler", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"构建队列服务已启动: {self.address[0]}:{self.address[1]}")
+
+    def serve_forever(self) -> None:
+        """启动服务并阻塞，直到收到 shutdown 请求或 stop() 被调用"""
+        self.start()
+        try:
+            while not self._stop.wait(QUEUE_POLL_INTERVAL):
+                pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """停止服务，取消所有任务并删除服务信息文件"""
+        if self._stopped:
+            return
+        self._stopped = True
+        self._stop.set()
+        try:
+            # 连接一次以唤醒阻塞在 accept() 的接收线程
+            Client(self.address, authkey=self._authkey).close()
+        except OSError:
+            pass
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._listener.close()
+        self.build_queue.shutdown()
+
+        try:
+            info = json.loads(self.service_file.read_text(encoding="utf-8"))
+            if info.get("pid") == os.getpid():
+                self.service_file.unlink()
+        except (OSError, ValueError):
+            pass
+        logger.info("构建队列服务已停止")
+
+    def handle_request(self, request: dict) -> dict:
+        """处理一个请求
+
+        Args:
+            request: 请求字典
+
+        Returns:
+            dict: 响应字典
+        """
+        try:
+            cmd = request.get("cmd")
+            if cmd == "ping":
+                return {"ok": True}
+            if cmd == "submit":
+                job = BatchJob.from_dict(request["job"])
+                queue_job = self.build_queue.submit(job, int(request.get("priority", 0)))
+                return {"ok": True, "job_id": queue_job.job_id}
+            if cmd == "cancel":
+                return {"ok": True, "cancelled": self.build_queue.cancel(request["job_id"])}
+            if cmd == "status":
+                job_id = request.get("job_id")
+                if job_id:
+                    queue_job = self.build_queue.get_job(job_id)
+                    if not queue_job:
+                        return {"ok": False, "error": f"任务不存在: {job_id}"}
+                    return {"ok": True, "job": queue_job.to_dict()}
+                return {"ok": True, "jobs": self.build_queue.list_jobs()}
+            if cmd == "events":
+                events, next_seq = self.build_queue.get_events(request["job_id"], int(request.get("since", 0)))
+                return {"ok": True, "events": events, "next": next_seq}
+            if cmd == "shutdown":
+                self._stop.set()
+                return {"ok": True}
+            return {"ok": False, "error": f"未知命令: {cmd}"}
+        except KeyError as e:
+            return {"ok": False, "error": f"缺少参数或任务不存在: {e}"}
+        except Exception as e:
+            message = str(e).splitlines()[0]
+            logger.error(f"处理请求失败: {message}")
+            return {"ok": False, "error": message}
+
+    def _accept_loop(self) -> None:
+        """接收连接，每个连接在独立线程中处理"""
+        while not self._stop.is_set():
+            try:
+                conn = self._listener.accept()
+            except Exception as e:
+                if self._stop.is_set():
+                    return
+                logger.warning(f"拒绝连接: {e}")
+                continue
+            threading.Thread(target=self._handle_connection, args=(conn,), daemon=True).start()
+
+    def _handle_connection(self, conn) -> None:
+        """处理一个连接上的请求，直到客户端关闭连接
+
+        Args:
+            conn: 连接对象
+        """
+        with conn:
+            while not self._stop.is_set():
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                conn.send(self.handle_request(request))
+
+
+class BuildQueueClient:
+    """构建队列客户端"""
+
+    def __init__(self, service_file: Optional[Path] = None, timeout: float = CLIENT_TIMEOUT):
+        """初始化构建队列客户端
+
+        Args:
+            service_file: 服务信息文件路径（默认 get_service_file()）
+            timeout: 等待响应的超时（秒）
+        """
+        self.service_file = Path(service_file or get_service_file())
+        self.timeout = timeout
+
+    def ping(self) -> bool:
+        """检查服务是否可用
+
+        Returns:
+            bool: 服务是否可用
+        """
+        try:
+            self._request({"cmd": "ping"})
+            return True
+        except BuildQueueError:
+            return False
+
+    def submit(self, job: BatchJob, priority: int = 0) -> str:
+        """提交构建任务
+
+        Args:
+            job: 构建任务
+            priority: 优先级（越大越先执行）
+
+        Returns:
+            str: 任务 ID
+        """
+        return self._request({"cmd": "submit", "job": dataclasses.asdict(job), "priority": priority})["job_id"]
+
+    def cancel(self, job_id: str) -> bool:
+        """取消构建任务
+
+        Args:
+            job_id: 任务 ID
+
+        Returns:
+            bool: 是否已取消或已请求取消
+        """
+        return self._request({"cmd": "cancel", "job_id": job_id})["cancelled"]
+
+    def status(self, job_id: Optional[str] = None) -> Any:
+        """查询任务状态
+
+        Args:
+            job_id: 任务 ID（为空时返回所有任务）
+
+        Returns:
+            dict 或 List[dict]: 任务字典或任务字典列表
+        """
+        if job_id:
+            return self._request({"cmd": "status", "job_id": job_id})["job"]
+        return self._request({"cmd": "status"})["jobs"]
+
+    def events(self, job_id: str, since: int = 0) -> Tuple[List[dict], int]:
+        """获取任务事件
+
+        Args:
+            job_id: 任务 ID
+            since: 上次返回的事件序号
+
+        Returns:
+            Tuple[List[dict], int]: (新事件列表, 下次查询的序号)
+        """
+        response = self._request({"cmd": "events", "job_id": job_id, "since": since})
+        return response["events"], response["next"]
+
+    def shutdown(self) -> None:
+        """请求服务停止"""
+        self._request({"cmd": "shutdown"})
+
+    def _request(self, request: dict) -> dict:
+        """发送请求并等待响应
+
+        Args:
+            request: 请求字典
+
+        Returns:
+            dict: 响应字典
+
+        Raises:
+            BuildQueueError: 无法连接服务、超时或服务返回错误时抛出
+        """
+        try:
+            info = json.loads(self.service_file.read_text(encoding="utf-8"))
+            address = tuple(info["address"])
+            authkey = bytes.fromhex(info["authkey"])
+        except (OSError, ValueError, KeyError) as e:
+            raise BuildQueueError(f"构建队列服务未运行: {e}")
+
+        try:
+            with Client(address, authkey=authkey) as conn:
+                conn.send(request)
+                if not conn.poll(self.timeout):
+                    raise BuildQueueError("构建队列服务响应超时")
+                response = conn.recv()
+        except BuildQueueError:
+            raise
+        except Exception as e:
+            raise BuildQueueError(f"无法连接构建队列服务: {e}")
+
+        if not response.get("ok"):
+            raise BuildQueueError(response.get("error", "未知错误"), suggestions=[])
+        return response
+
+
+def is_queue_running(service_file: Optional[Path] = None) -> bool:
+    """检查构建队列服务是否可用
+
+    Args:
+        service_file: 服务信息文件路径（可选）
+
+    Returns:
+        bool: 服务是否可用
+    """
+    return BuildQueueClient(service_file, timeout=2.0).ping()
@@ -551,7 +551,8 @@ def load_custom_workflow(file_path: Path) -> tuple[Optional[WorkflowConfig], Opt
                 StageConfig(
                     name=stage["id"],  # 使用id作为name（内部标识）
                     enabled=stage["enabled"],
-                    timeout=stage.get("timeout", 300)  # 默认超时300秒
+                    timeout=stage.get("timeout", 300),  # 默认超时300秒
+                    depends_on=stage.get("depends_on")  # 可选，覆盖内置依赖规则
                 )
                 for stage in data["stages"]
             ]
@@ -782,11 +783,19 @@ def load_workflow_config(filepath: Path) -> tuple[list, list[str]]:
             # 解析其他字段
             timeout = stage_data.get("timeout", 300)
 
+            # 解析 depends_on 字段（可选，覆盖内置依赖规则）
+            depends_on = stage_data.get("depends_on")
+            if depends_on is not None and not (
+                    isinstance(depends_on, list) and all(isinstance(dep, str) for dep in depends_on)):
+                errors.append(f"阶段 '{stage_name}' 的 depends_on 字段必须是阶段名称列表")
+                depends_on = None
+
             # 创建 StageConfig 对象 (任务 5.4)
             stage = StageConfig(
                 name=stage_name,
                 enabled=enabled,
-                timeout=timeout
+                timeout=timeout,
+                depends_on=depends_on
             )
             stages.append(stage)
 
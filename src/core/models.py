@@ -8,7 +8,7 @@ import dataclasses
 import subprocess
 import time
 from dataclasses import dataclass, fields
-from typing import Optional, List, Dict, Callable
+from typing import Any, Optional, List, Dict, Callable
 from enum import Enum
 
 # 创建默认字段对象（在类外部创建，避免Python 3.11的bug）
@@ -135,18 +135,22 @@ class StageConfig:
     name: str = ""                    # 阶段名称（如 "matlab_gen", "iar_compile"）
     enabled: bool = True              # 是否启用此阶段
     timeout: int = 300                # 超时时间（秒）
+    depends_on: Optional[List[str]] = None  # 显式依赖的阶段（None 表示使用 STAGE_DEPENDENCIES）
 
     def to_dict(self) -> dict:
         """转换为字典
 
         Returns:
-            阶段配置字典
+            阶段配置字典（未声明 depends_on 时不包含该字段）
         """
-        return {
+        data = {
             "name": self.name,
             "enabled": self.enabled,
             "timeout": self.timeout
         }
+        if self.depends_on is not None:
+            data["depends_on"] = list(self.depends_on)
+        return data
 
     @classmethod
     def from_dict(cls, data: dict) -> "StageConfig":
@@ -421,6 +425,7 @@ class BuildContext:
         active_processes: 活跃进程字典
         temp_files: 临时文件列表
         last_activity_time: 最后活动时间（用于超时检测）
+        tool_slots: 工具并发许可（工具名 -> 信号量，批量构建时跨进程共享）
     """
     config: dict = dataclasses.field(default_factory=dict)
     state: dict = dataclasses.field(default_factory=dict)
@@ -440,6 +445,9 @@ class BuildContext:
     # Story 2.15 - 任务 15: 超时检测
     last_activity_time: float = dataclasses.field(default_factory=time.monotonic)
 
+    # 工具并发许可：执行占用 MATLAB/IAR 的阶段前先获取对应信号量
+    tool_slots: Dict[str, Any] = dataclasses.field(default_factory=dict)
+
     def log(self, message: str):
         """记录日志
 
@@ -587,6 +595,7 @@ class StageExecution:
         duration: 执行时长（秒）
         error_message: 错误消息
         output_files: 输出文件列表
+        cache_status: 阶段缓存状态（"hit"/"miss"，未使用缓存为空）
     """
     name: str = ""
     status: BuildState = BuildState.IDLE
@@ -595,6 +604,7 @@ class StageExecution:
     duration: float = 0.0
     error_message: str = ""
     output_files: List[str] = dataclasses.field(default_factory=list)
+    cache_status: str = ""
 
 
 @dataclass
@@ -0,0 +1,288 @@
+"""Build queue watcher thread for the GUI.
+
+Submits a build to the local build queue service (core.build_queue) and
+polls its events, re-emitting them with the same signals as WorkflowThread
+so MainWindow and WorkflowManager can treat both the same way.
+
+The job carries the full project configuration, so the service builds
+exactly what the GUI shows even if it runs under another user profile.
+Finished queue builds are saved to the local build history like direct
+builds, so delta HEX (find_latest_output_file) and build comparison see
+them too.
+"""
+
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QThread, pyqtSignal, QObject
+
+from core.batch import EVENT_DONE, EVENT_LOG, EVENT_PROGRESS, EVENT_STAGE, BatchJob
+from core.build_history_manager import get_history_manager
+from core.build_history_models import BuildRecord, StageExecutionRecord
+from core.build_queue import JOB_CANCELLED, JOB_COMPLETED, JOB_QUEUED, JOB_RUNNING, BuildQueueClient
+from core.models import BuildProgress, BuildState, ProjectConfig, StageStatus, WorkflowConfig
+from core.stage_cache import CACHE_HIT
+from utils.errors import BuildQueueError
+
+logger = logging.getLogger(__name__)
+
+# 查询队列事件的间隔（秒）
+WATCH_POLL_INTERVAL = 0.5
+
+# 连续查询失败多少次后放弃
+MAX_POLL_FAILURES = 10
+
+
+class QueueJobThread(QThread):
+    """构建队列任务监视线程
+
+    提交构建任务到构建队列服务，并将队列事件转换为与 WorkflowThread
+    相同的信号。取消请求转发给队列服务。
+
+    Signals:
+        progress_update(int, str): 进度百分比, 消息
+        stage_started(str): 阶段名称（队列构建不发出）
+        stage_complete(str, bool): 阶段名, 成功
+        log_message(str): 日志内容
+        error_occurred(str, list): 错误消息, 建议列表
+        build_finished(BuildState): 构建最终状态
+        progress_update_detailed(BuildProgress): 构建进度对象
+        build_cancelled(str, str): 构建取消信号 (阶段名称, 消息)
+    """
+
+    progress_update = pyqtSignal(int, str)
+    stage_started = pyqtSignal(str)
+    stage_complete = pyqtSignal(str, bool)
+    log_message = pyqtSignal(str)
+    error_occurred = pyqtSignal(str, list)
+    build_finished = pyqtSignal(BuildState)
+    progress_update_detailed = pyqtSignal(BuildProgress)
+    build_cancelled = pyqtSignal(str, str)
+
+    def __init__(self, project_config: ProjectConfig, workflow_config: WorkflowConfig,
+                 parent: Optional[QObject] = None, priority: int = 0,
+                 client: Optional[BuildQueueClient] = None):
+        """初始化构建队列任务监视线程
+
+        Args:
+            project_config: 项目配置
+            workflow_config: 工作流配置
+            parent: 父对象
+            priority: 任务优先级（越大越先执行）
+            client: 构建队列客户端（默认使用默认服务信息文件）
+        """
+        super().__init__(parent)
+
+        self.project_config = project_config
+        self.workflow_config = workflow_config
+        self.priority = priority
+        self.client = client or BuildQueueClient()
+        self.job_id = ""
+        self._cancel_sent = False
+        self._history_manager = get_history_manager()
+        self._build_record: Optional[BuildRecord] = None
+        self._stage_end_times: Dict[str, float] = {}
+
+        enabled = [s.name for s in workflow_config.stages if s.enabled]
+        self._progress = BuildProgress(
+            total_stages=len(enabled),
+            stage_statuses={name: StageStatus.PENDING for name in enabled}
+        )
+
+    def run(self) -> None:
+        """提交任务并监视，直到任务结束"""
+        job = BatchJob(
+            project=self.project_config.name,
+            workflow_config=self.workflow_config.to_dict(),
+            project_config=self.project_config.to_dict()
+        )
+        try:
+            self.job_id = self.client.submit(job, self.priority)
+        except BuildQueueError as e:
+            self.error_occurred.emit(f"提交到构建队列失败: {e.args[0]}", e.suggestions)
+            self.build_finished.emit(BuildState.FAILED)
+            return
+
+        logger.info(f"已提交到构建队列: {self.job_id}")
+        self.log_message.emit(self._add_timestamp(f"已提交到构建队列 (任务 {self.job_id})，等待资源..."))
+        self._progress.start_time = time.monotonic()
+        self.progress_update_detailed.emit(self._progress)
+
+        since = 0
+        failures = 0
+        while True:
+            if self.isInterruptionRequested() and not self._cancel_sent:
+                self.request_cancellation()
+
+            try:
+                events, since = self.client.events(self.job_id, since)
+                failures = 0
+            except BuildQueueError as e:
+                failures += 1
+                if failures >= MAX_POLL_FAILURES:
+                    self.error_occurred.emit(f"与构建队列服务的连接中断: {e.args[0]}", e.suggestions)
+                    self.build_finished.emit(BuildState.FAILED)
+                    return
+                events = []
+
+            for event in events:
+                if event["type"] == EVENT_DONE:
+                    self._finish(event)
+                    return
+                self._handle_event(event)
+
+            time.sleep(WATCH_POLL_INTERVAL)
+
+    def request_cancellation(self):
+        """请求取消构建（排队中的任务直接移出队列）"""
+        self._cancel_sent = True
+        if not self.job_id:
+            self.requestInterruption()
+            return
+        try:
+            self.client.cancel(self.job_id)
+            self.log_message.emit(self._add_timestamp("正在取消构建..."))
+        except BuildQueueError as e:
+            logger.error(f"取消构建队列任务失败: {e}")
+
+    def request_cancel(self):
+        """请求取消构建（request_cancellation 的别名）"""
+        self.request_cancellation()
+
+    def _handle_event(self, event: dict) -> None:
+        """将队列事件转换为信号
+
+        Args:
+            event: 队列事件
+        """
+        event_type = event["type"]
+        if event_type == JOB_QUEUED:
+            self.progress_update.emit(0, f"排队中（优先级 {event.get('priority', 0)}）")
+        elif event_type == JOB_RUNNING:
+            self.log_message.emit(self._add_timestamp("构建队列已开始执行任务"))
+            self._create_build_record()
+        elif event_type == EVENT_LOG:
+            self.log_message.emit(self._add_timestamp(event["message"]))
+        elif event_type == EVENT_PROGRESS:
+            self.progress_update.emit(event["percent"], event["message"])
+        elif event_type == EVENT_STAGE:
+            stage, success = event["stage"], event["success"]
+            self._stage_end_times[stage] = event.get("time", time.time())
+            self._progress.stage_statuses[stage] = StageStatus.COMPLETED if success else StageStatus.FAILED
+            if success:
+                self._progress.completed_stages += 1
+            self._progress.current_stage = stage
+            self._progress.percentage = 100.0 * self._progress.completed_stages / max(self._progress.total_stages, 1)
+            self._progress.elapsed_time = time.monotonic() - self._progress.start_time
+            self.stage_complete.emit(stage, success)
+            self.progress_update_detailed.emit(self._progress)
+
+    def _finish(self, event: dict) -> None:
+        """任务结束时发出最终信号
+
+        Args:
+            event: done 事件
+        """
+        state = event["state"]
+        result = event.get("result") or {}
+        self._save_build_record(state, result)
+        if state == JOB_COMPLETED:
+            self.log_message.emit(self._add_timestamp(
+                f"工作流执行完成，耗时: {result.get('duration', 0.0):.2f} 秒"))
+            self.build_finished.emit(BuildState.COMPLETED)
+        elif state == JOB_CANCELLED:
+            self.log_message.emit(self._add_timestamp("工作流已被用户取消"))
+            self.build_cancelled.emit(self._progress.current_stage, "构建被用户取消")
+            self.build_finished.emit(BuildState.CANCELLED)
+        else:
+            error = result.get("error") or "构建失败"
+            stage = result.get("failed_stage", "")
+            self.log_message.emit(self._add_timestamp(f"工作流执行失败: {error}"))
+            self.error_occurred.emit(f"阶段 {stage} 失败: {error}" if stage else error, [])
+            self.build_finished.emit(BuildState.FAILED)
+
+    def _create_build_record(self) -> None:
+        """任务开始执行时创建构建历史记录"""
+        try:
+            self._build_record = self._history_manager.create_build_record(
+                project_name=self.project_config.name,
+                workflow_name=self.workflow_config.name,
+                workflow_id=self.workflow_config.id,
+                config_snapshot={
+                    'project_name': self.project_config.name,
+                    'workflow_id': self.workflow_config.id,
+                    'workflow_name': self.workflow_config.name,
+                    'simulink_path': self.project_config.simulink_path,
+                    'matlab_code_path': self.project_config.matlab_code_path,
+                    'a2l_path': self.project_config.a2l_path,
+                    'target_path': self.project_config.target_path,
+                    'iar_project_path': self.project_config.iar_project_path,
+                    'queue_job_id': self.job_id,
+                }
+            )
+        except Exception as e:
+            logger.error(f"创建构建历史记录失败: {e}")
+
+    def _save_build_record(self, state: str, result: dict) -> None:
+        """任务结束时更新并保存构建历史记录（排队中被取消的任务没有记录）
+
+        Args:
+            state: 任务结束状态
+            result: BatchJobResult 字典
+        """
+        if not self._build_record:
+            return
+
+        try:
+            build_state = {JOB_COMPLETED: BuildState.COMPLETED,
+                           JOB_CANCELLED: BuildState.CANCELLED}.get(state, BuildState.FAILED)
+            build_id = self._build_record.build_id
+            durations = result.get("stage_durations", {})
+            cached = set(result.get("cached_stages", []))
+
+            stage_records = []
+            for stage, status in self._progress.stage_statuses.items():
+                if stage not in self._stage_end_times:
+                    continue
+                end_time = datetime.fromtimestamp(self._stage_end_times[stage])
+                duration = durations.get(stage)
+                stage_records.append(StageExecutionRecord(
+                    stage_id=f"{build_id}_{stage}",
+                    build_id=build_id,
+                    stage_name=stage,
+                    status=status,
+                    start_time=end_time - timedelta(seconds=duration or 0.0),
+                    end_time=end_time,
+                    duration=duration,
+                    error_message=result.get("error") if stage == result.get("failed_stage") else None,
+                    cache_status=CACHE_HIT if stage in cached else None
+                ))
+
+            self._history_manager.update_build_record(
+                build_id,
+                end_time=datetime.now(),
+                state=build_state,
+                duration=result.get("duration"),
+                progress_percent=100 if build_state == BuildState.COMPLETED else int(self._progress.percentage),
+                current_stage=None,
+                error_message=result.get("error") or None,
+                stage_results=stage_records,
+                output_files=list(result.get("output_files", []))
+            )
+            self._history_manager.save_build_record(build_id)
+            logger.info(f"保存构建历史记录: build_id={build_id}, state={build_state.value}")
+        except Exception as e:
+            logger.error(f"保存构建历史记录失败: {e}")
+
+    def _add_timestamp(self, message: str) -> str:
+        """添加 [HH:MM:SS] 时间戳到日志消息
+
+        Args:
+            message: 原始日志消息
+
+        Returns:
+            str: 带时间戳的日志消息
+        """
+        return f"{datetime.now().strftime('[%H:%M:%S]')} {message}"
@@ -0,0 +1,249 @@
+"""DAG-based stage scheduler for workflow execution.
+
+Runs the enabled stages of a workflow in dependency order. Stages whose
+dependencies have all completed are started together on a bounded
+worker pool, so independent stages overlap instead of waiting for each
+other.
+
+Dependencies come from core.workflow.STAGE_DEPENDENCIES (direct
+dependencies only) unless a stage declares its own with
+StageConfig.depends_on; an empty list makes the stage independent of
+every other stage. A dependency on a disabled stage is replaced by that
+stage's own dependencies, and a stage that is neither in the graph nor
+declares depends_on depends on the enabled stage before it, so unknown
+stages keep the sequential order of the workflow configuration.
+
+All callbacks are invoked on the thread that calls run(), which keeps
+BuildProgress and StageExecution updates single-threaded. When exactly
+one stage is ready and nothing else is running (or max_workers is 1), the
+stage runs inline on the calling thread; a pure dependency chain therefore
+executes exactly as the old sequential loop did.
+
+Usage:
+    scheduler = StageScheduler(enabled_stages, run_stage, max_workers=4)
+    result = scheduler.run()
+"""
+
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from core.models import StageConfig, StageResult, StageStatus
+
+logger = logging.getLogger(__name__)
+
+# 默认最大并行阶段数
+DEFAULT_MAX_PARALLEL_STAGES = 4
+
+# 等待运行中阶段时检查取消的间隔（秒）
+CANCEL_POLL_INTERVAL = 0.1
+
+
+@dataclass
+class ScheduleResult:
+    """调度执行结果
+
+    Attributes:
+        results: 已结束阶段的执行结果（按结束顺序）
+        failed_stage: 第一个失败的阶段名称（无失败为空）
+        cancelled: 是否因取消而停止
+        skipped: 未启动的阶段名称（失败或取消后）
+    """
+    results: Dict[str, StageResult] = field(default_factory=dict)
+    failed_stage: str = ""
+    cancelled: bool = False
+    skipped: List[str] = field(default_factory=list)
+
+    @property
+    def success(self) -> bool:
+        """所有阶段是否均执行成功"""
+        return not self.failed_stage and not self.cancelled and not self.skipped
+
+
+def build_stage_graph(
+    stages: List[StageConfig],
+    dependencies: Optional[Dict[str, List[str]]] = None
+) -> Dict[str, List[str]]:
+    """构建启用阶段之间的直接依赖图
+
+    阶段配置了 depends_on 时以其替代依赖规则中该阶段的依赖。
+
+    Args:
+        stages: 启用的阶段配置列表（按工作流顺序）
+        dependencies: 阶段依赖规则（可选，默认 STAGE_DEPENDENCIES）
+
+    Returns:
+        Dict[str, List[str]]: 阶段名称 -> 依赖的启用阶段名称列表
+    """
+    if dependencies is None:
+        from core.workflow import STAGE_DEPENDENCIES  # 动态导入避免循环依赖
+        dependencies = STAGE_DEPENDENCIES
+
+    names = [stage.name for stage in stages]
+    enabled = set(names)
+
+    def resolve(name: str, seen: set, direct: Optional[List[str]] = None) -> List[str]:
+        """将对禁用阶段的依赖替换为其自身依赖"""
+        resolved = []
+        for dep in dependencies.get(name, []) if direct is None else direct:
+            if dep in seen:
+                continue
+            seen.add(dep)
+            if dep in enabled:
+                resolved.append(dep)
+            else:
+                resolved.extend(resolve(dep, seen))
+        return resolved
+
+    graph = {}
+    for i, stage in enumerate(stages):
+        name = stage.name
+        if stage.depends_on is not None:
+            deps = resolve(name, {name}, stage.depends_on)
+        elif name in dependencies:
+            deps = resolve(name, {name})
+        else:
+            # 未知阶段保持配置中的顺序
+            deps = names[i - 1:i]
+        # 只保留在当前阶段之前配置的依赖，避免顺序颠倒的配置形成死锁
+        graph[name] = [dep for dep in dict.fromkeys(deps) if names.index(dep) < i]
+
+    return graph
+
+
+class StageScheduler:
+    """按依赖关系并行执行工作流阶段
+
+    失败或取消后不再启动新阶段，等待运行中的阶段结束后返回。
+    运行中的阶段通过 BuildContext.is_cancelled 自行响应取消。
+
+    Attributes:
+        stages: 启用的阶段配置列表
+        graph: 阶段依赖图
+        max_workers: 最大并行阶段数
+    """
+
+    def __init__(
+        self,
+        stages: List[StageConfig],
+        run_stage: Callable[[StageConfig], StageResult],
+        max_workers: int = DEFAULT_MAX_PARALLEL_STAGES,
+        dependencies: Optional[Dict[str, List[str]]] = None,
+        cancel_check: Optional[Callable[[], bool]] = None,
+        on_stage_start: Optional[Callable[[StageConfig], None]] = None,
+        on_stage_finish: Optional[Callable[[StageConfig, StageResult], None]] = None
+    ):
+        """初始化调度器
+
+        Args:
+            stages: 启用的阶段配置列表（按工作流顺序）
+            run_stage: 阶段执行函数，返回 StageResult
+            max_workers: 最大并行阶段数（小于 1 按 1 处理）
+            dependencies: 阶段依赖规则（可选，默认 STAGE_DEPENDENCIES）
+            cancel_check: 取消检查回调（可选）
+            on_stage_start: 阶段启动前回调（在调用 run() 的线程中执行）
+            on_stage_finish: 阶段结束后回调（在调用 run() 的线程中执行）
+        """
+        self.stages = list(stages)
+        self.graph = build_stage_graph(self.stages, dependencies)
+        self.max_workers = max(1, int(max_workers))
+        self._run_stage = run_stage
+        self._cancel_check = cancel_check
+        self._on_stage_start = on_stage_start
+        self._on_stage_finish = on_stage_finish
+
+    def run(self) -> ScheduleResult:
+        """执行所有阶段
+
+        Returns:
+            ScheduleResult: 调度执行结果
+        """
+        result = ScheduleResult()
+        pending = list(self.stages)
+        completed = set()
+        running: Dict[Future, StageConfig] = {}
+        executor = None
+
+        try:
+            while pending or running:
+                if not result.failed_stage and not result.cancelled and self._is_cancelled():
+                    logger.info("检测到取消请求，停止启动新阶段")
+                    result.cancelled = True
+
+                stopping = bool(result.failed_stage or result.cancelled)
+                ready = [] if stopping else [
+                    stage for stage in pending
+                    if all(dep in completed for dep in self.graph[stage.name])
+                ]
+
+                if not running and not ready:
+                    break
+
+                if ready and not running and (len(ready) == 1 or self.max_workers == 1):
+                    # 无法并行：直接在当前线程执行
+                    stage = ready[0]
+                    pending.remove(stage)
+                    self._start(stage)
+                    self._finish(stage, self._call(stage), result, completed)
+                    continue
+
+                for stage in ready[:self.max_workers - len(running)]:
+                    if executor is None:
+                        executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix="stage"
+                        )
+                    pending.remove(stage)
+                    self._start(stage)
+                    running[executor.submit(self._call, stage)] = stage
+
+                done, _ = wait(list(running), timeout=CANCEL_POLL_INTERVAL,
+                               return_when=FIRST_COMPLETED)
+                for future in [f for f in running if f in done]:
+                    stage = running.pop(future)
+                    self._finish(stage, future.result(), result, completed)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+        result.skipped = [stage.name for stage in pending]
+        return result
+
+    def _is_cancelled(self) -> bool:
+        """检查是否请求取消"""
+        return bool(self._cancel_check and self._cancel_check())
+
+    def _start(self, stage: StageConfig):
+        """通知阶段启动"""
+        if self._on_stage_start:
+            self._on_stage_start(stage)
+
+    def _call(self, stage: StageConfig) -> StageResult:
+        """执行阶段，异常转换为失败结果"""
+        try:
+            return self._run_stage(stage)
+        except Exception as e:
+            logger.exception(f"阶段 {stage.name} 执行异常: {e}")
+            return StageResult(
+                status=StageStatus.FAILED,
+                message=f"阶段 {stage.name} 执行异常: {str(e)}",
+                error=e,
+                suggestions=["检查阶段配置", "查看日志获取详细信息"]
+            )
+
+    def _finish(self, stage: StageConfig, stage_result: StageResult,
+                result: ScheduleResult, completed: set):
+        """记录阶段结果并通知阶段结束"""
+        result.results[stage.name] = stage_result
+
+        if stage_result.status == StageStatus.FAILED:
+            if not result.failed_stage:
+                result.failed_stage = stage.name
+        elif stage_result.status == StageStatus.CANCELLED:
+            result.cancelled = True
+        else:
+            completed.add(stage.name)
+
+        if self._on_stage_finish:
+            self._on_stage_finish(stage, stage_result)
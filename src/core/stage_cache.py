@@ -0,0 +1,382 @@
+"""Content-addressed stage result cache.
+
+Stages that take long but are deterministic in their inputs (MATLAB code
+generation, IAR compilation) declare a StageCacheSpec listing the config
+keys, input files and upstream state they depend on, and the state
+entries and files they produce. Before such a stage runs, StageCache
+hashes the declared inputs (and the tool version, when the spec can
+determine it) into a key. On a hit the recorded output files are copied
+back from the local artifact store and the recorded state entries are
+restored, so the stage is skipped; on a miss the stage runs and a
+successful result is stored under the key. Specs whose outputs are whole
+directories owned by the stage (clean_outputs) have them emptied first so
+stale files from another build do not survive a restore.
+
+The cache is opt-in (context.config["stage_cache"], see
+core.workflow.run_stage_executor): the key only covers what the spec
+declares, so projects with undeclared external dependencies must not
+enable it.
+
+Artifact store layout:
+    <cache_dir>/objects/<sha256[:2]>/<sha256>    output file contents
+    <cache_dir>/entries/<stage>/<key>.json       manifest (state, files, result)
+
+File contents are stored once per distinct hash, so entries of unchanged
+files share their objects. Only the newest max_entries manifests are kept
+per stage; unreferenced objects are removed when old entries are pruned.
+
+Hits and misses are recorded in context.state["stage_cache"] as
+{stage_name: "hit" | "miss"} for the build record.
+
+Usage:
+    cache = StageCache()
+    result = cache.run("matlab_gen", CACHE_SPEC, executor, stage_config, context)
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from core.models import BuildContext, StageResult, StageStatus
+from utils.file_hash import hash_file, referenced_files, walk_files
+
+logger = logging.getLogger(__name__)
+
+# 缓存格式版本（变化时所有旧条目失效）
+CACHE_VERSION = 1
+
+# 每个阶段保留的缓存条目数量
+DEFAULT_MAX_ENTRIES = 5
+
+# context.state 中记录命中情况的键
+CACHE_STATE_KEY = "stage_cache"
+CACHE_HIT = "hit"
+CACHE_MISS = "miss"
+
+
+def default_cache_dir() -> Path:
+    """获取默认的阶段缓存目录"""
+    return Path(tempfile.gettempdir()) / "mbd_cicdkits" / "stage_cache"
+
+
+@dataclass
+class StageCacheSpec:
+    """阶段缓存声明
+
+    Attributes:
+        config_keys: 影响阶段结果的配置项
+        input_paths: 返回输入文件或目录的函数（目录递归哈希；返回 None 表示
+            必需配置缺失，不使用缓存）
+        input_extensions: 目录中参与哈希的文件扩展名（空表示全部）
+        exclude_dirs: 目录中不参与哈希的子目录名（如生成物目录）
+        state_inputs: 上游阶段的 context.state 键，哈希其中引用的文件内容
+        state_outputs: 命中时恢复的 context.state 键
+        output_paths: 返回阶段输出文件或目录的函数（执行成功后调用）
+        tool_version: 返回外部工具版本的函数（参与缓存键；返回 None 表示
+            版本无法确定，不使用缓存）
+        clean_outputs: 命中时是否先删除输出路径（输出目录由阶段独占生成时使用）
+    """
+    config_keys: List[str] = field(default_factory=list)
+    input_paths: Callable[[BuildContext], Optional[List[Path]]] = lambda context: []
+    input_extensions: Tuple[str, ...] = ()
+    exclude_dirs: Tuple[str, ...] = ()
+    state_inputs: List[str] = field(default_factory=list)
+    state_outputs: List[str] = field(default_factory=list)
+    output_paths: Callable[[BuildContext], List[Path]] = lambda context: []
+    tool_version: Callable[[BuildContext], Optional[str]] = lambda context: ""
+    clean_outputs: bool = False
+
+
+class StageCache:
+    """阶段结果缓存
+
+    输入不完整（声明的输入路径不存在）时不使用缓存；缓存读写失败只记录
+    警告，阶段照常执行。
+
+    Attributes:
+        cache_dir: 缓存目录
+        max_entries: 每个阶段保留的条目数量
+    """
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """初始化缓存
+
+        Args:
+            cache_dir: 缓存目录（可选，默认系统临时目录下的 mbd_cicdkits/stage_cache）
+            max_entries: 每个阶段保留的条目数量
+        """
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_entries = max(1, max_entries)
+
+    def compute_key(self, stage_name: str, spec: StageCacheSpec,
+                    context: BuildContext) -> Optional[str]:
+        """计算阶段输入的缓存键
+
+        Args:
+            stage_name: 阶段名称
+            spec: 阶段缓存声明
+            context: 构建上下文
+
+        Returns:
+            Optional[str]: 缓存键，输入不完整时返回 None
+        """
+        input_paths = spec.input_paths(context)
+        if input_paths is None:
+            return None
+
+        tool_version = spec.tool_version(context)
+        if tool_version is None:
+            logger.debug(f"阶段 {stage_name} 的工具版本无法确定，不使用缓存")
+            return None
+
+        files = []
+        for path in input_paths:
+            path = Path(path)
+            if not path.exists():
+                logger.debug(f"阶段 {stage_name} 的输入不存在，不使用缓存: {path}")
+                return None
+            for file in walk_files(path, spec.input_extensions, spec.exclude_dirs):
+                files.append((str(file), hash_file(file)))
+
+        upstream = []
+        for key in spec.state_inputs:
+            for file in referenced_files(context.state.get(key)):
+                upstream.append((str(file), hash_file(file)))
+
+        material = {
+            "version": CACHE_VERSION,
+            "stage": stage_name,
+            "tool_version": tool_version,
+            "config": {key: context.config.get(key) for key in spec.config_keys},
+            "files": files,
+            "upstream": sorted(upstream),
+        }
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get_entry_path(self, stage_name: str, key: str) -> Path:
+        """获取缓存条目清单路径"""
+        return self.cache_dir / "entries" / stage_name / f"{key}.json"
+
+    def _get_object_path(self, digest: str) -> Path:
+        """获取文件内容对象路径"""
+        return self.cache_dir / "objects" / digest[:2] / digest
+
+    def restore(self, stage_name: str, key: str, context: BuildContext,
+                spec: Optional[StageCacheSpec] = None) -> Optional[StageResult]:
+        """恢复缓存的阶段输出
+
+        spec.clean_outputs 为 True 时先删除输出路径，恢复后的输出与缓存时完全一致。
+
+        Args:
+            stage_name: 阶段名称
+            key: 缓存键
+            context: 构建上下文
+            spec: 阶段缓存声明（可选）
+
+        Returns:
+            Optional[StageResult]: 阶段结果，未命中返回 None
+        """
+        entry_path = self.get_entry_path(stage_name, key)
+        if not entry_path.exists():
+            return None
+
+        try:
+            manifest = json.loads(entry_path.read_text(encoding='utf-8'))
+            objects = [(Path(item["path"]), self._get_object_path(item["sha256"]))
+                       for item in manifest["files"]]
+            if not all(obj.exists() for _, obj in objects):
+                logger.warning(f"阶段缓存对象缺失，忽略条目: {entry_path.name}")
+                return None
+
+            if spec is not None and spec.clean_outputs:
+                for output in spec.output_paths(context):
+                    output = Path(output)
+                    if output.is_dir():
+                        shutil.rmtree(output)
+                    elif output.exists():
+                        output.unlink()
+
+            for path, obj in objects:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(obj, path)
+        except Exception as e:
+            logger.warning(f"恢复阶段缓存失败: {entry_path}: {e}")
+            return None
+
+        context.state.update(manifest["state"])
+        os.utime(entry_path)  # 最近使用的条目在清理时保留
+
+        result = manifest["result"]
+        return StageResult(
+            status=StageStatus.COMPLETED,
+            message=f"{result['message']}（使用缓存结果）",
+            output_files=result["output_files"],
+            execution_time=0.0
+        )
+
+    def store(self, stage_name: str, key: str, spec: StageCacheSpec,
+              context: BuildContext, result: StageResult) -> Optional[Path]:
+        """保存阶段输出
+
+        写入失败只记录警告，不影响调用方。
+
+        Args:
+            stage_name: 阶段名称
+            key: 缓存键
+            spec: 阶段缓存声明
+            context: 构建上下文
+            result: 阶段执行结果
+
+        Returns:
+            Optional[Path]: 缓存条目清单路径，未保存返回 None
+        """
+        try:
+            output_paths = [Path(p) for p in spec.output_paths(context)]
+            missing = [p for p in output_paths if not p.exists()]
+            if missing:
+                logger.debug(f"阶段 {stage_name} 的输出不存在，不写入缓存: {missing[0]}")
+                return None
+
+            manifest = {
+                "version": CACHE_VERSION,
+                "stage": stage_name,
+                "state": {k: context.state[k] for k in spec.state_outputs if k in context.state},
+                "files": [],
+                "result": {
+                    "message": result.message,
+                    "output_files": list(result.output_files or []),
+                },
+            }
+            json.dumps(manifest["state"], ensure_ascii=False)  # 状态不可序列化时不写入缓存
+
+            for path in output_paths:
+                for file in walk_files(path):
+                    digest = hash_file(file)
+                    obj = self._get_object_path(digest)
+                    if not obj.exists():
+                        obj.parent.mkdir(parents=True, exist_ok=True)
+                        self._atomic_copy(file, obj)
+                    manifest["files"].append({"path": str(file), "sha256": digest})
+            encoded = json.dumps(manifest, indent=2, ensure_ascii=False)
+
+            entry_path = self.get_entry_path(stage_name, key)
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, temp_name = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    f.write(encoded)
+                os.replace(temp_name, entry_path)
+            except BaseException:
+                Path(temp_name).unlink(missing_ok=True)
+                raise
+
+        except Exception as e:
+            logger.warning(f"写入阶段缓存失败: {stage_name}: {e}")
+            return None
+
+        self._prune(stage_name)
+        logger.info(f"已写入阶段缓存: {stage_name} ({len(manifest['files'])} 个文件)")
+        return entry_path
+
+    def run(self, stage_name: str, spec: StageCacheSpec, executor: Callable,
+            stage_config, context: BuildContext) -> StageResult:
+        """带缓存执行阶段
+
+        Args:
+            stage_name: 阶段名称
+            spec: 阶段缓存声明
+            executor: 阶段执行函数 (stage_config, context) -> StageResult
+            stage_config: 阶段配置
+            context: 构建上下文
+
+        Returns:
+            StageResult: 阶段执行结果（命中时为恢复的结果）
+        """
+        try:
+            key = self.compute_key(stage_name, spec, context)
+        except OSError as e:
+            logger.warning(f"计算阶段缓存键失败，直接执行: {stage_name}: {e}")
+            key = None
+
+        if key is None:
+            return executor(stage_config, context)
+
+        records = context.state.setdefault(CACHE_STATE_KEY, {})
+        result = self.restore(stage_name, key, context, spec)
+        if result is not None:
+            records[stage_name] = CACHE_HIT
+            context.log(f"阶段 {stage_name} 输入未变化，使用缓存结果 ({key[:12]})")
+            return result
+
+        records[stage_name] = CACHE_MISS
+        result = executor(stage_config, context)
+
+        if (isinstance(result, StageResult) and result.status == StageStatus.COMPLETED
+                and not context.is_cancelled):
+            self.store(stage_name, key, spec, context, result)
+
+        return result
+
+    def clear(self, stage_name: Optional[str] = None) -> int:
+        """删除缓存条目
+
+        Args:
+            stage_name: 阶段名称（可选，默认删除全部）
+
+        Returns:
+            int: 删除的条目数量
+        """
+        entries_dir = self.cache_dir / "entries"
+        entries = list(entries_dir.glob(f"{stage_name or '*'}/*.json"))
+        for entry in entries:
+            entry.unlink()
+        self._collect_objects()
+        return len(entries)
+
+    def _prune(self, stage_name: str):
+        """只保留最近使用的 max_entries 个条目"""
+        entries = sorted(
+            (self.cache_dir / "entries" / stage_name).glob("*.json"),
+            key=lambda p: p.stat().st_mtime_ns,
+            reverse=True
+        )
+        if len(entries) <= self.max_entries:
+            return
+
+        for entry in entries[self.max_entries:]:
+            entry.unlink(missing_ok=True)
+        self._collect_objects()
+
+    def _collect_objects(self):
+        """删除不再被任何条目引用的文件内容对象"""
+        referenced = set()
+        for entry in (self.cache_dir / "entries").glob("*/*.json"):
+            try:
+                manifest = json.loads(entry.read_text(encoding='utf-8'))
+                referenced.update(item["sha256"] for item in manifest["files"])
+            except (OSError, ValueError, KeyError) as e:
+                logger.debug(f"跳过无法读取的缓存条目: {entry}: {e}")
+                return  # 无法确定引用关系时不删除对象
+
+        for obj in (self.cache_dir / "objects").glob("*/*"):
+            if obj.name not in referenced:
+                obj.unlink(missing_ok=True)
+
+    @staticmethod
+    def _atomic_copy(source: Path, target: Path):
+        """复制文件到临时文件后原子替换"""
+        fd, temp_name = tempfile.mkstemp(dir=target.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            shutil.copyfile(source, temp_name)
+            os.replace(temp_name, target)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
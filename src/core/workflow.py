@@ -5,6 +5,7 @@ Architecture Decision 1.3 (Configuration Validation) and workflow execution
 following Architecture Decision 1.1 (Stage Interface Pattern).
 """
 
+import importlib
 import logging
 import time
 from pathlib import Path
@@ -20,10 +21,20 @@ from core.models import (
     StageResult,
     StageStatus
 )
+from core.scheduler import DEFAULT_MAX_PARALLEL_STAGES, StageScheduler
+from core.stage_cache import StageCache
+from utils.resume import (
+    delete_resume_snapshot,
+    get_remaining_stages,
+    load_resume_snapshot,
+    save_resume_snapshot,
+    validate_resume_snapshot
+)
 
 # 类型注解导入（仅在类型检查时使用）
 if TYPE_CHECKING:
     from core.models import StageConfig
+    from core.stage_cache import StageCacheSpec
 
 logger = logging.getLogger(__name__)
 
@@ -232,6 +243,98 @@ def _execute_package(config, context) -> StageResult:
             suggestions=["确保 Story 2.11 和 Story 2.12 已正确实现"]
         )
 
+
+# 声明了阶段缓存（CACHE_SPEC）的阶段模块
+CACHEABLE_STAGES = {
+    "matlab_gen": "stages.matlab_gen",
+    "iar_compile": "stages.iar_compile",
+}
+
+
+def get_stage_cache_spec(stage_name: str) -> Optional["StageCacheSpec"]:
+    """获取阶段的缓存声明
+
+    Args:
+        stage_name: 阶段名称
+
+    Returns:
+        Optional[StageCacheSpec]: 缓存声明，阶段不支持缓存时返回 None
+    """
+    module_name = CACHEABLE_STAGES.get(stage_name)
+    if not module_name:
+        return None
+
+    try:
+        # 动态导入以避免循环依赖
+        module = importlib.import_module(module_name)
+    except ImportError as e:
+        logger.warning(f"无法导入 {module_name}，不使用阶段缓存: {e}")
+        return None
+    return getattr(module, "CACHE_SPEC", None)
+
+
+# 占用外部工具许可的阶段（阶段名 -> 工具名），用于批量构建时限制工具并发数
+STAGE_TOOLS = {
+    "matlab_gen": "matlab",
+    "iar_compile": "iar",
+}
+
+
+def _hold_tool_slot(executor: Callable, tool: str, slot) -> Callable:
+    """包装阶段执行器，执行期间占用一个工具许可
+
+    Args:
+        executor: 阶段执行器
+        tool: 工具名称
+        slot: 工具许可信号量
+
+    Returns:
+        Callable: 包装后的阶段执行器
+    """
+    def run(stage_config, context) -> StageResult:
+        if not slot.acquire(False):
+            context.log(f"等待 {tool} 许可...")
+            slot.acquire()
+        try:
+            return executor(stage_config, context)
+        finally:
+            slot.release()
+
+    return run
+
+
+def run_stage_executor(stage_config: "StageConfig", context: BuildContext) -> StageResult:
+    """执行注册的阶段执行器，支持缓存的阶段先查询阶段缓存
+
+    context.tool_slots 中有阶段所用工具的许可时，实际执行阶段前先获取许可
+    （缓存命中不占用许可）。
+
+    配置项:
+        stage_cache: 是否启用阶段缓存（默认 False；缓存键只包含阶段声明的输入）
+        stage_cache_dir: 阶段缓存目录（默认系统临时目录）
+
+    Args:
+        stage_config: 阶段配置
+        context: 构建上下文
+
+    Returns:
+        StageResult: 阶段执行结果
+    """
+    stage_name = stage_config.name
+    executor = STAGE_EXECUTORS[stage_name]
+
+    tool = STAGE_TOOLS.get(stage_name)
+    slot = context.tool_slots.get(tool) if tool else None
+    if slot is not None:
+        executor = _hold_tool_slot(executor, tool, slot)
+
+    spec = get_stage_cache_spec(stage_name) if context.config.get("stage_cache", False) else None
+    if spec is None:
+        return executor(stage_config, context)
+
+    cache = StageCache(context.config.get("stage_cache_dir") or None)
+    return cache.run(stage_name, spec, executor, stage_config, context)
+
 # 阶段依赖规则（Story 2.3 Task 2.2, Story 2.7 任务 6.3, Story 2.8 任务 5.3）
 STAGE_DEPENDENCIES = {
     "matlab_gen": [],           # 无依赖
@@ -796,20 +899,110 @@ def adjust_stage_dependencies(
                     logger.debug(f"后置阶段 {dep_name} 已禁用")
 
 
+def save_stage_snapshot(
+    context: BuildContext,
+    completed_stages: List[str],
+    workflow_id: str = ""
+) -> Optional[Path]:
+    """阶段完成后保存构建恢复快照
+
+    配置项:
+        resume_snapshots: 是否保存恢复快照（默认 True）
+        resume_dir: 快照目录（默认 %APPDATA%/MBD_CICDKits/resume）
+
+    Args:
+        context: 构建上下文
+        completed_stages: 已完成的阶段列表
+        workflow_id: 工作流 ID
+
+    Returns:
+        Optional[Path]: 快照文件路径，未保存返回 None
+    """
+    project_name = context.config.get("name", "")
+    if not project_name or not context.config.get("resume_snapshots", True):
+        return None
+
+    return save_resume_snapshot(
+        project_name,
+        context.config,
+        context.state,
+        completed_stages,
+        workflow_id=workflow_id,
+        resume_dir=context.config.get("resume_dir") or None
+    )
+
+
+def clear_stage_snapshot(context: BuildContext) -> bool:
+    """构建成功后删除恢复快照
+
+    Args:
+        context: 构建上下文
+
+    Returns:
+        bool: 是否删除了快照
+    """
+    project_name = context.config.get("name", "")
+    if not project_name:
+        return False
+    return delete_resume_snapshot(project_name, context.config.get("resume_dir") or None)
+
+
+def restore_stage_snapshot(context: BuildContext, stage_names: List[str]) -> List[str]:
+    """从恢复快照还原构建状态
+
+    快照不存在、配置已修改或引用的文件已变化时不恢复，返回空列表，
+    调用方执行完整构建。
+
+    Args:
+        context: 构建上下文
+        stage_names: 启用的阶段名称（按工作流顺序）
+
+    Returns:
+        List[str]: 快照中已完成、本次跳过的阶段名称
+    """
+    project_name = context.config.get("name", "")
+    snapshot = None
+    if project_name:
+        snapshot = load_resume_snapshot(project_name, context.config.get("resume_dir") or None)
+
+    if not snapshot:
+        context.log("未找到可恢复的构建快照，执行完整构建")
+        return []
+
+    problems = validate_resume_snapshot(snapshot, context.config)
+    if problems:
+        context.log(f"构建快照已失效（{len(problems)} 项变化），执行完整构建:")
+        for problem in problems[:10]:
+            context.log(f"  - {problem}")
+        return []
+
+    remaining = get_remaining_stages(snapshot, stage_names)
+    completed = [name for name in stage_names if name not in remaining]
+    context.state.update(snapshot["state"])
+    context.state["resumed_stages"] = completed
+
+    logger.info(f"从快照恢复构建: 跳过 {completed}")
+    context.log(f"从快照恢复构建（保存于 {snapshot.get('saved_at', '?')}），"
+                f"跳过已完成阶段: {', '.join(completed) or '无'}")
+    return completed
+
+
 def execute_workflow(
     workflow_config: WorkflowConfig,
     context: BuildContext,
     progress_callback: Optional[Callable[[int, str], None]] = None,
     stage_callback: Optional[Callable[[str, bool], None]] = None,
-    cancel_check: Optional[Callable[[], bool]] = None
+    cancel_check: Optional[Callable[[], bool]] = None,
+    resume: bool = False
 ) -> bool:
     """执行工作流 (Story 2.4 Task 2)
 
-    按顺序执行工作流中所有启用的阶段。
+    按依赖关系执行工作流中所有启用的阶段，相互独立的阶段在有界线程池中
+    并行执行（最大并行数由 context.config["max_parallel_stages"] 指定）。
 
     Architecture Decision 1.1:
     - 统一阶段签名
-    - 按顺序执行阶段
+    - 按依赖顺序执行阶段（见 core.scheduler）
     - 阶段间通过 BuildContext 传递状态
 
     Architecture Decision 2.1:
@@ -822,6 +1015,7 @@ def execute_workflow(
         progress_callback: 进度回调 (百分比, 消息)
         stage_callback: 阶段完成回调 (阶段名, 成功)
         cancel_check: 取消检查回调
+        resume: 是否从上次构建的恢复快照继续（跳过已完成阶段）
 
     Returns:
         bool: 是否全部成功
@@ -846,37 +1040,47 @@ def execute_workflow(
 
     total_stages = len(enabled_stages)
 
-    # 执行每个阶段
-    for i, stage_config in enumerate(enabled_stages):
-        # 检查取消
-        if cancel_check and cancel_check():
-            logger.info("工作流被取消")
-            context.log("工作流已被用户取消")
-            context.state["cancel_reason"] = "user_requested"
-            return False
+    # 恢复模式：还原快照中的状态，只执行未完成的阶段
+    resumed_stages = []
+    if resume:
+        resumed_stages = restore_stage_snapshot(context, [s.name for s in enabled_stages])
+        enabled_stages = [s for s in enabled_stages if s.name not in resumed_stages]
+    finished_stages = list(resumed_stages)
+    completed_stages = list(resumed_stages)
+    stage_start_times: Dict[str, float] = {}
+    stage_durations = context.state.setdefault("stage_durations", {})
+
+    def run_stage(stage_config: "StageConfig") -> StageResult:
+        stage_name = stage_config.name
+
+        # 执行阶段 (Story 2.5 - 任务 8)
+        if stage_name in STAGE_EXECUTORS:
+            # 使用注册的阶段执行器
+            context.log(f"阶段 {stage_name} 执行中...")
+            return run_stage_executor(stage_config, context)
+
+        # 占位实现 - 尚未实现的阶段
+        context.log(f"阶段 {stage_name} 尚未实现（占位实现）...")
+        return StageResult(
+            status=StageStatus.COMPLETED,
+            message=f"阶段 {stage_name} 执行成功 (占位实现)"
+        )
 
+    def on_stage_start(stage_config: "StageConfig"):
         # 更新进度
         stage_name = stage_config.name
-        progress = int((i / total_stages) * 100)
+        stage_start_times[stage_name] = time.monotonic()
+        progress = int((len(finished_stages) / total_stages) * 100)
 
         if progress_callback:
             progress_callback(progress, f"执行阶段: {stage_name}")
 
-        logger.info(f"开始执行阶段 {i+1}/{total_stages}: {stage_name}")
+        logger.info(f"开始执行阶段 {len(finished_stages) + 1}/{total_stages}: {stage_name}")
 
-        # 执行阶段 (Story 2.5 - 任务 8)
-        if stage_name in STAGE_EXECUTORS:
-            # 使用注册的阶段执行器
-            context.log(f"阶段 {stage_name} 执行中...")
-            executor = STAGE_EXECUTORS[stage_name]
-            result = executor(stage_config, context)
-        else:
-            # 占位实现 - 尚未实现的阶段
-            context.log(f"阶段 {stage_name} 尚未实现（占位实现）...")
-            result = StageResult(
-                status=StageStatus.COMPLETED,
-                message=f"阶段 {stage_name} 执行成功 (占位实现)"
-            )
+    def on_stage_finish(stage_config: "StageConfig", result: StageResult):
+        stage_name = stage_config.name
+        finished_stages.append(stage_name)
+        stage_durations[stage_name] = time.monotonic() - stage_start_times.get(stage_name, start_time)
 
         # 通知阶段完成
         if stage_callback:
@@ -886,17 +1090,45 @@ def execute_workflow(
         if result.status == StageStatus.FAILED:
             logger.error(f"阶段 {stage_name} 失败: {result.message}")
             context.log(f"阶段 {stage_name} 失败: {result.message}")
-            context.state["failed_stage"] = stage_name
-            context.state["failure_reason"] = result.message
+            if "failed_stage" not in context.state:
+                context.state["failed_stage"] = stage_name
+                context.state["failure_reason"] = result.message
 
             if progress_callback:
+                progress = int(((len(finished_stages) - 1) / total_stages) * 100)
                 progress_callback(progress, f"阶段失败: {stage_name}")
-
-            return False
+            return
 
         # 保存阶段输出到上下文
         context.state[f"{stage_name}_output"] = result.output_files or []
 
+        # 保存恢复快照，后续阶段失败时可从此处继续
+        if result.status == StageStatus.COMPLETED:
+            completed_stages.append(stage_name)
+            save_stage_snapshot(context, completed_stages, workflow_config.id)
+
+    # 按依赖关系执行阶段，相互独立的阶段并行执行
+    scheduler = StageScheduler(
+        enabled_stages,
+        run_stage,
+        max_workers=context.config.get("max_parallel_stages", DEFAULT_MAX_PARALLEL_STAGES),
+        cancel_check=cancel_check,
+        on_stage_start=on_stage_start,
+        on_stage_finish=on_stage_finish
+    )
+    schedule = scheduler.run()
+
+    if schedule.failed_stage:
+        return False
+
+    if schedule.cancelled or schedule.skipped:
+        logger.info("工作流被取消")
+        context.log("工作流已被用户取消")
+        context.state["cancel_reason"] = "user_requested"
+        return False
+
+    clear_stage_snapshot(context)
+
     # 计算总执行时间
     elapsed = time.monotonic() - start_time
     context.state["build_duration"] = elapsed
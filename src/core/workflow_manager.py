@@ -5,7 +5,7 @@ between UI and workflow execution.
 """
 
 import logging
-from typing import Optional
+from typing import Optional, Union
 
 from PyQt6.QtCore import QObject, Qt
 
@@ -15,6 +15,7 @@ from core.models import (
     BuildExecution,
     BuildState
 )
+from core.queue_thread import QueueJobThread
 from core.workflow_thread import WorkflowThread
 
 logger = logging.getLogger(__name__)
@@ -49,7 +50,7 @@ class WorkflowManager(QObject):
         """
         super().__init__(parent)
 
-        self.workflow_thread: Optional[WorkflowThread] = None
+        self.workflow_thread: Optional[Union[WorkflowThread, QueueJobThread]] = None
         self.current_execution: Optional[BuildExecution] = None
 
         logger.info("工作流管理器初始化完成")
@@ -58,7 +59,8 @@ class WorkflowManager(QObject):
         self,
         project_config: ProjectConfig,
         workflow_config: WorkflowConfig,
-        connections: Optional[dict] = None
+        connections: Optional[dict] = None,
+        resume: bool = False
     ) -> bool:
         """启动工作流 (Story 2.4 Task 8.2)
 
@@ -68,6 +70,7 @@ class WorkflowManager(QObject):
             project_config: 项目配置
             workflow_config: 工作流配置
             connections: 信号连接字典 {signal_name: callback}
+            resume: 是否从上次构建的恢复快照继续（跳过已完成阶段）
 
         Returns:
             bool: 是否成功启动
@@ -78,9 +81,55 @@ class WorkflowManager(QObject):
             return False
 
         # 创建工作流线程
-        self.workflow_thread = WorkflowThread(project_config, workflow_config, self)
+        self.workflow_thread = WorkflowThread(project_config, workflow_config, self, resume=resume)
 
         # 连接信号（使用 QueuedConnection 确保线程安全）
+        self._connect_signals(connections)
+
+        # 启动线程
+        logger.info(f"启动工作流: {workflow_config.name}")
+        self.workflow_thread.start()
+
+        return True
+
+    def submit_to_queue(
+        self,
+        project_config: ProjectConfig,
+        workflow_config: WorkflowConfig,
+        connections: Optional[dict] = None,
+        priority: int = 0
+    ) -> bool:
+        """提交构建到本地构建队列服务，并监视执行进度
+
+        使用 QueueJobThread 代替 WorkflowThread，信号与本地构建相同。
+
+        Args:
+            project_config: 项目配置
+            workflow_config: 工作流配置
+            connections: 信号连接字典 {signal_name: callback}
+            priority: 任务优先级（越大越先执行）
+
+        Returns:
+            bool: 是否成功启动
+        """
+        if self.is_running():
+            logger.warning("工作流已在运行中，无法提交新任务")
+            return False
+
+        self.workflow_thread = QueueJobThread(project_config, workflow_config, self, priority=priority)
+        self._connect_signals(connections)
+
+        logger.info(f"提交工作流到构建队列: {workflow_config.name}")
+        self.workflow_thread.start()
+
+        return True
+
+    def _connect_signals(self, connections: Optional[dict]):
+        """连接当前线程的信号到回调函数
+
+        Args:
+            connections: 信号连接字典 {signal_name: callback}
+        """
         # Story 2.4 Task 5.2: 使用 QueuedConnection
         if connections:
             if 'progress_update' in connections:
@@ -114,12 +163,6 @@ class WorkflowManager(QObject):
                     Qt.ConnectionType.QueuedConnection
                 )
 
-        # 启动线程
-        logger.info(f"启动工作流: {workflow_config.name}")
-        self.workflow_thread.start()
-
-        return True
-
     def stop_workflow(self) -> bool:
         """停止工作流 (Story 2.4 Task 7.3, 8.2)
 
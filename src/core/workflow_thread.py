@@ -24,6 +24,7 @@ from core.models import (
 )
 from core.build_history_manager import get_history_manager
 from core.build_history_models import BuildRecord, StageExecutionRecord
+from core.stage_cache import CACHE_HIT, CACHE_STATE_KEY
 
 # 类型注解导入（仅在类型检查时使用）
 if TYPE_CHECKING:
@@ -72,18 +73,21 @@ class WorkflowThread(QThread):
     # 定义取消信号 (Story 2.15 - 任务 9.1)
     build_cancelled = pyqtSignal(str, str)  # 阶段名称, 消息
 
-    def __init__(self, project_config: ProjectConfig, workflow_config: WorkflowConfig, parent: Optional[QObject] = None):
+    def __init__(self, project_config: ProjectConfig, workflow_config: WorkflowConfig,
+                 parent: Optional[QObject] = None, resume: bool = False):
         """初始化工作流线程
 
         Args:
             project_config: 项目配置
             workflow_config: 工作流配置
             parent: 父对象
+            resume: 是否从上次构建的恢复快照继续（跳过已完成阶段）
         """
         super().__init__(parent)
 
         self.project_config = project_config
         self.workflow_config = workflow_config
+        self.resume = resume
 
         # 构建执行信息
         self._build_execution = BuildExecution(
@@ -191,7 +195,8 @@ class WorkflowThread(QThread):
     def _execute_workflow_internal(self) -> bool:
         """执行工作流内部实现 (Story 2.4 Task 2.5)
 
-        按顺序执行工作流中所有启用的阶段。
+        按依赖关系执行工作流中所有启用的阶段，相互独立的阶段由
+        StageScheduler 并行执行；信号和进度更新均在本线程中发出。
 
         Story 2.14 - 任务 7.3, 7.4, 7.5:
         - 在执行每个阶段前后发出进度更新信号
@@ -205,7 +210,8 @@ class WorkflowThread(QThread):
         Returns:
             bool: 是否全部成功
         """
-        from core.workflow import STAGE_EXECUTORS  # 动态导入避免循环依赖
+        from core.scheduler import DEFAULT_MAX_PARALLEL_STAGES, StageScheduler
+        from core.workflow import clear_stage_snapshot, restore_stage_snapshot, save_stage_snapshot
         from src.utils.progress import calculate_progress, calculate_time_remaining
 
         # 获取启用的阶段
@@ -248,24 +254,37 @@ class WorkflowThread(QThread):
         for stage_config in enabled_stages:
             build_progress.stage_statuses[stage_config.name] = StageStatus.PENDING
 
+        # 恢复模式：还原快照中的状态，已完成阶段不再执行
+        resumed_stages = []
+        if self.resume:
+            resumed_stages = restore_stage_snapshot(self._context, [s.name for s in enabled_stages])
+            for stage_name in resumed_stages:
+                build_progress.stage_statuses[stage_name] = StageStatus.COMPLETED
+            build_progress.completed_stages = len(resumed_stages)
+            build_progress.percentage = calculate_progress(len(resumed_stages), total_stages)
+            enabled_stages = [s for s in enabled_stages if s.name not in resumed_stages]
+
         # 发射初始进度信号
         self.progress_update_detailed.emit(build_progress)
 
-        # 执行每个阶段
-        for i, stage_config in enumerate(enabled_stages):
+        stage_executions = {}
+        finished_stages = list(resumed_stages)
+        completed_stages = list(resumed_stages)
+        interrupted = []
+
+        def check_cancel() -> bool:
             # 检查中断标志 (Story 2.4 Task 7.4, Story 2.15 - 任务 3.5)
-            if self.isInterruptionRequested():
-                # 设置取消标志 (Story 2.15 - 任务 3.6)
+            if not self.isInterruptionRequested():
+                return False
+            if not interrupted:
+                # 设置取消标志，运行中的阶段据此停止 (Story 2.15 - 任务 3.6)
                 self._context.is_cancelled = True
                 logger.info("检测到中断请求，停止工作流执行")
                 self.log_message.emit("正在取消构建...")
+                interrupted.append(True)
+            return True
 
-                # 更新进度状态为取消
-                build_progress.current_stage = stage_config.name
-                build_progress.stage_statuses[stage_config.name] = StageStatus.CANCELLED
-                self.progress_update_detailed.emit(build_progress)
-                return False
-
+        def on_stage_start(stage_config: 'StageConfig'):
             # 更新当前阶段
             stage_name = stage_config.name
             self._build_execution.current_stage = stage_name
@@ -278,6 +297,7 @@ class WorkflowThread(QThread):
                 start_time=time.monotonic()
             )
             self._build_execution.stages.append(stage_execution)
+            stage_executions[stage_name] = stage_execution
 
             # Story 2.14 - 任务 7.3: 发射阶段开始进度信号
             build_progress.stage_statuses[stage_name] = StageStatus.RUNNING
@@ -285,17 +305,19 @@ class WorkflowThread(QThread):
             self.progress_update_detailed.emit(build_progress)
 
             # 计算进度 (Story 2.4 Task 6.2)
-            progress = int((i / total_stages) * 100)
+            progress = int((len(finished_stages) / total_stages) * 100)
             self._build_execution.progress_percent = progress
             build_progress.percentage = float(progress)
 
             # 发送进度更新信号
             self.progress_update.emit(progress, f"执行阶段: {stage_name}")
             self.stage_started.emit(stage_name)
-            logger.info(f"开始执行阶段 {i+1}/{total_stages}: {stage_name}")
+            logger.info(f"开始执行阶段 {len(resumed_stages) + len(stage_executions)}/{total_stages}: {stage_name}")
 
-            # 执行阶段
-            result = self._execute_stage(stage_config, self._context)
+        def on_stage_finish(stage_config: 'StageConfig', result: StageResult):
+            stage_name = stage_config.name
+            stage_execution = stage_executions[stage_name]
+            finished_stages.append(stage_name)
 
             # 记录阶段结束信息
             stage_execution.end_time = time.monotonic()
@@ -315,8 +337,9 @@ class WorkflowThread(QThread):
                 stage_execution.status = BuildState.CANCELLED
                 build_progress.stage_statuses[stage_name] = StageStatus.CANCELLED
 
-            # 保存输出文件
+            # 保存输出文件和阶段缓存状态
             stage_execution.output_files = result.output_files or []
+            stage_execution.cache_status = self._context.state.get(CACHE_STATE_KEY, {}).get(stage_name, "")
 
             # Story 2.14 - 任务 7.3: 计算并发射阶段完成后的进度
             build_progress.elapsed_time = time.monotonic() - build_progress.start_time
@@ -330,6 +353,11 @@ class WorkflowThread(QThread):
             )
             self.progress_update_detailed.emit(build_progress)
 
+            # 保存恢复快照，后续阶段失败时可从此处继续
+            if result.status.value == "completed":
+                completed_stages.append(stage_name)
+                save_stage_snapshot(self._context, completed_stages, self.workflow_config.id)
+
             # Story 3.3: 发射阶段执行时间信息
             if result.status.value == "completed":
                 time_msg = f"[{stage_name}] 执行时长: {stage_execution.duration:.2f} 秒"
@@ -345,19 +373,40 @@ class WorkflowThread(QThread):
                 error_msg = f"阶段 {stage_name} 失败: {result.message}"
                 logger.error(error_msg)
                 self.log_message.emit(self._add_timestamp(error_msg))
-                self._build_execution.error_message = error_msg
+                if not self._build_execution.error_message:
+                    self._build_execution.error_message = error_msg
 
                 # 发送错误信号
                 self.error_occurred.emit(
                     error_msg,
                     result.suggestions or ["检查日志获取详细信息"]
                 )
-
-                return False
             elif result.status.value == "cancelled":
                 logger.info(f"阶段 {stage_name} 已取消")
                 self.log_message.emit(self._add_timestamp(f"阶段 {stage_name} 已取消"))
-                return False
+
+        # 按依赖关系执行阶段，相互独立的阶段并行执行
+        # 回调均在本线程中执行，BuildProgress 无需加锁
+        scheduler = StageScheduler(
+            enabled_stages,
+            lambda stage_config: self._execute_stage(stage_config, self._context),
+            max_workers=self._context.config.get("max_parallel_stages", DEFAULT_MAX_PARALLEL_STAGES),
+            cancel_check=check_cancel,
+            on_stage_start=on_stage_start,
+            on_stage_finish=on_stage_finish
+        )
+        schedule = scheduler.run()
+
+        if interrupted and schedule.skipped:
+            # 更新进度状态为取消
+            build_progress.current_stage = schedule.skipped[0]
+            build_progress.stage_statuses[schedule.skipped[0]] = StageStatus.CANCELLED
+            self.progress_update_detailed.emit(build_progress)
+
+        if not schedule.success:
+            return False
+
+        clear_stage_snapshot(self._context)
 
         # 所有阶段完成，更新进度到 100%
         self._build_execution.progress_percent = 100
@@ -387,7 +436,7 @@ class WorkflowThread(QThread):
         - 在阶段执行前检查取消标志
         - 检测到取消时返回 CANCELLED 结果
         """
-        from core.workflow import STAGE_EXECUTORS  # 动态导入避免循环依赖
+        from core.workflow import STAGE_EXECUTORS, run_stage_executor  # 动态导入避免循环依赖
 
         stage_name = stage_config.name
 
@@ -409,11 +458,9 @@ class WorkflowThread(QThread):
                 message=f"阶段 {stage_name} 执行成功 (占位实现)"
             )
 
-        # 使用注册的执行器
-        executor = STAGE_EXECUTORS[stage_name]
-
         try:
-            result = executor(stage_config, context)
+            # 使用注册的执行器（支持缓存的阶段先查询阶段缓存）
+            result = run_stage_executor(stage_config, context)
 
             # 检查取消标志（阶段执行后）(Story 2.15 - 任务 2.4)
             if self.isInterruptionRequested() or context.is_cancelled:
@@ -573,6 +620,11 @@ class WorkflowThread(QThread):
             ""
         ]
 
+        # 阶段缓存命中信息
+        cached_stages = [s.name for s in completed_stages if s.cache_status == CACHE_HIT]
+        if cached_stages:
+            summary_lines.insert(-2, f"使用缓存的阶段: {', '.join(cached_stages)}")
+
         summary_msg = "\n".join(summary_lines)
         logger.info(summary_msg)
 
@@ -652,7 +704,8 @@ class WorkflowThread(QThread):
                     start_time=datetime.fromtimestamp(stage_execution.start_time),
                     end_time=datetime.fromtimestamp(stage_execution.end_time) if stage_execution.end_time else None,
                     duration=stage_execution.duration,
-                    error_message=stage_execution.error_message
+                    error_message=stage_execution.error_message,
+                    cache_status=stage_execution.cache_status or None
                 )
                 stage_records.append(stage_record)
 
@@ -0,0 +1,34 @@
+"""Intel HEX processing module for MBD_CICDKits.
+
+This module provides a pure Python Intel HEX implementation used to
+merge bootloader, flash driver and application images without the
+Windows HexMerge.bat script.
+
+Modules:
+    intel_hex: Intel HEX reader/writer and sparse memory image
+    merger: HEX merge engine with overlap detection
+    verifier: HEX vs ELF PT_LOAD segment verification
+    delta: sector-based delta HEX generation between builds
+"""
+
+from hexfile.intel_hex import MemoryImage, IntelHexError, HexOverlapError, read_hex, write_hex
+from hexfile.merger import HexMerger, HexMergeResult
+from hexfile.verifier import HexVerifyResult, HexVerifyError, verify_hex_against_elf
+from hexfile.delta import DeltaHexGenerator, DeltaHexResult, DeltaHexError, SectorMap
+
+__all__ = [
+    "MemoryImage",
+    "IntelHexError",
+    "HexOverlapError",
+    "read_hex",
+    "write_hex",
+    "HexMerger",
+    "HexMergeResult",
+    "HexVerifyResult",
+    "HexVerifyError",
+    "verify_hex_against_elf",
+    "DeltaHexGenerator",
+    "DeltaHexResult",
+    "DeltaHexError",
+    "SectorMap",
+]
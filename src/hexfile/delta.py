@@ -0,0 +1,512 @@
+"""Sector-based delta HEX generation between two builds.
+
+Bench rigs erase and program flash one sector at a time, so a rebuild
+that only touched a few calibration tables does not need the complete
+HEX to be reflashed. The delta generator compares the previous and the
+new HEX image sector by sector (using a configurable sector map) and
+emits a delta HEX holding only the data of the changed sectors, plus a
+JSON sector manifest listing which sectors to erase and program.
+
+Each sector is compared and hashed as one contiguous buffer: reading a
+sector, comparing it with the base sector and computing its SHA-256
+all run in C, so the cost is linear in the image size with one Python
+iteration per sector instead of per byte.
+
+Usage:
+    generator = DeltaHexGenerator(SectorMap(default_sector_size=0x4000))
+    result = generator.generate("Prev.hex", "New.hex", "New_delta.hex", "New_delta.json")
+    print(result.message)
+"""
+
+import hashlib
+import json
+import logging
+import time
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from hexfile.intel_hex import DEFAULT_RECORD_SIZE, MemoryImage, read_hex, write_hex
+
+logger = logging.getLogger(__name__)
+
+# 默认扇区大小（16 KB）
+DEFAULT_SECTOR_SIZE = 0x4000
+
+# Flash 擦除后的字节值
+ERASED_VALUE = 0xFF
+
+# 扇区操作
+ACTION_PROGRAM = "program"
+ACTION_ERASE = "erase"
+
+# 差分文件名后缀（<stem>_delta.hex / <stem>_delta.json）
+DELTA_SUFFIX = "_delta"
+
+
+class DeltaHexError(Exception):
+    """差分 HEX 错误
+
+    当扇区映射配置无效或地址不在扇区映射范围内时抛出。
+    """
+    pass
+
+
+@dataclass
+class SectorRegion:
+    """扇区大小相同的 Flash 区域
+
+    Attributes:
+        start: 起始地址
+        end: 结束地址（不含）
+        sector_size: 扇区大小（字节）
+    """
+    start: int
+    end: int
+    sector_size: int
+
+
+@dataclass
+class SectorChange:
+    """变化的扇区
+
+    Attributes:
+        start: 扇区起始地址
+        end: 扇区结束地址（不含）
+        action: program（擦除后编程新数据）或 erase（新镜像中无数据，仅擦除）
+        base_hash: 旧镜像扇区内容的 SHA-256
+        new_hash: 新镜像扇区内容的 SHA-256
+        data_bytes: 新镜像在该扇区中的数据字节数
+    """
+    start: int
+    end: int
+    action: str
+    base_hash: str
+    new_hash: str
+    data_bytes: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为清单条目"""
+        return {
+            "start": f"0x{self.start:08X}",
+            "end": f"0x{self.end:08X}",
+            "size": self.end - self.start,
+            "action": self.action,
+            "base_sha256": self.base_hash,
+            "new_sha256": self.new_hash,
+            "data_bytes": self.data_bytes,
+        }
+
+
+@dataclass
+class DeltaHexResult:
+    """差分 HEX 生成结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        base_path: 旧 HEX 文件路径
+        new_path: 新 HEX 文件路径
+        output_path: 差分 HEX 文件路径
+        manifest_path: 扇区清单文件路径
+        sectors_total: 参与比较的扇区数
+        changed_sectors: 变化的扇区
+        delta_bytes: 差分 HEX 中的数据字节数
+        full_bytes: 新 HEX 中的数据字节数
+        execution_time: 执行时长（秒）
+    """
+    success: bool = False
+    message: str = ""
+    base_path: str = ""
+    new_path: str = ""
+    output_path: str = ""
+    manifest_path: str = ""
+    sectors_total: int = 0
+    changed_sectors: List[SectorChange] = field(default_factory=list)
+    delta_bytes: int = 0
+    full_bytes: int = 0
+    execution_time: float = 0.0
+
+
+def _parse_int(value: Union[int, str]) -> int:
+    """解析整数配置（支持 "0x" 前缀的十六进制字符串）"""
+    return value if isinstance(value, int) else int(str(value), 0)
+
+
+class SectorMap:
+    """Flash 扇区映射
+
+    由若干扇区大小相同的区域组成（例如 TC3xx PFlash 16 KB 扇区、
+    DFlash 4 KB 扇区）。不在任何区域内的地址按 default_sector_size
+    对齐划分；default_sector_size 为 None 时视为配置错误。
+
+    Attributes:
+        regions: 按起始地址排序的区域列表
+        default_sector_size: 区域外地址使用的扇区大小
+    """
+
+    def __init__(
+        self,
+        regions: Sequence[SectorRegion] = (),
+        default_sector_size: Optional[int] = DEFAULT_SECTOR_SIZE
+    ):
+        """初始化扇区映射
+
+        Args:
+            regions: 区域列表
+            default_sector_size: 区域外地址使用的扇区大小（None 表示不允许）
+
+        Raises:
+            DeltaHexError: 区域无效或相互重叠
+        """
+        self.regions = sorted(regions, key=lambda r: r.start)
+        self.default_sector_size = default_sector_size
+
+        if default_sector_size is not None and default_sector_size <= 0:
+            raise DeltaHexError(f"扇区大小无效: {default_sector_size}")
+        for region in self.regions:
+            if region.sector_size <= 0 or region.end <= region.start:
+                raise DeltaHexError(
+                    f"扇区区域无效: 0x{region.start:08X}-0x{region.end:08X}, "
+                    f"扇区大小 {region.sector_size}"
+                )
+        for prev, region in zip(self.regions, self.regions[1:]):
+            if region.start < prev.end:
+                raise DeltaHexError(
+                    f"扇区区域重叠: 0x{prev.start:08X}-0x{prev.end:08X} 与 "
+                    f"0x{region.start:08X}-0x{region.end:08X}"
+                )
+
+        self._starts = [region.start for region in self.regions]
+
+    @classmethod
+    def from_config(
+        cls,
+        regions: Optional[Sequence[Union[Dict[str, Any], Sequence[Any]]]] = None,
+        default_sector_size: Optional[Union[int, str]] = DEFAULT_SECTOR_SIZE
+    ) -> "SectorMap":
+        """从配置值创建扇区映射
+
+        Args:
+            regions: 区域配置列表，每项为 {"start", "end", "sector_size"}
+                字典或 [start, end, sector_size] 列表，整数可写为 "0x..." 字符串
+            default_sector_size: 区域外地址使用的扇区大小（None 表示不允许）
+
+        Returns:
+            SectorMap: 扇区映射
+
+        Raises:
+            DeltaHexError: 配置格式错误
+        """
+        parsed = []
+        for item in regions or []:
+            try:
+                if isinstance(item, dict):
+                    values = (item["start"], item["end"], item["sector_size"])
+                else:
+                    values = tuple(item)
+                start, end, size = (_parse_int(v) for v in values)
+            except (KeyError, TypeError, ValueError) as e:
+                raise DeltaHexError(f"扇区映射配置格式错误: {item!r}") from e
+            parsed.append(SectorRegion(start, end, size))
+
+        if default_sector_size is not None:
+            try:
+                default_sector_size = _parse_int(default_sector_size)
+            except (TypeError, ValueError) as e:
+                raise DeltaHexError(f"扇区大小配置格式错误: {default_sector_size!r}") from e
+
+        return cls(parsed, default_sector_size)
+
+    def sector_of(self, address: int) -> Tuple[int, int]:
+        """获取地址所在扇区
+
+        Args:
+            address: 地址
+
+        Returns:
+            Tuple[int, int]: (扇区起始地址, 扇区结束地址)，结束地址不含
+
+        Raises:
+            DeltaHexError: 地址不在任何区域内且未配置默认扇区大小
+        """
+        index = bisect_right(self._starts, address) - 1
+        if index >= 0 and address < self.regions[index].end:
+            region = self.regions[index]
+            start = address - (address - region.start) % region.sector_size
+            return start, min(start + region.sector_size, region.end)
+
+        if self.default_sector_size is None:
+            raise DeltaHexError(f"地址 0x{address:08X} 不在扇区映射范围内")
+
+        start = address - address % self.default_sector_size
+        end = start + self.default_sector_size
+        # 默认扇区不跨入已配置的区域
+        if index + 1 < len(self.regions):
+            end = min(end, self.regions[index + 1].start)
+        if index >= 0:
+            start = max(start, self.regions[index].end)
+        return start, end
+
+    def iter_sectors(self, ranges: Sequence[Tuple[int, int]]) -> Iterator[Tuple[int, int]]:
+        """按地址顺序遍历与地址范围相交的扇区（不重复）
+
+        Args:
+            ranges: 按起始地址排序的 (起始地址, 结束地址) 列表
+
+        Yields:
+            Tuple[int, int]: (扇区起始地址, 扇区结束地址)
+        """
+        last_end = -1
+        for lo, hi in ranges:
+            pos = max(lo, last_end)
+            while pos < hi:
+                start, end = self.sector_of(pos)
+                yield start, end
+                last_end = pos = end
+
+    def to_list(self) -> List[Dict[str, Any]]:
+        """转换为清单中的扇区映射描述"""
+        return [
+            {
+                "start": f"0x{region.start:08X}",
+                "end": f"0x{region.end:08X}",
+                "sector_size": region.sector_size,
+            }
+            for region in self.regions
+        ]
+
+
+def _merge_ranges(*range_lists: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """合并多个镜像的地址范围"""
+    merged: List[Tuple[int, int]] = []
+    for lo, hi in sorted(r for ranges in range_lists for r in ranges):
+        if merged and lo <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], hi))
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def compare_sectors(
+    base: MemoryImage,
+    new: MemoryImage,
+    sector_map: SectorMap,
+    erased_value: int = ERASED_VALUE
+) -> Tuple[List[SectorChange], int]:
+    """按扇区比较两个内存镜像
+
+    空洞按擦除值处理：数据全为擦除值的区域与空洞视为相同。
+
+    Args:
+        base: 旧镜像
+        new: 新镜像
+        sector_map: 扇区映射
+        erased_value: Flash 擦除值
+
+    Returns:
+        Tuple[List[SectorChange], int]: (变化的扇区, 参与比较的扇区数)
+
+    Raises:
+        DeltaHexError: 地址不在扇区映射范围内
+    """
+    changes: List[SectorChange] = []
+    sectors_total = 0
+
+    for start, end in sector_map.iter_sectors(_merge_ranges(base.ranges(), new.ranges())):
+        sectors_total += 1
+        length = end - start
+        base_data = base.read(start, length, erased_value)
+        new_data = new.read(start, length, erased_value)
+        if base_data == new_data:
+            continue
+
+        data_bytes = sum(len(view) for _, view in new.iter_range(start, length))
+        changes.append(SectorChange(
+            start=start,
+            end=end,
+            action=ACTION_PROGRAM if data_bytes else ACTION_ERASE,
+            base_hash=hashlib.sha256(base_data).hexdigest(),
+            new_hash=hashlib.sha256(new_data).hexdigest(),
+            data_bytes=data_bytes
+        ))
+
+    return changes, sectors_total
+
+
+def build_delta_image(new: MemoryImage, changes: Sequence[SectorChange]) -> MemoryImage:
+    """提取新镜像中变化扇区的数据
+
+    Args:
+        new: 新镜像
+        changes: 变化的扇区
+
+    Returns:
+        MemoryImage: 差分镜像（保留新镜像的起始地址记录）
+    """
+    delta = MemoryImage()
+    for change in changes:
+        for lo, view in new.iter_range(change.start, change.end - change.start):
+            delta.add(lo, view.tobytes())
+            view.release()
+    delta.start_linear_address = new.start_linear_address
+    delta.start_segment_address = new.start_segment_address
+    return delta
+
+
+def delta_output_paths(hex_path: Path) -> Tuple[Path, Path]:
+    """获取 HEX 文件对应的差分 HEX 与扇区清单路径
+
+    Args:
+        hex_path: 新 HEX 文件路径
+
+    Returns:
+        Tuple[Path, Path]: (<stem>_delta.hex, <stem>_delta.json)
+    """
+    hex_path = Path(hex_path)
+    stem = hex_path.stem + DELTA_SUFFIX
+    return hex_path.with_name(stem + ".hex"), hex_path.with_name(stem + ".json")
+
+
+def is_delta_hex(path: Path) -> bool:
+    """判断文件是否为差分 HEX（用于从历史输出中排除）"""
+    return Path(path).stem.endswith(DELTA_SUFFIX)
+
+
+class DeltaHexGenerator:
+    """差分 HEX 生成器
+
+    比较旧/新两个 HEX 文件，输出只包含变化扇区数据的差分 HEX
+    以及扇区清单。
+    """
+
+    def __init__(
+        self,
+        sector_map: Optional[SectorMap] = None,
+        record_size: int = DEFAULT_RECORD_SIZE,
+        erased_value: int = ERASED_VALUE
+    ):
+        """初始化生成器
+
+        Args:
+            sector_map: 扇区映射（默认按 16 KB 均匀划分）
+            record_size: 输出文件每条数据记录的字节数
+            erased_value: Flash 擦除值
+        """
+        self.sector_map = sector_map or SectorMap()
+        self.record_size = record_size
+        self.erased_value = erased_value
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def generate(
+        self,
+        base_path: Path,
+        new_path: Path,
+        output_path: Path,
+        manifest_path: Optional[Path] = None
+    ) -> DeltaHexResult:
+        """生成差分 HEX 和扇区清单
+
+        Args:
+            base_path: 旧 HEX 文件路径（上一次构建的输出）
+            new_path: 新 HEX 文件路径
+            output_path: 差分 HEX 输出路径
+            manifest_path: 扇区清单输出路径（None 表示不生成）
+
+        Returns:
+            DeltaHexResult: 生成结果
+
+        Raises:
+            FileNotFoundError: 输入文件不存在
+            IntelHexError: HEX 格式错误
+            DeltaHexError: 地址不在扇区映射范围内
+        """
+        start_time = time.monotonic()
+        base_path, new_path, output_path = Path(base_path), Path(new_path), Path(output_path)
+        self._log(f"生成差分 HEX: {base_path.name} -> {new_path.name}")
+
+        base = read_hex(base_path)
+        new = read_hex(new_path)
+        changes, sectors_total = compare_sectors(base, new, self.sector_map, self.erased_value)
+
+        delta = build_delta_image(new, changes)
+        write_hex(delta, output_path, self.record_size)
+
+        result = DeltaHexResult(
+            success=True,
+            base_path=str(base_path),
+            new_path=str(new_path),
+            output_path=str(output_path),
+            sectors_total=sectors_total,
+            changed_sectors=changes,
+            delta_bytes=len(delta),
+            full_bytes=len(new)
+        )
+
+        if manifest_path is not None:
+            manifest_path = Path(manifest_path)
+            self.write_manifest(result, manifest_path)
+            result.manifest_path = str(manifest_path)
+
+        result.execution_time = time.monotonic() - start_time
+        result.message = (
+            f"差分 HEX 生成完成: {len(changes)}/{sectors_total} 个扇区变化, "
+            f"{result.delta_bytes:,}/{result.full_bytes:,} 字节, "
+            f"耗时 {result.execution_time:.2f} 秒"
+        )
+        for change in changes[:20]:
+            self._log(
+                f"  0x{change.start:08X} - 0x{change.end - 1:08X} {change.action} "
+                f"({change.data_bytes:,} 字节)"
+            )
+        if len(changes) > 20:
+            self._log(f"  ... 等 {len(changes)} 个扇区")
+        self._log(result.message)
+        return result
+
+    def write_manifest(self, result: DeltaHexResult, manifest_path: Path):
+        """写入扇区清单（JSON）
+
+        Args:
+            result: 生成结果
+            manifest_path: 清单文件路径
+        """
+        manifest = {
+            "base_hex": result.base_path,
+            "new_hex": result.new_path,
+            "delta_hex": result.output_path,
+            "erased_value": self.erased_value,
+            "default_sector_size": self.sector_map.default_sector_size,
+            "sector_map": self.sector_map.to_list(),
+            "summary": {
+                "sectors_total": result.sectors_total,
+                "sectors_changed": len(result.changed_sectors),
+                "sectors_erase_only": sum(
+                    1 for c in result.changed_sectors if c.action == ACTION_ERASE
+                ),
+                "delta_bytes": result.delta_bytes,
+                "full_bytes": result.full_bytes,
+            },
+            "sectors": [change.to_dict() for change in result.changed_sectors],
+        }
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, ensure_ascii=False)
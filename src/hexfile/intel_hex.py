@@ -0,0 +1,384 @@
+"""Intel HEX reader and writer with a sparse memory image.
+
+The memory image keeps the loaded data as a sorted list of contiguous
+segments (start address + bytearray) instead of a per-address dict, so
+multi-megabyte flash images stay compact and overlap checks are a
+bisect over the segment starts.
+
+Supported record types:
+    00 data, 01 end of file, 02 extended segment address,
+    03 start segment address, 04 extended linear address,
+    05 start linear address
+
+Usage:
+    image = read_hex("App.hex")
+    image.merge(read_hex("Boot.hex"))
+    write_hex(image, "Merged.hex")
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 记录类型
+RECORD_DATA = 0x00
+RECORD_EOF = 0x01
+RECORD_EXT_SEGMENT = 0x02
+RECORD_START_SEGMENT = 0x03
+RECORD_EXT_LINEAR = 0x04
+RECORD_START_LINEAR = 0x05
+
+# 写入时每条数据记录的默认字节数
+DEFAULT_RECORD_SIZE = 16
+
+# Intel HEX 可寻址的最大地址（32 位）
+MAX_ADDRESS = 0xFFFFFFFF
+
+
+class IntelHexError(Exception):
+    """Intel HEX 格式错误
+
+    当 HEX 记录格式、校验和或地址无效时抛出。
+    """
+    pass
+
+
+class HexOverlapError(IntelHexError):
+    """HEX 镜像地址重叠错误
+
+    Attributes:
+        overlaps: 重叠区域列表 (起始地址, 结束地址, 已有数据来源, 新数据来源)
+    """
+
+    def __init__(self, overlaps: List[Tuple[int, int, str, str]]):
+        self.overlaps = overlaps
+        details = ", ".join(
+            f"0x{start:08X}-0x{end - 1:08X} ({old} / {new})"
+            for start, end, old, new in overlaps[:10]
+        )
+        more = f" 等 {len(overlaps)} 处" if len(overlaps) > 10 else ""
+        super().__init__(f"HEX 数据地址重叠: {details}{more}")
+
+
+class MemoryImage:
+    """稀疏内存镜像
+
+    按起始地址排序的连续数据段列表，每段记录数据来源（文件名），
+    用于重叠报告。
+
+    Attributes:
+        start_linear_address: 起始线性地址（记录类型 05），未定义时为 None
+        start_segment_address: 起始段地址 CS:IP（记录类型 03），未定义时为 None
+    """
+
+    def __init__(self):
+        """初始化空镜像"""
+        self._starts: List[int] = []
+        self._segments: List[bytearray] = []
+        self._sources: List[str] = []
+        self.start_linear_address: Optional[int] = None
+        self.start_segment_address: Optional[int] = None
+
+    def __len__(self) -> int:
+        """镜像中的数据字节总数"""
+        return sum(len(data) for data in self._segments)
+
+    @property
+    def segment_count(self) -> int:
+        """数据段数量"""
+        return len(self._segments)
+
+    def segments(self) -> Iterator[Tuple[int, bytearray]]:
+        """按地址顺序遍历数据段
+
+        Yields:
+            Tuple[int, bytearray]: (起始地址, 数据)
+        """
+        return zip(self._starts, self._segments)
+
+    def ranges(self) -> List[Tuple[int, int]]:
+        """获取合并相邻段后的地址范围
+
+        Returns:
+            List[Tuple[int, int]]: (起始地址, 结束地址) 列表，结束地址不含
+        """
+        ranges: List[Tuple[int, int]] = []
+        for start, data in self.segments():
+            end = start + len(data)
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def add(self, address: int, data: bytes, source: str = "", overwrite: bool = False):
+        """写入一段数据
+
+        Args:
+            address: 起始地址
+            data: 数据
+            source: 数据来源（用于重叠报告）
+            overwrite: 与已有数据重叠时是否覆盖
+
+        Raises:
+            HexOverlapError: 与已有数据重叠且内容不同（overwrite=False）
+            IntelHexError: 地址超出 32 位范围
+        """
+        if not data:
+            return
+        end = address + len(data)
+        if address < 0 or end - 1 > MAX_ADDRESS:
+            raise IntelHexError(f"地址超出 32 位范围: 0x{address:X}")
+
+        # 快速路径：同一来源的顺序记录追加到最后一段
+        if self._starts and self._sources[-1] == source:
+            last_end = self._starts[-1] + len(self._segments[-1])
+            if address == last_end:
+                self._segments[-1] += data
+                return
+
+        first = bisect_right(self._starts, address) - 1
+        if first < 0 or self._starts[first] + len(self._segments[first]) <= address:
+            first += 1
+        last = bisect_left(self._starts, end)
+
+        if first == last:
+            self._starts.insert(first, address)
+            self._segments.insert(first, bytearray(data))
+            self._sources.insert(first, source)
+            return
+
+        if not overwrite:
+            conflicts = []
+            for index in range(first, last):
+                seg_start = self._starts[index]
+                seg_data = self._segments[index]
+                lo = max(address, seg_start)
+                hi = min(end, seg_start + len(seg_data))
+                if seg_data[lo - seg_start:hi - seg_start] != data[lo - address:hi - address]:
+                    conflicts.append((lo, hi, self._sources[index], source))
+            if conflicts:
+                raise HexOverlapError(conflicts)
+
+        # 重叠段与新数据合并为一段（新数据覆盖重叠部分）
+        new_start = min(address, self._starts[first])
+        new_end = max(end, self._starts[last - 1] + len(self._segments[last - 1]))
+        merged = bytearray(new_end - new_start)
+        for index in range(first, last):
+            offset = self._starts[index] - new_start
+            merged[offset:offset + len(self._segments[index])] = self._segments[index]
+        merged[address - new_start:end - new_start] = data
+
+        self._starts[first:last] = [new_start]
+        self._segments[first:last] = [merged]
+        self._sources[first:last] = [source]
+
+    def merge(self, other: "MemoryImage", overwrite: bool = False):
+        """合并另一个镜像
+
+        起始地址记录只在本镜像未定义时采用对方的值。
+
+        Args:
+            other: 待合并的镜像
+            overwrite: 重叠时是否用 other 的数据覆盖
+
+        Raises:
+            HexOverlapError: 地址重叠且内容不同（overwrite=False）
+        """
+        conflicts: List[Tuple[int, int, str, str]] = []
+        for (start, data), source in zip(other.segments(), other._sources):
+            try:
+                self.add(start, data, source, overwrite)
+            except HexOverlapError as e:
+                conflicts.extend(e.overlaps)
+        if conflicts:
+            raise HexOverlapError(conflicts)
+
+        if self.start_linear_address is None:
+            self.start_linear_address = other.start_linear_address
+        if self.start_segment_address is None:
+            self.start_segment_address = other.start_segment_address
+
+    def iter_range(self, address: int, length: int) -> Iterator[Tuple[int, memoryview]]:
+        """按地址顺序遍历与地址范围相交的数据（不复制）
+
+        Args:
+            address: 起始地址
+            length: 长度
+
+        Yields:
+            Tuple[int, memoryview]: (相交部分起始地址, 相交部分数据)
+        """
+        end = address + length
+        index = max(bisect_right(self._starts, address) - 1, 0)
+        while index < len(self._starts) and self._starts[index] < end:
+            seg_start = self._starts[index]
+            seg_data = self._segments[index]
+            lo = max(address, seg_start)
+            hi = min(end, seg_start + len(seg_data))
+            if lo < hi:
+                yield lo, memoryview(seg_data)[lo - seg_start:hi - seg_start]
+            index += 1
+
+    def read(self, address: int, length: int, fill: int = 0xFF) -> bytes:
+        """读取一段地址的数据，空洞以 fill 填充
+
+        Args:
+            address: 起始地址
+            length: 长度
+            fill: 空洞填充值
+
+        Returns:
+            bytes: 数据
+        """
+        buf = bytearray([fill]) * length
+        for lo, view in self.iter_range(address, length):
+            buf[lo - address:lo - address + len(view)] = view
+        return bytes(buf)
+
+
+def _parse_record(line: bytes, line_no: int, path: Path) -> Tuple[int, int, bytes]:
+    """解析并校验一条记录
+
+    Returns:
+        Tuple[int, int, bytes]: (记录类型, 地址偏移, 数据)
+    """
+    try:
+        raw = bytes.fromhex(line[1:].decode('ascii'))
+    except ValueError as e:
+        raise IntelHexError(f"{path.name}:{line_no}: 非法的十六进制字符") from e
+
+    if len(raw) < 5 or len(raw) != raw[0] + 5:
+        raise IntelHexError(f"{path.name}:{line_no}: 记录长度不正确")
+    if sum(raw) & 0xFF:
+        raise IntelHexError(f"{path.name}:{line_no}: 校验和错误")
+
+    return raw[3], (raw[1] << 8) | raw[2], raw[4:-1]
+
+
+def read_hex(path: Path, image: Optional[MemoryImage] = None) -> MemoryImage:
+    """读取 Intel HEX 文件
+
+    Args:
+        path: HEX 文件路径
+        image: 写入的目标镜像（可选，默认新建；与已有数据重叠时报错）
+
+    Returns:
+        MemoryImage: 内存镜像
+
+    Raises:
+        FileNotFoundError: 文件不存在
+        IntelHexError: 格式错误
+        HexOverlapError: 文件内或与目标镜像地址重叠
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"HEX 文件不存在: {path}")
+
+    image = image if image is not None else MemoryImage()
+    source = path.name
+    base = 0
+    eof = False
+
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    for line_no, line in enumerate(content.splitlines(), 1):
+        line = line.strip()
+        if not line:
+            continue
+        if eof:
+            raise IntelHexError(f"{path.name}:{line_no}: 文件结束记录之后还有数据")
+        if line[:1] != b':':
+            raise IntelHexError(f"{path.name}:{line_no}: 记录必须以 ':' 开头")
+
+        record_type, offset, data = _parse_record(line, line_no, path)
+
+        if record_type == RECORD_DATA:
+            image.add(base + offset, data, source)
+        elif record_type == RECORD_EOF:
+            eof = True
+        elif record_type == RECORD_EXT_LINEAR and len(data) == 2:
+            base = int.from_bytes(data, 'big') << 16
+        elif record_type == RECORD_EXT_SEGMENT and len(data) == 2:
+            base = int.from_bytes(data, 'big') << 4
+        elif record_type == RECORD_START_LINEAR and len(data) == 4:
+            image.start_linear_address = int.from_bytes(data, 'big')
+        elif record_type == RECORD_START_SEGMENT and len(data) == 4:
+            image.start_segment_address = int.from_bytes(data, 'big')
+        else:
+            raise IntelHexError(
+                f"{path.name}:{line_no}: 不支持的记录类型 {record_type:02X} 或数据长度错误"
+            )
+
+    if not eof:
+        logger.warning(f"HEX 文件缺少结束记录: {path}")
+
+    return image
+
+
+def _format_record(record_type: int, offset: int, data: bytes) -> str:
+    """生成一条记录（含换行）"""
+    body = bytes((len(data), (offset >> 8) & 0xFF, offset & 0xFF, record_type)) + data
+    checksum = (-sum(body)) & 0xFF
+    return f":{body.hex().upper()}{checksum:02X}\n"
+
+
+def iter_hex_records(image: MemoryImage, record_size: int = DEFAULT_RECORD_SIZE) -> Iterator[str]:
+    """按地址顺序生成镜像的全部 HEX 记录
+
+    数据记录不跨越 64 KiB 边界，高 16 位地址变化时插入扩展线性地址记录。
+
+    Args:
+        image: 内存镜像
+        record_size: 每条数据记录的字节数（1-255）
+
+    Yields:
+        str: 记录文本（含换行）
+    """
+    if not 1 <= record_size <= 255:
+        raise IntelHexError(f"记录长度必须在 1-255 之间: {record_size}")
+
+    upper = 0
+    for start, data in image.segments():
+        pos = 0
+        while pos < len(data):
+            address = start + pos
+            if address >> 16 != upper:
+                upper = address >> 16
+                yield _format_record(RECORD_EXT_LINEAR, 0, upper.to_bytes(2, 'big'))
+            offset = address & 0xFFFF
+            count = min(record_size, len(data) - pos, 0x10000 - offset)
+            yield _format_record(RECORD_DATA, offset, bytes(data[pos:pos + count]))
+            pos += count
+
+    if image.start_segment_address is not None:
+        yield _format_record(RECORD_START_SEGMENT, 0, image.start_segment_address.to_bytes(4, 'big'))
+    if image.start_linear_address is not None:
+        yield _format_record(RECORD_START_LINEAR, 0, image.start_linear_address.to_bytes(4, 'big'))
+    yield _format_record(RECORD_EOF, 0, b'')
+
+
+def write_hex(image: MemoryImage, path: Path, record_size: int = DEFAULT_RECORD_SIZE) -> int:
+    """写入 Intel HEX 文件（一次缓冲写入）
+
+    Args:
+        image: 内存镜像
+        path: 输出文件路径
+        record_size: 每条数据记录的字节数
+
+    Returns:
+        int: 写入的字节数
+
+    Raises:
+        IntelHexError: 记录长度无效
+    """
+    path = Path(path)
+    content = ''.join(iter_hex_records(image, record_size)).encode('ascii')
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return len(content)
@@ -0,0 +1,158 @@
+"""Native Intel HEX merge engine.
+
+Replaces the Windows-only HexMerge.bat step of the IAR compile stage:
+the bootloader, flash driver and application HEX images are loaded into
+one sparse memory image, checked for address overlaps and written out in
+a single buffered pass. No external process is spawned, so HEX merging
+also runs on Linux build agents.
+
+Usage:
+    merger = HexMerger()
+    result = merger.merge(["Boot.hex", "FlashDrv.hex", "App.hex"], "Merged.hex")
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from hexfile.intel_hex import (
+    DEFAULT_RECORD_SIZE,
+    MemoryImage,
+    read_hex,
+    write_hex
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HexMergeResult:
+    """HEX 合并结果
+
+    Attributes:
+        success: 是否成功
+        message: 结果消息
+        output_path: 输出文件路径
+        input_files: 输入文件列表（按合并顺序）
+        total_bytes: 合并后数据字节数
+        ranges: 合并后的地址范围 (起始地址, 结束地址)，结束地址不含
+        output_size: 输出文件大小（字节）
+        execution_time: 执行时长（秒）
+    """
+    success: bool = False
+    message: str = ""
+    output_path: str = ""
+    input_files: List[str] = field(default_factory=list)
+    total_bytes: int = 0
+    ranges: List[Tuple[int, int]] = field(default_factory=list)
+    output_size: int = 0
+    execution_time: float = 0.0
+
+
+class HexMerger:
+    """Intel HEX 合并器
+
+    按输入顺序合并多个 HEX 文件。默认地址重叠（内容不同）时报错；
+    allow_overwrite=True 时后面的文件覆盖前面的文件。
+    起始地址记录取第一个定义了起始地址的文件。
+    """
+
+    def __init__(
+        self,
+        record_size: int = DEFAULT_RECORD_SIZE,
+        allow_overwrite: bool = False
+    ):
+        """初始化合并器
+
+        Args:
+            record_size: 输出文件每条数据记录的字节数
+            allow_overwrite: 地址重叠时是否允许后面的文件覆盖
+        """
+        self.record_size = record_size
+        self.allow_overwrite = allow_overwrite
+        self._log_callback: Optional[Callable[[str], None]] = None
+
+    def set_log_callback(self, callback: Callable[[str], None]):
+        """设置日志回调函数
+
+        Args:
+            callback: 日志回调函数
+        """
+        self._log_callback = callback
+
+    def _log(self, message: str):
+        """记录日志
+
+        Args:
+            message: 日志消息
+        """
+        logger.info(message)
+        if self._log_callback:
+            self._log_callback(message)
+
+    def load(self, input_paths: Sequence[Path]) -> MemoryImage:
+        """按顺序读取并合并多个 HEX 文件
+
+        Args:
+            input_paths: 输入 HEX 文件路径列表
+
+        Returns:
+            MemoryImage: 合并后的内存镜像
+
+        Raises:
+            FileNotFoundError: 输入文件不存在
+            IntelHexError: HEX 格式错误
+            HexOverlapError: 地址重叠
+        """
+        image = MemoryImage()
+        for index, input_path in enumerate(input_paths, 1):
+            input_path = Path(input_path)
+            part = read_hex(input_path)
+            self._log(
+                f"[{index}/{len(input_paths)}] 读取 {input_path.name}: "
+                f"{len(part):,} 字节, {len(part.ranges())} 个地址范围"
+            )
+            image.merge(part, overwrite=self.allow_overwrite)
+        return image
+
+    def merge(self, input_paths: Sequence[Path], output_path: Path) -> HexMergeResult:
+        """合并多个 HEX 文件并写入输出文件
+
+        Args:
+            input_paths: 输入 HEX 文件路径列表（如 Boot、FlashDriver、App）
+            output_path: 输出 HEX 文件路径
+
+        Returns:
+            HexMergeResult: 合并结果
+
+        Raises:
+            FileNotFoundError: 输入文件不存在
+            IntelHexError: HEX 格式错误
+            HexOverlapError: 地址重叠
+        """
+        start_time = time.monotonic()
+        output_path = Path(output_path)
+        self._log(f"开始合并 {len(input_paths)} 个 HEX 文件 -> {output_path.name}")
+
+        image = self.load(input_paths)
+        output_size = write_hex(image, output_path, self.record_size)
+
+        result = HexMergeResult(
+            success=True,
+            output_path=str(output_path),
+            input_files=[str(p) for p in input_paths],
+            total_bytes=len(image),
+            ranges=image.ranges(),
+            output_size=output_size,
+            execution_time=time.monotonic() - start_time
+        )
+        result.message = (
+            f"HEX 合并完成: {result.total_bytes:,} 字节, {len(result.ranges)} 个地址范围, "
+            f"耗时 {result.execution_time:.2f} 秒"
+        )
+        for start, end in result.ranges:
+            self._log(f"  0x{start:08X} - 0x{end - 1:08X} ({end - start:,} 字节)")
+        self._log(result.message)
+        return result
@@ -31,6 +31,9 @@ from typing import Optional, Callable, List, Dict, Any
 
 from core.constants import get_stage_timeout
 from utils.errors import ProcessTimeoutError, ProcessExitCodeError, ProcessError
+from hexfile.intel_hex import IntelHexError
+from hexfile.merger import HexMerger
+from hexfile.verifier import HexVerifyError, verify_hex_against_elf
 
 logger = logging.getLogger(__name__)
 
@@ -481,6 +484,81 @@ class IarIntegration:
         except Exception as e:
             raise ProcessError("HexMerge", f"HexMerge.bat 执行失败: {e}")
 
+    def merge_hex_files(
+        self,
+        input_paths: List[str],
+        output_path: str,
+        allow_overwrite: bool = False
+    ) -> Dict[str, Any]:
+        """使用纯 Python 合并 HEX 文件（替代 HexMerge.bat）
+
+        Args:
+            input_paths: 输入 HEX 文件路径列表（按合并顺序，如 Boot、FlashDriver、App）
+            output_path: 输出 HEX 文件路径
+            allow_overwrite: 地址重叠时是否允许后面的文件覆盖
+
+        Returns:
+            合并结果字典（success, output_path, total_bytes, ranges, execution_time）
+
+        Raises:
+            ProcessError: 输入文件不存在、格式错误或地址重叠
+        """
+        merger = HexMerger(allow_overwrite=allow_overwrite)
+        merger.set_log_callback(self._log)
+
+        try:
+            result = merger.merge([Path(p) for p in input_paths], Path(output_path))
+        except (FileNotFoundError, IntelHexError) as e:
+            raise ProcessError("HexMerge", f"HEX 合并失败: {e}")
+
+        return {
+            "success": result.success,
+            "output_path": result.output_path,
+            "total_bytes": result.total_bytes,
+            "ranges": result.ranges,
+            "execution_time": result.execution_time
+        }
+
+    def verify_hex_contents(self, hex_path: str, elf_path: str) -> Dict[str, Any]:
+        """校验 HEX 文件是否包含 ELF 的全部可加载段（PT_LOAD）数据
+
+        Args:
+            hex_path: HEX 文件路径
+            elf_path: ELF 文件路径
+
+        Returns:
+            校验结果字典（is_valid, message, mismatches, bytes_checked, execution_time, error）
+        """
+        result = {
+            "is_valid": False,
+            "message": "",
+            "mismatches": [],
+            "bytes_checked": 0,
+            "execution_time": 0.0,
+            "error": None
+        }
+
+        try:
+            verify_result = verify_hex_against_elf(Path(hex_path), Path(elf_path))
+        except (FileNotFoundError, IntelHexError, HexVerifyError) as e:
+            result["error"] = f"HEX 内容校验失败: {e}"
+            return result
+
+        result["is_valid"] = verify_result.success
+        result["message"] = verify_result.message
+        result["mismatches"] = [
+            {"start": m.start, "end": m.end, "kind": m.kind}
+            for m in verify_result.mismatches
+        ]
+        result["bytes_checked"] = verify_result.bytes_checked
+        result["execution_time"] = verify_result.execution_time
+
+        self._log(f"{verify_result.message}（耗时 {verify_result.execution_time:.2f} 秒）")
+        for mismatch in verify_result.mismatches[:10]:
+            self._log(f"  不一致: {mismatch}")
+
+        return result
+
     def get_error_report(self, errors: List[Dict[str, Any]]) -> str:
         """生成结构化错误报告"""
         if not errors:
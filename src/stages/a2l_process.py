@@ -21,7 +21,7 @@ import shutil
 import time
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional, List, Tuple, Callable
+from typing import Optional, List, Tuple, Callable, Dict, Union
 
 from core.models import (
     StageConfig,
@@ -37,7 +37,17 @@ from core.models import A2LHeaderReplacementConfig
 # Pure Python A2L processing (ADR-005)
 from a2l.elf_parser import ELFParser, ELFParseError
 from a2l.a2l_parser import A2LParser, A2LParseError
-from a2l.address_updater import A2LAddressUpdater, AddressUpdateError
+from a2l.address_updater import A2LAddressUpdater, AddressUpdateError, AddressUpdateResult
+from a2l.dwarf_resolver import DWARFMemberResolver
+from a2l.elf_cache import DEFAULT_MAX_CACHE_BYTES, ELFIndexCache
+from a2l.parse_cache import A2LParseCache
+from a2l.chunked_processor import ChunkedA2LPostProcessor
+from a2l.cal_extractor import CalibrationExtractor, CalExtractError
+from a2l.address_validator import A2LAddressValidator, AddressValidationError
+from a2l.support_pruner import A2LSupportPruner, A2LPruneError
+from a2l.daq_optimizer import DAQOptimizer, DAQOptimizeError, DEFAULT_MAX_ODT_BYTES, DEFAULT_MAX_ENTRY_SIZE
+from a2l.document import A2LDocument
+from a2l.post_processor import A2LPostProcessor, A2LPostProcessError, PostProcessResult
 
 logger = logging.getLogger(__name__)
 
@@ -333,6 +343,10 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
     - 记录 A2L 文件验证结果
     - 记录阶段执行时长
 
+    可选：A2L 内容未变化时从与 A2L 文件同目录的解析缓存加载块索引
+    （context.config["a2l_parse_cache"]，默认关闭）；
+    超大 A2L 可使用内存映射解析器（context.config["a2l_memory_mapped_parser"]，默认关闭）。
+
     Args:
         config: 阶段配置（StageConfig 或 A2LProcessConfig 类型）
         context: 构建上下文
@@ -401,7 +415,12 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
         # 使用纯 Python 实现更新地址 (ADR-005)
         log_callback("使用 Python 解析 ELF 文件并更新 A2L 地址...")
 
-        updater = A2LAddressUpdater()
+        # A2L 内容未变化时从解析缓存（与 A2L 文件同目录）加载块索引
+        parse_cache = A2LParseCache() if context.config.get("a2l_parse_cache", False) else None
+        updater = A2LAddressUpdater(
+            memory_mapped=context.config.get("a2l_memory_mapped_parser", False),
+            parse_cache=parse_cache
+        )
         updater.set_log_callback(log_callback)
 
         try:
@@ -425,6 +444,9 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
             if result.unmatched_count > 0:
                 log_callback(f"未匹配变量列表: {', '.join(result.unmatched_variables[:10])}"
                            + ("..." if result.unmatched_count > 10 else ""))
+            if result.ambiguous_variables:
+                log_callback(f"叶子节点歧义变量（未更新）: {len(result.ambiguous_variables)}")
+                context.state["a2l_ambiguous_variables"] = result.ambiguous_variables
 
         except (ELFParseError, A2LParseError, AddressUpdateError) as e:
             error_msg = f"A2L 地址更新失败: {str(e)}"
@@ -573,8 +595,51 @@ def read_xcp_header_template(
         ])
 
 
+def _load_a2l_document(
+    a2l: Union[Path, A2LDocument],
+    log_callback: Callable[[str], None]
+) -> A2LDocument:
+    """获取 A2L 文档（已加载的文档直接返回，否则读取并解码一次）
+
+    Args:
+        a2l: A2L 文件路径或已加载的 A2L 文档
+        log_callback: 日志回调函数
+
+    Returns:
+        A2LDocument: A2L 文档
+
+    Raises:
+        FileNotFoundError: A2L 文件不存在
+        FileError: 文件读取失败
+    """
+    if isinstance(a2l, A2LDocument):
+        return a2l
+
+    a2l_path = Path(a2l)
+    if not a2l_path.exists():
+        error_msg = f"A2L 文件不存在: {a2l_path}"
+        log_callback(f"错误: {error_msg}")
+        logger.error(error_msg)
+
+        raise FileNotFoundError(error_msg)
+
+    # 编码检测与后处理引擎共用
+    try:
+        return A2LDocument.load(a2l_path)
+    except (OSError, A2LPostProcessError) as e:
+        error_msg = f"读取 A2L 文件失败: {a2l_path} - {str(e)}"
+        log_callback(f"错误: {error_msg}")
+        logger.error(error_msg)
+
+        raise FileError(error_msg, suggestions=[
+            "检查 A2L 文件编码",
+            "确保文件格式为 UTF-8 或 GBK",
+            "查看详细日志获取更多信息"
+        ])
+
+
 def find_xcp_header_section(
-    a2l_path: Path,
+    a2l: Union[Path, A2LDocument],
     log_callback: Callable[[str], None]
 ) -> Optional[Tuple[int, int]]:
     """定位 A2L 文件中的 XCP 头文件部分
@@ -586,7 +651,7 @@ def find_xcp_header_section(
     - 如果未找到 XCP 头文件部分，返回错误并提供建议（"检查A2L文件格式"）
 
     Args:
-        a2l_path: A2L 文件路径
+        a2l: A2L 文件路径或已加载的 A2L 文档
         log_callback: 日志回调函数
 
     Returns:
@@ -597,62 +662,30 @@ def find_xcp_header_section(
         FileNotFoundError: A2L 文件不存在
         FileError: 文件读取失败
     """
-    # 验证 A2L 文件存在
-    if not a2l_path.exists():
-        error_msg = f"A2L 文件不存在: {a2l_path}"
-        log_callback(f"错误: {error_msg}")
-        logger.error(error_msg)
-
-        raise FileNotFoundError(error_msg)
-
-    # 读取 A2L 文件内容
-    try:
-        with open(a2l_path, 'r', encoding='utf-8') as f:
-            a2l_content = f.read()
-    except UnicodeDecodeError:
-        try:
-            with open(a2l_path, 'r', encoding='gbk') as f:
-                a2l_content = f.read()
-        except Exception as e:
-            error_msg = f"读取 A2L 文件失败: {a2l_path} - {str(e)}"
-            log_callback(f"错误: {error_msg}")
-            logger.error(error_msg)
-
-            raise FileError(error_msg, suggestions=[
-                "检查 A2L 文件编码",
-                "确保文件格式为 UTF-8 或 GBK",
-                "查看详细日志获取更多信息"
-            ])
+    document = _load_a2l_document(a2l, log_callback)
 
     # 查找第一个 /end MOD_PAR 行 (任务 3.3)
-    match = XCP_HEADER_END_PATTERN.search(a2l_content)
+    end_pos = document.header_end()
 
-    if not match:
+    if end_pos is None:
         # 未找到结束标记 (任务 3.5)
-        error_msg = f"未找到 A2L 文件中的 /end MOD_PAR 标记: {a2l_path}"
+        error_msg = f"未找到 A2L 文件中的 /end MOD_PAR 标记: {document.path}"
         log_callback(f"错误: {error_msg}")
         logger.error(error_msg)
 
         return None
 
-    # 起始位置固定为 0，结束位置为匹配行之后
+    # 起始位置固定为 0，结束位置为匹配行的行尾
     start_pos = 0
-    # 包含匹配行的内容，找到该行的结束位置
-    line_end = match.end()
-    # 找到该行的实际结束（包括换行符）
-    while line_end < len(a2l_content) and a2l_content[line_end] not in ['\n', '\r']:
-        line_end += 1
-
-    end_pos = line_end
 
     log_callback(f"找到 XCP 头文件替换范围: 位置 {start_pos}-{end_pos} ({end_pos - start_pos:,} bytes)")
-    logger.info(f"找到 XCP 头文件替换范围: {a2l_path} 位置 {start_pos}-{end_pos}")
+    logger.info(f"找到 XCP 头文件替换范围: {document.path} 位置 {start_pos}-{end_pos}")
 
     return (start_pos, end_pos)
 
 
 def replace_xcp_header_content(
-    a2l_path: Path,
+    a2l: Union[Path, A2LDocument],
     header_section: Tuple[int, int],
     xcp_template: str,
     log_callback: Callable[[str], None]
@@ -665,8 +698,10 @@ def replace_xcp_header_content(
     - 记录替换操作日志（替换的行数、原始长度、新长度）
     - 处理编码问题（确保使用 UTF-8 或 A2L 文件原始编码）
 
+    传入 A2LDocument 时直接替换文档内容，不读取磁盘。
+
     Args:
-        a2l_path: A2L 文件路径
+        a2l: A2L 文件路径或已加载的 A2L 文档
         header_section: (start_pos, end_pos) 元组，表示 XCP 头文件的起始和结束位置
         xcp_template: XCP 头文件模板内容
         log_callback: 日志回调函数
@@ -680,36 +715,20 @@ def replace_xcp_header_content(
     start_pos, end_pos = header_section
 
     # 读取 A2L 文件完整内容 (任务 4.2)
-    try:
-        with open(a2l_path, 'r', encoding='utf-8') as f:
-            a2l_content = f.read()
-    except UnicodeDecodeError:
-        try:
-            with open(a2l_path, 'r', encoding='gbk') as f:
-                a2l_content = f.read()
-        except Exception as e:
-            error_msg = f"读取 A2L 文件失败: {a2l_path} - {str(e)}"
-            log_callback(f"错误: {error_msg}")
-            logger.error(error_msg)
-
-            raise FileError(error_msg, suggestions=[
-                "检查 A2L 文件编码",
-                "确保文件格式为 UTF-8 或 GBK",
-                "查看详细日志获取更多信息"
-            ])
+    document = _load_a2l_document(a2l, log_callback)
 
     # 计算原始 XCP 头文件长度 (任务 4.4)
     original_length = end_pos - start_pos
     new_length = len(xcp_template)
 
     # 替换 XCP 头文件部分 (任务 4.3)
-    updated_content = a2l_content[:start_pos] + xcp_template + a2l_content[end_pos:]
+    document.replace_range(start_pos, end_pos, xcp_template)
 
     # 记录替换操作日志 (任务 4.4)
     log_callback(f"替换 XCP 头文件内容: 原始长度 {original_length:,} bytes -> 新长度 {new_length:,} bytes")
     logger.info(f"替换 XCP 头文件内容: {original_length:,} -> {new_length:,} bytes")
 
-    return updated_content
+    return document.content
 
 
 def generate_timestamp(timestamp_format: str) -> str:
@@ -732,9 +751,28 @@ def generate_timestamp(timestamp_format: str) -> str:
     return datetime.now().strftime(timestamp_format)
 
 
+def _build_a2l_output_path(a2l_config: A2LHeaderReplacementConfig) -> Path:
+    """构建带时间戳的 A2L 输出文件路径
+
+    Args:
+        a2l_config: A2L 头文件替换配置
+
+    Returns:
+        输出文件路径：`{output_dir}/{output_prefix}{时间戳}.a2l`
+    """
+    # 生成时间戳 (任务 5.2)
+    timestamp = generate_timestamp(a2l_config.timestamp_format)
+
+    # 构建输出文件名 (任务 5.3)
+    output_filename = f"{a2l_config.output_prefix}{timestamp}.a2l"
+
+    output_dir = Path(a2l_config.output_dir) if a2l_config.output_dir else Path.cwd()
+    return output_dir / output_filename
+
+
 def save_updated_a2l_file(
     a2l_config: A2LHeaderReplacementConfig,
-    updated_content: str,
+    updated_content: Union[str, A2LDocument],
     log_callback: Callable[[str], None]
 ) -> Path:
     """保存更新后的 A2L 文件
@@ -747,7 +785,7 @@ def save_updated_a2l_file(
 
     Args:
         a2l_config: A2L 头文件替换配置
-        updated_content: 更新后的 A2L 文件内容
+        updated_content: 更新后的 A2L 文件内容或 A2L 文档
         log_callback: 日志回调函数
 
     Returns:
@@ -759,15 +797,12 @@ def save_updated_a2l_file(
     import tempfile
     import shutil
 
-    # 生成时间戳 (任务 5.2)
-    timestamp = generate_timestamp(a2l_config.timestamp_format)
+    if isinstance(updated_content, A2LDocument):
+        updated_content = updated_content.content
 
-    # 构建输出文件名 (任务 5.3)
-    output_filename = f"{a2l_config.output_prefix}{timestamp}.a2l"
-
-    # 构建输出文件路径
-    output_dir = Path(a2l_config.output_dir) if a2l_config.output_dir else Path.cwd()
-    output_path = output_dir / output_filename
+    # 构建输出文件路径 (任务 5.2, 5.3)
+    output_path = _build_a2l_output_path(a2l_config)
+    output_dir = output_path.parent
 
     # 创建输出目录（如果不存在）
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -817,7 +852,7 @@ def save_updated_a2l_file(
 
 
 def verify_a2l_replacement(
-    output_path: Path,
+    output: Union[Path, A2LDocument],
     xcp_template: str,
     log_callback: Callable[[str], None]
 ) -> bool:
@@ -829,47 +864,51 @@ def verify_a2l_replacement(
     - 可选：验证 A2L 文件语法完整性（使用 A2L 验证工具）
     - 记录验证结果到日志
 
+    传入 A2LDocument 时在保存前直接验证内存中的内容。
+
     Args:
-        output_path: 输出文件路径
+        output: 输出文件路径或待保存的 A2L 文档
         xcp_template: XCP 头文件模板内容（用于验证）
         log_callback: 日志回调函数
 
     Returns:
         True 如果验证成功，否则 False
     """
-    # 验证输出文件存在 (任务 6.2)
-    if not output_path.exists():
-        error_msg = f"输出文件不存在: {output_path}"
-        log_callback(f"验证失败: {error_msg}")
-        logger.error(error_msg)
-        return False
+    if isinstance(output, A2LDocument):
+        document = output
+        output_path = document.path
+        size_text = f"{len(document.content):,} 字符"
+    else:
+        output_path = Path(output)
 
-    # 验证文件大小合理 (任务 6.2)
-    file_size = output_path.stat().st_size
-    if file_size == 0:
-        error_msg = f"输出文件大小为 0: {output_path}"
-        log_callback(f"验证失败: {error_msg}")
-        logger.error(error_msg)
-        return False
+        # 验证输出文件存在 (任务 6.2)
+        if not output_path.exists():
+            error_msg = f"输出文件不存在: {output_path}"
+            log_callback(f"验证失败: {error_msg}")
+            logger.error(error_msg)
+            return False
 
-    # 验证输出文件包含 XCP 头文件模板内容 (任务 6.3)
-    try:
-        with open(output_path, 'r', encoding='utf-8') as f:
-            file_content = f.read()
-    except UnicodeDecodeError:
+        # 读取文件内容（utf-8 优先，失败时回退 gbk）
         try:
-            with open(output_path, 'r', encoding='gbk') as f:
-                file_content = f.read()
-        except Exception as e:
+            document = A2LDocument.load(output_path)
+        except (OSError, A2LPostProcessError) as e:
             error_msg = f"读取输出文件失败: {output_path} - {str(e)}"
             log_callback(f"验证失败: {error_msg}")
             logger.error(error_msg)
             return False
+        size_text = f"{output_path.stat().st_size:,} bytes"
+
+    # 验证文件大小合理 (任务 6.2)
+    if not document.content:
+        error_msg = f"输出文件大小为 0: {output_path}"
+        log_callback(f"验证失败: {error_msg}")
+        logger.error(error_msg)
+        return False
 
-    # 检查是否包含 XCP 头文件模板内容
+    # 检查是否包含 XCP 头文件模板内容 (任务 6.3)
     # 使用模板的前 100 个字符作为验证指纹
     template_fingerprint = xcp_template[:100] if len(xcp_template) >= 100 else xcp_template
-    if template_fingerprint not in file_content:
+    if template_fingerprint not in document.content:
         error_msg = f"输出文件未包含预期的 XCP 头文件内容: {output_path}"
         log_callback(f"验证失败: {error_msg}")
         logger.error(error_msg)
@@ -880,95 +919,89 @@ def verify_a2l_replacement(
     # Phase 2 可以添加 A2L 验证工具集成
 
     # 记录验证结果 (任务 6.5)
-    log_callback(f"A2L 文件替换验证成功: {output_path} ({file_size:,} bytes)")
-    logger.info(f"A2L 文件替换验证成功: {output_path} ({file_size:,} bytes)")
+    log_callback(f"A2L 文件替换验证成功: {output_path} ({size_text})")
+    logger.info(f"A2L 文件替换验证成功: {output_path} ({size_text})")
 
     return True
 
 
-def remove_if_data_xcp_blocks(
-    a2l_path: Path,
+def _post_process_a2l(
+    a2l: Union[Path, A2LDocument],
+    processor: A2LPostProcessor,
     log_callback: Callable[[str], None]
-) -> Tuple[bool, int]:
-    """删除 A2L 文件中的所有 IF_DATA XCP 块
+) -> PostProcessResult:
+    """用后处理引擎处理 A2L 文档
 
-    删除所有 /begin IF_DATA XCP ... /end IF_DATA 块。
-    这些是 Simulink 自动生成的 XCP 数据，需要删除后替换为自定义 XCP 头文件。
-
-    对应 MATLAB 脚本 A2LTool.m 的功能。
+    传入 A2LDocument 时只修改内存中的内容；传入路径时读取一次并原地写回。
 
     Args:
-        a2l_path: A2L 文件路径
+        a2l: A2L 文件路径或已加载的 A2L 文档
+        processor: 后处理器
         log_callback: 日志回调函数
 
     Returns:
-        (success, removed_count) 元组
-        - success: 是否处理成功
-        - removed_count: 删除的块数量
+        PostProcessResult: 处理结果
 
     Raises:
         FileNotFoundError: A2L 文件不存在
         FileError: 文件读写失败
     """
-    # 验证 A2L 文件存在
-    if not a2l_path.exists():
-        error_msg = f"A2L 文件不存在: {a2l_path}"
-        log_callback(f"错误: {error_msg}")
-        logger.error(error_msg)
-        raise FileNotFoundError(error_msg)
+    document = _load_a2l_document(a2l, log_callback)
+    result = processor.process_document(document)
 
-    # 读取 A2L 文件内容
-    try:
-        with open(a2l_path, 'r', encoding='utf-8-sig') as f:
-            content = f.read()
-    except UnicodeDecodeError:
+    if not isinstance(a2l, A2LDocument):
         try:
-            with open(a2l_path, 'r', encoding='gbk') as f:
-                content = f.read()
-        except Exception as e:
-            error_msg = f"读取 A2L 文件失败: {a2l_path} - {str(e)}"
+            document.save(document.path, encoding='utf-8', newline='\n')
+        except A2LPostProcessError as e:
+            error_msg = f"处理 A2L 文件失败: {document.path} - {str(e)}"
             log_callback(f"错误: {error_msg}")
             logger.error(error_msg)
             raise FileError(error_msg, suggestions=[
                 "检查 A2L 文件编码",
-                "确保文件格式为 UTF-8 或 GBK"
+                "确保文件格式为 UTF-8 或 GBK",
+                "检查文件权限和磁盘空间"
             ])
 
-    # 删除 IF_DATA XCP 块的正则表达式
-    # 匹配 /begin IF_DATA XCP 到 /end IF_DATA 之间的所有内容
-    start_marker = r'/begin\s+IF_DATA\s+XCP'
-    end_marker = r'/end\s+IF_DATA'
+    return result
 
-    # 使用正则表达式删除所有匹配的块
-    pattern = re.compile(
-        start_marker + r'.*?' + end_marker,
-        re.DOTALL | re.IGNORECASE
-    )
 
-    removed_count = len(pattern.findall(content))
-    result = pattern.sub('', content)
+def remove_if_data_xcp_blocks(
+    a2l: Union[Path, A2LDocument],
+    log_callback: Callable[[str], None]
+) -> Tuple[bool, int]:
+    """删除 A2L 文件中的所有 IF_DATA XCP 块
 
-    # 写入更新后的内容
-    try:
-        with open(a2l_path, 'w', encoding='utf-8', newline='\n') as f:
-            f.write(result)
-    except Exception as e:
-        error_msg = f"写入 A2L 文件失败: {a2l_path} - {str(e)}"
-        log_callback(f"错误: {error_msg}")
-        logger.error(error_msg)
-        raise FileError(error_msg, suggestions=[
-            "检查文件权限",
-            "检查磁盘空间"
-        ])
+    删除所有 /begin IF_DATA XCP ... /end IF_DATA 块。
+    这些是 Simulink 自动生成的 XCP 数据，需要删除后替换为自定义 XCP 头文件。
+
+    对应 MATLAB 脚本 A2LTool.m 的功能。
+
+    Args:
+        a2l: A2L 文件路径（原地写回）或已加载的 A2L 文档（只修改内存）
+        log_callback: 日志回调函数
+
+    Returns:
+        (success, removed_count) 元组
+        - success: 是否处理成功
+        - removed_count: 删除的块数量
 
+    Raises:
+        FileNotFoundError: A2L 文件不存在
+        FileError: 文件读写失败
+    """
+    # 单遍删除（与地址更新、头文件替换共用同一引擎）
+    processor = A2LPostProcessor(remove_if_data_xcp=True)
+    result = _post_process_a2l(a2l, processor, log_callback)
+
+    removed_count = result.if_data_removed
     log_callback(f"IF_DATA XCP 块删除完成: 删除了 {removed_count} 个块")
-    logger.info(f"IF_DATA XCP 块删除完成: {a2l_path} 删除了 {removed_count} 个块")
+    logger.info(f"IF_DATA XCP 块删除完成: 删除了 {removed_count} 个块")
 
     return True, removed_count
 
 
 def filter_zero_address_variables(
-    a2l_path: Path,
+    a2l: Union[Path, A2LDocument],
     log_callback: Callable[[str], None]
 ) -> Tuple[bool, int, int]:
     """过滤掉地址为 0x0000 的 CHARACTERISTIC 变量
@@ -977,7 +1010,7 @@ def filter_zero_address_variables(
     这些变量在 ELF 文件中找不到对应符号，地址更新失败。
 
     Args:
-        a2l_path: A2L 文件路径
+        a2l: A2L 文件路径（原地写回）或已加载的 A2L 文档（只修改内存）
         log_callback: 日志回调函数
 
     Returns:
@@ -990,120 +1023,24 @@ def filter_zero_address_variables(
         FileNotFoundError: A2L 文件不存在
         FileError: 文件读写失败
     """
-    # 验证 A2L 文件存在
-    if not a2l_path.exists():
-        error_msg = f"A2L 文件不存在: {a2l_path}"
-        log_callback(f"错误: {error_msg}")
-        logger.error(error_msg)
-        raise FileNotFoundError(error_msg)
+    # 单遍过滤（与地址更新、头文件替换共用同一引擎）
+    processor = A2LPostProcessor(filter_zero_address=True)
+    result = _post_process_a2l(a2l, processor, log_callback)
 
-    # 读取 A2L 文件内容
-    try:
-        with open(a2l_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
-        try:
-            with open(a2l_path, 'r', encoding='gbk') as f:
-                content = f.read()
-        except Exception as e:
-            error_msg = f"读取 A2L 文件失败: {a2l_path} - {str(e)}"
-            log_callback(f"错误: {error_msg}")
-            logger.error(error_msg)
-            raise FileError(error_msg, suggestions=[
-                "检查 A2L 文件编码",
-                "确保文件格式为 UTF-8 或 GBK"
-            ])
-
-    lines = content.split('\n')
-    result_lines = []
-    i = 0
-    removed_count = 0
-    total_count = 0
-    in_characteristic = False
-    current_block = []
-
-    # 正则表达式匹配 /begin CHARACTERISTIC 和 /end CHARACTERISTIC
-    begin_pattern = re.compile(r'/begin\s+CHARACTERISTIC', re.IGNORECASE)
-    end_pattern = re.compile(r'/end\s+CHARACTERISTIC', re.IGNORECASE)
-    address_pattern = re.compile(r'ECU Address\s+.*?\b(0x[0-9A-Fa-f]+)\b')
-
-    while i < len(lines):
-        line = lines[i]
-        stripped = line.strip()
-
-        # 检测 /begin CHARACTERISTIC
-        if begin_pattern.search(stripped):
-            total_count += 1
-            in_characteristic = True
-            current_block = [line]
-
-            # 读取整个 CHARACTERISTIC 块
-            i += 1
-            while i < len(lines):
-                block_line = lines[i]
-                current_block.append(block_line)
-
-                # 检查是否包含地址信息
-                addr_match = address_pattern.search(block_line)
-                if addr_match:
-                    address = addr_match.group(1)
-                    if address == '0x0000' or address == '0x00000000':
-                        # 地址为 0，跳过这个块
-                        removed_count += 1
-                        log_callback(f"  跳过变量: 地址为 {address}")
-                        # 找到 /end CHARACTERISTIC 并跳出
-                        while i < len(lines):
-                            if end_pattern.search(lines[i].strip()):
-                                i += 1
-                                break
-                            i += 1
-                        in_characteristic = False
-                        current_block = []
-                        break
-                    else:
-                        # 地址有效，保留这个块
-                        result_lines.extend(current_block)
-                        in_characteristic = False
-                        current_block = []
-                        break
-
-                # 检查 /end CHARACTERISTIC
-                if end_pattern.search(block_line.strip()):
-                    # 没有找到地址信息，默认保留
-                    result_lines.extend(current_block)
-                    in_characteristic = False
-                    current_block = []
-                    i += 1
-                    break
-
-                i += 1
-        else:
-            if not in_characteristic:
-                result_lines.append(line)
-            i += 1
-
-    # 写入更新后的内容
-    try:
-        with open(a2l_path, 'w', encoding='utf-8', newline='\n') as f:
-            f.write('\n'.join(result_lines))
-    except Exception as e:
-        error_msg = f"写入 A2L 文件失败: {a2l_path} - {str(e)}"
-        log_callback(f"错误: {error_msg}")
-        logger.error(error_msg)
-        raise FileError(error_msg, suggestions=[
-            "检查文件权限",
-            "检查磁盘空间"
-        ])
+    for var_name in result.removed_variables:
+        log_callback(f"  跳过变量: {var_name} 地址为 0x00000000")
 
+    total_count = result.characteristic_count
+    removed_count = result.zero_address_removed
     kept_count = total_count - removed_count
     log_callback(f"变量过滤完成: 总数 {total_count}, 保留 {kept_count}, 删除 {removed_count}")
-    logger.info(f"变量过滤完成: {a2l_path} 总数 {total_count}, 保留 {kept_count}, 删除 {removed_count}")
+    logger.info(f"变量过滤完成: 总数 {total_count}, 保留 {kept_count}, 删除 {removed_count}")
 
     return True, total_count, removed_count
 
 
 def verify_processed_a2l_file(
-    a2l_path: Path,
+    a2l: Union[Path, A2LDocument],
     log_callback: Callable[[str], None]
 ) -> Tuple[bool, List[str]]:
     """验证处理后的 A2L 文件
@@ -1114,7 +1051,7 @@ def verify_processed_a2l_file(
     3. 原始头部是否已裁剪（检查第一个 /end MOD_PAR 之前的行数是否合理）
 
     Args:
-        a2l_path: A2L 文件路径
+        a2l: A2L 文件路径或已加载的 A2L 文档
         log_callback: 日志回调函数
 
     Returns:
@@ -1125,24 +1062,22 @@ def verify_processed_a2l_file(
     messages = []
     all_passed = True
 
-    # 1. 验证文件存在
-    if not a2l_path.exists():
-        messages.append(f"❌ A2L 文件不存在: {a2l_path}")
-        return False, messages
+    if isinstance(a2l, A2LDocument):
+        document = a2l
+    else:
+        # 1. 验证文件存在
+        if not a2l.exists():
+            messages.append(f"❌ A2L 文件不存在: {a2l}")
+            return False, messages
 
-    # 读取文件内容
-    try:
-        with open(a2l_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except UnicodeDecodeError:
+        # 读取文件内容
         try:
-            with open(a2l_path, 'r', encoding='gbk') as f:
-                content = f.read()
-        except Exception as e:
+            document = A2LDocument.load(a2l)
+        except (OSError, A2LPostProcessError) as e:
             messages.append(f"❌ 读取 A2L 文件失败: {e}")
             return False, messages
 
-    lines = content.split('\n')
+    lines = document.lines
 
     # 2. 验证 XCP 前缀已添加
     # 检查文件开头是否符合 XCP 头文件模板的特征
@@ -1239,8 +1174,10 @@ def verify_processed_a2l_file(
         messages.append(f"⚠️  未在预期位置找到原始 A2L 内容（检查了第 {search_start}-{search_end} 行）")
 
     # 5. 检查文件大小
-    file_size = a2l_path.stat().st_size
-    messages.append(f"📁 文件大小: {file_size:,} bytes ({len(lines):,} 行)")
+    if isinstance(a2l, A2LDocument):
+        messages.append(f"📁 文件大小: {len(document.content):,} 字符 ({len(lines):,} 行)")
+    else:
+        messages.append(f"📁 文件大小: {a2l.stat().st_size:,} bytes ({len(lines):,} 行)")
 
     return all_passed, messages
 
@@ -1334,11 +1271,42 @@ def _copy_files_to_tool_directory(
     return dest_a2l, dest_elf
 
 
+def _build_member_index(
+    elf_path: Path,
+    log_callback: Callable[[str], None],
+    cache: Optional[ELFIndexCache] = None
+) -> Optional[Dict[str, int]]:
+    """从 ELF 的 DWARF 信息构建结构体成员地址索引
+
+    用于解析 Simulink 的 B/DW 结构体成员（如 Model_B.Out）。
+    DWARF 信息缺失或解析失败时只记录警告，地址匹配退回到符号表。
+
+    Args:
+        elf_path: ELF 文件路径
+        log_callback: 日志回调函数
+        cache: 可选的 ELF 索引磁盘缓存
+
+    Returns:
+        成员路径到地址的映射，失败时返回 None
+    """
+    try:
+        member_index = DWARFMemberResolver(cache=cache).build_index(elf_path)
+    except (ELFParseError, FileNotFoundError) as e:
+        log_callback(f"警告: DWARF 成员索引构建失败，仅使用符号表匹配: {e}")
+        logger.warning(f"DWARF 成员索引构建失败: {e}")
+        return None
+
+    log_callback(f"DWARF 成员路径数量: {len(member_index)}")
+    return member_index
+
+
 def _update_a2l_addresses(
     a2l_path: Path,
     elf_path: Path,
     timeout: int,
-    log_callback: Callable[[str], None]
+    log_callback: Callable[[str], None],
+    resolve_struct_members: bool = True,
+    cache: Optional[ELFIndexCache] = None
 ) -> bool:
     """使用纯 Python 更新 A2L 文件中的变量地址
 
@@ -1349,6 +1317,8 @@ def _update_a2l_addresses(
         elf_path: ELF 文件路径
         timeout: 超时时间（秒）- 保留参数以兼容调用方
         log_callback: 日志回调函数
+        resolve_struct_members: 是否使用 DWARF 信息解析结构体成员地址
+        cache: 可选的 ELF 索引磁盘缓存
 
     Returns:
         成功返回 True
@@ -1363,40 +1333,28 @@ def _update_a2l_addresses(
     start_time = time.monotonic()
 
     try:
-        # 使用纯 Python 实现
-        updater = A2LAddressUpdater()
-        updater.set_log_callback(log_callback)
-
-        result = updater.update(elf_path, a2l_path, backup=True)
+        # 解析 ELF 符号表，然后以单遍引擎原地更新地址（原文件重命名为 .a2l.bak）
+        symbol_map = ELFParser(cache=cache).extract_symbols(elf_path)
+        member_index = None
+        if resolve_struct_members:
+            member_index = _build_member_index(elf_path, log_callback, cache)
+        processor = A2LPostProcessor(symbol_map=symbol_map, member_index=member_index)
+        processor.set_log_callback(log_callback)
+        result = processor.process(a2l_path, backup=True)
 
         elapsed = time.monotonic() - start_time
 
-        if result.success:
-            log_callback(f"地址更新成功（耗时 {elapsed:.2f} 秒）")
-            log_callback(f"  匹配变量: {result.matched_count}/{result.total_variables}")
-            if result.unmatched_count > 0:
-                log_callback(f"  未匹配变量: {result.unmatched_count}")
-                # 只显示前10个未匹配变量
-                unmatched_preview = result.unmatched_variables[:10]
-                log_callback(f"  未匹配列表: {', '.join(unmatched_preview)}"
-                           + ("..." if result.unmatched_count > 10 else ""))
-            return True
-        else:
-            error_msg = result.message
-            log_callback(f"错误: {error_msg}")
-            logger.error(error_msg)
-
-            raise ProcessError(
-                "A2L",
-                error_msg,
-                suggestions=[
-                    "检查 ELF 文件格式是否正确",
-                    "验证 A2L 文件格式是否正确",
-                    "确认 pyelftools 已安装: pip install pyelftools"
-                ]
-            )
-
-    except (ELFParseError, A2LParseError, AddressUpdateError) as e:
+        log_callback(f"地址更新成功（耗时 {elapsed:.2f} 秒）")
+        log_callback(f"  匹配变量: {result.matched_count}/{result.total_variables}")
+        if result.unmatched_count > 0:
+            log_callback(f"  未匹配变量: {result.unmatched_count}")
+            # 只显示前10个未匹配变量
+            unmatched_preview = result.unmatched_variables[:10]
+            log_callback(f"  未匹配列表: {', '.join(unmatched_preview)}"
+                       + ("..." if result.unmatched_count > 10 else ""))
+        return True
+
+    except (ELFParseError, A2LPostProcessError, FileNotFoundError) as e:
         error_msg = f"地址更新失败: {str(e)}"
         log_callback(f"错误: {error_msg}")
         logger.error(error_msg, exc_info=True)
@@ -1427,6 +1385,136 @@ def _update_a2l_addresses(
         )
 
 
+def _update_batch_a2l_addresses(
+    a2l_paths: List[Path],
+    symbol_map: Dict[str, int],
+    member_index: Optional[Dict[str, int]],
+    output_dir: Path,
+    max_workers: Optional[int],
+    log_callback: Callable[[str], None],
+    parse_cache: Optional[A2LParseCache] = None,
+    memory_mapped: bool = False
+) -> List[AddressUpdateResult]:
+    """使用已解析的 ELF 符号映射批量更新多个 A2L 文件的地址
+
+    用于多核 ECU 或多变体 A2L 共用同一个 ELF 的场景，ELF 不重复解析，
+    各 A2L 文件在进程池中并发更新。不同目录下的同名文件在输出目录中
+    加上目录名前缀（见 batch_output_names），互不覆盖。
+
+    Args:
+        a2l_paths: 待更新的 A2L 文件路径列表
+        symbol_map: ELF 符号名称到地址的映射
+        member_index: DWARF 成员路径到地址的映射（可选）
+        output_dir: 输出目录
+        max_workers: 最大工作进程数（None 表示 CPU 核数）
+        log_callback: 日志回调函数
+        parse_cache: 可选的 A2L 解析缓存
+        memory_mapped: 是否使用内存映射解析器（适用于超大 A2L 文件）
+
+    Returns:
+        List[AddressUpdateResult]: 与 a2l_paths 顺序一致的更新结果
+
+    Raises:
+        ValueError: 如果同一个 A2L 文件出现多次
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    updater = A2LAddressUpdater(
+        resolve_struct_members=False,
+        memory_mapped=memory_mapped,
+        parse_cache=parse_cache
+    )
+    updater.set_log_callback(log_callback)
+    results = updater.update_batch_with_symbol_map(
+        symbol_map,
+        a2l_paths,
+        output_dir=output_dir,
+        backup=False,
+        max_workers=max_workers,
+        member_index=member_index
+    )
+
+    for a2l_path, result in zip(a2l_paths, results):
+        if result.success:
+            output_name = Path(result.output_path).name
+            renamed = f" -> {output_name}" if output_name != a2l_path.name else ""
+            log_callback(
+                f"  {a2l_path.name}{renamed}: 匹配变量 {result.matched_count}/{result.total_variables}"
+            )
+    return results
+
+
+def _extract_calibration_snapshot(
+    a2l_path: Path,
+    elf_path: Path,
+    snapshot_format: str,
+    log_callback: Callable[[str], None]
+) -> Optional[Path]:
+    """从 ELF 初始化数据中提取全部 CHARACTERISTIC 的初始值并写入快照
+
+    快照与 A2L 输出文件放在同一目录，命名为 <A2L 文件名>_cal.json 或
+    <A2L 文件名>_cal.cdfx。提取失败只记录警告，不影响阶段结果。
+
+    Args:
+        a2l_path: 地址已更新的 A2L 文件路径
+        elf_path: ELF 文件路径
+        snapshot_format: 快照格式（json 或 cdfx）
+        log_callback: 日志回调函数
+
+    Returns:
+        快照文件路径，失败时返回 None
+    """
+    snapshot_path = a2l_path.with_name(f"{a2l_path.stem}_cal.{snapshot_format}")
+    log_callback(f"\n提取标定参数初始值: {snapshot_path.name}")
+
+    extractor = CalibrationExtractor()
+    extractor.set_log_callback(log_callback)
+    try:
+        extractor.extract(a2l_path, elf_path, snapshot_path, snapshot_format)
+    except (CalExtractError, A2LParseError, OSError) as e:
+        log_callback(f"警告: 标定参数初始值提取失败: {e}")
+        logger.warning(f"标定参数初始值提取失败: {e}")
+        return None
+
+    return snapshot_path
+
+
+def _write_daq_packing_report(
+    a2l_path: Path,
+    context: BuildContext,
+    log_callback: Callable[[str], None]
+) -> Optional[Path]:
+    """按 MEASUREMENT 地址连续性计算推荐的 XCP DAQ/ODT 布局并写入报告
+
+    报告与 A2L 输出文件放在同一目录，命名为 <A2L 文件名>_daq.json。
+    计算失败只记录警告，不影响阶段结果。
+
+    Args:
+        a2l_path: 地址已更新的 A2L 文件路径
+        context: 构建上下文（读取 a2l_daq_max_odt_bytes、a2l_daq_max_entry_size、a2l_daq_max_gap）
+        log_callback: 日志回调函数
+
+    Returns:
+        报告文件路径，失败时返回 None
+    """
+    report_path = a2l_path.with_name(f"{a2l_path.stem}_daq.json")
+    log_callback(f"\n计算 DAQ/ODT 推荐布局: {report_path.name}")
+
+    try:
+        optimizer = DAQOptimizer(
+            max_odt_bytes=int(context.config.get("a2l_daq_max_odt_bytes", DEFAULT_MAX_ODT_BYTES)),
+            max_entry_size=int(context.config.get("a2l_daq_max_entry_size", DEFAULT_MAX_ENTRY_SIZE)),
+            max_gap=int(context.config.get("a2l_daq_max_gap", 0))
+        )
+        optimizer.set_log_callback(log_callback)
+        optimizer.optimize_file(a2l_path, report_path)
+    except (DAQOptimizeError, A2LParseError, OSError, ValueError) as e:
+        log_callback(f"警告: DAQ/ODT 布局计算失败: {e}")
+        logger.warning(f"DAQ/ODT 布局计算失败: {e}")
+        return None
+
+    return report_path
+
 
 def execute_xcp_header_replacement_stage(
     config: StageConfig,
@@ -1436,12 +1524,30 @@ def execute_xcp_header_replacement_stage(
 
     完整流程：
     1. 清理 A2L 工具目录下的残留 A2L 和 ELF 文件
-    2. 复制 A2L 文件（从配置路径）到 A2L 工具目录
-    3. 复制 ELF 文件到 A2L 工具目录
-    4. 调用 MATLAB 更新变量地址
-    5. 裁剪 A2L（删除 IF_DATA XCP 块）
-    6. 替换 XCP 头文件
-    7. 保存到 output 子目录
+    2. 复制 A2L 文件（从配置路径）和 ELF 文件到 A2L 工具目录
+    3. 解析 ELF 符号表和 DWARF 结构体成员索引
+       （context.config["a2l_resolve_struct_members"]，默认启用），读取 XCP 头文件模板；
+       ELF 内容未变化时从磁盘索引缓存加载（context.config["elf_index_cache"]，默认启用；
+       缓存目录大小上限 context.config["elf_index_cache_max_mb"]，默认 256 MB）
+    4. A2L 只读取并解码一次（A2LDocument），在内存中单遍处理：
+       更新变量地址（地址增量报告保存在 context.state["a2l_address_delta"]）、
+       删除 IF_DATA XCP 块、替换 XCP 头文件；
+       可选在 A2L 工具目录缓存块索引，A2L 内容未变化时跳过块识别
+       （context.config["a2l_parse_cache"]，默认关闭），
+       可选过滤零地址 CHARACTERISTIC（context.config["a2l_filter_zero_address"]），
+       可选删除不再被引用的 COMPU_METHOD/COMPU_VTAB/RECORD_LAYOUT
+       （context.config["a2l_prune_unused_support"]）
+    5. 验证内存中的文档后一次性保存到 output 子目录；
+       可选按 ELF 数据节和符号大小验证全部对象的地址范围
+       （context.config["a2l_validate_addresses"]，
+       context.config["a2l_validate_addresses_strict"] 为 True 时发现问题即失败）；
+       可选批量更新 context.config["a2l_batch_paths"] 中的其他 A2L，
+       启用 context.config["a2l_parse_cache"] 时其解析结果缓存在各文件旁，
+       启用 context.config["a2l_memory_mapped_parser"] 时使用内存映射解析器读取
+    6. 可选：从 ELF 提取标定参数初始值快照（context.config["a2l_cal_snapshot"]，
+       格式由 context.config["a2l_cal_snapshot_format"] 指定：json 或 cdfx）
+    7. 可选：按 MEASUREMENT 地址连续性生成 XCP DAQ/ODT 推荐布局报告
+       （context.config["a2l_daq_optimize"]，ODT 容量由 context.config["a2l_daq_max_odt_bytes"] 指定）
 
     Args:
         config: 阶段配置
@@ -1554,11 +1660,11 @@ def execute_xcp_header_replacement_stage(
         log_callback(f"A2L 工具目录: {a2l_tool_path}")
 
         # 步骤 1: 清理残留文件
-        log_callback("\n[步骤 1/6] 清理残留文件...")
+        log_callback("\n[步骤 1/5] 清理残留文件...")
         _clean_a2l_tool_directory(a2l_tool_path, log_callback)
 
         # 步骤 2-3: 复制文件到工具目录
-        log_callback("\n[步骤 2/6] 复制 A2L 和 ELF 文件到工具目录...")
+        log_callback("\n[步骤 2/5] 复制 A2L 和 ELF 文件到工具目录...")
         try:
             dest_a2l, dest_elf = _copy_files_to_tool_directory(
                 source_a2l_path, source_elf_path, a2l_tool_path, log_callback
@@ -1571,30 +1677,35 @@ def execute_xcp_header_replacement_stage(
                 suggestions=e.suggestions
             )
 
-        # 步骤 4: 使用 MATLAB 更新变量地址
-        log_callback("\n[步骤 3/6] 更新 A2L 变量地址...")
-        timeout = getattr(config, 'timeout', None) or get_stage_timeout("a2l_process")
+        # 步骤 3: 解析 ELF 符号表并读取 XCP 头文件模板
+        log_callback("\n[步骤 3/5] 解析 ELF 符号表并读取 XCP 头文件模板...")
+        # ELF 内容未变化时从磁盘缓存加载符号表和 DWARF 成员索引
+        elf_cache = None
+        if context.config.get("elf_index_cache", True):
+            max_mb = context.config.get("elf_index_cache_max_mb", DEFAULT_MAX_CACHE_BYTES // (1024 * 1024))
+            elf_cache = ELFIndexCache(max_bytes=int(max_mb) * 1024 * 1024)
         try:
-            _update_a2l_addresses(dest_a2l, dest_elf, timeout, log_callback)
-        except (ProcessError, ProcessTimeoutError) as e:
+            symbol_map = ELFParser(cache=elf_cache).extract_symbols(dest_elf)
+            log_callback(f"ELF 符号数量: {len(symbol_map)}")
+        except (ELFParseError, FileNotFoundError) as e:
+            error_msg = f"更新变量地址失败: 解析 ELF 文件失败: {e}"
+            log_callback(f"错误: {error_msg}")
+            logger.error(error_msg)
+
             return StageResult(
                 status=StageStatus.FAILED,
-                message=f"更新变量地址失败: {e}",
+                message=error_msg,
                 error=e,
-                suggestions=e.suggestions if hasattr(e, 'suggestions') else []
+                suggestions=[
+                    "检查 ELF 文件是否存在且有效",
+                    "确认 pyelftools 已安装: pip install pyelftools"
+                ]
             )
 
-        # 步骤 5: 裁剪 A2L（删除 IF_DATA XCP 块）
-        log_callback("\n[步骤 4/6] 裁剪 A2L 文件...")
-        try:
-            success, removed_count = remove_if_data_xcp_blocks(dest_a2l, log_callback)
-            if not success:
-                log_callback("警告: IF_DATA XCP 块删除可能不完整")
-        except (FileNotFoundError, FileError) as e:
-            log_callback(f"警告: 裁剪 A2L 时出错: {e}")
-
-        # 步骤 6: 替换 XCP 头文件
-        log_callback("\n[步骤 5/6] 替换 XCP 头文件...")
+        # 解析 DWARF 结构体成员（Simulink B/DW 点号变量名）
+        member_index = None
+        if context.config.get("a2l_resolve_struct_members", True):
+            member_index = _build_member_index(dest_elf, log_callback, elf_cache)
 
         # 读取 XCP 头文件模板
         template_path = a2l_tool_path / "奇瑞热管理XCP头文件.txt"
@@ -1616,72 +1727,213 @@ def execute_xcp_header_replacement_stage(
                 ]
             )
 
-        # 定位 XCP 头文件部分
-        header_section = find_xcp_header_section(dest_a2l, log_callback)
-        if not header_section:
-            error_msg = "未找到 A2L 文件中的 XCP 头文件部分"
+        # 步骤 4: 单遍处理：更新地址、删除 IF_DATA XCP 块、（可选）过滤零地址、替换头文件
+        log_callback("\n[步骤 4/5] 更新变量地址、裁剪 A2L 并替换 XCP 头文件（单遍内存处理）...")
+
+        a2l_config = A2LHeaderReplacementConfig()
+        a2l_config.output_dir = str(a2l_tool_path / "output")
+        a2l_config.output_prefix = "tmsAPP_upAdress"
+        output_path = _build_a2l_output_path(a2l_config)
+
+        processor_options = dict(
+            symbol_map=symbol_map,
+            remove_if_data_xcp=True,
+            filter_zero_address=context.config.get("a2l_filter_zero_address", False),
+            xcp_template=xcp_template,
+            member_index=member_index
+        )
+        # 超大 A2L 文件可按顶层变量块分块，多进程并行处理（分块处理不使用块索引缓存）
+        parallel_workers = context.config.get("a2l_parallel_workers", 1)
+        if parallel_workers != 1:
+            processor = ChunkedA2LPostProcessor(
+                max_workers=parallel_workers or None, **processor_options
+            )
+        else:
+            # 复制到工具目录的 A2L 保留修改时间，内容未变化时命中工具目录下的块索引缓存
+            parse_cache = A2LParseCache() if context.config.get("a2l_parse_cache", False) else None
+            processor = A2LPostProcessor(parse_cache=parse_cache, **processor_options)
+        processor.set_log_callback(log_callback)
+
+        # A2L 只读取并解码一次，后续步骤都在内存中的文档上进行，最后一次性保存
+        try:
+            document = _load_a2l_document(dest_a2l, log_callback)
+            process_result = processor.process_document(document)
+        except (FileNotFoundError, FileError, A2LPostProcessError) as e:
+            error_msg = f"处理 A2L 文件失败: {str(e)}"
             log_callback(f"错误: {error_msg}")
             logger.error(error_msg)
 
             return StageResult(
                 status=StageStatus.FAILED,
                 message=error_msg,
+                error=e,
                 suggestions=[
-                    "检查 A2L 文件格式",
-                    "确认文件包含 /begin MOD_PAR 标记"
+                    "检查 A2L 文件编码（UTF-8 或 GBK）",
+                    "检查输出目录权限",
+                    "检查磁盘空间"
                 ]
             )
 
-        # 替换头部内容
-        try:
-            updated_content = replace_xcp_header_content(
-                dest_a2l, header_section, xcp_template, log_callback
-            )
-        except FileError as e:
-            error_msg = f"替换 XCP 头文件内容失败: {str(e)}"
+        if not process_result.header_found:
+            error_msg = "未找到 A2L 文件中的 XCP 头文件部分"
             log_callback(f"错误: {error_msg}")
             logger.error(error_msg)
 
             return StageResult(
                 status=StageStatus.FAILED,
                 message=error_msg,
-                error=e,
-                suggestions=e.suggestions
+                suggestions=[
+                    "检查 A2L 文件格式",
+                    "确认文件包含 /begin MOD_PAR 标记"
+                ]
             )
 
-        # 步骤 7: 保存到 output 目录
-        log_callback("\n[步骤 6/6] 保存最终 A2L 文件...")
+        log_callback(f"匹配变量: {process_result.matched_count}/{process_result.total_variables}")
+        if process_result.unmatched_count > 0:
+            log_callback(f"未匹配变量: {process_result.unmatched_count}")
+            log_callback(f"未匹配列表: {', '.join(process_result.unmatched_variables[:10])}"
+                       + ("..." if process_result.unmatched_count > 10 else ""))
+        if process_result.ambiguous_variables:
+            log_callback(f"叶子节点歧义变量（未更新）: {len(process_result.ambiguous_variables)}")
+            for var_name, candidates in list(process_result.ambiguous_variables.items())[:10]:
+                log_callback(f"  {var_name}: {', '.join(candidates)}")
+            context.state["a2l_ambiguous_variables"] = process_result.ambiguous_variables
+        if process_result.delta is not None:
+            log_callback(f"地址增量: {process_result.delta.summary()}")
+            context.state["a2l_address_delta"] = process_result.delta.to_dict()
+        log_callback(f"IF_DATA XCP 块删除完成: 删除了 {process_result.if_data_removed} 个块")
+        if processor.filter_zero_address:
+            log_callback(
+                f"变量过滤完成: 总数 {process_result.characteristic_count}, "
+                f"删除 {process_result.zero_address_removed}"
+            )
+        log_callback(
+            f"替换 XCP 头文件内容: 原始长度 {process_result.header_original_length:,} bytes "
+            f"-> 新长度 {process_result.header_new_length:,} bytes"
+        )
 
-        # 创建输出配置
-        a2l_config = A2LHeaderReplacementConfig()
-        a2l_config.output_dir = str(a2l_tool_path / "output")
-        a2l_config.output_prefix = "tmsAPP_upAdress"
+        # 可选：删除过滤后不再被引用的 COMPU_METHOD/COMPU_VTAB/RECORD_LAYOUT
+        if context.config.get("a2l_prune_unused_support", False):
+            pruner = A2LSupportPruner()
+            pruner.set_log_callback(log_callback)
+            document.content, prune_result = pruner.prune_text(document.content)
+            context.state["a2l_prune_bytes_saved"] = prune_result.bytes_saved
 
-        try:
-            output_path = save_updated_a2l_file(a2l_config, updated_content, log_callback)
-        except FileError as e:
-            error_msg = f"保存 A2L 文件失败: {str(e)}"
+        # 步骤 5: 验证并保存最终 A2L 文件
+        log_callback("\n[步骤 5/5] 验证并保存最终 A2L 文件...")
+
+        if not verify_a2l_replacement(document, xcp_template, log_callback):
+            error_msg = "A2L 文件替换验证失败"
             log_callback(f"错误: {error_msg}")
             logger.error(error_msg)
 
             return StageResult(
                 status=StageStatus.FAILED,
                 message=error_msg,
-                error=e,
-                suggestions=e.suggestions
+                suggestions=["检查输出文件", "查看详细日志"]
             )
 
-        # 验证输出文件
-        if not verify_a2l_replacement(output_path, xcp_template, log_callback):
-            error_msg = "A2L 文件替换验证失败"
+        try:
+            document.save(output_path, encoding=a2l_config.encoding)
+        except A2LPostProcessError as e:
+            error_msg = f"保存 A2L 文件失败: {str(e)}"
             log_callback(f"错误: {error_msg}")
             logger.error(error_msg)
 
             return StageResult(
                 status=StageStatus.FAILED,
                 message=error_msg,
-                suggestions=["检查输出文件", "查看详细日志"]
+                error=e,
+                suggestions=[
+                    "检查输出目录权限",
+                    "检查磁盘空间"
+                ]
             )
+        log_callback(f"保存 A2L 文件: {output_path}")
+
+        # 可选：按 ELF 数据节和符号大小验证全部对象的地址范围
+        if context.config.get("a2l_validate_addresses", False):
+            log_callback("\n验证 A2L 对象地址范围...")
+            validator = A2LAddressValidator()
+            validator.set_log_callback(log_callback)
+            try:
+                validation = validator.validate_file(output_path, dest_elf)
+            except (AddressValidationError, OSError) as e:
+                log_callback(f"警告: 地址范围验证失败: {e}")
+                logger.warning(f"地址范围验证失败: {e}")
+            else:
+                context.state["a2l_address_issues"] = [issue.to_dict() for issue in validation.issues]
+                if validation.issues and context.config.get("a2l_validate_addresses_strict", False):
+                    error_msg = f"A2L 地址范围验证发现 {len(validation.issues)} 个问题"
+                    log_callback(f"错误: {error_msg}")
+                    logger.error(error_msg)
+                    return StageResult(
+                        status=StageStatus.FAILED,
+                        message=error_msg,
+                        suggestions=[
+                            "检查 A2L 与 ELF 是否来自同一次构建",
+                            "检查 A2L 数据类型与 C 变量类型是否一致"
+                        ]
+                    )
+
+        output_files = [str(output_path)]
+
+        # 可选：使用同一个 ELF 批量更新其他 A2L 文件（多核/多变体）
+        batch_paths = [Path(p) for p in context.config.get("a2l_batch_paths", [])]
+        if batch_paths:
+            log_callback(f"\n批量更新 {len(batch_paths)} 个 A2L 文件地址...")
+            batch_results = _update_batch_a2l_addresses(
+                batch_paths,
+                symbol_map,
+                member_index,
+                Path(a2l_config.output_dir),
+                context.config.get("a2l_batch_workers"),
+                log_callback,
+                A2LParseCache() if context.config.get("a2l_parse_cache", False) else None,
+                context.config.get("a2l_memory_mapped_parser", False)
+            )
+
+            failed = [
+                f"{path.name}: {result.message}"
+                for path, result in zip(batch_paths, batch_results)
+                if not result.success
+            ]
+            if failed:
+                error_msg = f"批量更新 A2L 地址失败: {'; '.join(failed)}"
+                log_callback(f"错误: {error_msg}")
+                logger.error(error_msg)
+
+                return StageResult(
+                    status=StageStatus.FAILED,
+                    message=error_msg,
+                    suggestions=[
+                        "检查 a2l_batch_paths 中的文件是否存在且有效",
+                        "检查输出目录权限"
+                    ]
+                )
+
+            batch_outputs = [result.output_path for result in batch_results]
+            context.state["a2l_batch_output_paths"] = batch_outputs
+            output_files.extend(batch_outputs)
+
+        # 可选：从 ELF 初始化数据中提取标定参数初始值快照
+        if context.config.get("a2l_cal_snapshot", False):
+            snapshot_path = _extract_calibration_snapshot(
+                output_path,
+                dest_elf,
+                context.config.get("a2l_cal_snapshot_format", "json"),
+                log_callback
+            )
+            if snapshot_path is not None:
+                context.state["a2l_cal_snapshot_path"] = str(snapshot_path)
+                output_files.append(str(snapshot_path))
+
+        # 可选：生成 XCP DAQ/ODT 推荐布局报告
+        if context.config.get("a2l_daq_optimize", False):
+            report_path = _write_daq_packing_report(output_path, context, log_callback)
+            if report_path is not None:
+                context.state["a2l_daq_report_path"] = str(report_path)
+                output_files.append(str(report_path))
 
         # 记录输出文件路径到 BuildContext
         context.state["a2l_output_path"] = str(output_path)
@@ -1696,7 +1948,7 @@ def execute_xcp_header_replacement_stage(
         return StageResult(
             status=StageStatus.COMPLETED,
             message="A2L 文件处理成功",
-            output_files=[str(output_path)],
+            output_files=output_files,
             execution_time=elapsed
         )
 
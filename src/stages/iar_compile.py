@@ -21,7 +21,7 @@ Architecture Decision 2.1:
 import logging
 import time
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from core.models import (
     StageConfig,
@@ -30,6 +30,7 @@ from core.models import (
     StageStatus
 )
 from core.constants import get_stage_timeout
+from core.stage_cache import StageCacheSpec
 from integrations.iar import IarIntegration
 from utils.errors import (
     ProcessError,
@@ -40,6 +41,45 @@ from utils.errors import (
 logger = logging.getLogger(__name__)
 
 
+def _cache_input_paths(context: BuildContext) -> Optional[List[Path]]:
+    """获取参与缓存键计算的 IAR 工程目录和外部 HEX 合并输入"""
+    iar_project_path = context.config.get("iar_project_path", "")
+    if not iar_project_path:
+        return None
+
+    project_dir = Path(iar_project_path).parent
+    build_config = context.config.get("iar_build_config", "Debug")
+    paths = [project_dir]
+    for hex_input in context.config.get("iar_hex_merge_inputs", []):
+        # 编译输出目录下的 HEX 由本阶段生成，不作为输入
+        if Path(hex_input).parts[:1] != (build_config,):
+            paths.append(project_dir / hex_input)
+    return paths
+
+
+def _cache_output_paths(context: BuildContext) -> List[Path]:
+    """获取编译生成的 ELF 和 HEX 文件"""
+    build_output = context.state.get("build_output", {})
+    return [Path(p) for p in (build_output.get("elf_file"), build_output.get("hex_file")) if p]
+
+
+# 阶段缓存声明：源文件、工程文件和编译配置不变时直接恢复 ELF/HEX
+CACHE_SPEC = StageCacheSpec(
+    config_keys=[
+        "iar_project_path", "iar_build_config", "iar_tool_path",
+        "iar_execute_hex_merge", "iar_hex_merge_inputs", "iar_hex_merge_output",
+        "iar_hex_merge_allow_overwrite", "iar_verify_hex_contents", "iar_verify_hex_strict"
+    ],
+    input_paths=_cache_input_paths,
+    input_extensions=(".c", ".h", ".s", ".asm", ".icf", ".ewp", ".eww", ".xcl", ".mac",
+                      ".bat", ".a", ".lib"),
+    exclude_dirs=("Debug", "Release", "settings", ".git"),
+    state_inputs=["moved_files"],
+    state_outputs=["build_output", "hex_verification"],
+    output_paths=_cache_output_paths
+)
+
+
 def _validate_iar_project_path(iar_project_path: str) -> None:
     """验证 IAR 工程路径
 
@@ -390,9 +430,36 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
         # 查找并执行 HexMerge.bat (Story 2.8 - 任务 1.7, 2.3)
         execute_hex_merge = context.config.get("iar_execute_hex_merge", True)
 
+        # 配置了输入 HEX 列表时使用纯 Python 合并（不依赖 HexMerge.bat，可在 Linux 上运行）
+        hex_merge_inputs = context.config.get("iar_hex_merge_inputs", [])
+
         hex_file = None
 
-        if execute_hex_merge:
+        if execute_hex_merge and hex_merge_inputs:
+            hex_output = project_dir / context.config.get("iar_hex_merge_output", "Merged.hex")
+            context.log(f"合并 HEX 文件: {len(hex_merge_inputs)} 个输入 -> {hex_output}")
+
+            try:
+                hex_result = iar.merge_hex_files(
+                    input_paths=[str(project_dir / p) for p in hex_merge_inputs],
+                    output_path=str(hex_output),
+                    allow_overwrite=context.config.get("iar_hex_merge_allow_overwrite", False)
+                )
+                hex_file = Path(hex_result["output_path"])
+                context.log(f"HEX 合并完成，耗时: {hex_result['execution_time']:.2f} 秒")
+
+                # 与 HexMerge.bat 路径相同，验证合并生成的 HEX 文件
+                hex_verify = iar.verify_hex_file(str(hex_file))
+
+                if hex_verify["is_valid"]:
+                    context.log(f"HEX 文件验证通过: {hex_file} ({hex_verify['size']} 字节)")
+                else:
+                    context.log(f"警告: HEX 文件验证失败: {hex_verify.get('error', '未知错误')}")
+            except ProcessError as e:
+                context.log(f"警告: HEX 合并失败: {e}")
+                logger.warning(f"HEX 合并失败: {e}")
+
+        elif execute_hex_merge:
             context.log("查找 HexMerge.bat...")
 
             hex_merge_bat = _find_hex_merge_bat(project_dir)
@@ -437,6 +504,26 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
             else:
                 context.log("未找到 HexMerge.bat，跳过 HEX 文件生成")
 
+        # 校验 HEX 是否包含 ELF 的全部可加载段数据
+        if hex_file and context.config.get("iar_verify_hex_contents", True):
+            hex_contents = iar.verify_hex_contents(str(hex_file), str(elf_path))
+            context.state["hex_verification"] = hex_contents
+
+            if hex_contents["error"]:
+                context.log(f"警告: {hex_contents['error']}")
+            elif not hex_contents["is_valid"]:
+                context.log(f"警告: {hex_contents['message']}")
+                if context.config.get("iar_verify_hex_strict", False):
+                    return StageResult(
+                        status=StageStatus.FAILED,
+                        message=f"HEX 文件内容校验失败: {hex_contents['message']}",
+                        suggestions=[
+                            "检查 HEX 合并输入文件是否为本次编译的输出",
+                            "检查 HexMerge 配置的地址范围",
+                            "查看日志中的不一致地址范围"
+                        ]
+                    )
+
         # 显示警告（如果有）
         warnings = compile_result.get("warnings", [])
         if warnings:
@@ -23,6 +23,7 @@ Architecture Decision 5.1:
 
 import logging
 import time
+from importlib import metadata
 from pathlib import Path
 from typing import Optional, List
 
@@ -33,12 +34,62 @@ from core.models import (
     StageStatus
 )
 from core.constants import get_stage_timeout
+from core.stage_cache import StageCacheSpec
 from integrations.matlab import MatlabIntegration, MATLAB_ENGINE_AVAILABLE
 from utils.errors import ProcessTimeoutError, ProcessError
 
 logger = logging.getLogger(__name__)
 
 
+def _cache_input_paths(context: BuildContext) -> Optional[List[Path]]:
+    """获取参与缓存键计算的 Simulink 工程目录和生成脚本"""
+    simulink_path = context.config.get("simulink_path", "")
+    if not simulink_path or not context.config.get("matlab_code_path", ""):
+        return None
+
+    project = Path(simulink_path)
+    paths = [project if project.is_dir() else project.parent]
+    script = Path(context.config.get("gencode_script_path", "genCode"))
+    if script.is_absolute():
+        paths.append(script)
+    # 工程目录外引用的模型、库和数据字典（matlab_cache_extra_paths）
+    paths.extend(Path(path) for path in context.config.get("matlab_cache_extra_paths", []) or [])
+    return paths
+
+
+def _matlab_tool_version(context: BuildContext) -> Optional[str]:
+    """获取参与缓存键计算的 MATLAB 版本
+
+    优先使用配置项 matlab_version（如 "R2023b"），否则使用已安装的
+    MATLAB Engine for Python 包版本（与 MATLAB 发行版一一对应）。
+    两者都无法确定时返回 None，此时不使用缓存。
+    """
+    configured = context.config.get("matlab_version", "")
+    if configured:
+        return str(configured)
+
+    for package in ("matlabengine", "matlabengineforpython"):
+        try:
+            return f"{package}=={metadata.version(package)}"
+        except metadata.PackageNotFoundError:
+            continue
+    return None
+
+
+# 阶段缓存声明：模型、脚本、外部引用、配置和 MATLAB 版本不变时直接恢复
+# 20_Code 下的生成代码（恢复前清空 20_Code，避免残留其他构建的文件）
+CACHE_SPEC = StageCacheSpec(
+    config_keys=["simulink_path", "matlab_code_path", "gencode_script_path", "matlab_cache_extra_paths"],
+    input_paths=_cache_input_paths,
+    input_extensions=(".slx", ".mdl", ".m", ".p", ".sldd", ".mat", ".prj"),
+    exclude_dirs=("slprj", "20_Code", ".git"),
+    state_outputs=["matlab_output"],
+    output_paths=lambda context: [Path(context.config.get("matlab_code_path", "")) / "20_Code"],
+    tool_version=_matlab_tool_version,
+    clean_outputs=True
+)
+
+
 def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
     """执行 MATLAB 代码生成阶段
 
@@ -24,6 +24,7 @@ Architecture Decision 5.1:
 import logging
 import time
 from pathlib import Path
+from typing import List
 
 from core.models import StageConfig, BuildContext, StageResult, StageStatus
 from utils.file_ops import create_target_folder_safe, generate_timestamp, move_output_files_safe
@@ -239,6 +240,10 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
         if a2l_files:
             context.state["output_files"]["a2l"] = str(a2l_files[0])
 
+        # 与上一次构建的 HEX 比较，生成差分 HEX 和扇区清单
+        if hex_files and context.config.get("package_delta_hex", False):
+            success_files.extend(_generate_delta_hex(hex_files[0], context))
+
         # 验证所有文件移动成功 (Story 2.12 - 任务 5.7)
         # 判断是否所有文件都失败
         if not success_files:
@@ -353,3 +358,76 @@ def execute_stage(config: StageConfig, context: BuildContext) -> StageResult:
             suggestions=["查看详细日志", "联系技术支持"],
             execution_time=execution_time
         )
+
+
+def _generate_delta_hex(hex_path: Path, context: BuildContext) -> List[Path]:
+    """与上一次成功构建的 HEX 比较，生成差分 HEX 和扇区清单
+
+    旧 HEX 优先取 delta_hex_base_path 配置，否则从构建历史中查找同一
+    项目最近一次成功构建归档的 HEX（排除差分 HEX）。差分生成失败只
+    记录警告，不影响打包结果。
+
+    配置项（context.config）:
+        - package_delta_hex: 是否生成差分 HEX（默认 False）
+        - delta_hex_base_path: 旧 HEX 文件路径（可选）
+        - delta_hex_sector_size: 默认扇区大小（默认 0x4000）
+        - delta_hex_sector_map: 扇区区域列表 [{"start", "end", "sector_size"}]（可选）
+
+    Args:
+        hex_path: 本次归档的 HEX 文件路径
+        context: 构建上下文
+
+    Returns:
+        List[Path]: 生成的差分 HEX 和扇区清单路径（未生成时为空）
+    """
+    from core.build_history_manager import get_history_manager
+    from hexfile.delta import (
+        DeltaHexError,
+        DeltaHexGenerator,
+        SectorMap,
+        delta_output_paths,
+        is_delta_hex
+    )
+    from hexfile.intel_hex import IntelHexError
+
+    def log(message: str):
+        if context.log_callback:
+            context.log_callback(message)
+
+    base_path_str = context.config.get("delta_hex_base_path", "")
+    if base_path_str:
+        base_path = Path(base_path_str)
+    else:
+        base_path = get_history_manager().find_latest_output_file(
+            context.config.get("name", ""), ".hex", exclude=is_delta_hex
+        )
+
+    if base_path is None or not base_path.is_file():
+        logger.info("未找到上一次构建的 HEX 文件，跳过差分 HEX 生成")
+        log("[INFO] 未找到上一次构建的 HEX 文件，跳过差分 HEX 生成")
+        return []
+
+    output_path, manifest_path = delta_output_paths(hex_path)
+    try:
+        sector_map = SectorMap.from_config(
+            context.config.get("delta_hex_sector_map"),
+            context.config.get("delta_hex_sector_size", 0x4000)
+        )
+        generator = DeltaHexGenerator(sector_map)
+        generator.set_log_callback(lambda msg: log(f"[INFO] {msg}"))
+        result = generator.generate(base_path, hex_path, output_path, manifest_path)
+    except (OSError, IntelHexError, DeltaHexError) as e:
+        logger.warning(f"差分 HEX 生成失败: {e}")
+        log(f"[WARNING] 差分 HEX 生成失败: {e}")
+        return []
+
+    context.state["delta_hex"] = {
+        "base_path": result.base_path,
+        "output_path": result.output_path,
+        "manifest_path": result.manifest_path,
+        "sectors_total": result.sectors_total,
+        "sectors_changed": len(result.changed_sectors),
+        "delta_bytes": result.delta_bytes,
+        "full_bytes": result.full_bytes,
+    }
+    return [output_path, manifest_path]
@@ -28,6 +28,7 @@ from utils.errors import ConfigLoadError
 from core.models import ProjectConfig, WorkflowConfig, BuildContext, BuildState
 from core.workflow import validate_workflow_config, execute_workflow
 from core.workflow_manager import WorkflowManager
+from core.build_queue import is_queue_running
 from ui.dialogs.new_project_dialog import NewProjectDialog
 from ui.dialogs.validation_result_dialog import show_validation_result
 from ui.dialogs.cancel_dialog import CancelConfirmationDialog  # Story 2.15 - 任务 5
@@ -475,6 +476,12 @@ class MainWindow(QMainWindow):
         self.refresh_action.setShortcut("F5")
         self.refresh_action.triggered.connect(self._refresh_project_list)
 
+        # 继续上次构建（从恢复快照跳过已完成阶段）
+        self.resume_action = QAction("继续上次构建", self)
+        self.resume_action.setShortcut("Ctrl+Shift+B")
+        self.resume_action.setStatusTip("从上次未完成构建的恢复快照继续，跳过已完成的阶段")
+        self.resume_action.triggered.connect(self._resume_build)
+
         # 切换主题
         self.theme_action = QAction("切换主题", self)
         self.theme_action.setShortcut("Ctrl+T")
@@ -498,6 +505,10 @@ class MainWindow(QMainWindow):
         file_menu.addSeparator()
         file_menu.addAction(self.exit_action)
 
+        # 构建菜单
+        build_menu = menubar.addMenu("🔨 构建")
+        build_menu.addAction(self.resume_action)
+
         # 帮助菜单
         help_menu = menubar.addMenu("❓ 帮助")
         about_action = QAction("关于", self)
@@ -770,8 +781,16 @@ class MainWindow(QMainWindow):
             ]
         )
 
-    def _start_build(self):
-        """开始构建流程 (Story 2.4 Task 3, 7)"""
+    def _resume_build(self):
+        """从上次构建的恢复快照继续构建"""
+        self._start_build(resume=True)
+
+    def _start_build(self, resume: bool = False):
+        """开始构建流程 (Story 2.4 Task 3, 7)
+
+        Args:
+            resume: 是否从上次构建的恢复快照继续（快照不存在或已失效时执行完整构建）
+        """
         if not self._current_config:
             QMessageBox.warning(self, "⚠️ 未加载项目", "请先加载一个项目配置。")
             return
@@ -828,11 +847,33 @@ class MainWindow(QMainWindow):
             'build_cancelled': self._on_build_cancelled  # Story 2.15 - 任务 10.2
         }
 
-        success = self._workflow_manager.start_workflow(
-            self._current_config,
-            workflow_config,
-            connections
-        )
+        # 构建队列不支持恢复快照，恢复构建在本机直接执行
+        queue_running = is_queue_running()
+        if resume and queue_running:
+            reply = QMessageBox.question(
+                self, "⚠️ 构建队列运行中",
+                "构建队列不支持继续上次构建，将在本机直接执行，可能与队列中的构建共用工作目录。\n是否继续？"
+            )
+            if reply != QMessageBox.StandardButton.Yes:
+                self._is_building = False
+                self._unlock_config_ui()
+                return
+
+        # 共享构建机上运行了构建队列服务时提交到队列，避免与其他构建互相覆盖工作目录
+        if queue_running and not resume:
+            logger.info("检测到构建队列服务，提交构建到队列")
+            success = self._workflow_manager.submit_to_queue(
+                self._current_config,
+                workflow_config,
+                connections
+            )
+        else:
+            success = self._workflow_manager.start_workflow(
+                self._current_config,
+                workflow_config,
+                connections,
+                resume=resume
+            )
 
         if not success:
             self._is_building = False
@@ -849,8 +890,8 @@ class MainWindow(QMainWindow):
             )
             logger.info("已连接 progress_update_detailed 信号到进度面板")
 
-        self.status_bar.showMessage("🚀 构建流程启动...")
-        logger.info("构建流程已启动")
+        self.status_bar.showMessage("🚀 继续上次构建..." if resume else "🚀 构建流程启动...")
+        logger.info("构建流程已启动（恢复模式）" if resume else "构建流程已启动")
 
     def _lock_config_ui(self):
         """锁定配置界面 - 构建期间禁用修改 (Story 2.4 Task 3.1)"""
@@ -506,3 +506,29 @@ class MatlabVersionError(MatlabProcessError):
         )
         self.actual_version = actual_version
         self.required_version = required_version
+
+
+class BuildQueueError(Exception):
+    """构建队列服务错误
+
+    无法连接构建队列服务，或服务拒绝请求时抛出。
+
+    Attributes:
+        message: 错误消息
+        suggestions: 修复建议列表
+    """
+
+    def __init__(self, message: str, suggestions: List[str] = None):
+        super().__init__(message)
+        self.suggestions = suggestions if suggestions is not None else [
+            "确认构建队列服务已启动（python run_queue.py serve）",
+            "检查服务信息文件是否存在且可读",
+            "查看队列服务日志获取更多信息"
+        ]
+
+    def __str__(self):
+        base_msg = super().__str__()
+        if self.suggestions:
+            suggestions = "\n".join(f"  - {s}" for s in self.suggestions)
+            return f"{base_msg}\n\n建议:\n{suggestions}"
+        return base_msg
@@ -0,0 +1,113 @@
+"""File content hashing helpers for MBD_CICDKits.
+
+Shared by the stage cache (core.stage_cache) and the build resume
+snapshots (utils.resume): both key their decisions on the SHA-256 of
+input files and of the files that BuildContext.state entries reference
+(directories are expanded to the files they contain).
+
+hash_file_cached() memoizes digests by (path, size, st_mtime_ns), like
+a2l.elf_cache.ELFIndexCache, so files that did not change since the last
+call are not read again.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+# 计算内容哈希时的读取块大小
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# hash_file_cached 最多记忆的摘要数量，超出时清空重新计算
+DIGEST_MEMO_MAX_ENTRIES = 4096
+
+# (绝对路径, 文件大小, st_mtime_ns) -> 摘要
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def hash_file(path: Path) -> str:
+    """计算文件内容的 SHA-256 摘要
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 十六进制摘要
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_file_cached(path: Path) -> str:
+    """计算文件内容的 SHA-256 摘要（大小和修改时间未变化时返回上次的结果）
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        str: 十六进制摘要
+    """
+    path = Path(path)
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        digest = hash_file(path)
+        if len(_digest_memo) >= DIGEST_MEMO_MAX_ENTRIES:
+            _digest_memo.clear()
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def walk_files(path: Path, extensions: Tuple[str, ...] = (),
+               exclude_dirs: Tuple[str, ...] = ()) -> List[Path]:
+    """列出文件或目录下的文件（按路径排序）
+
+    Args:
+        path: 文件或目录路径
+        extensions: 只保留这些扩展名（小写，含点号；为空表示全部）
+        exclude_dirs: 跳过的子目录名称
+
+    Returns:
+        List[Path]: 文件路径列表
+    """
+    if path.is_file():
+        return [path]
+
+    files = []
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if d not in exclude_dirs)
+        for name in sorted(names):
+            if not extensions or Path(name).suffix.lower() in extensions:
+                files.append(Path(root) / name)
+    return files
+
+
+def referenced_files(value: Any) -> Iterable[Path]:
+    """从 context.state 条目中提取引用的已存在文件（绝对路径）
+
+    引用目录时展开为目录下的全部文件。
+
+    Args:
+        value: context.state 条目（可嵌套 dict/list）
+
+    Yields:
+        Path: 文件路径
+    """
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from referenced_files(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from referenced_files(item)
+    elif isinstance(value, str) and value:
+        path = Path(value)
+        if path.is_absolute():
+            if path.is_file():
+                yield path
+            elif path.is_dir():
+                yield from walk_files(path)
@@ -0,0 +1,238 @@
+"""Build resume snapshot management for MBD_CICDKits.
+
+After every completed stage the workflow persists a snapshot of
+BuildContext.state together with the SHA-256 of every file the state
+references (files inside referenced output directories included).
+Digests are memoized by (path, size, st_mtime_ns), so files that did not
+change since the previous stage are not read again. A later build started in resume mode loads the snapshot,
+checks that the project configuration and referenced files are unchanged,
+restores the state and continues with the stages that did not complete.
+
+Snapshots are stored one per project:
+    %APPDATA%/MBD_CICDKits/resume/<project>.json
+
+State values that cannot be serialized to JSON (e.g. process handles)
+are left out of the snapshot.
+"""
+
+import json
+import logging
+import os
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from utils.file_hash import hash_file, hash_file_cached, referenced_files
+
+logger = logging.getLogger(__name__)
+
+# 快照格式版本
+SNAPSHOT_VERSION = 1
+
+# 比较配置时忽略的字段（保存配置时会更新）
+IGNORED_CONFIG_KEYS = ("created_at", "modified_at")
+
+# 只对本次构建有意义、不写入快照的状态条目
+VOLATILE_STATE_KEYS = ("build_start_time", "build_duration", "failed_stage",
+                       "failure_reason", "cancel_reason")
+
+
+def get_resume_dir() -> Path:
+    """获取构建恢复快照目录
+
+    快照保存到 %APPDATA%/MBD_CICDKits/resume/
+
+    Returns:
+        Path: 快照目录路径
+    """
+    app_data = os.environ.get("APPDATA", os.path.expanduser("~"))
+    return Path(app_data) / "MBD_CICDKits" / "resume"
+
+
+def get_snapshot_path(project_name: str, resume_dir: Optional[Path] = None) -> Path:
+    """获取项目的快照文件路径
+
+    Args:
+        project_name: 项目名称
+        resume_dir: 快照目录（可选，默认 get_resume_dir()）
+
+    Returns:
+        Path: 快照文件路径
+    """
+    safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in project_name)
+    return Path(resume_dir or get_resume_dir()) / f"{safe_name}.json"
+
+
+def serializable_state(state: Dict[str, Any]) -> Dict[str, Any]:
+    """提取可 JSON 序列化的状态条目（不含 VOLATILE_STATE_KEYS）
+
+    Args:
+        state: BuildContext.state
+
+    Returns:
+        Dict[str, Any]: 可序列化的状态条目
+    """
+    result = {}
+    for key, value in state.items():
+        if key in VOLATILE_STATE_KEYS:
+            continue
+        try:
+            json.dumps(value)
+        except (TypeError, ValueError):
+            logger.debug(f"状态条目无法序列化，不写入快照: {key}")
+            continue
+        result[key] = value
+    return result
+
+
+def save_resume_snapshot(
+    project_name: str,
+    config: Dict[str, Any],
+    state: Dict[str, Any],
+    completed_stages: List[str],
+    workflow_id: str = "",
+    resume_dir: Optional[Path] = None
+) -> Optional[Path]:
+    """保存构建恢复快照
+
+    Args:
+        project_name: 项目名称
+        config: 项目配置字典
+        state: BuildContext.state
+        completed_stages: 已完成的阶段列表
+        workflow_id: 工作流 ID
+        resume_dir: 快照目录（可选）
+
+    Returns:
+        Optional[Path]: 保存的文件路径，失败返回 None
+    """
+    try:
+        state_data = serializable_state(state)
+        file_hashes = {}
+        for value in state_data.values():
+            for path in referenced_files(value):
+                if str(path) not in file_hashes:
+                    file_hashes[str(path)] = hash_file_cached(path)
+
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "project_name": project_name,
+            "workflow_id": workflow_id,
+            "saved_at": datetime.now().isoformat(),
+            "config": config,
+            "state": state_data,
+            "file_hashes": file_hashes,
+            "completed_stages": list(completed_stages)
+        }
+        encoded = json.dumps(data, indent=2, ensure_ascii=False, default=str)
+
+        file_path = get_snapshot_path(project_name, resume_dir)
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_name = tempfile.mkstemp(dir=file_path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(encoded)
+            os.replace(temp_name, file_path)
+        except BaseException:
+            Path(temp_name).unlink(missing_ok=True)
+            raise
+
+        logger.debug(f"构建恢复快照已保存: {file_path} ({len(completed_stages)} 个阶段)")
+        return file_path
+
+    except Exception as e:
+        logger.error(f"保存构建恢复快照失败: {e}")
+        return None
+
+
+def load_resume_snapshot(project_name: str, resume_dir: Optional[Path] = None) -> Optional[Dict[str, Any]]:
+    """加载构建恢复快照
+
+    Args:
+        project_name: 项目名称
+        resume_dir: 快照目录（可选）
+
+    Returns:
+        Optional[Dict]: 快照数据，不存在或无法读取返回 None
+    """
+    file_path = get_snapshot_path(project_name, resume_dir)
+    try:
+        if not file_path.exists():
+            return None
+
+        data = json.loads(file_path.read_text(encoding="utf-8"))
+        if data.get("version") != SNAPSHOT_VERSION:
+            logger.warning(f"构建恢复快照版本不匹配，忽略: {file_path}")
+            return None
+
+        logger.info(f"构建恢复快照已加载: {file_path}")
+        return data
+
+    except Exception as e:
+        logger.error(f"加载构建恢复快照失败: {e}")
+        return None
+
+
+def delete_resume_snapshot(project_name: str, resume_dir: Optional[Path] = None) -> bool:
+    """删除构建恢复快照（构建成功后调用）
+
+    Args:
+        project_name: 项目名称
+        resume_dir: 快照目录（可选）
+
+    Returns:
+        bool: 是否删除了快照
+    """
+    file_path = get_snapshot_path(project_name, resume_dir)
+    try:
+        if not file_path.exists():
+            return False
+        file_path.unlink()
+        logger.debug(f"构建恢复快照已删除: {file_path}")
+        return True
+    except OSError as e:
+        logger.error(f"删除构建恢复快照失败: {e}")
+        return False
+
+
+def validate_resume_snapshot(snapshot: Dict[str, Any], config: Dict[str, Any]) -> List[str]:
+    """检查快照是否仍可用于恢复构建
+
+    Args:
+        snapshot: 快照数据
+        config: 当前项目配置字典
+
+    Returns:
+        List[str]: 问题列表，空列表表示可以恢复
+    """
+    problems = []
+
+    saved_config = snapshot.get("config", {})
+    config = json.loads(json.dumps(config, default=str))  # 与快照中的 JSON 形式比较
+    for key in sorted(set(saved_config) | set(config)):
+        if key not in IGNORED_CONFIG_KEYS and saved_config.get(key) != config.get(key):
+            problems.append(f"配置项已修改: {key}")
+
+    for path_str, digest in snapshot.get("file_hashes", {}).items():
+        path = Path(path_str)
+        if not path.is_file():
+            problems.append(f"文件不存在: {path}")
+        elif hash_file(path) != digest:
+            problems.append(f"文件已修改: {path}")
+
+    return problems
+
+
+def get_remaining_stages(snapshot: Dict[str, Any], stage_names: List[str]) -> List[str]:
+    """获取恢复构建时需要执行的阶段
+
+    Args:
+        snapshot: 快照数据
+        stage_names: 启用的阶段名称（按工作流顺序）
+
+    Returns:
+        List[str]: 未完成的阶段名称
+    """
+    completed = set(snapshot.get("completed_stages", []))
+    return [name for name in stage_names if name not in completed]
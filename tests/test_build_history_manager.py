@@ -489,6 +489,64 @@ class TestBuildHistoryManager(unittest.TestCase):
         all_records.clear()
         self.assertEqual(len(self.manager._records), 5)
 
+    def test_find_latest_output_file(self):
+        """测试查找项目最近一次成功构建的输出文件"""
+        old_hex = Path(self.temp_dir) / "old" / "App.hex"
+        new_hex = Path(self.temp_dir) / "new" / "App.hex"
+        delta_hex = Path(self.temp_dir) / "new" / "App_delta.hex"
+        for path in (old_hex, new_hex, delta_hex):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(":00000001FF\n")
+
+        old = self._create_test_record(workflow_name="old")
+        old.output_files = [str(old_hex.parent), str(old_hex)]
+        new = self._create_test_record(workflow_name="new")
+        new.output_files = [str(delta_hex), str(new_hex)]
+        failed = self._create_test_record(workflow_name="failed", state=BuildState.FAILED)
+        failed.output_files = [str(new_hex)]
+        # 记录按时间从新到旧排列
+        self.manager._records = [failed, new, old]
+
+        found = self.manager.find_latest_output_file(
+            "test_project", ".HEX", exclude=lambda p: p.stem.endswith("_delta")
+        )
+        self.assertEqual(found, new_hex)
+
+        # 文件已被删除时回退到更早的构建
+        new_hex.unlink()
+        delta_hex.unlink()
+        self.assertEqual(self.manager.find_latest_output_file("test_project", ".hex"), old_hex)
+        self.assertIsNone(self.manager.find_latest_output_file("other_project", ".hex"))
+
+    def test_compare_records_a2l_diff(self):
+        """测试对比两次构建输出的 A2L 文件"""
+        block = '/begin MEASUREMENT Speed "" UWORD CM_Speed 0 0 0 {upper}\n  ECU_ADDRESS {address}\n/end MEASUREMENT\n'
+        old_a2l = Path(self.temp_dir) / "old" / "App.a2l"
+        new_a2l = Path(self.temp_dir) / "new" / "App.a2l"
+        for path, upper, address in ((old_a2l, 300, "0x1000"), (new_a2l, 400, "0x2000")):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(block.format(upper=upper, address=address), encoding='utf-8')
+
+        old = self._create_test_record(workflow_name="old")
+        old.output_files = [str(old_a2l.with_suffix(".hex")), str(old_a2l)]
+        new = self._create_test_record(workflow_name="new")
+        new.output_files = [str(new_a2l)]
+        self.manager._records = [new, old]
+
+        comparison = self.manager.compare_records(old.build_id, new.build_id, a2l_diff=True)
+
+        a2l_diff = comparison['a2l_diff']
+        self.assertEqual(a2l_diff['summary']['changed'], 1)
+        self.assertEqual(a2l_diff['changed'][0]['fields'], [
+            {'field': 'upper_limit', 'old': '300', 'new': '400'}
+        ])
+
+        # 默认不对比 A2L；没有 A2L 输出时返回错误说明
+        self.assertNotIn('a2l_diff', self.manager.compare_records(old.build_id, new.build_id))
+        new_a2l.unlink()
+        comparison = self.manager.compare_records(old.build_id, new.build_id, a2l_diff=True)
+        self.assertIn('error', comparison['a2l_diff'])
+
 
 class TestBuildRecord(unittest.TestCase):
     """构建记录单元测试"""
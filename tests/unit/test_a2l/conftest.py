@@ -0,0 +1,105 @@
+"""Shared fixtures for A2L unit tests."""
+
+import pytest
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+
+# 模拟 Simulink 生成代码中的 B/DW 结构体
+SIMULINK_SOURCE = """
+typedef struct {
+    unsigned char Switch;
+    double Out;
+    float Gain[4];
+} B_Model_T;
+
+typedef struct {
+    int Delay2_DSTATE;
+    struct {
+        short Count;
+        long Acc;
+    } Integrator;
+    union {
+        int AsInt;
+        float AsFloat;
+    } Shared;
+} DW_Model_T;
+
+B_Model_T Model_B;
+DW_Model_T Model_DW;
+volatile const int Model_P = 3;
+int Out = 7;
+
+int main(void)
+{
+    Model_B.Out = Model_P + Out;
+    Model_DW.Delay2_DSTATE = (int)Model_B.Out;
+    return 0;
+}
+"""
+
+
+@pytest.fixture(scope="session")
+def simulink_elf():
+    """使用 gcc 编译带 DWARF 信息的测试 ELF"""
+    gcc = shutil.which("gcc")
+    if gcc is None:
+        pytest.skip("gcc 不可用，无法生成测试 ELF")
+
+    temp_dir = Path(tempfile.mkdtemp())
+    source = temp_dir / "model.c"
+    source.write_text(SIMULINK_SOURCE, encoding='utf-8')
+    elf_path = temp_dir / "model.elf"
+
+    proc = subprocess.run(
+        [gcc, "-g", "-O0", "-no-pie", "-o", str(elf_path), str(source)],
+        capture_output=True
+    )
+    if proc.returncode != 0 or not elf_path.exists():
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        pytest.skip(f"gcc 编译失败: {proc.stderr.decode(errors='ignore')}")
+
+    yield elf_path
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+# 标定参数（初始化数据与 .bss）
+CALIBRATION_SOURCE = """
+volatile const unsigned char CalSwitch = 1;
+volatile const float CalGain = 2.5f;
+volatile const short CalTable[4] = {-1, 2, -3, 4};
+volatile const float CalCurve[6] = {0.0f, 1.0f, 2.0f, 10.0f, 20.0f, 30.0f};
+volatile const char CalName[8] = "ECU_A";
+unsigned short CalZero;
+
+int main(void)
+{
+    return CalSwitch + (int)CalGain + CalTable[0] + (int)CalCurve[0] + CalName[0] + CalZero;
+}
+"""
+
+
+@pytest.fixture(scope="session")
+def calibration_elf():
+    """使用 gcc 编译包含标定参数的测试 ELF"""
+    gcc = shutil.which("gcc")
+    if gcc is None:
+        pytest.skip("gcc 不可用，无法生成测试 ELF")
+
+    temp_dir = Path(tempfile.mkdtemp())
+    source = temp_dir / "cal.c"
+    source.write_text(CALIBRATION_SOURCE, encoding='utf-8')
+    elf_path = temp_dir / "cal.elf"
+
+    proc = subprocess.run(
+        [gcc, "-O0", "-no-pie", "-o", str(elf_path), str(source)],
+        capture_output=True
+    )
+    if proc.returncode != 0 or not elf_path.exists():
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        pytest.skip(f"gcc 编译失败: {proc.stderr.decode(errors='ignore')}")
+
+    yield elf_path
+    shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,172 @@
+"""Unit tests for the semantic A2L diff."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.a2l_diff import A2LDiffer, diff_indexes, index_a2l
+
+
+OLD_A2L = """/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin CHARACTERISTIC
+      /* Name                   */      CalGain
+      /* Long Identifier        */      "gain"
+      /* Type                   */      VALUE
+      /* ECU Address            */      0x70001000
+      /* Record Layout          */      Scalar_FLOAT32_IEEE
+      /* Maximum Difference     */      0
+      /* Conversion Method      */      CM_Identity
+      /* Lower Limit            */      0
+      /* Upper Limit            */      10
+    /end CHARACTERISTIC
+    /begin MEASUREMENT Speed "vehicle speed" UWORD CM_Speed 0 0 0 300
+      ECU_ADDRESS 0x70002000 /* @ECU_Address@Speed@ */
+      /begin IF_DATA XCP
+        LINK_MAP "Speed" 0x70002000 0x0 0 0x0 1 0xCF 0x0
+      /end IF_DATA
+    /end MEASUREMENT
+    /begin MEASUREMENT Torque "" FLOAT32_IEEE CM_Identity 0 0 -500 500
+      ECU_ADDRESS 0x70002004
+    /end MEASUREMENT
+    /begin MEASUREMENT OldSignal "" UBYTE CM_Identity 0 0 0 255
+      ECU_ADDRESS 0x70002008
+    /end MEASUREMENT
+    /begin COMPU_METHOD CM_Speed "" LINEAR "%6.2" "km/h"
+      COEFFS_LINEAR 0.1 0
+    /end COMPU_METHOD
+  /end MODULE
+/end PROJECT
+"""
+
+NEW_A2L = """/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin CHARACTERISTIC
+      /* Name                   */      CalGain
+      /* Long Identifier        */      "gain"
+      /* Type                   */      VALUE
+      /* ECU Address            */      0x70003000
+      /* Record Layout          */      Scalar_FLOAT32_IEEE
+      /* Maximum Difference     */      0
+      /* Conversion Method      */      CM_Identity
+      /* Lower Limit            */      0
+      /* Upper Limit            */      20
+    /end CHARACTERISTIC
+    /begin MEASUREMENT Speed "vehicle speed" UWORD CM_Speed 0 0 0 300
+      ECU_ADDRESS 0x70004000
+      /begin IF_DATA XCP
+        LINK_MAP "Speed"   0x70004000 0x0 0 0x0 1 0xCF 0x0
+      /end IF_DATA
+    /end MEASUREMENT
+    /begin MEASUREMENT Torque "" FLOAT32_IEEE CM_Identity 0 0 -500 500
+      ECU_ADDRESS 0x70004004
+      MATRIX_DIM 2 1 1
+    /end MEASUREMENT
+    /begin MEASUREMENT NewSignal "" UBYTE CM_Identity 0 0 0 255
+      ECU_ADDRESS 0x70004008
+    /end MEASUREMENT
+  /end MODULE
+/end PROJECT
+"""
+
+
+class TestA2LIndex:
+    """A2L 对象索引测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_index_fields(self):
+        """测试两种格式的头部字段、关键字行和嵌套块"""
+        path = self.temp_dir / "old.a2l"
+        path.write_text(OLD_A2L, encoding='utf-8')
+
+        index = index_a2l(path)
+
+        assert set(index) == {
+            ("CHARACTERISTIC", "CalGain"),
+            ("MEASUREMENT", "Speed"),
+            ("MEASUREMENT", "Torque"),
+            ("MEASUREMENT", "OldSignal"),
+        }
+        gain = index[("CHARACTERISTIC", "CalGain")]
+        assert gain["address"] == "0x70001000"
+        assert gain["deposit"] == "Scalar_FLOAT32_IEEE"
+        assert gain["upper_limit"] == "10"
+        speed = index[("MEASUREMENT", "Speed")]
+        assert speed["long_identifier"] == '"vehicle speed"'
+        assert speed["conversion"] == "CM_Speed"
+        assert speed["ECU_ADDRESS"] == "0x70002000"
+        assert speed["/begin IF_DATA"].startswith("XCP LINK_MAP")
+
+    def test_missing_file(self):
+        """测试文件不存在"""
+        with pytest.raises(FileNotFoundError):
+            index_a2l(self.temp_dir / "missing.a2l")
+
+
+class TestA2LDiffer:
+    """A2L 差异比较测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.old_path = self.temp_dir / "old.a2l"
+        self.new_path = self.temp_dir / "new.a2l"
+        self.old_path.write_text(OLD_A2L, encoding='utf-8')
+        self.new_path.write_text(NEW_A2L, encoding='utf-8')
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_diff_ignoring_addresses(self):
+        """测试忽略地址时只报告语义变化"""
+        differ = A2LDiffer(ignore_addresses=True)
+        differ.set_log_callback(self.log_messages.append)
+        result = differ.diff(self.old_path, self.new_path)
+
+        assert result.success is True
+        assert result.added == [("MEASUREMENT", "NewSignal")]
+        assert result.removed == [("MEASUREMENT", "OldSignal")]
+        changed = {c.name: c.changes for c in result.changed}
+        assert set(changed) == {"CalGain", "Speed", "Torque"}
+        assert [(c.field, c.old, c.new) for c in changed["CalGain"]] == [("upper_limit", "10", "20")]
+        assert [(c.field, c.old, c.new) for c in changed["Torque"]] == [("MATRIX_DIM", None, "2 1 1")]
+        # IF_DATA 中的地址不属于地址字段
+        assert [c.field for c in changed["Speed"]] == ["/begin IF_DATA"]
+        assert result.address_changed == 0
+        assert self.log_messages
+
+        data = result.to_dict()
+        assert data["summary"]["changed"] == 3
+        assert data["added"] == [{"kind": "MEASUREMENT", "name": "NewSignal"}]
+
+    def test_diff_with_addresses(self):
+        """测试不忽略地址时地址变化也被报告"""
+        result = A2LDiffer(ignore_addresses=False).diff(self.old_path, self.new_path)
+
+        changed = {c.name: [f.field for f in c.changes] for c in result.changed}
+        assert changed["CalGain"] == ["address", "upper_limit"]
+        assert "ECU_ADDRESS" in changed["Speed"]
+
+    def test_address_only_changes(self):
+        """测试只有地址变化的对象被计数但不报告"""
+        old = {("MEASUREMENT", "A"): {"datatype": "UBYTE", "ECU_ADDRESS": "0x1000"}}
+        new = {("MEASUREMENT", "A"): {"datatype": "UBYTE", "ECU_ADDRESS": "0x2000"}}
+
+        result = diff_indexes(old, new, ignore_addresses=True)
+
+        assert result.changed == []
+        assert result.address_changed == 1
@@ -15,8 +15,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
 
 from a2l.address_updater import (
     A2LAddressUpdater,
+    AddressDelta,
     AddressUpdateResult,
-    AddressUpdateError
+    AddressUpdateError,
+    batch_output_names
 )
 
 
@@ -280,8 +282,9 @@ class TestA2LAddressUpdater:
             a2l_path = Path(f.name)
 
         try:
-            # Mock ELF 解析器
-            with patch.object(self.updater._elf_parser, 'extract_symbols') as mock_elf:
+            # Mock ELF 解析器（无 DWARF 成员）
+            with patch.object(self.updater._elf_parser, 'extract_symbols') as mock_elf, \
+                    patch.object(self.updater._dwarf_resolver, 'build_index', return_value={}):
                 mock_elf.return_value = {
                     "Var1": 0x10000001,
                     "Var3": 0x10000003
@@ -301,6 +304,29 @@ class TestA2LAddressUpdater:
         finally:
             a2l_path.unlink()
 
+    def test_get_match_statistics_uses_member_index(self):
+        """测试匹配统计与 update 一样使用 DWARF 结构体成员匹配"""
+        a2l_content = """/begin MEASUREMENT Model_B.Out
+    ECU_ADDRESS 0x00000000
+/end MEASUREMENT
+"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.a2l', delete=False, encoding='utf-8') as f:
+            f.write(a2l_content)
+            a2l_path = Path(f.name)
+
+        try:
+            with patch.object(self.updater._elf_parser, 'extract_symbols', return_value={"Model_B": 0x1000}), \
+                    patch.object(self.updater._dwarf_resolver, 'build_index',
+                                 return_value={"Model_B.Out": 0x1008}):
+                matched, unmatched, total, _ = self.updater.get_match_statistics(
+                    elf_path=Path("/dummy.elf"),
+                    a2l_path=a2l_path
+                )
+
+            assert (matched, unmatched, total) == (1, 0, 1)
+        finally:
+            a2l_path.unlink()
+
 
 class TestA2LAddressUpdaterErrorHandling:
     """地址更新器错误处理测试"""
@@ -359,3 +385,227 @@ class TestA2LAddressUpdaterErrorHandling:
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
+
+
+BATCH_A2L_TEMPLATE = """/begin PROJECT Prj ""
+    /begin CHARACTERISTIC
+      /* Name                   */      {name}
+      /* ECU Address            */      0x00000000
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.Out
+      ECU_ADDRESS 0x00000000
+    /end MEASUREMENT
+/end PROJECT
+"""
+
+
+class TestA2LAddressUpdaterBatch:
+    """批量地址更新测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.output_dir = self.temp_dir / "output"
+        self.output_dir.mkdir()
+        self.symbols = {"CalA": 0x28001000, "CalB": 0x28002000, "Model_B": 0x28003000}
+        self.members = {"Model_B.Out": 0x28003008}
+        self.a2l_paths = []
+        for name in ("CalA", "CalB", "CalC"):
+            path = self.temp_dir / f"{name}.a2l"
+            path.write_text(BATCH_A2L_TEMPLATE.format(name=name), encoding='utf-8')
+            self.a2l_paths.append(path)
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_batch_process_pool(self):
+        """测试进程池批量更新，结果顺序与输入一致"""
+        results = A2LAddressUpdater().update_batch_with_symbol_map(
+            self.symbols, self.a2l_paths, self.output_dir,
+            max_workers=2, member_index=self.members
+        )
+
+        assert [r.success for r in results] == [True, True, True]
+        assert [r.matched_count for r in results] == [2, 2, 1]
+        assert results[2].unmatched_variables == ["CalC"]
+        assert results[0].output_path == str(self.output_dir / "CalA.a2l")
+
+        content = (self.output_dir / "CalB.a2l").read_text(encoding='utf-8')
+        assert "0x28002000" in content
+        assert "0x28003008" in content
+        # 指定输出目录时原文件不变
+        assert "0x28002000" not in self.a2l_paths[1].read_text(encoding='utf-8')
+
+    def test_batch_sequential_matches_pool(self):
+        """测试单进程顺序执行与进程池输出一致"""
+        sequential_dir = self.temp_dir / "sequential"
+        sequential_dir.mkdir()
+
+        A2LAddressUpdater().update_batch_with_symbol_map(
+            self.symbols, self.a2l_paths, sequential_dir,
+            max_workers=1, member_index=self.members
+        )
+        A2LAddressUpdater().update_batch_with_symbol_map(
+            self.symbols, self.a2l_paths, self.output_dir,
+            max_workers=3, member_index=self.members
+        )
+
+        for path in self.a2l_paths:
+            assert (sequential_dir / path.name).read_bytes() == (self.output_dir / path.name).read_bytes()
+
+    def test_batch_failure_is_per_file(self):
+        """测试单个文件失败不影响其他文件"""
+        paths = self.a2l_paths[:1] + [self.temp_dir / "missing.a2l"]
+
+        results = A2LAddressUpdater().update_batch_with_symbol_map(
+            self.symbols, paths, self.output_dir, max_workers=2
+        )
+
+        assert results[0].success is True
+        assert results[1].success is False
+
+    def test_batch_same_basename(self):
+        """测试不同目录下的同名文件输出到不同文件，同一文件重复时报错"""
+        core_dir = self.temp_dir / "core1"
+        core_dir.mkdir()
+        other = core_dir / "CalA.a2l"
+        other.write_text(BATCH_A2L_TEMPLATE.format(name="CalB"), encoding='utf-8')
+
+        results = A2LAddressUpdater().update_batch_with_symbol_map(
+            self.symbols, [self.a2l_paths[0], other], self.output_dir, max_workers=2
+        )
+
+        assert [Path(r.output_path).name for r in results] == [f"{self.temp_dir.name}_CalA.a2l", "core1_CalA.a2l"]
+        assert "0x28001000" in Path(results[0].output_path).read_text(encoding='utf-8')
+        assert "0x28002000" in Path(results[1].output_path).read_text(encoding='utf-8')
+
+        with pytest.raises(ValueError):
+            A2LAddressUpdater().update_batch_with_symbol_map(
+                self.symbols, [self.a2l_paths[0], self.a2l_paths[0]], self.output_dir
+            )
+
+    def test_batch_output_names(self):
+        """测试输出文件名去重"""
+        assert batch_output_names([Path("a/x.a2l"), Path("b/y.a2l")]) == ["x.a2l", "y.a2l"]
+        assert batch_output_names([Path("a/x.a2l"), Path("b/x.a2l")]) == ["a_x.a2l", "b_x.a2l"]
+        assert batch_output_names([Path("a/x.a2l"), Path("c/a/x.a2l")]) == ["0_a_x.a2l", "1_a_x.a2l"]
+
+    def test_batch_empty(self):
+        """测试空列表"""
+        assert A2LAddressUpdater().update_batch_with_symbol_map(self.symbols, []) == []
+
+    def test_batch_with_elf(self, simulink_elf):
+        """测试从 ELF 批量更新时只解析一次 ELF"""
+        updater = A2LAddressUpdater()
+        with patch.object(updater._elf_parser, 'extract_symbols',
+                          wraps=updater._elf_parser.extract_symbols) as extract:
+            results = updater.update_batch(
+                simulink_elf, self.a2l_paths, self.output_dir, max_workers=2
+            )
+
+        assert extract.call_count == 1
+        assert all(r.success for r in results)
+        assert all(r.matched_count == 1 for r in results)
+
+
+INCREMENTAL_A2L = """/begin PROJECT Prj ""
+    /begin CHARACTERISTIC
+      /* Name                   */      Same
+      /* ECU Address            */      4096
+    /end CHARACTERISTIC
+    /begin CHARACTERISTIC
+      /* Name                   */      Moved
+      /* ECU Address            */      0x28000100
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Fresh
+      ECU_ADDRESS 0x0
+    /end MEASUREMENT
+    /begin MEASUREMENT
+      /* Name                   */      Gone
+      ECU_ADDRESS 0x28000300
+    /end MEASUREMENT
+/end PROJECT
+"""
+
+
+class TestA2LAddressUpdaterIncremental:
+    """增量地址更新测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+        self.a2l_path.write_text(INCREMENTAL_A2L, encoding='utf-8')
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_delta_and_changed_lines_only(self):
+        """测试增量报告，且只修改地址变化的行（未变化地址保留原格式）"""
+        symbols = {"Same": 0x1000, "Moved": 0x28000900, "Fresh": 0x28000A00}
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, incremental=True
+        )
+
+        assert result.success is True
+        assert result.write_skipped is False
+        assert result.matched_count == 3
+        assert result.patched_count == 2
+        assert result.updated_variables == ["Moved", "Fresh"]
+        assert result.delta.moved == [("Moved", 0x28000100, 0x28000900)]
+        assert result.delta.new == [("Fresh", 0x28000A00)]
+        assert result.delta.vanished == [("Gone", 0x28000300)]
+        assert result.delta.unchanged_count == 1
+
+        content = self.a2l_path.read_text(encoding='utf-8')
+        assert "      /* ECU Address            */      4096" in content
+        assert "0x28000900" in content
+        assert "ECU_ADDRESS 0x28000A00" in content
+        assert self.a2l_path.with_suffix('.a2l.bak').exists()
+
+    def test_no_change_skips_write(self):
+        """测试地址均未变化时不写文件也不备份"""
+        symbols = {"Same": 0x1000, "Moved": 0x28000100, "Gone": 0x28000300}
+        mtime = self.a2l_path.stat().st_mtime_ns
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, incremental=True
+        )
+
+        assert result.success is True
+        assert result.write_skipped is True
+        assert result.patched_count == 0
+        assert result.delta.has_changes is False
+        assert self.a2l_path.stat().st_mtime_ns == mtime
+        assert not self.a2l_path.with_suffix('.a2l.bak').exists()
+
+    def test_no_change_to_other_output_copies(self):
+        """测试输出到其他路径且无变化时复制原文件"""
+        symbols = {"Same": 0x1000}
+        output_path = self.temp_dir / "out" / "result.a2l"
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, output_path, incremental=True
+        )
+
+        assert result.write_skipped is False
+        assert output_path.read_bytes() == self.a2l_path.read_bytes()
+
+    def test_delta_to_dict(self):
+        """测试增量报告序列化"""
+        delta = AddressDelta()
+        delta.record("A", 0x10, 0x20)
+        delta.record("B", 0, 0x30)
+        delta.record("C", 0x40, None)
+        delta.record("D", 0, None)
+
+        data = delta.to_dict()
+        assert data["moved"] == [{"name": "A", "old": "0x00000010", "new": "0x00000020"}]
+        assert data["new"] == [{"name": "B", "new": "0x00000030"}]
+        assert data["vanished"] == [{"name": "C", "old": "0x00000040"}]
+        assert data["unchanged_count"] == 0
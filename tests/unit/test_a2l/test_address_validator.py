@@ -0,0 +1,176 @@
+"""Unit tests for A2L address range validation."""
+
+import pytest
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.address_validator import (
+    ISSUE_OUTSIDE_SECTION,
+    ISSUE_OVERLAP,
+    ISSUE_SIZE_EXCEEDS_SYMBOL,
+    A2LAddressValidator,
+    A2LObject,
+    AddressValidationError,
+    check_overlaps,
+    check_sections,
+    check_symbol_sizes
+)
+from a2l.elf_parser import ELFParser
+
+
+RECORD_LAYOUTS = """
+    /begin RECORD_LAYOUT Scalar_UBYTE
+      FNC_VALUES 1 UBYTE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Scalar_SWORD
+      FNC_VALUES 1 SWORD COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Lookup1D_FLOAT32_IEEE
+      AXIS_PTS_X 1 FLOAT32_IEEE INDEX_INCR DIRECT
+      FNC_VALUES 2 FLOAT32_IEEE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+"""
+
+CHARACTERISTIC_BLOCK = """
+    /begin CHARACTERISTIC {name} "" {char_type} 0x{address:08X} {layout} 0 NO_COMPU_METHOD 0 100
+      {extra}
+    /end CHARACTERISTIC
+"""
+
+MEASUREMENT_BLOCK = """
+    /begin MEASUREMENT {name} "" {datatype} NO_COMPU_METHOD 0 0 0 100
+      ECU_ADDRESS 0x{address:08X}
+    /end MEASUREMENT
+"""
+
+
+def o(name: str, address: int, size: int) -> A2LObject:
+    """构造测试对象"""
+    return A2LObject(name, "MEASUREMENT", address, size)
+
+
+class TestChecks:
+    """单项检查测试类"""
+
+    def test_check_sections(self):
+        """测试对象必须完整落在一个数据节内"""
+        sections = [(0x100, 0x200), (0x200, 0x300), (0x1000, 0x1100)]
+        objects = [o("ok", 0x1FC, 4), o("cross", 0x1FE, 4), o("gap", 0x800, 1), o("low", 0x10, 1)]
+
+        issues = check_sections(objects, sections)
+
+        assert [i.name for i in issues] == ["cross", "gap", "low"]
+        assert all(i.kind == ISSUE_OUTSIDE_SECTION for i in issues)
+
+    def test_check_overlaps(self):
+        """测试只报告部分重叠，嵌套范围和相同范围不是问题"""
+        objects = [
+            o("struct", 0x100, 16),
+            o("member_a", 0x100, 4),
+            o("member_b", 0x104, 4),
+            o("alias", 0x104, 4),
+            o("shifted", 0x10E, 4),
+            o("inner_bad", 0x106, 4),
+            o("next", 0x120, 2),
+        ]
+
+        issues = check_overlaps(objects)
+
+        assert sorted((i.name, i.detail.split()[1]) for i in issues) == [
+            ("inner_bad", "alias"),
+            ("inner_bad", "member_b"),
+            ("shifted", "struct"),
+        ]
+        assert all(i.kind == ISSUE_OVERLAP for i in issues)
+
+    def test_check_symbol_sizes(self):
+        """测试 A2L 大小超出所在符号，成员在符号内不报错"""
+        symbol_sizes = {0x100: 8, 0x200: 2}
+        objects = [o("member", 0x104, 4), o("too_big", 0x200, 4), o("tail", 0x106, 4), o("free", 0x50, 4)]
+
+        issues = check_symbol_sizes(objects, symbol_sizes)
+
+        assert [i.name for i in issues] == ["too_big", "tail"]
+        assert all(i.kind == ISSUE_SIZE_EXCEEDS_SYMBOL for i in issues)
+
+    def test_large_object_count(self):
+        """测试 50k 个对象的验证耗时"""
+        objects = [o(f"v{i}", 0x1000 + 4 * i, 4) for i in range(50000)]
+        symbol_sizes = {obj.address: 4 for obj in objects}
+
+        start = time.monotonic()
+        result = A2LAddressValidator().validate(objects, [(0x1000, 0x1000 + 4 * 50000)], symbol_sizes)
+
+        assert result.success is True
+        assert time.monotonic() - start < 2.0
+
+
+class TestA2LAddressValidator:
+    """地址验证器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_a2l(self, elf_path: Path) -> Path:
+        """按 ELF 符号地址生成包含正确和错误对象的 A2L"""
+        symbols = ELFParser(use_raw_reader=True).extract_symbols(elf_path)
+        blocks = [
+            CHARACTERISTIC_BLOCK.format(name="CalSwitch", char_type="VALUE", address=symbols["CalSwitch"],
+                                        layout="Scalar_UBYTE", extra=""),
+            CHARACTERISTIC_BLOCK.format(name="CalTable", char_type="VAL_BLK", address=symbols["CalTable"],
+                                        layout="Scalar_SWORD", extra="MATRIX_DIM 4 1 1"),
+            CHARACTERISTIC_BLOCK.format(name="CalCurve", char_type="CURVE", address=symbols["CalCurve"],
+                                        layout="Lookup1D_FLOAT32_IEEE", extra=""),
+            CHARACTERISTIC_BLOCK.format(name="CalRemoved", char_type="VALUE", address=0,
+                                        layout="Scalar_UBYTE", extra=""),
+            MEASUREMENT_BLOCK.format(name="CalGain", datatype="FLOAT32_IEEE", address=symbols["CalGain"]),
+            MEASUREMENT_BLOCK.format(name="CalTable_0", datatype="SWORD", address=symbols["CalTable"]),
+            MEASUREMENT_BLOCK.format(name="CalZero", datatype="ULONG", address=symbols["CalZero"]),
+            MEASUREMENT_BLOCK.format(name="Stale", datatype="UBYTE", address=0x10),
+        ]
+        a2l_path = self.temp_dir / "App.a2l"
+        a2l_path.write_text(
+            "/begin PROJECT Prj \"\"\n  /begin MODULE Mod \"\"\n"
+            + RECORD_LAYOUTS + "".join(blocks) + "  /end MODULE\n/end PROJECT\n",
+            encoding='utf-8'
+        )
+        return a2l_path
+
+    def test_validate_file(self, calibration_elf):
+        """测试 ELF 节与符号检查"""
+        a2l_path = self._write_a2l(calibration_elf)
+
+        validator = A2LAddressValidator()
+        validator.set_log_callback(self.log_messages.append)
+        result = validator.validate_file(a2l_path, calibration_elf)
+
+        assert result.success is False
+        assert result.object_count == 7
+        assert list(result.skipped) == ["CalRemoved"]
+        assert [i.name for i in result.issues if i.kind == ISSUE_OUTSIDE_SECTION] == ["Stale"]
+        # CalZero 是 2 字节的 unsigned short，A2L 声明为 ULONG
+        assert [i.name for i in result.issues if i.kind == ISSUE_SIZE_EXCEEDS_SYMBOL] == ["CalZero"]
+        assert any("CalZero" in message for message in self.log_messages)
+
+    def test_invalid_files(self, calibration_elf):
+        """测试无效的 A2L 和 ELF 文件"""
+        bad_elf = self.temp_dir / "bad.elf"
+        bad_elf.write_bytes(b"not an elf" * 10)
+        a2l_path = self._write_a2l(calibration_elf)
+
+        with pytest.raises(AddressValidationError):
+            A2LAddressValidator().validate_file(a2l_path, bad_elf)
+        with pytest.raises(FileNotFoundError):
+            A2LAddressValidator().validate_file(self.temp_dir / "missing.a2l", calibration_elf)
@@ -0,0 +1,257 @@
+"""Unit tests for calibration initial-value extraction from ELF."""
+
+import json
+import pytest
+import shutil
+import struct
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.cal_extractor import (
+    CalExtractError,
+    CalibrationExtractor,
+    ELFDataImage,
+    read_characteristic_layouts,
+    read_compu_methods,
+    read_record_layouts
+)
+from a2l.elf_parser import ELFParser
+
+
+RECORD_LAYOUTS = """
+    /begin RECORD_LAYOUT Scalar_UBYTE
+      FNC_VALUES 1 UBYTE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Scalar_FLOAT32_IEEE
+      FNC_VALUES 1 FLOAT32_IEEE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Scalar_SWORD
+      FNC_VALUES 1 SWORD COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Scalar_UWORD
+      FNC_VALUES 1 UWORD COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT Lookup1D_FLOAT32_IEEE
+      AXIS_PTS_X 1 FLOAT32_IEEE INDEX_INCR DIRECT
+      FNC_VALUES 2 FLOAT32_IEEE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+"""
+
+COMPU_METHODS = """
+    /begin COMPU_METHOD
+      /* Name of CompuMethod    */      CM_Identity
+      /* Long identifier        */      "Q = V"
+      /* Conversion Type        */      IDENTICAL
+      /* Format                 */      "%g"
+      /* Units                  */      ""
+    /end COMPU_METHOD
+    /begin COMPU_METHOD CM_Scale "Q = 0.5 * V + 1" RAT_FUNC "%8.3" "rpm"
+      COEFFS 0 2 -2 0 0 1
+    /end COMPU_METHOD
+    /begin COMPU_METHOD CM_Linear "" LINEAR "%8.3" ""
+      COEFFS_LINEAR 0.25 -1e1
+    /end COMPU_METHOD
+    /begin COMPU_METHOD CM_Square "" RAT_FUNC "%8.3" ""
+      COEFFS 1 0 0 0 0 1
+    /end COMPU_METHOD
+    /begin COMPU_METHOD CM_Verbal "" TAB_VERB "%8.3" ""
+      COMPU_TAB_REF VTAB_Mode
+    /end COMPU_METHOD
+"""
+
+SIMULINK_BLOCK = """
+    /begin CHARACTERISTIC
+      /* Name                   */      {name}
+      /* Long Identifier        */      ""
+      /* Type                   */      {char_type}
+      /* ECU Address            */      0x{address:08X}
+      /* Record Layout          */      {layout}
+      /* Maximum Difference     */      0
+      /* Conversion Method      */      CM_Identity
+      /* Lower Limit            */      -1000
+      /* Upper Limit            */      1000
+      {extra}
+      /begin IF_DATA XCP
+        MATRIX_DIM 99 99 99
+      /end IF_DATA
+    /end CHARACTERISTIC
+"""
+
+STANDARD_BLOCK = """
+    /begin CHARACTERISTIC {name} "standard format" {char_type} 0x{address:08X} {layout} 0 NO_COMPU_METHOD 0 100
+      {extra}
+    /end CHARACTERISTIC
+"""
+
+
+def build_a2l(symbols: dict) -> str:
+    """生成包含全部测试标定参数的 A2L 文本"""
+    blocks = [
+        SIMULINK_BLOCK.format(name="CalSwitch", char_type="VALUE", address=symbols["CalSwitch"],
+                              layout="Scalar_UBYTE", extra=""),
+        SIMULINK_BLOCK.format(name="CalGain", char_type="VALUE", address=symbols["CalGain"],
+                              layout="Scalar_FLOAT32_IEEE", extra=""),
+        STANDARD_BLOCK.format(name="CalTable", char_type="VAL_BLK", address=symbols["CalTable"],
+                              layout="Scalar_SWORD", extra="MATRIX_DIM 4 1 1"),
+        SIMULINK_BLOCK.format(name="CalCurve", char_type="CURVE", address=symbols["CalCurve"],
+                              layout="Lookup1D_FLOAT32_IEEE", extra=""),
+        STANDARD_BLOCK.format(name="CalName", char_type="ASCII", address=symbols["CalName"],
+                              layout="Scalar_UBYTE", extra="NUMBER 8"),
+        SIMULINK_BLOCK.format(name="CalZero", char_type="VALUE", address=symbols["CalZero"],
+                              layout="Scalar_UWORD", extra=""),
+        SIMULINK_BLOCK.format(name="CalRemoved", char_type="VALUE", address=0,
+                              layout="Scalar_UBYTE", extra=""),
+    ]
+    return (
+        "ASAP2_VERSION 1 60\n/begin PROJECT Prj \"\"\n  /begin MODULE Mod \"\"\n"
+        + RECORD_LAYOUTS + "".join(blocks) + COMPU_METHODS + "  /end MODULE\n/end PROJECT\n"
+    )
+
+
+class TestA2LLayoutScan:
+    """A2L 存储描述扫描测试类"""
+
+    def test_characteristic_layouts(self):
+        """测试两种格式的头部字段和元素个数，忽略嵌套块中的关键字"""
+        symbols = {name: 0x1000 + i for i, name in enumerate(
+            ["CalSwitch", "CalGain", "CalTable", "CalCurve", "CalName", "CalZero"])}
+        layouts = read_characteristic_layouts(build_a2l(symbols).encode())
+
+        assert layouts["CalSwitch"].char_type == "VALUE"
+        assert layouts["CalSwitch"].deposit == "Scalar_UBYTE"
+        assert layouts["CalSwitch"].element_count == 1
+        assert layouts["CalTable"].char_type == "VAL_BLK"
+        assert layouts["CalTable"].address_str == "0x00001002"
+        assert layouts["CalTable"].element_count == 4
+        assert layouts["CalName"].element_count == 8
+        assert layouts["CalSwitch"].conversion == "CM_Identity"
+        assert layouts["CalTable"].conversion == "NO_COMPU_METHOD"
+
+    def test_record_layouts(self):
+        """测试带轴点的记录布局没有简单数据类型"""
+        layouts = read_record_layouts(RECORD_LAYOUTS.encode())
+
+        assert layouts["Scalar_FLOAT32_IEEE"] == "FLOAT32_IEEE"
+        assert layouts["Scalar_SWORD"] == "SWORD"
+        assert layouts["Lookup1D_FLOAT32_IEEE"] is None
+
+    def test_compu_methods(self):
+        """测试线性转换方法转换为系数，查表和非线性转换为 None"""
+        methods = read_compu_methods(COMPU_METHODS.encode())
+
+        assert methods == {
+            "CM_Identity": (1.0, 0.0),
+            "CM_Scale": (0.5, 1.0),
+            "CM_Linear": (0.25, -10.0),
+            "CM_Square": None,
+            "CM_Verbal": None,
+        }
+
+
+class TestCalibrationExtractor:
+    """标定值提取器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_a2l(self, elf_path: Path) -> Path:
+        """按 ELF 符号地址生成测试 A2L"""
+        symbols = ELFParser(use_raw_reader=True).extract_symbols(elf_path)
+        a2l_path = self.temp_dir / "cal.a2l"
+        a2l_path.write_text(build_a2l(symbols), encoding='utf-8')
+        return a2l_path
+
+    def test_extract_json(self, calibration_elf):
+        """测试 JSON 快照包含 ELF 中的初始值"""
+        a2l_path = self._write_a2l(calibration_elf)
+        output = self.temp_dir / "out" / "cal.json"
+
+        extractor = CalibrationExtractor()
+        extractor.set_log_callback(self.log_messages.append)
+        result = extractor.extract(a2l_path, calibration_elf, output)
+
+        assert result.success is True
+        assert result.characteristic_count == 7
+        assert result.extracted_count == 6
+        assert list(result.skipped) == ["CalRemoved"]
+        assert self.log_messages
+
+        data = json.loads(output.read_text(encoding='utf-8'))["characteristics"]
+        assert data["CalSwitch"]["data"] == "01"
+        assert struct.unpack("<f", bytes.fromhex(data["CalGain"]["data"]))[0] == 2.5
+        assert struct.unpack("<4h", bytes.fromhex(data["CalTable"]["data"])) == (-1, 2, -3, 4)
+        # CURVE 使用 ELF 符号大小
+        assert data["CalCurve"]["size"] == 24
+        assert bytes.fromhex(data["CalName"]["data"]).rstrip(b"\0") == b"ECU_A"
+        # .bss 中的参数初始值为 0
+        assert data["CalZero"]["data"] == "0000"
+
+    def test_extract_cdfx(self, calibration_elf):
+        """测试 CDFX 快照包含可解码的参数，CURVE 被跳过"""
+        a2l_path = self._write_a2l(calibration_elf)
+        output = self.temp_dir / "cal.cdfx"
+
+        result = CalibrationExtractor().extract(a2l_path, calibration_elf, output)
+
+        assert result.snapshot_format == "cdfx"
+        assert result.extracted_count == 5
+        assert "CalCurve" in result.skipped
+
+        root = ET.fromstring(output.read_bytes().split(b"\n", 2)[2])
+        instances = {
+            inst.findtext("SHORT-NAME"): inst
+            for inst in root.iter("SW-INSTANCE")
+        }
+        assert set(instances) == {"CalSwitch", "CalGain", "CalTable", "CalName", "CalZero"}
+        assert [v.text for v in instances["CalTable"].iter("V")] == ["4", "-1", "2", "-3", "4"]
+        assert instances["CalGain"].find(".//V").text == "2.5"
+        assert instances["CalName"].find(".//VT").text == "ECU_A"
+
+    def test_extract_cdfx_physical_values(self, calibration_elf):
+        """测试 CDFX 数值按 COMPU_METHOD 转换为物理值，非线性转换的参数被跳过"""
+        a2l_path = self._write_a2l(calibration_elf)
+        text = a2l_path.read_text(encoding='utf-8')
+        text = text.replace("Scalar_SWORD 0 NO_COMPU_METHOD", "Scalar_SWORD 0 CM_Scale")
+        text = text.replace("CM_Identity\n      /* Lower", "CM_Verbal\n      /* Lower", 1)
+        a2l_path.write_text(text, encoding='utf-8')
+        output = self.temp_dir / "cal.cdfx"
+
+        result = CalibrationExtractor().extract(a2l_path, calibration_elf, output)
+
+        assert "CM_Verbal" in result.skipped["CalSwitch"]
+        root = ET.fromstring(output.read_bytes().split(b"\n", 2)[2])
+        instances = {
+            inst.findtext("SHORT-NAME"): inst
+            for inst in root.iter("SW-INSTANCE")
+        }
+        assert set(instances) == {"CalGain", "CalTable", "CalName", "CalZero"}
+        assert [v.text for v in instances["CalTable"].iter("V")] == ["4", "0.5", "2", "-0.5", "3"]
+
+    def test_address_outside_data_sections(self, calibration_elf):
+        """测试地址不在初始化数据节中的参数被跳过"""
+        with ELFDataImage(calibration_elf) as elf:
+            assert elf.view(0x10, 4) is None
+            view = elf.view(ELFParser().extract_symbols(calibration_elf)["CalSwitch"], 1)
+            assert view.tobytes() == b"\x01"
+            view.release()
+
+    def test_invalid_elf(self):
+        """测试无效 ELF 文件"""
+        bad = self.temp_dir / "bad.elf"
+        bad.write_bytes(b"not an elf" * 10)
+
+        with pytest.raises(CalExtractError):
+            ELFDataImage(bad)
+        with pytest.raises(FileNotFoundError):
+            ELFDataImage(self.temp_dir / "missing.elf")
@@ -0,0 +1,155 @@
+"""Unit tests for the multi-core chunked A2L post-processor."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.chunked_processor import ChunkedA2LPostProcessor, split_a2l_chunks
+from a2l.post_processor import A2LPostProcessor
+
+
+HEADER = """ASAP2_VERSION 1 60
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin MOD_PAR ""
+      /begin IF_DATA XCP
+        OLD_XCP_SETTINGS
+      /end IF_DATA
+    /end MOD_PAR
+"""
+
+BLOCK = """    /begin CHARACTERISTIC
+      /* Name                   */      Cal{index}
+      /* ECU Address            */      0x0000
+      /begin IF_DATA XCP
+        LINK_MAP "Cal{index}" 0x0 0x0 0x0 0x0 0x0 0x0
+      /end IF_DATA
+    /end CHARACTERISTIC
+    /begin MEASUREMENT Meas{index} ""
+      ECU_ADDRESS 0x0000
+    /end MEASUREMENT
+"""
+
+FOOTER = """  /end MODULE
+/end PROJECT
+"""
+
+TEMPLATE = "/* NEW XCP HEADER */\n/begin MOD_PAR \"new\"\n/end MOD_PAR"
+
+
+def build_a2l(count: int) -> str:
+    """生成包含 count 组变量块的 A2L 文本"""
+    return HEADER + "".join(BLOCK.format(index=i) for i in range(count)) + FOOTER
+
+
+def build_options(count: int) -> dict:
+    """生成后处理选项（奇数编号的 CHARACTERISTIC 无符号，过滤后被删除）"""
+    symbols = {f"Cal{i}": 0x28000000 + i * 16 for i in range(0, count, 2)}
+    symbols.update({f"Meas{i}": 0x29000000 + i * 16 for i in range(count)})
+    return dict(
+        symbol_map=symbols,
+        remove_if_data_xcp=True,
+        filter_zero_address=True,
+        xcp_template=TEMPLATE
+    )
+
+
+class TestSplitA2LChunks:
+    """分块函数测试类"""
+
+    def test_chunks_reassemble(self):
+        """测试分块拼接后与原文相同，且每块（除第一块）从变量块开始"""
+        content = build_a2l(50)
+        chunks = split_a2l_chunks(content, 8)
+
+        assert len(chunks) > 1
+        assert "".join(chunks) == content
+        for chunk in chunks[1:]:
+            assert chunk.lstrip().startswith("/begin CHARACTERISTIC") or \
+                chunk.lstrip().startswith("/begin MEASUREMENT")
+
+    def test_start_keeps_header_in_first_chunk(self):
+        """测试切分点不早于 start"""
+        content = build_a2l(50)
+        start = content.index("/end MOD_PAR")
+        chunks = split_a2l_chunks(content, 100, start)
+
+        assert "/end MOD_PAR" in chunks[0]
+
+    def test_single_chunk(self):
+        """测试块数为 1 或无边界时不切分"""
+        assert split_a2l_chunks("abc", 1) == ["abc"]
+        assert split_a2l_chunks("no blocks\n" * 10, 4) == ["no blocks\n" * 10]
+
+
+class TestChunkedA2LPostProcessor:
+    """分块后处理器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_parallel_matches_sequential(self):
+        """测试多进程分块处理结果与单遍处理器逐字节一致"""
+        content = build_a2l(200)
+        options = build_options(200)
+
+        expected, expected_result = A2LPostProcessor(**options).process_text(content)
+        actual, actual_result = ChunkedA2LPostProcessor(
+            max_workers=3, min_chunk_size=256, **options
+        ).process_text(content)
+
+        assert actual == expected
+        assert actual_result.success is True
+        assert actual_result.header_found is True
+        assert actual_result.matched_count == expected_result.matched_count
+        assert actual_result.updated_variables == expected_result.updated_variables
+        assert actual_result.removed_variables == expected_result.removed_variables
+        assert actual_result.if_data_removed == expected_result.if_data_removed == 201
+        assert actual_result.zero_address_removed == 100
+        assert actual_result.delta.to_dict() == expected_result.delta.to_dict()
+
+    def test_process_file(self):
+        """测试文件处理与单遍处理器输出一致"""
+        a2l_path = self.temp_dir / "merged.a2l"
+        a2l_path.write_text(build_a2l(100), encoding='utf-8')
+        options = build_options(100)
+
+        A2LPostProcessor(**options).process(a2l_path, self.temp_dir / "sequential.a2l")
+        result = ChunkedA2LPostProcessor(
+            max_workers=2, min_chunk_size=256, **options
+        ).process(a2l_path, self.temp_dir / "parallel.a2l")
+
+        assert result.success is True
+        assert (self.temp_dir / "parallel.a2l").read_bytes() == \
+            (self.temp_dir / "sequential.a2l").read_bytes()
+
+    def test_missing_header_not_chunked(self):
+        """测试没有 /end MOD_PAR 时报告未找到头部"""
+        content = build_a2l(50).replace("/end MOD_PAR", "/end OTHER")
+
+        _, result = ChunkedA2LPostProcessor(
+            max_workers=2, min_chunk_size=64, xcp_template=TEMPLATE
+        ).process_text(content)
+
+        assert result.success is False
+        assert result.header_found is False
+
+    def test_small_file_sequential(self):
+        """测试小文件不启动进程池"""
+        content = build_a2l(3)
+        processor = ChunkedA2LPostProcessor(max_workers=4, **build_options(3))
+
+        assert processor._split(content) == [content]
+        output, result = processor.process_text(content)
+        assert output == A2LPostProcessor(**build_options(3)).process_text(content)[0]
+        assert result.success is True
@@ -0,0 +1,211 @@
+"""Unit tests for XCP DAQ/ODT packing optimization."""
+
+import json
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.daq_optimizer import (
+    DAQOptimizeError,
+    DAQOptimizer,
+    MeasurementInfo,
+    merge_ranges,
+    naive_packing,
+    pack_entries,
+    read_measurements,
+    split_range
+)
+
+
+A2L_CONTENT = """
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin MEASUREMENT
+      /* Name                   */      SpeedHigh
+      /* Long identifier        */      ""
+      /* Data type              */      UBYTE
+      /* Conversion method      */      CM_Identity
+      /* Resolution (Not used)  */      0
+      /* Accuracy (Not used)    */      0
+      /* Lower limit            */      0
+      /* Upper limit            */      255
+      ECU_ADDRESS                       0x1001 /* @ECU_Address@SpeedHigh@ */
+    /end MEASUREMENT
+    /begin MEASUREMENT Torque "standard format" FLOAT32_IEEE NO_COMPU_METHOD 0 0 -1000 1000
+      ECU_ADDRESS 0x2000
+    /end MEASUREMENT
+    /begin MEASUREMENT SpeedLow "" UBYTE NO_COMPU_METHOD 0 0 0 255
+      /begin IF_DATA XCP
+        ECU_ADDRESS 0x9999
+      /end IF_DATA
+      ECU_ADDRESS 0x1000
+    /end MEASUREMENT
+    /begin MEASUREMENT Buffer "" UWORD NO_COMPU_METHOD 0 0 0 65535
+      MATRIX_DIM 3 2 1
+      ECU_ADDRESS 0x3000
+    /end MEASUREMENT
+    /begin MEASUREMENT TestMeas
+        "Test Measurement"
+        SWORD
+        ENGINE_SPEED
+        0.5
+        0.0
+        0.0
+        255.0
+        address 0x1002
+    /end MEASUREMENT
+    /begin MEASUREMENT Removed "" UBYTE NO_COMPU_METHOD 0 0 0 255
+      ECU_ADDRESS 0x0000
+    /end MEASUREMENT
+    /begin MEASUREMENT Strange "" UNKNOWN_TYPE NO_COMPU_METHOD 0 0 0 255
+      ECU_ADDRESS 0x4000
+    /end MEASUREMENT
+  /end MODULE
+/end PROJECT
+"""
+
+
+def m(name: str, address: int, size: int) -> MeasurementInfo:
+    """构造测试变量"""
+    return MeasurementInfo(name, address, size)
+
+
+class TestReadMeasurements:
+    """MEASUREMENT 扫描测试类"""
+
+    def test_read_measurements(self):
+        """测试三种地址格式、数组大小和跳过原因"""
+        measurements, skipped = read_measurements(A2L_CONTENT.encode())
+
+        assert [(x.name, x.address, x.size) for x in measurements] == [
+            ("SpeedHigh", 0x1001, 1),
+            ("Torque", 0x2000, 4),
+            ("SpeedLow", 0x1000, 1),
+            ("Buffer", 0x3000, 12),
+            ("TestMeas", 0x1002, 2),
+        ]
+        assert set(skipped) == {"Removed", "Strange"}
+
+
+class TestPacking:
+    """打包算法测试类"""
+
+    def test_merge_ranges(self):
+        """测试重叠与相邻的变量合并，间隙按 max_gap 合并"""
+        measurements = [m("c", 0x10, 1), m("a", 0x00, 4), m("member", 0x02, 2), m("b", 0x04, 2)]
+
+        ranges = merge_ranges(measurements)
+        assert [[x.name for x in r] for r in ranges] == [["a", "member", "b"], ["c"]]
+
+        ranges = merge_ranges(measurements, max_gap=10)
+        assert len(ranges) == 1
+
+    def test_split_range(self):
+        """测试在变量边界切分，大于容量的变量被拆分"""
+        entries = split_range([m("a", 0, 4), m("b", 4, 2), m("c", 6, 4), m("big", 10, 9)], 7)
+
+        assert [(e.address, e.size, e.measurements) for e in entries] == [
+            (0, 6, ["a", "b"]),
+            (6, 4, ["c"]),
+            (10, 7, ["big"]),
+            (17, 2, ["big"]),
+        ]
+
+    def test_overlapping_member_not_transmitted_twice(self):
+        """测试结构体内的成员不增加传输字节"""
+        entries = split_range([m("struct", 0, 6), m("member", 2, 2)], 7)
+
+        assert [(e.address, e.size) for e in entries] == [(0, 6)]
+        assert entries[0].measurements == ["struct", "member"]
+
+    def test_pack_entries(self):
+        """测试最佳适配递减装箱不超过 ODT 容量"""
+        entries = split_range([m("a", 0, 4)], 7) + split_range([m("b", 8, 3)], 7) \
+            + split_range([m("c", 16, 5)], 7) + split_range([m("d", 24, 2)], 7)
+
+        odts = pack_entries(entries, 7)
+
+        assert len(odts) == 2
+        assert all(odt.size <= 7 for odt in odts)
+        assert sorted(odt.size for odt in odts) == [7, 7]
+        assert [odt.number for odt in odts] == [0, 1]
+        assert odts[0].entries[0].address == 0
+
+    def test_naive_packing(self):
+        """测试按生成顺序的基准布局"""
+        assert naive_packing([m("a", 0, 4), m("b", 4, 4), m("c", 8, 3), m("big", 16, 9)], 7) == (4, 5)
+
+
+class TestDAQOptimizer:
+    """DAQ 优化器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_optimize_file(self):
+        """测试优化结果优于按生成顺序的布局并写入报告"""
+        a2l_path = self.temp_dir / "App.a2l"
+        a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+        report_path = self.temp_dir / "App_daq.json"
+
+        optimizer = DAQOptimizer(max_odt_bytes=7)
+        optimizer.set_log_callback(self.log_messages.append)
+        result = optimizer.optimize_file(a2l_path, report_path)
+
+        assert result.success is True
+        assert result.measurement_count == 5
+        assert result.range_count == 3
+        assert result.total_bytes == 4 + 4 + 12
+        # 按生成顺序: 3 个 ODT / 6 个条目
+        assert (result.naive_odt_count, result.naive_entry_count) == (3, 6)
+        assert (len(result.odts), result.entry_count) == (3, 5)
+        assert all(odt.size <= 7 for odt in result.odts)
+        assert result.split_measurements == ["Buffer"]
+        assert set(result.skipped) == {"Removed", "Strange"}
+        assert self.log_messages
+
+        report = json.loads(report_path.read_text(encoding='utf-8'))
+        assert report["summary"]["odts"] == len(result.odts)
+        entries = [entry for odt in report["odts"] for entry in odt["entries"]]
+        assert {
+            "address": "0x00001000",
+            "size": 2,
+            "measurements": ["SpeedLow", "SpeedHigh"],
+        } in entries
+
+    def test_contiguous_ranges_use_fewer_entries(self):
+        """测试连续变量合并为一个条目"""
+        measurements = [m(f"sig{i}", 0x100 + 2 * i, 2) for i in range(20)]
+
+        result = DAQOptimizer(max_odt_bytes=8).optimize(list(reversed(measurements)))
+
+        assert len(result.odts) == 5
+        assert result.entry_count == 5
+        assert result.naive_entry_count == 20
+
+    def test_entry_size_limit(self):
+        """测试条目大小受 max_entry_size 限制"""
+        result = DAQOptimizer(max_odt_bytes=64, max_entry_size=4).optimize(
+            [m("a", 0, 2), m("b", 2, 2), m("c", 4, 2)]
+        )
+
+        assert [e.size for odt in result.odts for e in odt.entries] == [4, 2]
+        assert len(result.odts) == 1
+
+    def test_invalid_parameters(self):
+        """测试无效参数和文件"""
+        with pytest.raises(DAQOptimizeError):
+            DAQOptimizer(max_odt_bytes=0)
+        with pytest.raises(FileNotFoundError):
+            DAQOptimizer().optimize_file(self.temp_dir / "missing.a2l")
@@ -0,0 +1,129 @@
+"""Unit tests for the shared in-memory A2L document."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.document import A2LDocument
+from a2l.post_processor import A2LPostProcessError, A2LPostProcessor
+from a2l.support_pruner import A2LSupportPruner
+from stages.a2l_process import (
+    filter_zero_address_variables,
+    find_xcp_header_section,
+    replace_xcp_header_content,
+    verify_a2l_replacement,
+    verify_processed_a2l_file
+)
+
+
+A2L_CONTENT = """ASAP2_VERSION 1 61
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin MOD_PAR ""
+      ECU "Old ECU"
+    /end MOD_PAR
+    /begin CHARACTERISTIC CalGain "增益" VALUE 0x70001000 RL_Float 0 CM_Gain 0 10
+    /end CHARACTERISTIC
+    /begin CHARACTERISTIC
+      /* Name                   */      CalLost
+      /* Long Identifier        */      ""
+      /* Type                   */      VALUE
+      /* ECU Address            */      0x0000 /* @ECU_Address@CalLost@ */
+      /* Record Layout          */      RL_Float
+      /* Maximum Difference     */      0
+      /* Conversion Method      */      CM_Gain
+      /* Lower Limit            */      0
+      /* Upper Limit            */      10
+    /end CHARACTERISTIC
+    /begin RECORD_LAYOUT RL_Float
+      FNC_VALUES 1 FLOAT32_IEEE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT RL_Unused
+      FNC_VALUES 1 SWORD COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin COMPU_METHOD CM_Gain "" LINEAR "%6.2" ""
+      COEFFS_LINEAR 1 0
+    /end COMPU_METHOD
+  /end MODULE
+/end PROJECT
+"""
+
+XCP_TEMPLATE = "ASAP2_VERSION 1 71\n/begin PROJECT Prj \"\"\n  /begin MODULE Mod \"\"\n    /begin XCP\n    /end XCP\n"
+
+
+class TestA2LDocument:
+    """A2L 文档测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "App.a2l"
+        self.a2l_path.write_text(A2L_CONTENT, encoding='gbk')
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_detects_encoding(self):
+        """测试加载时检测一次编码并缓存行和头部位置"""
+        document = A2LDocument.load(self.a2l_path)
+
+        assert document.encoding == 'gbk'
+        assert document.content == A2L_CONTENT
+        assert document.modified is False
+        assert document.lines is document.lines
+        assert document.content[:document.header_end()].endswith("/end MOD_PAR")
+
+        document.replace_range(0, document.header_end(), XCP_TEMPLATE)
+        assert document.modified is True
+        assert document.lines[3] == "    /begin XCP"
+
+    def test_load_invalid_file(self):
+        """测试文件不存在和无法解码"""
+        broken = self.temp_dir / "broken.a2l"
+        broken.write_bytes(b"\xff\xfe\xff")
+
+        with pytest.raises(FileNotFoundError):
+            A2LDocument.load(self.temp_dir / "missing.a2l")
+        with pytest.raises(A2LPostProcessError):
+            A2LDocument.load(broken)
+
+    def test_helpers_share_document(self):
+        """测试各处理步骤在同一文档上进行，保存前不写磁盘"""
+        document = A2LDocument.load(self.a2l_path)
+        self.a2l_path.unlink()
+
+        section = find_xcp_header_section(document, self.log_messages.append)
+        content = replace_xcp_header_content(document, section, XCP_TEMPLATE, self.log_messages.append)
+        _, total, removed = filter_zero_address_variables(document, self.log_messages.append)
+        document.content, prune_result = A2LSupportPruner().prune_text(document.content)
+
+        assert content.startswith(XCP_TEMPLATE)
+        assert (total, removed) == (2, 1)
+        assert prune_result.removed == {"RECORD_LAYOUT": ["RL_Unused"]}
+        assert "CalLost" not in document.content
+        assert verify_a2l_replacement(document, XCP_TEMPLATE, self.log_messages.append) is True
+        _, messages = verify_processed_a2l_file(document, self.log_messages.append)
+        assert messages[0].startswith("✅ XCP 头文件已添加")
+        assert "字符" in messages[-1]
+        assert not self.a2l_path.exists()
+
+        output_path = document.save(self.temp_dir / "out" / "App_new.a2l", newline='\n')
+        assert output_path.read_text(encoding='utf-8') == document.content
+        assert document.modified is False
+        assert list((self.temp_dir / "out").glob("*.tmp")) == []
+
+    def test_process_document_without_header(self):
+        """测试未找到头部时文档保持不变"""
+        document = A2LDocument("/begin PROJECT Prj \"\"\n/end PROJECT\n")
+
+        result = A2LPostProcessor(xcp_template=XCP_TEMPLATE).process_document(document)
+
+        assert result.success is False
+        assert document.modified is False
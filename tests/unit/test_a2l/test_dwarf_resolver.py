@@ -0,0 +1,114 @@
+"""Unit tests for the DWARF struct member resolver."""
+
+import pytest
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.dwarf_resolver import DWARFMemberResolver, _decode_uleb128
+from a2l.elf_parser import ELFParser, ELFParseError
+from a2l.address_updater import match_symbol_address
+
+
+class TestDWARFMemberResolver:
+    """DWARF 成员解析器测试类"""
+
+    def test_init(self):
+        """测试初始化"""
+        resolver = DWARFMemberResolver()
+
+        assert resolver.elf_path is None
+        assert resolver.index == {}
+        assert resolver.get_variable_count() == 0
+
+    def test_build_index_file_not_found(self):
+        """测试文件不存在"""
+        resolver = DWARFMemberResolver()
+
+        with pytest.raises(FileNotFoundError):
+            resolver.build_index(Path("nonexistent.elf"))
+
+    def test_build_index_invalid_elf(self):
+        """测试无效 ELF 文件"""
+        with tempfile.NamedTemporaryFile(suffix='.elf', delete=False) as f:
+            f.write(b"not an elf file")
+            temp_path = Path(f.name)
+
+        try:
+            with pytest.raises(ELFParseError):
+                DWARFMemberResolver().build_index(temp_path)
+        finally:
+            temp_path.unlink()
+
+    def test_struct_member_offsets(self, simulink_elf):
+        """测试结构体成员地址 = 变量基址 + 成员偏移"""
+        symbols = ELFParser().extract_symbols(simulink_elf)
+        resolver = DWARFMemberResolver()
+        resolver.build_index(simulink_elf)
+
+        base_b = symbols["Model_B"]
+        assert resolver.resolve("Model_B") == base_b
+        assert resolver.resolve("Model_B.Switch") == base_b
+        assert resolver.resolve("Model_B.Out") == base_b + 8
+        assert resolver.resolve("Model_B.Gain") == base_b + 16
+
+    def test_nested_and_union_members(self, simulink_elf):
+        """测试嵌套结构体与联合体成员"""
+        symbols = ELFParser().extract_symbols(simulink_elf)
+        resolver = DWARFMemberResolver()
+        resolver.build_index(simulink_elf)
+
+        base_dw = symbols["Model_DW"]
+        assert resolver.resolve("Model_DW.Delay2_DSTATE") == base_dw
+        assert resolver.resolve("Model_DW.Integrator.Count") == base_dw + 8
+        assert resolver.resolve("Model_DW.Integrator.Acc") == base_dw + 16
+        assert resolver.resolve("Model_DW.Shared.AsInt") == base_dw + 24
+        assert resolver.resolve("Model_DW.Shared.AsFloat") == base_dw + 24
+
+    def test_scalar_with_qualifiers(self, simulink_elf):
+        """测试 const/volatile 修饰的标量变量"""
+        symbols = ELFParser().extract_symbols(simulink_elf)
+        resolver = DWARFMemberResolver()
+        resolver.build_index(simulink_elf)
+
+        assert resolver.resolve("Model_P") == symbols["Model_P"]
+        assert resolver.resolve("Model_P.Anything") is None
+        assert resolver.resolve("Model_B.Missing") is None
+
+    def test_index_built_once_per_elf(self, simulink_elf):
+        """测试同一 ELF 只构建一次索引"""
+        resolver = DWARFMemberResolver()
+        first = resolver.build_index(simulink_elf)
+        second = resolver.build_index(simulink_elf)
+
+        assert first is second
+        assert resolver.get_variable_count() >= 4
+
+    def test_member_match_beats_leaf_match(self, simulink_elf):
+        """测试成员路径优先于叶子节点匹配（避免同名全局变量误匹配）"""
+        symbols = ELFParser().extract_symbols(simulink_elf)
+        index = DWARFMemberResolver().build_index(simulink_elf)
+
+        addr, match_type, _ = match_symbol_address("Model_B.Out", symbols, index)
+        assert match_type == "member"
+        assert addr == symbols["Model_B"] + 8
+
+        # 不提供成员索引时退回叶子节点匹配，得到错误的全局变量 Out
+        addr, match_type, _ = match_symbol_address("Model_B.Out", symbols)
+        assert match_type == "leaf"
+        assert addr == symbols["Out"]
+
+
+class TestDecodeUleb128:
+    """ULEB128 解码测试类"""
+
+    def test_single_byte(self):
+        """测试单字节编码"""
+        assert _decode_uleb128([0x23, 0x08], 1) == 8
+
+    def test_multi_byte(self):
+        """测试多字节编码"""
+        assert _decode_uleb128([0xE5, 0x8E, 0x26], 0) == 624485
@@ -0,0 +1,132 @@
+"""Unit tests for the persistent ELF index cache."""
+
+import os
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.elf_cache import ELFIndexCache, KIND_SYMBOLS, KIND_DWARF_MEMBERS
+from a2l.elf_parser import ELFParser
+from a2l.dwarf_resolver import DWARFMemberResolver
+
+
+class TestELFIndexCache:
+    """ELF 索引缓存测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.cache = ELFIndexCache(self.temp_dir / "cache")
+        self.elf_path = self.temp_dir / "test.elf"
+        self.elf_path.write_bytes(b"\x7fELF" + b"\x00" * 60)
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_store_and_load_roundtrip(self):
+        """测试写入后可完整读回（含 64 位地址和非 ASCII 名称）"""
+        mapping = {"VarA": 0x28001000, "Model_B.Out": 0xFFFFFFFF00000010, "变量": 1}
+        assert self.cache.store(self.elf_path, KIND_SYMBOLS, mapping, extra=5) is not None
+
+        loaded, extra = self.cache.load(self.elf_path, KIND_SYMBOLS)
+        assert loaded == mapping
+        assert extra == 5
+        assert self.cache.hits == 1
+
+    def test_empty_mapping_roundtrip(self):
+        """测试空映射"""
+        self.cache.store(self.elf_path, KIND_SYMBOLS, {})
+
+        loaded, extra = self.cache.load(self.elf_path, KIND_SYMBOLS)
+        assert loaded == {}
+        assert extra == 0
+
+    def test_miss_when_not_cached(self):
+        """测试未缓存时未命中"""
+        assert self.cache.load(self.elf_path, KIND_SYMBOLS) is None
+        assert self.cache.misses == 1
+
+    def test_kinds_are_independent(self):
+        """测试符号表与 DWARF 索引分开缓存"""
+        self.cache.store(self.elf_path, KIND_SYMBOLS, {"A": 1})
+
+        assert self.cache.load(self.elf_path, KIND_DWARF_MEMBERS) is None
+
+    def test_keyed_by_content(self):
+        """测试按内容哈希命中：相同内容的不同路径共享缓存，内容变化则失效"""
+        self.cache.store(self.elf_path, KIND_SYMBOLS, {"A": 1})
+
+        copy_path = self.temp_dir / "copy.elf"
+        shutil.copy(self.elf_path, copy_path)
+        assert self.cache.load(copy_path, KIND_SYMBOLS) == ({"A": 1}, 0)
+
+        copy_path.write_bytes(b"\x7fELF" + b"\x01" * 60)
+        assert self.cache.load(copy_path, KIND_SYMBOLS) is None
+
+    def test_corrupt_cache_is_ignored(self):
+        """测试缓存文件损坏时视为未命中"""
+        cache_path = self.cache.store(self.elf_path, KIND_SYMBOLS, {"A": 1})
+        cache_path.write_bytes(b"garbage")
+
+        assert self.cache.load(self.elf_path, KIND_SYMBOLS) is None
+
+    def test_clear(self):
+        """测试清空缓存"""
+        self.cache.store(self.elf_path, KIND_SYMBOLS, {"A": 1})
+        self.cache.store(self.elf_path, KIND_DWARF_MEMBERS, {"A.b": 2})
+
+        assert self.cache.clear() == 2
+        assert self.cache.load(self.elf_path, KIND_SYMBOLS) is None
+
+    def test_prune_least_recently_used(self):
+        """测试超过大小上限时淘汰最久未使用的缓存文件"""
+        elf_paths = []
+        for i in range(3):
+            path = self.temp_dir / f"v{i}.elf"
+            path.write_bytes(b"\x7fELF" + bytes([i]) * 60)
+            elf_paths.append(path)
+
+        size = len(self.cache.store(elf_paths[0], KIND_SYMBOLS, {"A": 1}).read_bytes())
+        cache = ELFIndexCache(self.temp_dir / "cache", max_bytes=2 * size)
+        os.utime(cache.get_cache_path(elf_paths[0], KIND_SYMBOLS), ns=(1, 1))
+        cache.store(elf_paths[1], KIND_SYMBOLS, {"A": 1})
+        os.utime(cache.get_cache_path(elf_paths[1], KIND_SYMBOLS), ns=(2, 2))
+
+        # 命中刷新修改时间，v0 变为最近使用
+        assert cache.load(elf_paths[0], KIND_SYMBOLS) is not None
+        cache.store(elf_paths[2], KIND_SYMBOLS, {"A": 1})
+
+        assert cache.load(elf_paths[1], KIND_SYMBOLS) is None
+        assert cache.load(elf_paths[0], KIND_SYMBOLS) is not None
+        assert cache.load(elf_paths[2], KIND_SYMBOLS) is not None
+
+
+class TestParsersWithCache:
+    """解析器接入缓存的测试类"""
+
+    def test_elf_parser_uses_cache(self, simulink_elf, tmp_path):
+        """测试第二次解析同一 ELF 命中缓存且结果一致"""
+        cache = ELFIndexCache(tmp_path)
+        first = ELFParser(cache=cache)
+        symbols = first.extract_symbols(simulink_elf)
+
+        second = ELFParser(cache=cache)
+        assert second.extract_symbols(simulink_elf) == symbols
+        assert second.get_filtered_count() == first.get_filtered_count()
+        assert cache.hits == 1
+
+    def test_dwarf_resolver_uses_cache(self, simulink_elf, tmp_path):
+        """测试 DWARF 成员索引从缓存加载"""
+        cache = ELFIndexCache(tmp_path)
+        index = DWARFMemberResolver(cache=cache).build_index(simulink_elf)
+
+        resolver = DWARFMemberResolver(cache=cache)
+        assert resolver.build_index(simulink_elf) == index
+        assert resolver.resolve("Model_B.Out") == index["Model_B.Out"]
+        assert cache.hits == 1
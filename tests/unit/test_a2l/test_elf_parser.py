@@ -6,6 +6,7 @@ Story 2.9 - Task 9.1: Test ELF parser functionality
 import pytest
 import tempfile
 import struct
+import time
 from pathlib import Path
 from unittest.mock import patch, MagicMock
 
@@ -159,6 +160,182 @@ class TestELFParserMocked:
             temp_path.unlink()
 
 
+def build_minimal_elf(symbols, elf_class=2, little_endian=True):
+    """构造只包含 .symtab/.strtab/.shstrtab 的最小 ELF 文件内容
+
+    Args:
+        symbols: (名称, 地址) 列表
+        elf_class: 1 = ELF32, 2 = ELF64
+        little_endian: 是否小端
+
+    Returns:
+        bytes: ELF 文件内容
+    """
+    order = '<' if little_endian else '>'
+    is64 = elf_class == 2
+
+    names = [b""]
+    entries = [(0, 0)]
+    str_size = 1
+    for name, addr in symbols:
+        encoded = name.encode('utf-8')
+        entries.append((str_size, addr))
+        names.append(encoded)
+        str_size += len(encoded) + 1
+    strtab = b"\0".join(names) + b"\0"
+
+    if is64:
+        symtab = b"".join(struct.pack(order + 'IBBHQQ', n, 0x11, 0, 1, a, 4) for n, a in entries)
+    else:
+        symtab = b"".join(struct.pack(order + 'IIIBBH', n, a, 4, 0x11, 0, 1) for n, a in entries)
+
+    shstrtab = b"\0.symtab\0.strtab\0.shstrtab\0"
+    ehsize = 64 if is64 else 52
+    shentsize = 64 if is64 else 40
+    sym_entsize = 24 if is64 else 16
+
+    symtab_off = ehsize
+    strtab_off = symtab_off + len(symtab)
+    shstrtab_off = strtab_off + len(strtab)
+    shoff = shstrtab_off + len(shstrtab)
+
+    ident = b"\x7fELF" + bytes([elf_class, 1 if little_endian else 2, 1]) + b"\0" * 9
+    if is64:
+        header = ident + struct.pack(order + 'HHIQQQIHHHHHH', 2, 62, 1, 0, 0, shoff, 0,
+                                     ehsize, 0, 0, shentsize, 4, 3)
+        shdr_fmt = order + 'IIQQQQIIQQ'
+    else:
+        header = ident + struct.pack(order + 'HHIIIIIHHHHHH', 2, 40, 1, 0, 0, shoff, 0,
+                                     ehsize, 0, 0, shentsize, 4, 3)
+        shdr_fmt = order + 'IIIIIIIIII'
+
+    sections = [
+        struct.pack(shdr_fmt, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0),
+        struct.pack(shdr_fmt, 1, 2, 0, 0, symtab_off, len(symtab), 2, 1, 8, sym_entsize),
+        struct.pack(shdr_fmt, 9, 3, 0, 0, strtab_off, len(strtab), 0, 0, 1, 0),
+        struct.pack(shdr_fmt, 17, 3, 0, 0, shstrtab_off, len(shstrtab), 0, 0, 1, 0),
+    ]
+    return header + symtab + strtab + shstrtab + b"".join(sections)
+
+
+class TestELFParserRawReader:
+    """原始符号表快速解析测试类"""
+
+    SYMBOLS = [
+        ("Model_B", 0x28001000),
+        ("CalVar", 0x28002000),
+        ("ZeroVar", 0),
+        ("__internal", 0x28003000),
+        ("_ZN3fooEv", 0x28004000),
+        ("module_init", 0x28005000),
+        ("CalVar", 0x28006000),
+        ("变量", 0x28007000),
+    ]
+
+    @pytest.mark.parametrize("elf_class", [1, 2])
+    @pytest.mark.parametrize("little_endian", [True, False])
+    def test_raw_reader_matches_pyelftools(self, tmp_path, elf_class, little_endian):
+        """测试快速路径与 pyelftools 路径结果一致（ELF32/64，大小端）"""
+        elf_path = tmp_path / "test.elf"
+        elf_path.write_bytes(build_minimal_elf(self.SYMBOLS, elf_class, little_endian))
+
+        raw_parser = ELFParser()
+        raw_symbols = raw_parser.extract_symbols(elf_path)
+
+        slow_parser = ELFParser(use_raw_reader=False)
+        slow_symbols = slow_parser.extract_symbols(elf_path)
+
+        assert raw_symbols == slow_symbols
+        assert raw_symbols == {
+            "Model_B": 0x28001000,
+            "CalVar": 0x28006000,
+            "变量": 0x28007000,
+        }
+        assert raw_parser.get_filtered_count() == slow_parser.get_filtered_count() == 3
+
+    @pytest.mark.parametrize("elf_class", [1, 2])
+    @pytest.mark.parametrize("little_endian", [True, False])
+    def test_raw_reader_tail_merged_names(self, tmp_path, elf_class, little_endian):
+        """测试符号名指向尾部合并字符串中间时与 pyelftools 一致"""
+        symbols = [
+            ("svar_X", 0x100), ("mod_init", 0x104), ("x__y", 0x108),
+            ("p1", 0x10C), ("p2", 0x110), ("p3", 0x114), ("p4", 0x118),
+        ]
+        data = bytearray(build_minimal_elf(symbols, elf_class, little_endian))
+
+        # 字符串表偏移与 build_minimal_elf 一致；p1~p4 改为指向其他名称的中间
+        offsets, pos = {}, 1
+        for name, _ in symbols:
+            offsets[name] = pos
+            pos += len(name) + 1
+        symtab_off, entsize = (64, 24) if elf_class == 2 else (52, 16)
+        order = '<' if little_endian else '>'
+        for index, st_name in [(4, offsets["svar_X"] + 1), (5, offsets["mod_init"] + 3),
+                               (6, offsets["mod_init"] + 4), (7, offsets["x__y"] + 1)]:
+            struct.pack_into(order + 'I', data, symtab_off + entsize * index, st_name)
+        elf_path = tmp_path / "merged.elf"
+        elf_path.write_bytes(bytes(data))
+
+        raw_parser = ELFParser()
+        raw_symbols = raw_parser.extract_symbols(elf_path)
+        slow_parser = ELFParser(use_raw_reader=False)
+
+        assert raw_symbols == slow_parser.extract_symbols(elf_path)
+        assert raw_symbols == {"svar_X": 0x100, "x__y": 0x108, "var_X": 0x10C, "init": 0x114}
+        assert raw_parser.get_filtered_count() == slow_parser.get_filtered_count() == 3
+
+    def test_raw_reader_million_symbols(self, tmp_path):
+        """测试 100 万个符号的解析耗时（取 3 次最快值，排除机器抖动）"""
+        symbols = [
+            (f"Model_B.Signal_{i}" if i % 10 else f"__internal_{i}", 0x20000000 + 4 * i)
+            for i in range(1_000_000)
+        ]
+        elf_path = tmp_path / "big.elf"
+        elf_path.write_bytes(build_minimal_elf(symbols, elf_class=1))
+
+        elapsed = []
+        for _ in range(3):
+            parser = ELFParser()
+            start = time.monotonic()
+            result = parser.extract_symbols(elf_path)
+            elapsed.append(time.monotonic() - start)
+
+        assert len(result) == 900_000
+        assert parser.get_filtered_count() == 100_000
+        assert min(elapsed) < 1.5
+
+    def test_raw_reader_used_without_pyelftools(self, tmp_path):
+        """测试快速路径成功时不调用 pyelftools"""
+        elf_path = tmp_path / "test.elf"
+        elf_path.write_bytes(build_minimal_elf(self.SYMBOLS))
+
+        with patch.object(ELFParser, '_extract_symbols_pyelftools') as fallback:
+            symbols = ELFParser().extract_symbols(elf_path)
+
+        fallback.assert_not_called()
+        assert symbols["Model_B"] == 0x28001000
+
+    def test_fallback_on_unsupported_layout(self, tmp_path):
+        """测试无法识别的 ELF 布局回退到 pyelftools"""
+        data = bytearray(build_minimal_elf(self.SYMBOLS))
+        data[4] = 3  # 无效的 EI_CLASS
+        elf_path = tmp_path / "test.elf"
+        elf_path.write_bytes(bytes(data))
+
+        with patch.object(ELFParser, '_extract_symbols_pyelftools') as fallback:
+            ELFParser().extract_symbols(elf_path)
+
+        fallback.assert_called_once()
+
+    def test_raw_reader_with_real_elf(self, simulink_elf):
+        """测试 gcc 生成的 ELF 两种路径结果一致"""
+        raw_symbols = ELFParser().extract_symbols(simulink_elf)
+        slow_symbols = ELFParser(use_raw_reader=False).extract_symbols(simulink_elf)
+
+        assert raw_symbols == slow_symbols
+        assert "Model_B" in raw_symbols
+
+
 class TestELFParserIntegration:
     """ELF 解析器集成测试"""
 
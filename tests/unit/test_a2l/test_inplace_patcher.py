@@ -0,0 +1,209 @@
+"""Unit tests for in-place A2L address patching."""
+
+import pytest
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.inplace_patcher import A2LInPlacePatcher, A2LPatchError, get_journal_path
+from a2l.address_updater import A2LAddressUpdater
+
+
+A2L_CONTENT = """/begin PROJECT Prj ""
+    /begin CHARACTERISTIC
+      /* Name                   */      CalVar
+      /* ECU Address            */      0x28000000
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.Out
+      ECU_ADDRESS 0x28000100
+    /end MEASUREMENT
+    /begin MEASUREMENT SameVar ""
+      ECU_ADDRESS 0x28000200
+    /end MEASUREMENT
+/end PROJECT
+"""
+
+
+class TestA2LInPlacePatcher:
+    """原地修改器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+        self.a2l_path.write_bytes(b"AAA 0x0000 BBB 0x1111\n")
+        self.patcher = A2LInPlacePatcher()
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_apply_and_undo(self):
+        """测试修改后可通过撤销日志恢复"""
+        journal = self.patcher.apply(self.a2l_path, [(4, "0x0000", "0xABCD"), (15, "0x1111", "0x2222")])
+
+        assert journal == get_journal_path(self.a2l_path)
+        assert self.a2l_path.read_bytes() == b"AAA 0xABCD BBB 0x2222\n"
+        assert json.loads(journal.read_text(encoding='utf-8'))["entries"][0]["ranges"][0]["old"] == "0x0000"
+
+        assert self.patcher.undo(self.a2l_path) == 2
+        assert self.a2l_path.read_bytes() == b"AAA 0x0000 BBB 0x1111\n"
+        assert not journal.exists()
+
+    def test_repeated_apply_stacks_journal(self):
+        """测试多次修改追加到同一撤销日志，撤销按相反顺序逐次恢复"""
+        self.patcher.apply(self.a2l_path, [(4, "0x0000", "0xABCD")])
+        journal = self.patcher.apply(self.a2l_path, [(4, "0xABCD", "0x1234"), (15, "0x1111", "0x2222")])
+
+        assert self.a2l_path.read_bytes() == b"AAA 0x1234 BBB 0x2222\n"
+        assert len(json.loads(journal.read_text(encoding='utf-8'))["entries"]) == 2
+
+        assert self.patcher.undo(self.a2l_path) == 2
+        assert self.a2l_path.read_bytes() == b"AAA 0xABCD BBB 0x1111\n"
+        assert journal.exists()
+
+        assert self.patcher.undo(self.a2l_path) == 1
+        assert self.a2l_path.read_bytes() == b"AAA 0x0000 BBB 0x1111\n"
+        assert not journal.exists()
+
+    def test_stale_journal_refused(self):
+        """测试已有撤销日志与文件大小不一致时拒绝修改"""
+        self.patcher.apply(self.a2l_path, [(4, "0x0000", "0xABCD")])
+        self.a2l_path.write_bytes(b"AAA 0x0000 BBB 0x1111 CCC\n")
+
+        with pytest.raises(A2LPatchError):
+            self.patcher.apply(self.a2l_path, [(4, "0x0000", "0x9999")])
+
+        assert self.a2l_path.read_bytes() == b"AAA 0x0000 BBB 0x1111 CCC\n"
+
+    def test_journal_entries_capped(self):
+        """测试撤销日志超过上限时丢弃最早的修改"""
+        patcher = A2LInPlacePatcher(max_journal_entries=2)
+        for old, new in [("0x0000", "0x0001"), ("0x0001", "0x0002"), ("0x0002", "0x0003")]:
+            journal = patcher.apply(self.a2l_path, [(4, old, new)])
+
+        entries = json.loads(journal.read_text(encoding='utf-8'))["entries"]
+        assert [e["ranges"][0]["new"] for e in entries] == ["0x0002", "0x0003"]
+
+        patcher.undo(self.a2l_path)
+        patcher.undo(self.a2l_path)
+        assert self.a2l_path.read_bytes() == b"AAA 0x0001 BBB 0x1111\n"
+        assert not journal.exists()
+
+    def test_unsupported_journal_version(self):
+        """测试不支持的撤销日志版本被拒绝"""
+        get_journal_path(self.a2l_path).write_text(json.dumps({
+            "version": 1, "file": "test.a2l", "file_size": 22,
+            "ranges": [{"offset": 4, "old": "0x0000", "new": "0xABCD"}],
+        }), encoding='utf-8')
+
+        with pytest.raises(A2LPatchError):
+            self.patcher.undo(self.a2l_path)
+
+    def test_undo_content_changed(self):
+        """测试修改后的内容被改写时拒绝恢复"""
+        self.patcher.apply(self.a2l_path, [(4, "0x0000", "0xABCD")])
+        self.a2l_path.write_bytes(b"AAA 0xFFFF BBB 0x1111\n")
+
+        with pytest.raises(A2LPatchError):
+            self.patcher.undo(self.a2l_path)
+
+        assert self.a2l_path.read_bytes() == b"AAA 0xFFFF BBB 0x1111\n"
+
+    def test_width_mismatch(self):
+        """测试不等宽修改被拒绝且文件不变"""
+        with pytest.raises(A2LPatchError):
+            self.patcher.apply(self.a2l_path, [(4, "0x0000", "0x00000000")])
+
+        assert self.a2l_path.read_bytes() == b"AAA 0x0000 BBB 0x1111\n"
+
+    def test_content_mismatch(self):
+        """测试文件内容与记录不一致时拒绝修改且不写日志"""
+        with pytest.raises(A2LPatchError):
+            self.patcher.apply(self.a2l_path, [(4, "0x9999", "0xABCD")])
+
+        assert self.a2l_path.read_bytes() == b"AAA 0x0000 BBB 0x1111\n"
+        assert not get_journal_path(self.a2l_path).exists()
+
+    def test_undo_without_journal(self):
+        """测试没有撤销日志"""
+        with pytest.raises(FileNotFoundError):
+            self.patcher.undo(self.a2l_path)
+
+    def test_undo_size_changed(self):
+        """测试文件大小变化后拒绝恢复"""
+        self.patcher.apply(self.a2l_path, [(4, "0x0000", "0xABCD")])
+        self.a2l_path.write_bytes(b"rewritten")
+
+        with pytest.raises(A2LPatchError):
+            self.patcher.undo(self.a2l_path)
+
+
+class TestUpdaterPatchInPlace:
+    """地址更新器原地修改模式测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_patch_same_width(self):
+        """测试等宽地址只修改变化的字节，保留 CRLF，使用撤销日志代替 .bak"""
+        original = A2L_CONTENT.replace("\n", "\r\n").encode('utf-8')
+        self.a2l_path.write_bytes(original)
+        symbols = {"CalVar": 0x28001000, "Out": 0x28002000, "SameVar": 0x28000200}
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, patch_in_place=True
+        )
+
+        assert result.success is True
+        assert result.matched_count == 3
+        assert result.patched_count == 2
+        assert result.journal_path == str(get_journal_path(self.a2l_path))
+        assert not self.a2l_path.with_suffix('.a2l.bak').exists()
+
+        expected = original.replace(b"0x28000000", b"0x28001000").replace(b"0x28000100", b"0x28002000")
+        assert self.a2l_path.read_bytes() == expected
+
+        A2LInPlacePatcher().undo(self.a2l_path)
+        assert self.a2l_path.read_bytes() == original
+
+    def test_no_changes_writes_nothing(self):
+        """测试地址都未变化时不写文件也不生成日志"""
+        self.a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+        symbols = {"CalVar": 0x28000000, "Out": 0x28000100, "SameVar": 0x28000200}
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, patch_in_place=True
+        )
+
+        assert result.success is True
+        assert result.patched_count == 0
+        assert result.journal_path == ""
+        assert not get_journal_path(self.a2l_path).exists()
+
+    def test_width_mismatch_falls_back_to_rewrite(self):
+        """测试地址宽度不同时回退到整文件重写（含 .bak 备份）"""
+        self.a2l_path.write_text(A2L_CONTENT.replace("0x28000000", "0x0000"), encoding='utf-8')
+        symbols = {"CalVar": 0x28001000}
+
+        result = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, patch_in_place=True
+        )
+
+        assert result.success is True
+        assert result.patched_count == 0
+        assert "0x28001000" in self.a2l_path.read_text(encoding='utf-8')
+        assert self.a2l_path.with_suffix('.a2l.bak').exists()
+        assert not get_journal_path(self.a2l_path).exists()
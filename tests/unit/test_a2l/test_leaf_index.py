@@ -0,0 +1,129 @@
+"""Unit tests for the symbol leaf-name index."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.leaf_index import SymbolLeafIndex
+from a2l.address_updater import A2LAddressUpdater, match_symbol_address
+from a2l.post_processor import A2LPostProcessor
+
+
+SYMBOLS = {
+    "Out": 0x1000,
+    "IDP_o1.gSig": 0x2000,
+    "IDP_o3.gSig": 0x3000,
+    "Alias.gSame": 0x4000,
+    "gSame": 0x4000,
+    "Other.gOnly": 0x5000,
+}
+
+A2L_CONTENT = """/begin PROJECT Prj ""
+    /begin MEASUREMENT
+      /* Name                   */      Root.IDP_o3.gSig
+      ECU_ADDRESS 0x0
+    /end MEASUREMENT
+    /begin MEASUREMENT
+      /* Name                   */      Root.IDP_o9.gSig
+      ECU_ADDRESS 0x0
+    /end MEASUREMENT
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.gSame
+      ECU_ADDRESS 0x0
+    /end MEASUREMENT
+/end PROJECT
+"""
+
+
+class TestSymbolLeafIndex:
+    """叶子节点索引测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.index = SymbolLeafIndex(SYMBOLS)
+
+    def test_plain_leaf(self):
+        """测试不带点号的符号作为叶子节点"""
+        assert self.index.resolve("Model_B.Out") == (0x1000, ["Out"])
+
+    def test_same_address_is_not_ambiguous(self):
+        """测试候选地址相同（别名）时不视为歧义"""
+        addr, candidates = self.index.resolve("Model_B.gSame")
+        assert addr == 0x4000
+        assert sorted(candidates) == ["Alias.gSame", "gSame"]
+
+    def test_dotted_suffix_disambiguates(self):
+        """测试点号后缀匹配消除歧义"""
+        assert self.index.resolve("Root.IDP_o3.gSig") == (0x3000, ["IDP_o3.gSig"])
+
+    def test_ambiguous(self):
+        """测试无法消除的歧义返回全部候选且不猜测地址"""
+        addr, candidates = self.index.resolve("Root.IDP_o9.gSig")
+        assert addr is None
+        assert sorted(candidates) == ["IDP_o1.gSig", "IDP_o3.gSig"]
+
+    def test_unknown_leaf(self):
+        """测试没有候选"""
+        assert self.index.resolve("A.Missing") == (None, [])
+
+    def test_get_ambiguous_leaves(self):
+        """测试列出所有歧义叶子节点"""
+        assert list(self.index.get_ambiguous_leaves()) == ["gSig"]
+
+    def test_match_symbol_address_ambiguous(self):
+        """测试 match_symbol_address 返回歧义类型和候选符号"""
+        addr, match_type, candidates = match_symbol_address("Root.IDP_o9.gSig", SYMBOLS, None, self.index)
+        assert (addr, match_type) == (None, "ambiguous")
+        assert sorted(candidates) == ["IDP_o1.gSig", "IDP_o3.gSig"]
+        assert match_symbol_address("X.gOnly", SYMBOLS, None, self.index) == (0x5000, "leaf", [])
+        assert match_symbol_address("IDP_o1.gSig", SYMBOLS, None, self.index) == (0x2000, "exact", [])
+
+
+class TestAmbiguityReporting:
+    """歧义报告测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+        self.a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_updater_reports_ambiguous(self):
+        """测试地址更新器报告歧义变量且不更新其地址"""
+        result = A2LAddressUpdater().update_with_symbol_map(SYMBOLS, self.a2l_path)
+
+        assert result.success is True
+        assert result.matched_count == 2
+        assert result.unmatched_variables == ["Root.IDP_o9.gSig"]
+        assert sorted(result.ambiguous_variables["Root.IDP_o9.gSig"]) == ["IDP_o1.gSig", "IDP_o3.gSig"]
+        content = self.a2l_path.read_text(encoding='utf-8')
+        assert "0x00003000" in content
+        assert "0x00002000" not in content
+
+    def test_post_processor_reports_ambiguous(self):
+        """测试单遍后处理器报告歧义变量"""
+        _, result = A2LPostProcessor(symbol_map=SYMBOLS).process_text(A2L_CONTENT)
+
+        assert result.matched_count == 2
+        assert list(result.ambiguous_variables) == ["Root.IDP_o9.gSig"]
+
+    def test_match_statistics_uses_index(self):
+        """测试匹配统计与更新使用相同的叶子节点规则"""
+        updater = A2LAddressUpdater(resolve_struct_members=False)
+        with patch.object(updater._elf_parser, 'extract_symbols', return_value=SYMBOLS):
+            matched, unmatched, total, unmatched_list = updater.get_match_statistics(
+                Path("/dummy.elf"), self.a2l_path
+            )
+
+        assert (matched, unmatched, total) == (2, 1, 3)
+        assert unmatched_list == ["Root.IDP_o9.gSig"]
@@ -0,0 +1,231 @@
+"""Unit tests for the memory-mapped A2L parser."""
+
+import pytest
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.a2l_parser import A2LParser, A2LParseError
+from a2l.mapped_parser import MappedA2LParser, MappedA2LVariable
+from a2l.address_updater import A2LAddressUpdater
+
+
+A2L_CONTENT = """ASAP2_VERSION 1 60
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin CHARACTERISTIC StdVar "standard format"
+      VALUE
+      address 0x1000
+    /end CHARACTERISTIC
+    /begin CHARACTERISTIC
+      /* Name                   */      SimVar
+      /* Long Identifier        */      "simulink format"
+      /* ECU Address            */      0x2000
+      /begin IF_DATA XCP
+        LINK_MAP "SimVar" 0x0 0x0 0x0 0x0 0x0 0x0
+      /end IF_DATA
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.Out
+      ECU_ADDRESS 0x3000
+    /end MEASUREMENT
+    /begin AXIS_PTS
+      /* Name                   */      AxisVar
+      /* ECU Address            */      4096
+    /end AXIS_PTS
+    /begin MEASUREMENT NoAddr ""
+    /end MEASUREMENT
+    /begin CHARACTERISTIC StdVar "duplicate wins"
+      address 0x5000
+    /end CHARACTERISTIC
+  /end MODULE
+/end PROJECT
+"""
+
+FIELDS = ("name", "var_type", "address", "address_str", "line_start", "line_end", "address_line")
+
+
+def assert_same_variables(base: A2LParser, mapped: MappedA2LParser):
+    """断言两种解析器得到相同的变量信息"""
+    assert list(mapped.variables) == list(base.variables)
+    for name, expected in base.variables.items():
+        actual = mapped.get_variable(name)
+        for field_name in FIELDS:
+            assert getattr(actual, field_name) == getattr(expected, field_name), (name, field_name)
+
+
+class TestMappedA2LParser:
+    """内存映射解析器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+        self.parser = MappedA2LParser()
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        self.parser.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, content: str, newline: str = "\n", encoding: str = "utf-8"):
+        """写入测试文件"""
+        self.a2l_path.write_bytes(content.replace("\n", newline).encode(encoding))
+
+    def test_matches_base_parser(self):
+        """测试结果与 A2LParser 一致"""
+        self._write(A2L_CONTENT)
+        base = A2LParser()
+        base.parse(self.a2l_path)
+        self.parser.parse(self.a2l_path)
+
+        assert_same_variables(base, self.parser)
+        assert self.parser.get_variable_count() == base.get_variable_count() == 5
+        assert self.parser.get_characteristic_count() == base.get_characteristic_count()
+        assert self.parser.get_measurement_count() == base.get_measurement_count()
+
+    def test_matches_base_parser_crlf(self):
+        """测试 CRLF 换行的文件"""
+        self._write(A2L_CONTENT, newline="\r\n")
+        base = A2LParser()
+        base.parse(self.a2l_path)
+        self.parser.parse(self.a2l_path)
+
+        assert_same_variables(base, self.parser)
+        assert self.parser.get_lines() == base.get_lines()
+
+    def test_get_lines_matches_base(self):
+        """测试 get_lines 与 A2LParser 一致（行号可直接索引）"""
+        self._write(A2L_CONTENT)
+        base = A2LParser()
+        base.parse(self.a2l_path)
+        self.parser.parse(self.a2l_path)
+
+        lines = self.parser.get_lines()
+        assert lines == base.get_lines()
+        var = self.parser.get_variable("SimVar")
+        assert "0x2000" in lines[var.address_line - 1]
+
+    def test_lazy_slot_records(self):
+        """测试变量记录按需创建且没有 __dict__"""
+        self._write(A2L_CONTENT)
+        variables = self.parser.parse(self.a2l_path)
+
+        var = variables["Model_B.Out"]
+        assert isinstance(var, MappedA2LVariable)
+        assert not hasattr(var, "__dict__")
+        assert var.var_type == "MEASUREMENT"
+        assert var.address == 0x3000
+        assert "Missing" not in variables
+        assert self.parser.get_variable("Missing") is None
+
+    def test_duplicate_and_missing_address(self):
+        """测试同名变量后者覆盖、无地址变量"""
+        self._write(A2L_CONTENT)
+        self.parser.parse(self.a2l_path)
+
+        assert self.parser.get_address("StdVar") == 0x5000
+        no_addr = self.parser.get_variable("NoAddr")
+        assert no_addr.address == 0
+        assert no_addr.address_str == ""
+        assert self.parser.get_address_span("NoAddr") is None
+
+    def test_address_span(self):
+        """测试地址标记的字节范围"""
+        self._write(A2L_CONTENT)
+        self.parser.parse(self.a2l_path)
+
+        start, end = self.parser.get_address_span("AxisVar")
+        assert self.a2l_path.read_bytes()[start:end] == b"4096"
+
+    def test_latin1_name(self):
+        """测试非 UTF-8 文件中的名称按 latin-1 解码（与 A2LParser 一致）"""
+        self._write(A2L_CONTENT.replace("StdVar", "StdVär"), encoding="latin-1")
+        base = A2LParser()
+        base.parse(self.a2l_path)
+        self.parser.parse(self.a2l_path)
+
+        assert "StdVär" in self.parser.variables
+        assert_same_variables(base, self.parser)
+
+    def test_close_releases_mapping(self):
+        """测试关闭后无法读取地址字段"""
+        self._write(A2L_CONTENT)
+        self.parser.parse(self.a2l_path)
+        var = self.parser.get_variable("SimVar")
+        self.parser.close()
+
+        with pytest.raises(A2LParseError):
+            _ = var.address
+        assert self.parser.get_lines() == []
+
+    def test_parse_file_not_found(self):
+        """测试文件不存在"""
+        with pytest.raises(FileNotFoundError):
+            self.parser.parse(self.temp_dir / "missing.a2l")
+
+    def test_parse_empty_file(self):
+        """测试空文件"""
+        self.a2l_path.write_bytes(b"")
+
+        with pytest.raises(A2LParseError):
+            self.parser.parse(self.a2l_path)
+
+    def test_updater_memory_mapped(self):
+        """测试地址更新器使用内存映射解析器时输出一致"""
+        self._write(A2L_CONTENT)
+        symbols = {"SimVar": 0x28002000, "Out": 0x28003000, "AxisVar": 0x28004000}
+        out_base = self.temp_dir / "base.a2l"
+        out_mapped = self.temp_dir / "mapped.a2l"
+
+        result_base = A2LAddressUpdater().update_with_symbol_map(
+            symbols, self.a2l_path, out_base
+        )
+        result_mapped = A2LAddressUpdater(memory_mapped=True).update_with_symbol_map(
+            symbols, self.a2l_path, out_mapped
+        )
+
+        assert result_mapped.success is True
+        assert result_mapped.matched_count == result_base.matched_count == 3
+        assert out_mapped.read_text(encoding='utf-8') == out_base.read_text(encoding='utf-8')
+
+    @pytest.mark.parametrize("newline,encoding,suffix", [
+        ("\n", "utf-8", "\n"),
+        ("\r\n", "utf-8", "\r\n"),
+        ("\r\n", "utf-8", ""),
+        ("\n", "latin-1", "\n"),
+    ])
+    def test_write_patched_matches_base(self, newline, encoding, suffix):
+        """测试按偏移分块写出的文件与逐行修改后写出的文件一致（块边界落在任意位置）"""
+        content = A2L_CONTENT.rstrip("\n") + "\n/* Kommentar: Größe */" + suffix.replace("\r\n", "\n")
+        self._write(content, newline, encoding)
+        symbols = {"StdVar": 0x28001000, "SimVar": 0x28002000, "Out": 0x28003000}
+        out_base = self.temp_dir / "base.a2l"
+        A2LAddressUpdater().update_with_symbol_map(symbols, self.a2l_path, out_base)
+
+        for chunk_size in (1, 3, 7, 64, 1 << 20):
+            out_mapped = self.temp_dir / f"mapped_{chunk_size}.a2l"
+            with patch("a2l.mapped_parser.WRITE_CHUNK_SIZE", chunk_size):
+                result = A2LAddressUpdater(memory_mapped=True).update_with_symbol_map(
+                    symbols, self.a2l_path, out_mapped
+                )
+            assert result.success is True
+            assert out_mapped.read_bytes() == out_base.read_bytes(), chunk_size
+
+    def test_write_patched_overwrites_source(self):
+        """测试内存映射模式下覆盖原文件（先写临时文件再替换）"""
+        self._write(A2L_CONTENT)
+        symbols = {"SimVar": 0x28002000}
+
+        result = A2LAddressUpdater(memory_mapped=True).update_with_symbol_map(
+            symbols, self.a2l_path, backup=False
+        )
+
+        assert result.success is True
+        assert "0x28002000" in self.a2l_path.read_text(encoding='utf-8')
+        assert list(self.temp_dir.glob("*.tmp")) == []
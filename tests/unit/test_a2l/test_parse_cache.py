@@ -0,0 +1,195 @@
+"""Unit tests for the binary A2L parse snapshot cache."""
+
+import os
+import pytest
+import shutil
+import tempfile
+from array import array
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l import parse_cache
+from a2l.a2l_parser import A2LParser
+from a2l.mapped_parser import MappedA2LParser
+from a2l.parse_cache import (
+    A2LParseCache,
+    A2LParseIndex,
+    KIND_LINES,
+    KIND_OFFSETS,
+    pack_parse_index,
+    unpack_parse_index
+)
+
+
+A2L_CONTENT = """ASAP2_VERSION 1 60
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin CHARACTERISTIC StdVar "standard format"
+      VALUE
+      address 0x1000
+    /end CHARACTERISTIC
+    /begin CHARACTERISTIC
+      /* Name                   */      SimVar
+      /* ECU Address            */      0x2000
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.Out
+      ECU_ADDRESS 0x3000
+    /end MEASUREMENT
+    /begin AXIS_PTS
+      /* Name                   */      AxisVar
+      /* ECU Address            */      4096
+    /end AXIS_PTS
+    /begin MEASUREMENT NoAddr ""
+    /end MEASUREMENT
+  /end MODULE
+/end PROJECT
+"""
+
+FIELDS = ("name", "var_type", "address", "address_str", "line_start", "line_end", "address_line")
+
+
+def snapshot(parser: A2LParser) -> dict:
+    """提取解析器全部变量字段"""
+    return {
+        name: tuple(getattr(parser.get_variable(name), f) for f in FIELDS)
+        for name in parser.variables
+    }
+
+
+class TestParseIndexFormat:
+    """块索引二进制格式测试类"""
+
+    def test_pack_roundtrip(self):
+        """测试序列化后反序列化得到相同的索引"""
+        index = A2LParseIndex(
+            names=["StdVar", "变量"],
+            type_codes=array('B', [0, 1]),
+            line_starts=array('I', [4, 9]),
+            line_ends=array('I', [7, 12]),
+            address_lines=array('I', [6, 0]),
+            address_starts=array('Q', [2 ** 40, 0]),
+            address_ends=array('Q', [2 ** 40 + 6, 0]),
+            address_strs=["0x1000", ""]
+        )
+
+        restored = unpack_parse_index(pack_parse_index(index, 100, 1, b"\0" * 32))
+
+        assert restored == index
+
+    def test_invalid_data(self):
+        """测试魔数错误和数据截断"""
+        data = pack_parse_index(A2LParseIndex(names=["A"], type_codes=array('B', [0]),
+                                              line_starts=array('I', [1]), line_ends=array('I', [2]),
+                                              address_lines=array('I', [0]),
+                                              address_starts=array('Q', [0]),
+                                              address_ends=array('Q', [0])),
+                                0, 0, b"\0" * 32)
+
+        with pytest.raises(ValueError):
+            unpack_parse_index(b"XXXX" + data[4:])
+        with pytest.raises(ValueError):
+            unpack_parse_index(data[:-20])
+
+
+class TestA2LParseCache:
+    """A2L 解析缓存测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "App.a2l"
+        self.a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @pytest.mark.parametrize("parser_cls, kind", [
+        (A2LParser, KIND_LINES),
+        (MappedA2LParser, KIND_OFFSETS),
+    ])
+    def test_hit_matches_fresh_parse(self, parser_cls, kind):
+        """测试命中缓存时结果与重新解析一致，且不执行块扫描"""
+        fresh = parser_cls()
+        fresh.parse(self.a2l_path)
+        expected = snapshot(fresh)
+        fresh.close()
+
+        cache = A2LParseCache()
+        first = parser_cls(cache=cache)
+        first.parse(self.a2l_path)
+        first.close()
+        assert (cache.hits, cache.misses) == (0, 1)
+        assert cache.get_cache_path(self.a2l_path, kind).exists()
+
+        second = parser_cls(cache=cache)
+        second._parse_blocks = second._scan_blocks = None  # 命中时不应被调用
+        second.parse(self.a2l_path)
+        assert cache.hits == 1
+        assert snapshot(second) == expected
+        second.close()
+
+    def test_hit_reads_lines_lazily(self):
+        """测试 A2LParser 命中缓存时不读取文件，get_lines() 时才读取"""
+        cache = A2LParseCache()
+        A2LParser(cache=cache).parse(self.a2l_path)
+
+        parser = A2LParser(cache=cache)
+        reads = []
+        original_read = parser._read_file_with_encoding
+        parser._read_file_with_encoding = lambda path: reads.append(path) or original_read(path)
+        parser.parse(self.a2l_path)
+
+        assert cache.hits == 1
+        assert reads == []
+        assert parser.get_lines() == A2L_CONTENT.splitlines()
+        assert len(reads) == 1
+
+    def test_content_change_invalidates(self):
+        """测试 A2L 内容变化后缓存失效并被覆盖"""
+        cache = A2LParseCache()
+        MappedA2LParser(cache=cache).parse(self.a2l_path)
+
+        self.a2l_path.write_text(A2L_CONTENT.replace("0x3000", "0x4000"), encoding='utf-8')
+        with MappedA2LParser(cache=cache) as parser:
+            parser.parse(self.a2l_path)
+            assert parser.get_address("Model_B.Out") == 0x4000
+        assert (cache.hits, cache.misses) == (0, 2)
+
+        with MappedA2LParser(cache=cache) as parser:
+            assert parser.parse(self.a2l_path)["Model_B.Out"].address == 0x4000
+        assert cache.hits == 1
+
+    def test_copied_file_rehashes_once(self, monkeypatch):
+        """测试修改时间变化但内容相同时按哈希命中，并刷新缓存头部"""
+        cache = A2LParseCache()
+        A2LParser(cache=cache).parse(self.a2l_path)
+        stat = self.a2l_path.stat()
+        os.utime(self.a2l_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        calls = []
+        original_hash = parse_cache.hash_file
+        monkeypatch.setattr(parse_cache, "hash_file", lambda p: calls.append(p) or original_hash(p))
+
+        A2LParser(cache=cache).parse(self.a2l_path)
+        A2LParser(cache=cache).parse(self.a2l_path)
+
+        assert cache.hits == 2
+        assert len(calls) == 1
+
+    def test_corrupt_cache_ignored(self):
+        """测试缓存文件损坏时视为未命中并正常解析"""
+        cache = A2LParseCache(cache_dir=self.temp_dir / "cache")
+        cache_path = cache.get_cache_path(self.a2l_path, KIND_LINES)
+        cache_path.parent.mkdir()
+        cache_path.write_bytes(b"garbage")
+
+        variables = A2LParser(cache=cache).parse(self.a2l_path)
+
+        assert variables["StdVar"].address == 0x1000
+        assert cache.misses == 1
+        assert cache.invalidate(self.a2l_path) == 1
@@ -0,0 +1,284 @@
+"""Unit tests for the single-pass A2L post-processor."""
+
+import pytest
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.document import A2LDocument
+from a2l.parse_cache import A2LParseCache, block_kind
+from a2l.post_processor import (
+    A2LPostProcessor,
+    PostProcessResult,
+    find_header_end,
+    read_a2l_text
+)
+
+
+A2L_CONTENT = """ASAP2_VERSION 1 60
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin MOD_PAR ""
+      /begin IF_DATA XCP
+        OLD_XCP_SETTINGS
+      /end IF_DATA
+    /end MOD_PAR
+    /begin CHARACTERISTIC
+      /* Name                   */      CalVar
+      /* Long Identifier        */      ""
+      /* ECU Address            */      0x0000
+    /end CHARACTERISTIC
+    /begin CHARACTERISTIC
+      /* Name                   */      MissingVar
+      /* ECU Address            */      0x0000
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Model_B.Out
+      /* Long identifier        */      ""
+      ECU_ADDRESS 0x0000
+      /begin IF_DATA XCP
+        LINK_MAP "Model_B.Out" 0x0 0x0 0x0 0x0 0x0 0x0
+      /end IF_DATA
+    /end MEASUREMENT
+  /end MODULE
+/end PROJECT
+"""
+
+TEMPLATE = "/* NEW XCP HEADER */\n/begin MOD_PAR \"new\"\n/end MOD_PAR"
+
+
+class TestA2LPostProcessor:
+    """单遍后处理器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "test.a2l"
+        self.a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        import shutil
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_address_patching(self):
+        """测试地址更新（精确匹配 + 叶子节点匹配）"""
+        processor = A2LPostProcessor(symbol_map={"CalVar": 0x28001000, "Out": 0x28002000})
+        content, result = processor.process_text(A2L_CONTENT)
+
+        assert result.matched_count == 2
+        assert result.unmatched_count == 1
+        assert result.total_variables == 3
+        assert result.unmatched_variables == ["MissingVar"]
+        assert "0x28001000" in content
+        assert "ECU_ADDRESS 0x28002000" in content
+
+    def test_address_delta(self):
+        """测试更新地址时生成地址增量报告（按原地址区分移动、新增和消失）"""
+        content = A2L_CONTENT.replace("ECU_ADDRESS 0x0000", "ECU_ADDRESS 0x28002000")
+        processor = A2LPostProcessor(symbol_map={"CalVar": 0x28001000, "Out": 0x28002000})
+        _, result = processor.process_text(content.replace(
+            "MissingVar\n      /* ECU Address            */      0x0000",
+            "MissingVar\n      /* ECU Address            */      0x28003000"
+        ))
+
+        assert result.delta.new == [("CalVar", 0x28001000)]
+        assert result.delta.vanished == [("MissingVar", 0x28003000)]
+        assert result.delta.moved == []
+        assert result.delta.unchanged_count == 1
+
+    def test_no_delta_without_symbol_map(self):
+        """测试不更新地址时不生成增量报告"""
+        _, result = A2LPostProcessor(remove_if_data_xcp=True).process_text(A2L_CONTENT)
+
+        assert result.delta is None
+
+    def test_document_block_index_cache(self):
+        """测试块索引缓存命中时跳过块识别，输出与统计和完整扫描一致"""
+        # 重复名称和无名称的块也必须按原样处理
+        content = A2L_CONTENT.replace("  /end MODULE", (
+            "    /begin CHARACTERISTIC CalVar \"dup\"\n"
+            "      address 0x0\n"
+            "    /end CHARACTERISTIC\n"
+            "    /begin MEASUREMENT\n"
+            "      ECU_ADDRESS 0x10\n"
+            "    /end MEASUREMENT\n"
+            "  /end MODULE"
+        ))
+        self.a2l_path.write_text(content, encoding='utf-8')
+        options = dict(
+            symbol_map={"CalVar": 0x28001000, "Out": 0x28002000},
+            remove_if_data_xcp=True,
+            filter_zero_address=True,
+            xcp_template=TEMPLATE
+        )
+        expected, expected_result = A2LPostProcessor(**options).process_text(content)
+
+        cache = A2LParseCache()
+        for _ in range(2):
+            document = A2LDocument.load(self.a2l_path)
+            result = A2LPostProcessor(parse_cache=cache, **options).process_document(document)
+            assert document.content == expected
+            assert result.updated_variables == expected_result.updated_variables
+            assert result.removed_variables == expected_result.removed_variables
+            assert result.header_found is True
+
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert cache.get_cache_path(self.a2l_path, block_kind(True, True)).exists()
+
+    def test_block_index_skips_block_scan(self, monkeypatch):
+        """测试命中块索引时不执行块内扫描"""
+        cache = A2LParseCache()
+        processor = A2LPostProcessor(symbol_map={"CalVar": 0x28001000}, parse_cache=cache)
+        processor.process_document(A2LDocument.load(self.a2l_path))
+
+        monkeypatch.setattr(A2LPostProcessor, "_scan_block_line", None)
+        document = A2LDocument.load(self.a2l_path)
+        result = processor.process_document(document)
+
+        assert cache.hits == 1
+        assert result.matched_count == 1
+        assert "0x28001000" in document.content
+
+    def test_remove_if_data_xcp(self):
+        """测试删除所有 IF_DATA XCP 块"""
+        processor = A2LPostProcessor(remove_if_data_xcp=True)
+        content, result = processor.process_text(A2L_CONTENT)
+
+        assert result.if_data_removed == 2
+        assert "IF_DATA" not in content
+        assert "LINK_MAP" not in content
+        assert "/end MEASUREMENT" in content
+
+    def test_remove_if_data_single_line(self):
+        """测试同一行内开始和结束的 IF_DATA XCP 块"""
+        processor = A2LPostProcessor(remove_if_data_xcp=True)
+        content, result = processor.process_text("a /begin IF_DATA XCP x /end IF_DATA b\n")
+
+        assert result.if_data_removed == 1
+        assert content == "a  b\n"
+
+    def test_filter_zero_address(self):
+        """测试删除地址为 0 的 CHARACTERISTIC（地址更新之后判断）"""
+        processor = A2LPostProcessor(
+            symbol_map={"CalVar": 0x28001000},
+            filter_zero_address=True
+        )
+        content, result = processor.process_text(A2L_CONTENT)
+
+        assert result.characteristic_count == 2
+        assert result.zero_address_removed == 1
+        assert result.removed_variables == ["MissingVar"]
+        assert "CalVar" in content
+        assert "MissingVar" not in content
+        assert "Model_B.Out" in content
+
+    def test_header_replacement(self):
+        """测试替换文件开头到第一个 /end MOD_PAR 的内容"""
+        processor = A2LPostProcessor(xcp_template=TEMPLATE)
+        content, result = processor.process_text(A2L_CONTENT)
+
+        assert result.header_found is True
+        assert result.success is True
+        assert content.startswith(TEMPLATE + "\n")
+        assert "ASAP2_VERSION" not in content
+        assert "OLD_XCP_SETTINGS" not in content
+        assert "/begin CHARACTERISTIC" in content
+
+    def test_header_not_found(self):
+        """测试未找到 /end MOD_PAR 时不写入输出文件"""
+        self.a2l_path.write_text("/begin CHARACTERISTIC\n/end CHARACTERISTIC\n", encoding='utf-8')
+        output_path = self.temp_dir / "output" / "out.a2l"
+
+        processor = A2LPostProcessor(xcp_template=TEMPLATE)
+        result = processor.process(self.a2l_path, output_path)
+
+        assert result.success is False
+        assert result.header_found is False
+        assert not output_path.exists()
+        assert list((self.temp_dir / "output").iterdir()) == []
+
+    def test_fused_matches_sequential(self):
+        """测试单遍处理结果与逐步处理结果一致"""
+        symbols = {"CalVar": 0x28001000, "Out": 0x28002000}
+
+        step1, _ = A2LPostProcessor(symbol_map=symbols).process_text(A2L_CONTENT)
+        step2, _ = A2LPostProcessor(remove_if_data_xcp=True).process_text(step1)
+        end_pos = find_header_end(step2)
+        sequential = TEMPLATE + step2[end_pos:]
+
+        fused, result = A2LPostProcessor(
+            symbol_map=symbols,
+            remove_if_data_xcp=True,
+            xcp_template=TEMPLATE
+        ).process_text(A2L_CONTENT)
+
+        assert result.success is True
+        assert fused == sequential
+
+    def test_process_to_output_file(self):
+        """测试写入独立输出文件，源文件保持不变"""
+        output_path = self.temp_dir / "output" / "out.a2l"
+        processor = A2LPostProcessor(
+            symbol_map={"CalVar": 0x28001000},
+            remove_if_data_xcp=True,
+            xcp_template=TEMPLATE
+        )
+        result = processor.process(self.a2l_path, output_path, newline='\n')
+
+        assert result.success is True
+        assert result.output_path == str(output_path)
+        assert result.encoding == 'utf-8-sig'
+        assert self.a2l_path.read_text(encoding='utf-8') == A2L_CONTENT
+        output = output_path.read_text(encoding='utf-8')
+        assert output.startswith(TEMPLATE)
+        assert "0x28001000" in output
+        # 输出目录中不应残留临时文件
+        assert [p.name for p in output_path.parent.iterdir()] == ["out.a2l"]
+
+    def test_process_in_place_with_backup(self):
+        """测试原地处理时原文件被保留为 .a2l.bak"""
+        processor = A2LPostProcessor(symbol_map={"CalVar": 0x28001000})
+        result = processor.process(self.a2l_path, backup=True, newline='\n')
+
+        backup_path = self.a2l_path.with_suffix('.a2l.bak')
+        assert result.success is True
+        assert backup_path.read_text(encoding='utf-8') == A2L_CONTENT
+        assert "0x28001000" in self.a2l_path.read_text(encoding='utf-8')
+
+    def test_process_gbk_file(self):
+        """测试 GBK 编码文件自动回退解码"""
+        content = A2L_CONTENT.replace('""', '"标定量"')
+        self.a2l_path.write_bytes(content.encode('gbk'))
+
+        processor = A2LPostProcessor(symbol_map={"CalVar": 0x28001000})
+        result = processor.process(self.a2l_path, newline='\n')
+
+        assert result.success is True
+        assert result.encoding == 'gbk'
+        assert "标定量" in self.a2l_path.read_text(encoding='utf-8')
+
+    def test_process_file_not_found(self):
+        """测试文件不存在"""
+        with pytest.raises(FileNotFoundError):
+            A2LPostProcessor().process(self.temp_dir / "missing.a2l")
+
+    def test_read_a2l_text(self):
+        """测试读取 A2L 文本并返回编码"""
+        content, encoding = read_a2l_text(self.a2l_path)
+
+        assert content == A2L_CONTENT
+        assert encoding == 'utf-8-sig'
+
+    def test_result_default_values(self):
+        """测试结果默认值"""
+        result = PostProcessResult()
+
+        assert result.success is False
+        assert result.matched_count == 0
+        assert result.if_data_removed == 0
+        assert result.header_found is False
+        assert result.updated_variables == []
@@ -0,0 +1,164 @@
+"""Unit tests for unreferenced A2L support block pruning."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from a2l.support_pruner import (
+    A2LPruneError,
+    A2LSupportPruner,
+    build_reference_graph,
+    find_unreferenced
+)
+
+
+A2L_CONTENT = """ASAP2_VERSION 1 71
+/begin PROJECT Prj ""
+  /begin MODULE Mod ""
+    /begin MOD_COMMON ""
+      S_REC_LAYOUT RL_Default
+    /end MOD_COMMON
+    /begin CHARACTERISTIC CalGain "gain" VALUE 0x1000 RL_Float 0 CM_Gain 0 10
+    /end CHARACTERISTIC
+    /begin MEASUREMENT
+      /* Name                   */      Mode
+      /* Long identifier        */      ""
+      /* Data type              */      UBYTE
+      /* Conversion method      */      CM_Mode
+      /* Resolution (Not used)  */      0
+      /* Accuracy (Not used)    */      0
+      /* Lower limit            */      0
+      /* Upper limit            */      3
+      ECU_ADDRESS                       0x2000
+    /end MEASUREMENT
+    /begin RECORD_LAYOUT RL_Default
+      FNC_VALUES 1 UBYTE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT RL_Float
+      FNC_VALUES 1 FLOAT32_IEEE COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin RECORD_LAYOUT RL_Unused
+      FNC_VALUES 1 SWORD COLUMN_DIR DIRECT
+    /end RECORD_LAYOUT
+    /begin COMPU_METHOD CM_Gain "" LINEAR "%6.2" ""
+      COEFFS_LINEAR 1 0
+    /end COMPU_METHOD
+    /begin COMPU_METHOD
+      /* Name of CompuMethod    */      CM_Mode
+      /* Long identifier        */      ""
+      /* Conversion Type        */      TAB_VERB
+      /* Format                 */      "%3.0"
+      /* Units                  */      ""
+      COMPU_TAB_REF VT_Mode
+    /end COMPU_METHOD
+    /begin COMPU_VTAB VT_Mode "" TAB_VERB 2
+      0 "Off"
+      1 "On"
+    /end COMPU_VTAB
+    /begin COMPU_METHOD CM_Removed "" TAB_VERB "%3.0" ""
+      COMPU_TAB_REF VT_Removed
+    /end COMPU_METHOD
+    /begin COMPU_VTAB VT_Removed "" TAB_VERB 1
+      0 "CM_Gain"
+    /end COMPU_VTAB
+    /begin COMPU_VTAB VT_Cycle "" TAB_VERB 1
+      0 "x"
+    /end COMPU_VTAB
+    /begin COMPU_METHOD CM_Cycle "" TAB_VERB "%3.0" ""
+      COMPU_TAB_REF VT_Cycle
+      STATUS_STRING_REF CM_Cycle
+    /end COMPU_METHOD
+  /end MODULE
+/end PROJECT
+"""
+
+
+class TestReferenceGraph:
+    """引用图测试类"""
+
+    def test_build_reference_graph(self):
+        """测试支撑块名称、Simulink 格式名称和块内引用"""
+        blocks, roots = build_reference_graph(A2L_CONTENT.encode())
+
+        assert set(blocks) == {
+            b"RL_Default", b"RL_Float", b"RL_Unused", b"CM_Gain", b"CM_Mode",
+            b"VT_Mode", b"CM_Removed", b"VT_Removed", b"VT_Cycle", b"CM_Cycle",
+        }
+        assert blocks[b"CM_Mode"][0].references == {"VT_Mode"}
+        assert blocks[b"CM_Cycle"][0].references == {"VT_Cycle"}
+        assert roots == {b"RL_Default", b"RL_Float", b"CM_Gain", b"CM_Mode"}
+
+    def test_find_unreferenced(self):
+        """测试经 COMPU_TAB_REF 可达的块被保留"""
+        blocks, roots = build_reference_graph(A2L_CONTENT.encode())
+
+        names = [block.name for block in find_unreferenced(blocks, roots)]
+
+        assert names == ["RL_Unused", "CM_Removed", "VT_Removed", "VT_Cycle", "CM_Cycle"]
+
+
+class TestA2LSupportPruner:
+    """支撑块精简器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_path = self.temp_dir / "App.a2l"
+        self.a2l_path.write_text(A2L_CONTENT, encoding='utf-8')
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_prune_in_place(self):
+        """测试原地删除未引用块并报告节省的字节数"""
+        pruner = A2LSupportPruner()
+        pruner.set_log_callback(self.log_messages.append)
+        result = pruner.prune(self.a2l_path)
+
+        content = self.a2l_path.read_text(encoding='utf-8')
+        assert result.success is True
+        assert result.support_count == 10
+        assert result.removed == {
+            "RECORD_LAYOUT": ["RL_Unused"],
+            "COMPU_METHOD": ["CM_Removed", "CM_Cycle"],
+            "COMPU_VTAB": ["VT_Removed", "VT_Cycle"],
+        }
+        assert result.bytes_saved == len(A2L_CONTENT.encode()) - len(content.encode())
+        assert result.bytes_saved > 0
+        assert "RL_Unused" not in content and "VT_Removed" not in content
+        assert "/begin COMPU_VTAB VT_Mode" in content
+        assert "\n    /begin COMPU_VTAB VT_Mode" in content
+        assert content.count("/begin") == content.count("/end")
+        assert self.log_messages
+
+        # 再次精简没有可删除的块
+        again = A2LSupportPruner().prune(self.a2l_path)
+        assert again.removed_count == 0
+        assert again.bytes_saved == 0
+
+    def test_prune_to_output(self):
+        """测试输出到新文件时不修改源文件"""
+        output = self.temp_dir / "out" / "App_pruned.a2l"
+
+        result = A2LSupportPruner().prune(self.a2l_path, output)
+
+        assert output.exists()
+        assert self.a2l_path.read_text(encoding='utf-8') == A2L_CONTENT
+        assert result.new_size == output.stat().st_size
+
+    def test_invalid_file(self):
+        """测试不存在和空的 A2L 文件"""
+        empty = self.temp_dir / "empty.a2l"
+        empty.write_bytes(b"")
+
+        with pytest.raises(FileNotFoundError):
+            A2LSupportPruner().prune(self.temp_dir / "missing.a2l")
+        with pytest.raises(A2LPruneError):
+            A2LSupportPruner().prune(empty)
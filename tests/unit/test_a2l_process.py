@@ -37,6 +37,7 @@ from stages.a2l_process import (
     save_updated_a2l_file,
     verify_a2l_replacement,
     execute_xcp_header_replacement_stage,
+    _update_batch_a2l_addresses,
     XCP_HEADER_START_PATTERN,
     XCP_HEADER_END_PATTERN,
     XCP_HEADER_SECTION_PATTERN
@@ -622,5 +623,46 @@ class TestExecuteXCPHeaderReplacementStage(unittest.TestCase):
         self.assertIn("a2l_xcp_replaced_path", context.state)
 
 
+class TestBatchA2LUpdate(unittest.TestCase):
+    """测试使用同一 ELF 符号映射批量更新 A2L"""
+
+    A2L_TEMPLATE = """/begin PROJECT Prj ""
+    /begin CHARACTERISTIC
+      /* Name                   */      {name}
+      /* ECU Address            */      0x00000000
+    /end CHARACTERISTIC
+/end PROJECT
+"""
+
+    def setUp(self):
+        """测试前设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.a2l_paths = []
+        for name in ("CalA", "CalB"):
+            path = self.temp_dir / f"{name}.a2l"
+            path.write_text(self.A2L_TEMPLATE.format(name=name), encoding='utf-8')
+            self.a2l_paths.append(path)
+        self.symbols = {"CalA": 0x28001000, "CalB": 0x28002000}
+
+    def tearDown(self):
+        """测试后清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_memory_mapped_parser_matches_default(self):
+        """测试内存映射解析器与默认解析器输出一致"""
+        outputs = {}
+        for memory_mapped in (False, True):
+            output_dir = self.temp_dir / f"out_{memory_mapped}"
+            results = _update_batch_a2l_addresses(
+                self.a2l_paths, self.symbols, None, output_dir, 1,
+                lambda msg: None, memory_mapped=memory_mapped
+            )
+            self.assertEqual([r.matched_count for r in results], [1, 1])
+            outputs[memory_mapped] = [(output_dir / p.name).read_bytes() for p in self.a2l_paths]
+
+        self.assertEqual(outputs[True], outputs[False])
+        self.assertIn(b"0x28002000", outputs[True][1])
+
+
 if __name__ == '__main__':
     unittest.main()
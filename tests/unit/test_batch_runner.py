@@ -0,0 +1,202 @@
+"""Unit tests for the headless multi-project batch runner.
+
+Tests:
+- Job file and tool limit parsing
+- Workflow resolution for a project
+- Tool slot acquisition around MATLAB/IAR stages
+- Batch orchestration, event streaming and summary
+"""
+
+import json
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.batch import (
+    EVENT_DONE,
+    EVENT_STAGE,
+    BatchJob,
+    format_batch_summary,
+    load_batch_jobs,
+    parse_tool_limits,
+    resolve_workflow,
+    run_batch
+)
+from core.models import BuildContext, ProjectConfig, StageConfig, StageResult, StageStatus, WorkflowConfig
+from core.workflow import run_stage_executor
+from utils.errors import ConfigLoadError
+
+
+def completed(message="ok"):
+    """创建成功的阶段结果"""
+    return StageResult(status=StageStatus.COMPLETED, message=message)
+
+
+class TestBatchInputs:
+    """测试批量任务输入解析"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_load_batch_jobs(self):
+        """测试加载任务文件，label 默认为项目名"""
+        path = self.temp_dir / "jobs.json"
+        path.write_text(json.dumps({"jobs": [
+            {"project": "A"},
+            {"project": "A", "label": "A_debug", "workflow": "quick_compile",
+             "overrides": {"target_path": "/out/debug"}},
+        ]}), encoding="utf-8")
+
+        jobs = load_batch_jobs(path)
+
+        assert [job.label for job in jobs] == ["A", "A_debug"]
+        assert jobs[1].workflow_id == "quick_compile"
+        assert jobs[1].overrides == {"target_path": "/out/debug"}
+
+    def test_load_batch_jobs_invalid(self):
+        """测试任务缺少 project 字段时报错"""
+        path = self.temp_dir / "jobs.json"
+        path.write_text(json.dumps([{"label": "x"}]), encoding="utf-8")
+
+        with pytest.raises(ConfigLoadError):
+            load_batch_jobs(path)
+
+    def test_parse_tool_limits(self):
+        """测试解析工具并发上限"""
+        assert parse_tool_limits(["MATLAB=2", "iar=0"]) == {"matlab": 2, "iar": 0}
+        with pytest.raises(ValueError):
+            parse_tool_limits(["matlab"])
+        with pytest.raises(ValueError):
+            parse_tool_limits(["matlab=two"])
+
+    def test_resolve_workflow(self):
+        """测试优先使用项目保存的工作流，指定不存在的模板时报错"""
+        saved = WorkflowConfig(id="custom", name="custom", stages=[StageConfig(name="package")])
+        project = ProjectConfig(name="A", custom_params={"workflow_config": saved.to_dict()})
+
+        assert resolve_workflow(project).id == "custom"
+        assert resolve_workflow(project, "quick_compile").id == "quick_compile"
+        assert resolve_workflow(ProjectConfig(name="B")).id == "full_pipeline"
+        with pytest.raises(ConfigLoadError):
+            resolve_workflow(project, "missing")
+
+
+class TestToolSlots:
+    """测试工具许可"""
+
+    def test_slot_held_during_stage(self):
+        """测试执行占用工具的阶段时持有许可，结束后释放"""
+        slot = threading.Semaphore(1)
+        held = []
+
+        def run_stage(stage_config, context):
+            free = slot.acquire(blocking=False)
+            if free:
+                slot.release()
+            held.append(not free)
+            return completed()
+
+        executor = Mock(side_effect=run_stage)
+        context = BuildContext(config={"stage_cache": False}, tool_slots={"iar": slot})
+
+        with patch.dict("core.workflow.STAGE_EXECUTORS", {"iar_compile": executor, "package": executor}):
+            run_stage_executor(StageConfig(name="iar_compile"), context)
+            run_stage_executor(StageConfig(name="package"), context)
+
+        assert held == [True, False]
+        assert slot.acquire(blocking=False)
+
+
+class TestRunBatch:
+    """测试批量构建调度"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+        self.workflow = WorkflowConfig(id="wf", name="test",
+                                       stages=[StageConfig(name="matlab_gen"), StageConfig(name="package")])
+
+    def _matlab(self, stage_config, context):
+        """模拟占用 MATLAB 的阶段"""
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return completed()
+
+    def _package(self, stage_config, context):
+        """模拟打包阶段，target_path 为 fail 时失败"""
+        if context.config.get("target_path") == "fail":
+            return StageResult(status=StageStatus.FAILED, message="boom")
+        return completed()
+
+    def _run(self, jobs, **kwargs):
+        """使用线程池代替进程池执行批量构建"""
+        events = []
+        executors = {"matlab_gen": self._matlab, "package": self._package}
+        with patch("core.batch.ProcessPoolExecutor", ThreadPoolExecutor), \
+                patch("core.batch.load_config", side_effect=lambda name: ProjectConfig(name=name)), \
+                patch("core.batch.resolve_workflow", return_value=self.workflow), \
+                patch.dict("core.workflow.STAGE_EXECUTORS", executors):
+            results = run_batch(jobs, on_event=events.append, **kwargs)
+        return results, events
+
+    def test_tool_limit_and_summary(self):
+        """测试工具并发上限、事件转发和失败任务汇总"""
+        jobs = [BatchJob(project="P", label=f"P{i}",
+                         overrides={"stage_cache": False, "resume_snapshots": False})
+                for i in range(4)]
+        jobs[2].overrides["target_path"] = "fail"
+
+        results, events = self._run(jobs, max_workers=4, tool_limits={"matlab": 1})
+
+        assert self.peak == 1
+        assert [r.label for r in results] == ["P0", "P1", "P2", "P3"]
+        assert [r.success for r in results] == [True, True, False, True]
+        assert results[2].failed_stage == "package"
+        assert results[2].error == "boom"
+        assert {e["job"] for e in events if e["type"] == EVENT_DONE} == {"P0", "P1", "P2", "P3"}
+        assert {"job": "P0", "type": EVENT_STAGE, "stage": "package", "success": True} in events
+
+        summary = format_batch_summary(results)
+        assert "[package] boom" in summary
+        assert "3 成功, 1 失败" in summary
+
+    def test_shared_workspace_serialized(self):
+        """测试共用工作目录的变体即使不限制工具并发也依次执行"""
+        jobs = [BatchJob(project="P", label=f"P{i}",
+                         overrides={"stage_cache": False, "resume_snapshots": False,
+                                    "a2l_tool_path": "/tools/a2l", "target_path": f"/out/{i}"})
+                for i in range(3)]
+
+        results, _ = self._run(jobs, max_workers=3, tool_limits={"matlab": 0})
+
+        assert self.peak == 1
+        assert all(r.success for r in results)
+
+    def test_duplicate_labels_rejected(self):
+        """测试任务标识重复时报错"""
+        with pytest.raises(ValueError):
+            run_batch([BatchJob(project="A"), BatchJob(project="A")])
+
+    def test_worker_process_reports_load_error(self):
+        """测试在工作进程中加载不存在的项目时返回错误结果"""
+        results = run_batch([BatchJob(project="__missing_batch_project__")], max_workers=1)
+
+        assert results[0].success is False
+        assert "配置文件不存在" in results[0].error
@@ -0,0 +1,332 @@
+"""Unit tests for the local build queue service.
+
+Tests:
+- Workspace token conflicts
+- Priority ordering and resource-aware dispatch
+- Cancellation of queued and running jobs
+- Socket server / client round trip
+- GUI watcher thread signal mapping
+"""
+
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from core.batch import BatchJob, BatchJobResult
+from core.build_queue import (
+    JOB_CANCELLED,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    BuildQueue,
+    BuildQueueClient,
+    BuildQueueServer,
+    QUEUE_DIR_ENV,
+    get_queue_dir,
+    tokens_conflict,
+    workspace_tokens
+)
+from core.models import BuildState, ProjectConfig, StageConfig, StageStatus, WorkflowConfig
+from utils.errors import BuildQueueError
+
+
+class TestQueueDir:
+    """测试构建队列服务目录"""
+
+    def test_machine_wide_default(self, monkeypatch):
+        """测试默认使用机器级目录而不是用户目录"""
+        monkeypatch.delenv(QUEUE_DIR_ENV, raising=False)
+        monkeypatch.setenv("APPDATA", "/users/a/AppData/Roaming")
+        monkeypatch.setenv("PROGRAMDATA", "/ProgramData")
+
+        assert get_queue_dir() == Path("/ProgramData") / "MBD_CICDKits" / "queue"
+
+        monkeypatch.delenv("PROGRAMDATA")
+        assert get_queue_dir() == Path(tempfile.gettempdir()) / "MBD_CICDKits" / "queue"
+
+    def test_env_override(self, monkeypatch):
+        """测试环境变量指定服务目录"""
+        monkeypatch.setenv(QUEUE_DIR_ENV, "/shared/queue")
+
+        assert get_queue_dir() == Path("/shared/queue")
+
+
+class TestWorkspaceTokens:
+    """测试工作区令牌"""
+
+    def test_conflicts(self):
+        """测试同一项目或父子目录冲突，不相关目录不冲突"""
+        a = workspace_tokens("A", {"target_path": "/build/a", "a2l_tool_path": "/tools/a2l"})
+        b = workspace_tokens("B", {"target_path": "/build/b"})
+        c = workspace_tokens("C", {"target_path": "/build/bb", "a2l_tool_path": "/tools"})
+
+        assert not tokens_conflict(a, b)
+        assert not tokens_conflict(b, c)
+        assert tokens_conflict(a, c)
+        assert tokens_conflict(a, workspace_tokens("A", {}))
+
+
+class FakeRunner:
+    """用可控事件代替真实构建的任务执行函数"""
+
+    def __init__(self):
+        self.started = []
+        self.release = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, job, resume=False, cancel_path="", job_key=""):
+        event = threading.Event()
+        with self.lock:
+            self.release[job.label] = event
+            self.started.append(job.label)
+        while not event.wait(0.01):
+            if cancel_path and Path(cancel_path).exists():
+                return BatchJobResult(label=job.label, project=job.project, error="user_requested")
+        return BatchJobResult(label=job.label, project=job.project, success=True)
+
+    def finish(self, label):
+        """结束指定任务"""
+        self.release[label].set()
+
+
+class TestBuildQueue:
+    """测试构建队列调度"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.runner = FakeRunner()
+        self.configs = {
+            "A": ProjectConfig(name="A", target_path="/build/a"),
+            "B": ProjectConfig(name="B", target_path="/build/b"),
+            "C": ProjectConfig(name="C", target_path="/build/c"),
+        }
+        self.patches = [
+            patch("core.build_queue.ProcessPoolExecutor", ThreadPoolExecutor),
+            patch("core.build_queue.run_batch_job", self.runner),
+            patch("core.batch.load_config", side_effect=lambda name: self.configs[name]),
+        ]
+        for p in self.patches:
+            p.start()
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        for event in self.runner.release.values():
+            event.set()
+        for p in self.patches:
+            p.stop()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _queue(self, max_workers):
+        """创建构建队列"""
+        return BuildQueue(max_workers=max_workers, work_dir=self.temp_dir)
+
+    def _wait(self, build_queue, job_id, state):
+        """等待任务进入指定状态"""
+        deadline = time.monotonic() + 5
+        while build_queue.get_job(job_id).state != state:
+            assert time.monotonic() < deadline, f"{job_id} 未进入 {state}"
+            build_queue.poll()
+            time.sleep(0.01)
+
+    def test_conflicting_jobs_serialized(self):
+        """测试同一项目的任务依次执行，不同项目并行执行"""
+        build_queue = self._queue(max_workers=3)
+        a1 = build_queue.submit(BatchJob(project="A"))
+        a2 = build_queue.submit(BatchJob(project="A"))
+        b = build_queue.submit(BatchJob(project="B"))
+
+        assert (a1.state, a2.state, b.state) == (JOB_RUNNING, JOB_QUEUED, JOB_RUNNING)
+
+        self.runner.finish("A")
+        self._wait(build_queue, a1.job_id, JOB_COMPLETED)
+        assert a2.state == JOB_RUNNING
+        assert self.runner.started.count("A") == 2
+
+    def test_priority_order_and_reservation(self):
+        """测试高优先级任务先执行，且等待中的高优先级任务的资源不被低优先级任务占用"""
+        build_queue = self._queue(max_workers=2)
+        a = build_queue.submit(BatchJob(project="A"))
+        high = build_queue.submit(BatchJob(project="A", label="A_high"), priority=10)
+        low = build_queue.submit(BatchJob(project="A", label="A_low"))
+        c = build_queue.submit(BatchJob(project="C"), priority=-1)
+
+        assert (high.state, low.state, c.state) == (JOB_QUEUED, JOB_QUEUED, JOB_RUNNING)
+
+        self.runner.finish("A")
+        self._wait(build_queue, high.job_id, JOB_RUNNING)
+        assert low.state == JOB_QUEUED
+        assert self.runner.started == ["A", "C", "A_high"]
+
+    def test_cancel(self):
+        """测试取消排队任务和运行中任务"""
+        build_queue = self._queue(max_workers=1)
+        a = build_queue.submit(BatchJob(project="A"))
+        b = build_queue.submit(BatchJob(project="B"))
+
+        assert build_queue.cancel(b.job_id)
+        assert b.state == JOB_CANCELLED
+
+        assert build_queue.cancel(a.job_id)
+        self._wait(build_queue, a.job_id, JOB_CANCELLED)
+        assert not build_queue.cancel(a.job_id)
+        assert "B" not in self.runner.started
+
+        events, next_seq = build_queue.get_events(a.job_id)
+        assert [e["type"] for e in events] == ["queued", "running", "log", "done"]
+        assert build_queue.get_events(a.job_id, next_seq) == ([], next_seq)
+
+    def test_broken_pool_recovered(self):
+        """测试工作进程崩溃后任务失败，后续任务在新的进程池中执行"""
+        pools = []
+
+        class BrokenOncePool(ThreadPoolExecutor):
+            def __init__(self, *args, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.broken = not pools
+                pools.append(self)
+
+            def submit(self, fn, *args, **kwargs):
+                if self.broken:
+                    raise BrokenProcessPool("worker died")
+                return super().submit(fn, *args, **kwargs)
+
+        def crash(job, *args):
+            raise BrokenProcessPool("worker died")
+
+        with patch("core.build_queue.ProcessPoolExecutor", BrokenOncePool):
+            build_queue = self._queue(max_workers=1)
+            a = build_queue.submit(BatchJob(project="A"))
+            assert a.state == JOB_RUNNING
+            assert len(pools) == 2
+
+            while "A" not in self.runner.release:
+                time.sleep(0.01)
+            with patch("core.build_queue.run_batch_job", crash):
+                b = build_queue.submit(BatchJob(project="B"))
+                self.runner.finish("A")
+                self._wait(build_queue, b.job_id, JOB_FAILED)
+            c = build_queue.submit(BatchJob(project="C"))
+
+            assert "工作进程异常" in b.result.error
+            assert c.state == JOB_RUNNING
+            assert len(pools) == 3
+            build_queue.shutdown()
+
+
+class TestBuildQueueServer:
+    """测试构建队列服务和客户端"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.service_file = self.temp_dir / "service.json"
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_round_trip(self):
+        """测试通过本地套接字提交任务、查询事件和停止服务"""
+        runner = Mock(side_effect=lambda job, *args: BatchJobResult(label=job.label, project=job.project,
+                                                                    success=True, duration=1.5))
+        client = BuildQueueClient(self.service_file)
+        assert not client.ping()
+
+        with patch("core.build_queue.ProcessPoolExecutor", ThreadPoolExecutor), \
+                patch("core.build_queue.run_batch_job", runner), \
+                patch("core.batch.load_config", return_value=ProjectConfig(name="A")):
+            server = BuildQueueServer(BuildQueue(work_dir=self.temp_dir), service_file=self.service_file)
+            server.start()
+            try:
+                assert client.ping()
+                job_id = client.submit(BatchJob(project="A", overrides={"target_path": "/out"}), priority=3)
+
+                deadline = time.monotonic() + 5
+                while client.status(job_id)["state"] != JOB_COMPLETED:
+                    assert time.monotonic() < deadline
+                    time.sleep(0.05)
+
+                events, _ = client.events(job_id)
+                assert events[-1]["result"]["duration"] == 1.5
+                assert client.status()[0]["priority"] == 3
+                assert runner.call_args.args[0].overrides == {"target_path": "/out"}
+                with pytest.raises(BuildQueueError):
+                    client.status("missing")
+            finally:
+                client.shutdown()
+                server.stop()
+
+        assert not self.service_file.exists()
+
+
+class TestQueueJobThread:
+    """测试 GUI 构建队列监视线程"""
+
+    def test_signals(self):
+        """测试队列事件转换为 WorkflowThread 兼容的信号"""
+        from core.queue_thread import QueueJobThread
+
+        client = Mock()
+        client.submit.return_value = "job1"
+        client.events.side_effect = [
+            ([{"type": "queued", "priority": 0}, {"type": "running"},
+              {"type": "progress", "percent": 0, "message": "执行阶段: package"},
+              {"type": "stage", "stage": "package", "success": True}], 4),
+            ([{"type": "done", "state": "completed",
+               "result": {"duration": 2.0, "output_files": ["/out/A.hex"], "stage_durations": {"package": 1.5}}}], 5),
+        ]
+        workflow = WorkflowConfig(id="wf", name="test", stages=[StageConfig(name="package")])
+        history = Mock()
+        history.create_build_record.return_value.build_id = "b1"
+        with patch("core.queue_thread.get_history_manager", return_value=history):
+            thread = QueueJobThread(ProjectConfig(name="A", target_path="/out"), workflow, client=client)
+
+        stages, finished, details = [], [], []
+        thread.stage_complete.connect(lambda name, ok: stages.append((name, ok)))
+        thread.build_finished.connect(finished.append)
+        thread.progress_update_detailed.connect(lambda p: details.append(p.completed_stages))
+
+        with patch("core.queue_thread.WATCH_POLL_INTERVAL", 0):
+            thread.run()
+
+        submitted = client.submit.call_args.args[0]
+        assert submitted.project == "A"
+        assert submitted.workflow_config["id"] == "wf"
+        assert submitted.project_config["target_path"] == "/out"
+        assert stages == [("package", True)]
+        assert details == [0, 1]
+        assert finished == [BuildState.COMPLETED]
+
+        # 队列构建同样写入构建历史
+        update = history.update_build_record.call_args.kwargs
+        assert update["state"] == BuildState.COMPLETED
+        assert update["output_files"] == ["/out/A.hex"]
+        assert update["stage_results"][0].stage_name == "package"
+        assert update["stage_results"][0].status == StageStatus.COMPLETED
+        assert update["stage_results"][0].duration == 1.5
+        history.save_build_record.assert_called_once_with("b1")
+
+    def test_submit_failure(self):
+        """测试服务不可用时报告错误并结束"""
+        from core.queue_thread import QueueJobThread
+
+        client = Mock()
+        client.submit.side_effect = BuildQueueError("构建队列服务未运行")
+        thread = QueueJobThread(ProjectConfig(name="A"), WorkflowConfig(), client=client)
+        errors, finished = [], []
+        thread.error_occurred.connect(lambda msg, suggestions: errors.append(msg))
+        thread.build_finished.connect(finished.append)
+
+        thread.run()
+
+        assert "构建队列服务未运行" in errors[0]
+        assert finished == [BuildState.FAILED]
@@ -0,0 +1,243 @@
+"""Unit tests for resuming a failed build from a persisted state snapshot.
+
+Tests:
+- Snapshot persistence with referenced file hashes
+- Snapshot validation against configuration and file changes
+- execute_workflow and WorkflowThread resume mode
+"""
+
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.models import BuildContext, StageConfig, StageResult, StageStatus, WorkflowConfig
+from core.workflow import execute_workflow
+from utils.file_hash import hash_file
+from utils.resume import (
+    get_remaining_stages,
+    get_snapshot_path,
+    load_resume_snapshot,
+    save_resume_snapshot,
+    validate_resume_snapshot
+)
+
+
+class TestResumeSnapshot:
+    """测试恢复快照的保存和校验"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.elf = self.temp_dir / "App.out"
+        self.elf.write_bytes(b"elf-v1")
+        self.config = {"name": "Proj", "a2l_path": "/a2l", "modified_at": "t1"}
+        self.state = {
+            "build_output": {"elf_file": str(self.elf), "success": True},
+            "build_start_time": 123.0,
+            "process_handle": threading.Lock(),
+        }
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_save_and_load(self):
+        """测试快照保存可序列化状态和引用文件的哈希"""
+        path = save_resume_snapshot("Proj", self.config, self.state, ["iar_compile"],
+                                    workflow_id="full_pipeline", resume_dir=self.temp_dir)
+
+        snapshot = load_resume_snapshot("Proj", resume_dir=self.temp_dir)
+
+        assert path == get_snapshot_path("Proj", self.temp_dir)
+        assert snapshot["state"] == {"build_output": self.state["build_output"]}
+        assert list(snapshot["file_hashes"]) == [str(self.elf)]
+        assert snapshot["completed_stages"] == ["iar_compile"]
+        assert validate_resume_snapshot(snapshot, dict(self.config, modified_at="t2")) == []
+        assert get_remaining_stages(snapshot, ["iar_compile", "a2l_process"]) == ["a2l_process"]
+
+    def test_validate_detects_changes(self):
+        """测试配置修改、文件修改和文件删除使快照失效"""
+        save_resume_snapshot("Proj", self.config, self.state, ["iar_compile"], resume_dir=self.temp_dir)
+        snapshot = load_resume_snapshot("Proj", resume_dir=self.temp_dir)
+
+        self.elf.write_bytes(b"elf-v2")
+        problems = validate_resume_snapshot(snapshot, dict(self.config, a2l_path="/other"))
+        assert problems == ["配置项已修改: a2l_path", f"文件已修改: {self.elf}"]
+
+        self.elf.unlink()
+        assert validate_resume_snapshot(snapshot, self.config) == [f"文件不存在: {self.elf}"]
+
+    def test_directory_outputs_hashed(self):
+        """测试状态引用的输出目录按其中的文件记录哈希"""
+        output_dir = self.temp_dir / "hex"
+        (output_dir / "sub").mkdir(parents=True)
+        (output_dir / "App.hex").write_bytes(b"hex-v1")
+        (output_dir / "sub" / "App.a2l").write_bytes(b"a2l-v1")
+        state = dict(self.state, matlab_output=str(output_dir))
+
+        save_resume_snapshot("Proj", self.config, state, ["matlab_gen"], resume_dir=self.temp_dir)
+        snapshot = load_resume_snapshot("Proj", resume_dir=self.temp_dir)
+
+        assert sorted(snapshot["file_hashes"]) == sorted(
+            [str(self.elf), str(output_dir / "App.hex"), str(output_dir / "sub" / "App.a2l")]
+        )
+        (output_dir / "sub" / "App.a2l").write_bytes(b"a2l-v2")
+        assert validate_resume_snapshot(snapshot, self.config) == [
+            f"文件已修改: {output_dir / 'sub' / 'App.a2l'}"
+        ]
+
+    def test_unchanged_files_not_rehashed(self):
+        """测试大小和修改时间未变化的文件在后续快照中不重新计算哈希"""
+        with patch("utils.file_hash.hash_file", side_effect=hash_file) as hasher:
+            save_resume_snapshot("Proj", self.config, self.state, ["iar_compile"], resume_dir=self.temp_dir)
+            save_resume_snapshot("Proj", self.config, self.state, ["iar_compile", "a2l_process"],
+                                 resume_dir=self.temp_dir)
+            assert hasher.call_count == 1
+
+            self.elf.write_bytes(b"elf-v2-longer")
+            save_resume_snapshot("Proj", self.config, self.state, ["iar_compile"], resume_dir=self.temp_dir)
+            assert hasher.call_count == 2
+
+        snapshot = load_resume_snapshot("Proj", resume_dir=self.temp_dir)
+        assert snapshot["file_hashes"][str(self.elf)] == hash_file(self.elf)
+
+    def test_load_missing(self):
+        """测试快照不存在时返回 None"""
+        assert load_resume_snapshot("Other", resume_dir=self.temp_dir) is None
+
+
+class TestExecuteWorkflowResume:
+    """测试 execute_workflow 的恢复模式"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.artifact = self.temp_dir / "App.out"
+        self.config = {"name": "Proj", "resume_dir": str(self.temp_dir / "resume")}
+        self.workflow = WorkflowConfig(
+            id="wf",
+            name="test",
+            stages=[StageConfig(name="stage_a"), StageConfig(name="stage_b"), StageConfig(name="stage_c")]
+        )
+
+        self.stage_a = Mock(side_effect=self._produce)
+        self.stage_b = Mock(return_value=StageResult(status=StageStatus.COMPLETED, message="ok"))
+        self.stage_c = Mock(return_value=StageResult(status=StageStatus.FAILED, message="boom"))
+        self.executors = {"stage_a": self.stage_a, "stage_b": self.stage_b, "stage_c": self.stage_c}
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _produce(self, config, context):
+        """模拟生成文件的阶段"""
+        self.artifact.write_bytes(b"v1")
+        context.state["build_output"] = {"elf_file": str(self.artifact)}
+        return StageResult(status=StageStatus.COMPLETED, message="ok")
+
+    def _run(self, resume=False):
+        """执行一次工作流"""
+        context = BuildContext(config=dict(self.config))
+        with patch.dict("core.workflow.STAGE_EXECUTORS", self.executors):
+            success = execute_workflow(self.workflow, context, resume=resume)
+        return success, context
+
+    def test_resume_from_failed_stage(self):
+        """测试从失败阶段继续，已完成阶段不再执行，成功后删除快照"""
+        assert self._run()[0] is False
+        assert get_snapshot_path("Proj", self.temp_dir / "resume").exists()
+
+        self.stage_c.return_value = StageResult(status=StageStatus.COMPLETED, message="ok")
+        success, context = self._run(resume=True)
+
+        assert success is True
+        assert self.stage_a.call_count == 1
+        assert self.stage_b.call_count == 1
+        assert self.stage_c.call_count == 2
+        assert context.state["resumed_stages"] == ["stage_a", "stage_b"]
+        assert context.state["build_output"] == {"elf_file": str(self.artifact)}
+        assert not get_snapshot_path("Proj", self.temp_dir / "resume").exists()
+
+    def test_changed_file_runs_full_build(self):
+        """测试快照引用的文件变化时执行完整构建"""
+        self._run()
+        self.artifact.write_bytes(b"tampered")
+
+        self._run(resume=True)
+
+        assert self.stage_a.call_count == 2
+        assert self.stage_b.call_count == 2
+
+
+class TestWorkflowThreadResume:
+    """测试 WorkflowThread 的恢复模式"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_resumed_stages_marked_completed(self):
+        """测试恢复的阶段计入已完成进度，只执行未完成阶段"""
+        from core.models import ProjectConfig
+        from core.workflow_thread import WorkflowThread
+
+        project_config = ProjectConfig(name="Proj")
+        workflow = WorkflowConfig(id="wf", name="test",
+                                  stages=[StageConfig(name="stage_a"), StageConfig(name="stage_b")])
+        stage_a = Mock(return_value=StageResult(status=StageStatus.COMPLETED, message="ok"))
+        stage_b = Mock(return_value=StageResult(status=StageStatus.FAILED, message="boom"))
+        executors = {"stage_a": stage_a, "stage_b": stage_b}
+
+        with patch("utils.resume.get_resume_dir", return_value=self.temp_dir), \
+                patch.dict("core.workflow.STAGE_EXECUTORS", executors):
+            WorkflowThread(project_config, workflow).run()
+
+            stage_b.return_value = StageResult(status=StageStatus.COMPLETED, message="ok")
+            thread = WorkflowThread(project_config, workflow, resume=True)
+            progress = []
+            thread.progress_update_detailed.connect(
+                lambda p: progress.append((p.completed_stages, dict(p.stage_statuses))))
+            thread.run()
+
+        assert stage_a.call_count == 1
+        assert stage_b.call_count == 2
+        assert [s.name for s in thread.get_build_execution().stages] == ["stage_b"]
+        assert progress[0] == (1, {"stage_a": StageStatus.COMPLETED, "stage_b": StageStatus.PENDING})
+        assert thread.get_build_execution().state.value == "completed"
+        assert not (self.temp_dir / "Proj.json").exists()
+
+
+class TestMainWindowResume:
+    """测试主窗口的继续上次构建动作"""
+
+    def test_resume_action_starts_resumed_workflow(self):
+        """测试继续上次构建动作以恢复模式启动本地工作流"""
+        from PyQt6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication([])
+
+        from core.models import ProjectConfig
+        from ui.main_window import MainWindow
+
+        with patch("ui.main_window.load_last_project", return_value=None):
+            window = MainWindow()
+        window._current_config = ProjectConfig(name="Proj")
+        manager = Mock()
+        manager.start_workflow.return_value = True
+        manager.get_current_worker.return_value = None
+        window._workflow_manager = manager
+
+        with patch("ui.main_window.validate_workflow_config", return_value=Mock(is_valid=True)), \
+                patch("ui.main_window.is_queue_running", return_value=False):
+            window.resume_action.trigger()
+
+        assert manager.start_workflow.call_args.kwargs["resume"] is True
+        manager.submit_to_queue.assert_not_called()
+        window._is_building = False
+        window.close()
+        app.processEvents()
@@ -0,0 +1 @@
+"""Intel HEX module unit tests."""
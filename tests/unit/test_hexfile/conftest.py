@@ -0,0 +1,39 @@
+"""Shared fixtures for Intel HEX unit tests."""
+
+import pytest
+import shutil
+import subprocess
+import tempfile
+from pathlib import Path
+
+
+# 带初始化数据（.data）与常量（.rodata）的测试程序
+FIRMWARE_SOURCE = """
+const unsigned char CalTable[64] = {1, 2, 3, 4, 5, 6, 7, 8};
+int Counter = 0x12345678;
+int main(void) { return CalTable[0] + Counter; }
+"""
+
+
+@pytest.fixture(scope="session")
+def firmware_elf():
+    """使用 gcc 编译包含 PT_LOAD 段的测试 ELF"""
+    gcc = shutil.which("gcc")
+    if gcc is None:
+        pytest.skip("gcc 不可用，无法生成测试 ELF")
+
+    temp_dir = Path(tempfile.mkdtemp())
+    source = temp_dir / "firmware.c"
+    source.write_text(FIRMWARE_SOURCE, encoding='utf-8')
+    elf_path = temp_dir / "firmware.elf"
+
+    proc = subprocess.run(
+        [gcc, "-O0", "-no-pie", "-o", str(elf_path), str(source)],
+        capture_output=True
+    )
+    if proc.returncode != 0 or not elf_path.exists():
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        pytest.skip(f"gcc 编译失败: {proc.stderr.decode(errors='ignore')}")
+
+    yield elf_path
+    shutil.rmtree(temp_dir, ignore_errors=True)
@@ -0,0 +1,193 @@
+"""Unit tests for sector-based delta HEX generation."""
+
+import json
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from hexfile.delta import (
+    ACTION_ERASE,
+    ACTION_PROGRAM,
+    DeltaHexError,
+    DeltaHexGenerator,
+    SectorMap,
+    SectorRegion,
+    compare_sectors,
+    delta_output_paths,
+    is_delta_hex
+)
+from hexfile.intel_hex import MemoryImage, read_hex, write_hex
+
+
+SECTOR = 0x1000
+BASE_ADDRESS = 0x80000000
+
+
+def build_image(patches: dict = None, size: int = 8 * SECTOR) -> MemoryImage:
+    """生成 8 个扇区的镜像，patches 为 {地址: 数据} 的修改"""
+    data = bytearray(bytes(range(256)) * (size // 256))
+    for address, patch in (patches or {}).items():
+        offset = address - BASE_ADDRESS
+        data[offset:offset + len(patch)] = patch
+    image = MemoryImage()
+    image.add(BASE_ADDRESS, bytes(data))
+    image.start_linear_address = BASE_ADDRESS
+    return image
+
+
+class TestSectorMap:
+    """扇区映射测试类"""
+
+    def test_uniform_sectors(self):
+        """测试默认扇区按大小对齐"""
+        sector_map = SectorMap(default_sector_size=SECTOR)
+
+        assert sector_map.sector_of(BASE_ADDRESS + 0x1234) == (BASE_ADDRESS + 0x1000, BASE_ADDRESS + 0x2000)
+
+    def test_regions_with_different_sizes(self):
+        """测试不同区域使用不同扇区大小，默认扇区不跨入区域"""
+        sector_map = SectorMap.from_config(
+            [{"start": "0xAF000000", "end": "0xAF010000", "sector_size": "0x1000"},
+             [0x80000000, 0x80100000, 0x4000]],
+            default_sector_size=0x10000
+        )
+
+        assert sector_map.sector_of(0x80004010) == (0x80004000, 0x80008000)
+        assert sector_map.sector_of(0xAF00F000) == (0xAF00F000, 0xAF010000)
+        assert sector_map.sector_of(0xAEFFFFF0) == (0xAEFF0000, 0xAF000000)
+        assert sector_map.sector_of(0x80100010) == (0x80100000, 0x80110000)
+
+    def test_address_outside_map(self):
+        """测试未配置默认扇区大小时区域外地址报错"""
+        sector_map = SectorMap([SectorRegion(0x1000, 0x2000, 0x100)], default_sector_size=None)
+
+        with pytest.raises(DeltaHexError):
+            sector_map.sector_of(0x3000)
+
+    def test_invalid_config(self):
+        """测试重叠区域和格式错误的配置"""
+        with pytest.raises(DeltaHexError):
+            SectorMap.from_config([[0x0, 0x2000, 0x1000], [0x1000, 0x3000, 0x1000]])
+        with pytest.raises(DeltaHexError):
+            SectorMap.from_config([{"start": 0}])
+
+    def test_iter_sectors(self):
+        """测试跨扇区的地址范围不重复遍历扇区"""
+        sector_map = SectorMap(default_sector_size=SECTOR)
+        sectors = list(sector_map.iter_sectors([(0x10, 0x20), (0x30, 0x1010), (0x3000, 0x3001)]))
+
+        assert sectors == [(0x0, 0x1000), (0x1000, 0x2000), (0x3000, 0x4000)]
+
+
+class TestCompareSectors:
+    """扇区比较测试类"""
+
+    def test_identical_images(self):
+        """测试相同镜像没有变化扇区"""
+        changes, total = compare_sectors(build_image(), build_image(), SectorMap(default_sector_size=SECTOR))
+
+        assert changes == []
+        assert total == 8
+
+    def test_changed_sectors(self):
+        """测试只报告数据变化的扇区"""
+        new = build_image({BASE_ADDRESS + 0x1010: b"\x00\x01\x02", BASE_ADDRESS + 0x5FFF: b"\xAA\xBB"})
+
+        changes, total = compare_sectors(build_image(), new, SectorMap(default_sector_size=SECTOR))
+
+        assert total == 8
+        assert [(c.start - BASE_ADDRESS, c.action) for c in changes] == [
+            (0x1000, ACTION_PROGRAM), (0x5000, ACTION_PROGRAM), (0x6000, ACTION_PROGRAM)
+        ]
+        assert all(c.base_hash != c.new_hash for c in changes)
+
+    def test_removed_and_added_data(self):
+        """测试新镜像中消失的扇区只擦除，新增扇区需要编程"""
+        base = build_image()
+        new = build_image(size=4 * SECTOR)
+        new.add(BASE_ADDRESS + 0x10000, b"\x11" * 16)
+
+        changes, _ = compare_sectors(base, new, SectorMap(default_sector_size=SECTOR))
+
+        erased = [c for c in changes if c.action == ACTION_ERASE]
+        programmed = [c for c in changes if c.action == ACTION_PROGRAM]
+        assert [c.start - BASE_ADDRESS for c in erased] == [0x4000, 0x5000, 0x6000, 0x7000]
+        assert [(c.start - BASE_ADDRESS, c.data_bytes) for c in programmed] == [(0x10000, 16)]
+
+    def test_erased_value_equals_hole(self):
+        """测试数据全为擦除值的区域与空洞视为相同"""
+        base = MemoryImage()
+        base.add(0x0, b"\x01" * 16)
+        new = MemoryImage()
+        new.add(0x0, b"\x01" * 16 + b"\xFF" * 16)
+
+        changes, _ = compare_sectors(base, new, SectorMap(default_sector_size=SECTOR))
+
+        assert changes == []
+
+
+class TestDeltaHexGenerator:
+    """差分 HEX 生成器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.base = self.temp_dir / "Prev.hex"
+        self.new = self.temp_dir / "New.hex"
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_generate(self):
+        """测试差分 HEX 只包含变化扇区的新数据，清单列出变化扇区"""
+        write_hex(build_image(), self.base)
+        write_hex(build_image({BASE_ADDRESS + 0x2100: b"\xCA\xFE"}), self.new)
+        output, manifest = delta_output_paths(self.new)
+
+        generator = DeltaHexGenerator(SectorMap(default_sector_size=SECTOR))
+        generator.set_log_callback(self.log_messages.append)
+        result = generator.generate(self.base, self.new, output, manifest)
+
+        assert result.success is True
+        assert result.sectors_total == 8
+        assert result.delta_bytes == SECTOR
+        assert result.full_bytes == 8 * SECTOR
+        assert self.log_messages
+
+        delta = read_hex(output)
+        new = read_hex(self.new)
+        assert delta.ranges() == [(BASE_ADDRESS + 0x2000, BASE_ADDRESS + 0x3000)]
+        assert delta.read(BASE_ADDRESS + 0x2000, SECTOR) == new.read(BASE_ADDRESS + 0x2000, SECTOR)
+        assert delta.start_linear_address == BASE_ADDRESS
+
+        data = json.loads(manifest.read_text(encoding='utf-8'))
+        assert data["summary"]["sectors_changed"] == 1
+        assert data["sectors"][0]["start"] == "0x80002000"
+        assert data["sectors"][0]["action"] == ACTION_PROGRAM
+
+    def test_generate_without_changes(self):
+        """测试没有变化时输出空的差分 HEX"""
+        write_hex(build_image(), self.base)
+        write_hex(build_image(), self.new)
+
+        result = DeltaHexGenerator().generate(self.base, self.new, self.temp_dir / "d.hex")
+
+        assert result.changed_sectors == []
+        assert result.manifest_path == ""
+        assert len(read_hex(self.temp_dir / "d.hex")) == 0
+
+    def test_delta_output_paths(self):
+        """测试差分文件命名与识别"""
+        output, manifest = delta_output_paths(Path("out/App_20260101.hex"))
+
+        assert output == Path("out/App_20260101_delta.hex")
+        assert manifest == Path("out/App_20260101_delta.json")
+        assert is_delta_hex(output) is True
+        assert is_delta_hex(Path("out/App_20260101.hex")) is False
@@ -0,0 +1,146 @@
+"""Unit tests for the Intel HEX reader/writer and memory image."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from hexfile.intel_hex import (
+    MemoryImage,
+    IntelHexError,
+    HexOverlapError,
+    read_hex,
+    write_hex,
+    iter_hex_records
+)
+
+
+# 两段数据：0x00000000 的 4 字节与跨 64 KiB 边界的 0x0001FFFE 起 4 字节，带起始线性地址
+SAMPLE_HEX = """:0400000001020304F2
+:020000040001F9
+:02FFFE00AABB9C
+:020000040002F8
+:02000000CCDD55
+:0400000508000000EF
+:00000001FF
+"""
+
+
+class TestMemoryImage:
+    """稀疏内存镜像测试类"""
+
+    def test_sequential_add_extends_segment(self):
+        """测试同一来源的顺序数据合并为一段"""
+        image = MemoryImage()
+        image.add(0x1000, b"\x01\x02", "a.hex")
+        image.add(0x1002, b"\x03\x04", "a.hex")
+
+        assert image.segment_count == 1
+        assert len(image) == 4
+        assert image.ranges() == [(0x1000, 0x1004)]
+
+    def test_out_of_order_add(self):
+        """测试乱序写入后按地址排序"""
+        image = MemoryImage()
+        image.add(0x2000, b"\x02", "a.hex")
+        image.add(0x1000, b"\x01", "a.hex")
+
+        assert [start for start, _ in image.segments()] == [0x1000, 0x2000]
+
+    def test_overlap_detected(self):
+        """测试内容不同的重叠报错并报告来源"""
+        image = MemoryImage()
+        image.add(0x1000, b"\x00" * 16, "boot.hex")
+
+        with pytest.raises(HexOverlapError) as exc_info:
+            image.add(0x100C, b"\xFF" * 8, "app.hex")
+
+        assert exc_info.value.overlaps == [(0x100C, 0x1010, "boot.hex", "app.hex")]
+        assert len(image) == 16
+
+    def test_identical_overlap_allowed(self):
+        """测试内容相同的重叠不视为冲突"""
+        image = MemoryImage()
+        image.add(0x1000, b"\x01\x02\x03\x04", "a.hex")
+        image.add(0x1002, b"\x03\x04\x05", "b.hex")
+
+        assert image.ranges() == [(0x1000, 0x1005)]
+        assert image.read(0x1000, 5) == b"\x01\x02\x03\x04\x05"
+
+    def test_overwrite_spanning_segments(self):
+        """测试覆盖模式合并跨越多个已有段"""
+        image = MemoryImage()
+        image.add(0x1000, b"\x11\x11", "a.hex")
+        image.add(0x1004, b"\x22\x22", "a.hex")
+        image.add(0x1001, b"\xFF\xFF\xFF\xFF", "b.hex", overwrite=True)
+
+        assert image.segment_count == 1
+        assert image.read(0x1000, 6) == b"\x11\xFF\xFF\xFF\xFF\x22"
+
+    def test_read_fills_gaps(self):
+        """测试读取空洞以填充值补齐"""
+        image = MemoryImage()
+        image.add(0x10, b"\xAA", "a.hex")
+
+        assert image.read(0x0E, 4, fill=0x00) == b"\x00\x00\xAA\x00"
+
+
+class TestReadWriteHex:
+    """HEX 读写测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.hex_path = self.temp_dir / "sample.hex"
+        self.hex_path.write_text(SAMPLE_HEX, encoding='ascii')
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_read(self):
+        """测试读取数据记录、扩展线性地址与起始地址"""
+        image = read_hex(self.hex_path)
+
+        assert image.ranges() == [(0x0, 0x4), (0x1FFFE, 0x20002)]
+        assert image.read(0x1FFFE, 4) == b"\xAA\xBB\xCC\xDD"
+        assert image.start_linear_address == 0x08000000
+
+    def test_roundtrip(self):
+        """测试写出后重新读取得到相同镜像，且记录不跨越 64 KiB 边界"""
+        image = read_hex(self.hex_path)
+        out_path = self.temp_dir / "out.hex"
+        write_hex(image, out_path, record_size=32)
+
+        assert out_path.read_text(encoding='ascii') == SAMPLE_HEX
+        again = read_hex(out_path)
+        assert again.ranges() == image.ranges()
+        assert again.read(0, 4) == image.read(0, 4)
+
+    def test_checksum_error(self):
+        """测试校验和错误"""
+        self.hex_path.write_text(":0400000001020304F3\n:00000001FF\n", encoding='ascii')
+
+        with pytest.raises(IntelHexError, match="校验和"):
+            read_hex(self.hex_path)
+
+    def test_invalid_start_code(self):
+        """测试记录不以冒号开头"""
+        self.hex_path.write_text("0400000001020304F2\n", encoding='ascii')
+
+        with pytest.raises(IntelHexError):
+            read_hex(self.hex_path)
+
+    def test_file_not_found(self):
+        """测试文件不存在"""
+        with pytest.raises(FileNotFoundError):
+            read_hex(self.temp_dir / "missing.hex")
+
+    def test_invalid_record_size(self):
+        """测试无效的记录长度"""
+        with pytest.raises(IntelHexError):
+            list(iter_hex_records(MemoryImage(), record_size=0))
@@ -0,0 +1,83 @@
+"""Unit tests for the native HEX merge engine."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from hexfile.intel_hex import MemoryImage, HexOverlapError, read_hex, write_hex
+from hexfile.merger import HexMerger
+
+
+def write_image(path: Path, address: int, data: bytes, start: int = None):
+    """生成单段 HEX 文件"""
+    image = MemoryImage()
+    image.add(address, data, path.name)
+    image.start_linear_address = start
+    write_hex(image, path)
+
+
+class TestHexMerger:
+    """HEX 合并器测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.boot = self.temp_dir / "Boot.hex"
+        self.driver = self.temp_dir / "FlashDrv.hex"
+        self.app = self.temp_dir / "App.hex"
+        write_image(self.boot, 0x10000000, b"\xB0" * 300, start=0x10000000)
+        write_image(self.driver, 0x28000000, b"\xD0" * 64)
+        write_image(self.app, 0x10010000, bytes(range(256)) * 4, start=0x10010000)
+        self.log_messages = []
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_merge(self):
+        """测试合并 Boot、FlashDriver 与 App"""
+        merger = HexMerger()
+        merger.set_log_callback(self.log_messages.append)
+        output = self.temp_dir / "out" / "Merged.hex"
+
+        result = merger.merge([self.boot, self.driver, self.app], output)
+
+        assert result.success is True
+        assert result.total_bytes == 300 + 64 + 1024
+        assert result.ranges == [
+            (0x10000000, 0x1000012C),
+            (0x10010000, 0x10010400),
+            (0x28000000, 0x28000040),
+        ]
+        assert result.output_size == output.stat().st_size
+        assert any("HEX 合并完成" in msg for msg in self.log_messages)
+
+        merged = read_hex(output)
+        assert merged.read(0x10010000, 4) == b"\x00\x01\x02\x03"
+        # 起始地址取第一个定义了起始地址的文件
+        assert merged.start_linear_address == 0x10000000
+
+    def test_overlap_rejected(self):
+        """测试地址重叠时报错且不写输出文件"""
+        write_image(self.app, 0x1000012A, b"\x00" * 8)
+        output = self.temp_dir / "Merged.hex"
+
+        with pytest.raises(HexOverlapError) as exc_info:
+            HexMerger().merge([self.boot, self.app], output)
+
+        assert exc_info.value.overlaps[0][:2] == (0x1000012A, 0x1000012C)
+        assert not output.exists()
+
+    def test_overlap_overwrite(self):
+        """测试允许覆盖时后面的文件优先"""
+        write_image(self.app, 0x1000012A, b"\x00" * 8)
+        output = self.temp_dir / "Merged.hex"
+
+        HexMerger(allow_overwrite=True).merge([self.boot, self.app], output)
+
+        assert read_hex(output).read(0x10000128, 4) == b"\xB0\xB0\x00\x00"
@@ -0,0 +1,124 @@
+"""Unit tests for HEX vs ELF load segment verification."""
+
+import pytest
+import shutil
+import tempfile
+from pathlib import Path
+
+# 添加项目根目录到路径
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / "src"))
+
+from hexfile.intel_hex import MemoryImage, write_hex
+from hexfile.verifier import (
+    HexVerifyError,
+    read_elf_load_segments,
+    verify_hex_against_elf,
+    verify_image_against_segments
+)
+
+
+class TestVerifyImageAgainstSegments:
+    """内存镜像校验测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.data = bytes(range(256)) * 16
+        self.image = MemoryImage()
+        self.image.add(0x1000, self.data, "app.hex")
+
+    def test_match(self):
+        """测试数据一致"""
+        result = verify_image_against_segments(self.image, [(0x1000, self.data)])
+
+        assert result.success is True
+        assert result.segments_checked == 1
+        assert result.bytes_checked == len(self.data)
+        assert result.mismatches == []
+
+    def test_different_ranges(self):
+        """测试报告数据不同的地址范围"""
+        corrupted = bytearray(self.data)
+        corrupted[10:13] = b"\xEE\xEE\xEE"
+        corrupted[2000] ^= 0xFF
+
+        result = verify_image_against_segments(self.image, [(0x1000, bytes(corrupted))])
+
+        assert result.success is False
+        assert [(m.start, m.end, m.kind) for m in result.mismatches] == [
+            (0x100A, 0x100D, "different"),
+            (0x1000 + 2000, 0x1000 + 2001, "different"),
+        ]
+
+    def test_missing_ranges(self):
+        """测试报告 HEX 中缺失的地址范围（空洞与越界）"""
+        image = MemoryImage()
+        image.add(0x1000, self.data[:16], "a.hex")
+        image.add(0x1020, self.data[32:48], "a.hex")
+
+        result = verify_image_against_segments(image, [(0x1000, self.data[:64])])
+
+        assert [(m.start, m.end, m.kind) for m in result.mismatches] == [
+            (0x1010, 0x1020, "missing"),
+            (0x1030, 0x1040, "missing"),
+        ]
+
+    def test_segments_spanning_image_segments(self):
+        """测试一个可加载段跨越多个 HEX 数据段"""
+        image = MemoryImage()
+        image.add(0x1000, self.data[:100], "boot.hex")
+        image.add(0x1064, self.data[100:], "app.hex")
+
+        assert verify_image_against_segments(image, [(0x1000, self.data)]).success is True
+
+
+class TestVerifyHexAgainstElf:
+    """HEX 与 ELF 校验测试类"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write_hex_from_elf(self, elf_path: Path) -> Path:
+        """将 ELF 可加载段写为 HEX 文件"""
+        image = MemoryImage()
+        for address, data in read_elf_load_segments(elf_path):
+            image.add(address, data, elf_path.name)
+        hex_path = self.temp_dir / "firmware.hex"
+        write_hex(image, hex_path)
+        return hex_path
+
+    def test_matching_hex(self, firmware_elf):
+        """测试由 ELF 生成的 HEX 校验通过"""
+        hex_path = self._write_hex_from_elf(firmware_elf)
+
+        result = verify_hex_against_elf(hex_path, firmware_elf)
+
+        assert result.success is True
+        assert result.segments_checked >= 2
+        assert result.bytes_checked > 0
+
+    def test_stale_hex(self, firmware_elf):
+        """测试 HEX 缺少一个可加载段时报告缺失范围"""
+        segments = read_elf_load_segments(firmware_elf)
+        image = MemoryImage()
+        for address, data in segments[1:]:
+            image.add(address, data, "stale.hex")
+
+        result = verify_hex_against_elf(image, firmware_elf)
+
+        assert result.success is False
+        assert result.mismatches[0].start == segments[0][0]
+        assert result.mismatches[0].kind == "missing"
+
+    def test_invalid_elf(self):
+        """测试无效 ELF 文件"""
+        elf_path = self.temp_dir / "bad.elf"
+        elf_path.write_bytes(b"not an elf file")
+
+        with pytest.raises(HexVerifyError):
+            verify_hex_against_elf(MemoryImage(), elf_path)
@@ -299,3 +299,49 @@ class TestLogging:
         log_messages = [call[0][0] for call in context.log_callback.call_args_list]
         # 检查 ERROR 日志
         assert any("[ERROR]" in msg for msg in log_messages)
+
+
+class TestDeltaHex:
+    """测试差分 HEX 生成"""
+
+    def test_generate_delta_hex_from_base_path(self):
+        """测试与指定的旧 HEX 比较生成差分 HEX 和扇区清单"""
+        from hexfile.intel_hex import MemoryImage, read_hex, write_hex
+        from stages.package import _generate_delta_hex
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base_hex = Path(temp_dir) / "Prev.hex"
+            new_hex = Path(temp_dir) / "App.hex"
+            for path, value in ((base_hex, 0x11), (new_hex, 0x22)):
+                image = MemoryImage()
+                image.add(0x80000000, b"\x00" * 0x8000)
+                image.add(0x80008000, bytes([value]) * 0x100)
+                write_hex(image, path)
+
+            context = BuildContext()
+            context.config = {
+                "delta_hex_base_path": str(base_hex),
+                "delta_hex_sector_size": "0x4000"
+            }
+            context.log_callback = Mock()
+            context.state = {}
+
+            outputs = _generate_delta_hex(new_hex, context)
+
+            assert [p.name for p in outputs] == ["App_delta.hex", "App_delta.json"]
+            assert read_hex(outputs[0]).ranges() == [(0x80008000, 0x80008100)]
+            assert context.state["delta_hex"]["sectors_changed"] == 1
+            assert context.state["delta_hex"]["sectors_total"] == 3
+
+    def test_skip_without_base_hex(self):
+        """测试没有旧 HEX 时跳过差分生成"""
+        from stages.package import _generate_delta_hex
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            context = BuildContext()
+            context.config = {"delta_hex_base_path": str(Path(temp_dir) / "missing.hex")}
+            context.log_callback = Mock()
+            context.state = {}
+
+            assert _generate_delta_hex(Path(temp_dir) / "App.hex", context) == []
+            assert "delta_hex" not in context.state
@@ -0,0 +1,220 @@
+"""Unit tests for the content-addressed stage result cache.
+
+Tests:
+- Cache key computation from config, input files and upstream state
+- Restoring output files and state entries on a hit
+- Skipping the cache for incomplete inputs and failed stages
+- Entry pruning and build record serialization
+"""
+
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.build_history_models import StageExecutionRecord, StageStatus as RecordStatus
+from core.models import BuildContext, StageConfig, StageResult, StageStatus
+from core.stage_cache import CACHE_STATE_KEY, StageCache, StageCacheSpec
+from core.workflow import get_stage_cache_spec, run_stage_executor
+
+
+class TestStageCache:
+    """测试阶段缓存"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.model_dir = self.temp_dir / "model"
+        self.model_dir.mkdir()
+        (self.model_dir / "App.slx").write_bytes(b"model-v1")
+        (self.model_dir / "slprj").mkdir()
+        (self.model_dir / "slprj" / "cache.mat").write_bytes(b"volatile")
+        self.output_dir = self.temp_dir / "out"
+
+        self.cache = StageCache(cache_dir=self.temp_dir / "cache")
+        self.spec = StageCacheSpec(
+            config_keys=["simulink_path"],
+            input_paths=lambda context: [Path(context.config["simulink_path"])],
+            input_extensions=(".slx", ".mat"),
+            exclude_dirs=("slprj",),
+            state_outputs=["gen_output"],
+            output_paths=lambda context: [self.output_dir]
+        )
+        self.executor = Mock(side_effect=self._generate)
+
+    def teardown_method(self):
+        """每个测试方法后的清理"""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _generate(self, stage_config, context):
+        """模拟生成代码的阶段"""
+        self.output_dir.mkdir(exist_ok=True)
+        (self.output_dir / "App.c").write_text("int x;", encoding='utf-8')
+        context.state["gen_output"] = {"c_files": ["App.c"]}
+        return StageResult(status=StageStatus.COMPLETED, message="生成成功",
+                           output_files=[str(self.output_dir / "App.c")])
+
+    def _run(self, state=None):
+        """执行一次带缓存的阶段"""
+        context = BuildContext(config={"simulink_path": str(self.model_dir)}, state=state or {})
+        result = self.cache.run("gen", self.spec, self.executor, StageConfig(name="gen"), context)
+        return result, context
+
+    def test_hit_restores_outputs(self):
+        """测试输入不变时恢复输出文件和状态，不再执行阶段"""
+        first, context = self._run()
+        assert first.message == "生成成功"
+        assert context.state[CACHE_STATE_KEY] == {"gen": "miss"}
+
+        shutil.rmtree(self.output_dir)
+        (self.model_dir / "slprj" / "cache.mat").write_bytes(b"changed")  # 排除目录不影响缓存键
+
+        second, context = self._run()
+
+        assert self.executor.call_count == 1
+        assert context.state[CACHE_STATE_KEY] == {"gen": "hit"}
+        assert context.state["gen_output"] == {"c_files": ["App.c"]}
+        assert (self.output_dir / "App.c").read_text(encoding='utf-8') == "int x;"
+        assert second.status == StageStatus.COMPLETED
+        assert second.output_files == first.output_files
+        assert "缓存" in second.message
+
+    def test_restore_cleans_outputs(self):
+        """测试 clean_outputs 为 True 时恢复前清空输出目录"""
+        self.spec.clean_outputs = True
+        self._run()
+        (self.output_dir / "Stale.c").write_text("old", encoding='utf-8')
+
+        _, context = self._run()
+
+        assert context.state[CACHE_STATE_KEY] == {"gen": "hit"}
+        assert sorted(p.name for p in self.output_dir.iterdir()) == ["App.c"]
+
+    def test_tool_version_in_key(self):
+        """测试工具版本变化时重新执行，版本无法确定时不使用缓存"""
+        version = {"value": "R2023b"}
+        self.spec.tool_version = lambda context: version["value"]
+        self._run()
+
+        version["value"] = "R2024a"
+        self._run()
+        assert self.executor.call_count == 2
+
+        version["value"] = None
+        _, context = self._run()
+        assert self.executor.call_count == 3
+        assert CACHE_STATE_KEY not in context.state
+
+    def test_input_change_misses(self):
+        """测试输入文件内容变化时重新执行"""
+        self._run()
+        (self.model_dir / "App.slx").write_bytes(b"model-v2")
+
+        _, context = self._run()
+
+        assert self.executor.call_count == 2
+        assert context.state[CACHE_STATE_KEY] == {"gen": "miss"}
+
+    def test_upstream_state_files_in_key(self):
+        """测试上游状态引用的文件内容参与缓存键计算"""
+        source = self.temp_dir / "Moved.c"
+        source.write_text("v1", encoding='utf-8')
+        self.spec.state_inputs = ["moved_files"]
+        state = {"moved_files": {"c_files": [str(source)], "timestamp": "t1"}}
+        context = BuildContext(config={"simulink_path": str(self.model_dir)}, state=state)
+
+        key = self.cache.compute_key("gen", self.spec, context)
+        state["moved_files"]["timestamp"] = "t2"
+        assert self.cache.compute_key("gen", self.spec, context) == key
+
+        source.write_text("v2", encoding='utf-8')
+        assert self.cache.compute_key("gen", self.spec, context) != key
+
+    def test_missing_input_bypasses_cache(self):
+        """测试输入不存在时直接执行且不记录命中情况"""
+        shutil.rmtree(self.model_dir)
+
+        result, context = self._run()
+
+        assert result.message == "生成成功"
+        assert CACHE_STATE_KEY not in context.state
+        assert not (self.temp_dir / "cache").exists()
+
+    def test_failed_stage_not_stored(self):
+        """测试失败的阶段结果不写入缓存"""
+        self.executor.side_effect = lambda c, ctx: StageResult(status=StageStatus.FAILED, message="失败")
+
+        self._run()
+        self._run()
+
+        assert self.executor.call_count == 2
+
+    def test_prune_keeps_recent_entries(self):
+        """测试只保留最近的条目并清理不再引用的对象"""
+        self.cache.max_entries = 1
+        self._run()
+        (self.output_dir / "App.c").write_text("stale", encoding='utf-8')
+        (self.model_dir / "App.slx").write_bytes(b"model-v2")
+        self._run()
+
+        entries = list((self.temp_dir / "cache" / "entries" / "gen").glob("*.json"))
+        objects = list((self.temp_dir / "cache" / "objects").glob("*/*"))
+        assert len(entries) == 1
+        assert len(objects) == 1
+
+
+class TestStageCacheIntegration:
+    """测试阶段缓存与执行器和构建记录的集成"""
+
+    def test_cacheable_stages_declare_spec(self):
+        """测试 matlab_gen 和 iar_compile 声明了缓存输入"""
+        assert "simulink_path" in get_stage_cache_spec("matlab_gen").config_keys
+        assert "moved_files" in get_stage_cache_spec("iar_compile").state_inputs
+        assert get_stage_cache_spec("package") is None
+
+    def test_matlab_spec_key_inputs(self):
+        """测试 matlab_gen 的缓存键包含外部引用文件和 MATLAB 版本"""
+        spec = get_stage_cache_spec("matlab_gen")
+        context = BuildContext(config={"simulink_path": "/m/App.slx", "matlab_code_path": "/m",
+                                       "matlab_cache_extra_paths": ["/lib/Shared.slx"],
+                                       "matlab_version": "R2023b"})
+
+        assert Path("/lib/Shared.slx") in spec.input_paths(context)
+        assert spec.tool_version(context) == "R2023b"
+        assert spec.clean_outputs
+
+    def test_stage_cache_disabled_by_default(self):
+        """测试未配置 stage_cache 时不查询缓存"""
+        executor = Mock(return_value=StageResult(status=StageStatus.COMPLETED, message="ok"))
+
+        with patch.dict("core.workflow.STAGE_EXECUTORS", {"matlab_gen": executor}), \
+                patch("core.workflow.StageCache") as cache_cls:
+            run_stage_executor(StageConfig(name="matlab_gen"), BuildContext())
+
+        executor.assert_called_once()
+        cache_cls.assert_not_called()
+
+    def test_run_stage_executor_respects_config(self):
+        """测试 stage_cache 配置为 False 时不查询缓存"""
+        executor = Mock(return_value=StageResult(status=StageStatus.COMPLETED, message="ok"))
+        context = BuildContext(config={"stage_cache": False})
+
+        with patch.dict("core.workflow.STAGE_EXECUTORS", {"matlab_gen": executor}), \
+                patch("core.workflow.StageCache") as cache_cls:
+            run_stage_executor(StageConfig(name="matlab_gen"), context)
+
+        executor.assert_called_once()
+        cache_cls.assert_not_called()
+
+    def test_record_serializes_cache_status(self):
+        """测试构建记录保存阶段缓存状态"""
+        record = StageExecutionRecord(
+            stage_id="b_matlab_gen", build_id="b", stage_name="matlab_gen",
+            status=RecordStatus.COMPLETED, start_time=datetime.now(), cache_status="hit"
+        )
+
+        data = record.to_dict()
+
+        assert data["cache_status"] == "hit"
+        assert StageExecutionRecord.from_dict(data).cache_status == "hit"
@@ -0,0 +1,239 @@
+"""Unit tests for the DAG-based stage scheduler.
+
+Tests:
+- Dependency graph construction for enabled stages
+- Sequential execution of dependency chains on the calling thread
+- Concurrent execution of independent stages
+- Failure and cancellation handling
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from core.models import BuildContext, StageConfig, StageResult, StageStatus, WorkflowConfig
+from core.scheduler import StageScheduler, build_stage_graph
+from core.workflow import STAGE_DEPENDENCIES, execute_workflow
+
+
+def make_stages(*names):
+    """创建启用的阶段配置列表"""
+    return [StageConfig(name=name) for name in names]
+
+
+def completed(message="ok"):
+    """创建成功的阶段结果"""
+    return StageResult(status=StageStatus.COMPLETED, message=message)
+
+
+class TestBuildStageGraph:
+    """测试依赖图构建"""
+
+    def test_disabled_dependency_resolved(self):
+        """测试依赖的阶段被禁用时改为依赖其前置阶段"""
+        stages = make_stages("matlab_gen", "file_process", "iar_compile", "package")
+
+        graph = build_stage_graph(stages, STAGE_DEPENDENCIES)
+
+        assert graph == {
+            "matlab_gen": [],
+            "file_process": ["matlab_gen"],
+            "iar_compile": ["file_process"],
+            "package": ["iar_compile"],
+        }
+
+    def test_unknown_stage_keeps_order(self):
+        """测试未知阶段依赖配置中的前一个阶段"""
+        stages = make_stages("matlab_gen", "custom_a", "custom_b")
+
+        graph = build_stage_graph(stages, STAGE_DEPENDENCIES)
+
+        assert graph["custom_a"] == ["matlab_gen"]
+        assert graph["custom_b"] == ["custom_a"]
+
+    def test_declared_dependencies_override_rules(self):
+        """测试 depends_on 覆盖内置依赖规则，声明的依赖被禁用时改为依赖其前置阶段"""
+        stages = make_stages("matlab_gen", "file_process", "iar_compile", "a2l_process", "package")
+        stages[3].depends_on = ["file_move"]
+        stages[4].depends_on = ["iar_compile"]
+
+        graph = build_stage_graph(stages, STAGE_DEPENDENCIES)
+
+        assert graph["a2l_process"] == ["file_process"]
+        assert graph["package"] == ["iar_compile"]
+
+    def test_empty_declared_dependencies(self):
+        """测试 depends_on 为空列表的阶段不依赖任何阶段，可与前一阶段并行"""
+        stages = make_stages("custom_a", "custom_b")
+        stages[1].depends_on = []
+
+        assert build_stage_graph(stages, STAGE_DEPENDENCIES) == {"custom_a": [], "custom_b": []}
+
+    def test_depends_on_roundtrip(self):
+        """测试 depends_on 随阶段配置序列化"""
+        stage = StageConfig(name="package", depends_on=["iar_compile"])
+
+        assert StageConfig.from_dict(stage.to_dict()) == stage
+        assert StageConfig.from_dict({"name": "package"}).depends_on is None
+
+
+class TestStageScheduler:
+    """测试阶段调度器"""
+
+    def setup_method(self):
+        """每个测试方法前的设置"""
+        self.lock = threading.Lock()
+        self.events = []
+        self.main_thread = threading.get_ident()
+
+    def record(self, event):
+        """记录事件"""
+        with self.lock:
+            self.events.append(event)
+
+    def test_chain_runs_inline_in_order(self):
+        """测试依赖链在当前线程中按顺序执行"""
+        threads = []
+
+        def run_stage(stage):
+            threads.append(threading.get_ident())
+            self.record(("run", stage.name))
+            return completed()
+
+        scheduler = StageScheduler(
+            make_stages("matlab_gen", "file_process", "file_move"),
+            run_stage,
+            dependencies=STAGE_DEPENDENCIES,
+            on_stage_start=lambda s: self.record(("start", s.name)),
+            on_stage_finish=lambda s, r: self.record(("finish", s.name))
+        )
+        result = scheduler.run()
+
+        assert result.success
+        assert self.events == [
+            ("start", "matlab_gen"), ("run", "matlab_gen"), ("finish", "matlab_gen"),
+            ("start", "file_process"), ("run", "file_process"), ("finish", "file_process"),
+            ("start", "file_move"), ("run", "file_move"), ("finish", "file_move"),
+        ]
+        assert set(threads) == {self.main_thread}
+
+    def test_independent_stages_overlap(self):
+        """测试独立阶段并行执行，回调在调用线程中执行"""
+        barrier = threading.Barrier(2, timeout=5)
+        callback_threads = set()
+
+        def run_stage(stage):
+            if stage.name in ("a2l", "hex"):
+                barrier.wait()  # 两个阶段必须同时运行才能通过
+            self.record(stage.name)
+            return completed()
+
+        def on_finish(stage, result):
+            callback_threads.add(threading.get_ident())
+
+        scheduler = StageScheduler(
+            make_stages("compile", "a2l", "hex", "package"),
+            run_stage,
+            max_workers=2,
+            dependencies={"compile": [], "a2l": ["compile"], "hex": ["compile"],
+                          "package": ["a2l", "hex"]},
+            on_stage_finish=on_finish
+        )
+        result = scheduler.run()
+
+        assert result.success
+        assert self.events[0] == "compile"
+        assert self.events[-1] == "package"
+        assert callback_threads == {self.main_thread}
+
+    def test_max_workers_bounds_concurrency(self):
+        """测试同时运行的阶段数不超过 max_workers"""
+        active = []
+        peak = []
+
+        def run_stage(stage):
+            with self.lock:
+                active.append(stage.name)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with self.lock:
+                active.remove(stage.name)
+            return completed()
+
+        names = ["s1", "s2", "s3", "s4", "s5"]
+        scheduler = StageScheduler(make_stages(*names), run_stage, max_workers=2,
+                                   dependencies={name: [] for name in names})
+
+        assert scheduler.run().success
+        assert max(peak) == 2
+
+    def test_failure_stops_new_stages(self):
+        """测试阶段失败后不再启动后续阶段，运行中的阶段正常结束"""
+        def run_stage(stage):
+            if stage.name == "a":
+                return StageResult(status=StageStatus.FAILED, message="boom")
+            if stage.name == "b":
+                time.sleep(0.2)
+            self.record(stage.name)
+            return completed()
+
+        scheduler = StageScheduler(
+            make_stages("a", "b", "c"),
+            run_stage,
+            max_workers=2,
+            dependencies={"a": [], "b": [], "c": ["b"]}
+        )
+        result = scheduler.run()
+
+        assert result.failed_stage == "a"
+        assert result.results["b"].status == StageStatus.COMPLETED
+        assert result.skipped == ["c"]
+        assert self.events == ["b"]
+
+    def test_exception_becomes_failure(self):
+        """测试阶段抛出异常时转换为失败结果"""
+        def run_stage(stage):
+            raise RuntimeError("crash")
+
+        result = StageScheduler(make_stages("a"), run_stage, dependencies={}).run()
+
+        assert result.failed_stage == "a"
+        assert "crash" in result.results["a"].message
+
+    def test_cancel_waits_for_running_stages(self):
+        """测试取消后等待运行中的阶段结束并跳过未启动阶段"""
+        cancel = threading.Event()
+
+        def run_stage(stage):
+            if stage.name == "a":
+                cancel.set()
+                time.sleep(0.2)
+            return completed()
+
+        scheduler = StageScheduler(
+            make_stages("a", "b", "c"),
+            run_stage,
+            max_workers=2,
+            dependencies={"a": [], "b": [], "c": ["a"]},
+            cancel_check=cancel.is_set
+        )
+        result = scheduler.run()
+
+        assert result.cancelled
+        assert result.results["a"].status == StageStatus.COMPLETED
+        assert result.skipped == ["c"]
+
+
+class TestExecuteWorkflowScheduling:
+    """测试 execute_workflow 使用调度器"""
+
+    def test_parallel_max_from_config(self):
+        """测试 max_parallel_stages 配置传递给调度器"""
+        context = BuildContext(config={"max_parallel_stages": 1})
+        workflow = WorkflowConfig(name="test", stages=make_stages("custom_a", "custom_b"))
+
+        with patch("core.workflow.StageScheduler", wraps=StageScheduler) as scheduler_cls:
+            assert execute_workflow(workflow, context) is True
+
+        assert scheduler_cls.call_args.kwargs["max_workers"] == 1
+        assert context.state["custom_b_output"] == []
@@ -1,75 +1,69 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
-"""Verify addresses match between tool output and manual processing."""
+"""对比工具输出与手动处理的 A2L 中各对象的地址
 
-import sys
+命令行包装，比较逻辑见 src/a2l/a2l_diff.py（按名称索引 CHARACTERISTIC、
+MEASUREMENT、AXIS_PTS，支持标准格式和 Simulink 注释格式）。
+
+使用方法：
+    python verify_addresses.py TmsApp_test_output.a2l TmsApp_Mana.a2l
+    python verify_addresses.py tool.a2l manual.a2l --var Lo_Temp --var HV_PTC_Emg_Off_Rq
+
+全部地址一致时退出码为 0，存在差异为 1，文件无法读取为 2。
+"""
+
+import argparse
 import io
-import re
+import sys
 from pathlib import Path
 
-# 设置 stdout 编码为 utf-8
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-
-# 读取工具输出和手动处理文件
-tool_file = Path(r'D:\BaiduSyncdisk\4-学习\100-项目\181_CICDRedo\00_用户输入需求与材料\MBD_CICD_Obj_2026_03_04_16_08\TmsApp_test_output.a2l')
-mana_file = Path(r'D:\BaiduSyncdisk\4-学习\100-项目\181_CICDRedo\00_用户输入需求与材料\MBD_CICD_Obj_2026_03_04_16_08\TmsApp_Mana.a2l')
-
-# 提取地址的正则
-addr_pattern = re.compile(r'(?:ECU_ADDRESS|/\*\s*ECU\s+Address\s*\*/)\s+(0x[0-9A-Fa-f]+)')
-
-def extract_addresses(file_path):
-    """从A2L文件中提取变量地址"""
-    addresses = {}
-    content = file_path.read_text(encoding='utf-8')
-    lines = content.splitlines()
-
-    for i, line in enumerate(lines):
-        # 查找变量名（在地址行之前）
-        if '/* Name */' in line or '/* Name                   */' in line:
-            var_match = re.search(r'Name\s*\*/\s*(\S+)', line)
-            if var_match:
-                var_name = var_match.group(1)
-                # 在接下来几行查找地址
-                for j in range(i, min(i+20, len(lines))):
-                    addr_match = addr_pattern.search(lines[j])
-                    if addr_match:
-                        addresses[var_name] = addr_match.group(1)
-                        break
-
-    return addresses
-
-print("提取变量地址...")
-tool_addrs = extract_addresses(tool_file)
-mana_addrs = extract_addresses(mana_file)
-
-print(f"工具输出: {len(tool_addrs)} 个变量")
-print(f"手动处理: {len(mana_addrs)} 个变量")
-
-# 对比特定变量
-test_vars = ['HV_PTC_Emg_Off_Rq', 'Lo_Temp', 'cCbnEMA_DuctAirFlowRateVent_x',
-            'TwmCtrl_tHeaterClntTrgtMax', 'cCbnBlw_BlowerAirFlow2Level_Front_x']
-
-print("\n" + "="*80)
-print("变量地址对比:")
-print("="*80)
-print(f"{'变量名':45s} {'工具输出':12s} {'手动处理':12s} {'匹配':6s}")
-print("="*80)
-
-all_match = True
-mismatches = []
-for var in test_vars:
-    tool_addr = tool_addrs.get(var, '未找到')
-    mana_addr = mana_addrs.get(var, '未找到')
-    match = '✅' if tool_addr == mana_addr else '❌'
-    if match == '❌':
-        all_match = False
-        mismatches.append((var, tool_addr, mana_addr))
-    print(f'{var:45s} {tool_addr:12s} {mana_addr:12s} {match:6s}')
-
-print("="*80)
-if all_match:
-    print("✅ 全部匹配!")
-else:
-    print(f"❌ 存在 {len(mismatches)} 个差异:")
-    for var, t, m in mismatches:
-        print(f"   {var}: 工具={t}, 手动={m}")
+# 添加 src 到 Python 路径
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from a2l.a2l_diff import ADDRESS_FIELDS, A2LDiffer  # noqa: E402
+from a2l.a2l_parser import A2LParseError  # noqa: E402
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="对比两个 A2L 文件中的对象地址")
+    parser.add_argument("tool", type=Path, help="工具输出的 A2L 文件")
+    parser.add_argument("manual", type=Path, help="手动处理的 A2L 文件")
+    parser.add_argument("--var", action="append", default=[], help="只对比指定对象（可重复）")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """执行地址对比"""
+    args = parse_args(argv)
+
+    try:
+        result = A2LDiffer(ignore_addresses=False).diff(args.manual, args.tool)
+    except (FileNotFoundError, A2LParseError) as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 2
+
+    selected = set(args.var)
+    mismatches = []
+    for change in result.changed:
+        if selected and change.name not in selected:
+            continue
+        for field_change in change.changes:
+            if field_change.field in ADDRESS_FIELDS:
+                mismatches.append((change.kind, change.name, field_change.new, field_change.old))
+
+    print(f"工具输出: {result.new_count} 个对象, 手动处理: {result.old_count} 个对象")
+    print(f"{'对象':45s} {'工具输出':12s} {'手动处理':12s}")
+    for kind, name, tool_addr, manual_addr in mismatches:
+        print(f"{name:45s} {tool_addr or '-':12s} {manual_addr or '-':12s}  ({kind})")
+
+    only_tool = [name for _, name in result.added if not selected or name in selected]
+    only_manual = [name for _, name in result.removed if not selected or name in selected]
+    print(f"地址不一致: {len(mismatches)}, 仅工具输出: {len(only_tool)}, 仅手动处理: {len(only_manual)}")
+    return 1 if mismatches or only_tool or only_manual else 0
+
+
+if __name__ == "__main__":
+    # 设置 stdout 编码为 utf-8
+    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    sys.exit(main())